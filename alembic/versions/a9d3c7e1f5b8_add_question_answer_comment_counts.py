@@ -0,0 +1,61 @@
+"""Add live_answers_count and comments_count to question
+
+Counted from answer and comment and kept in step by crud.answer (creating,
+publishing, hiding and deleting an answer) and crud.comment (commenting on
+the question), so a question preview reads them off the row instead of
+loading every answer and comment of the question.
+
+A live answer is one that is published, not deleted and not hidden by a
+moderator; see model_utils.is_live_answer.
+
+Revision ID: a9d3c7e1f5b8
+Revises: f4b8d2e6a1c3
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a9d3c7e1f5b8'
+down_revision = 'f4b8d2e6a1c3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for column in ('live_answers_count', 'comments_count'):
+        op.add_column(
+            'question',
+            sa.Column(column, sa.Integer(), server_default='0', nullable=False),
+        )
+    op.execute(
+        """
+        UPDATE question SET live_answers_count = counts.n
+        FROM (
+            SELECT question_id, count(*) AS n
+            FROM answer
+            WHERE is_published AND NOT is_deleted AND NOT is_hidden_by_moderator
+            GROUP BY question_id
+        ) AS counts
+        WHERE question.id = counts.question_id
+        """
+    )
+    op.execute(
+        """
+        UPDATE question SET comments_count = counts.n
+        FROM (
+            SELECT question_id, count(*) AS n
+            FROM comment
+            WHERE question_id IS NOT NULL
+            GROUP BY question_id
+        ) AS counts
+        WHERE question.id = counts.question_id
+        """
+    )
+
+
+def downgrade():
+    op.drop_column('question', 'comments_count')
+    op.drop_column('question', 'live_answers_count')
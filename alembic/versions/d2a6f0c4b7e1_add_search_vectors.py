@@ -0,0 +1,48 @@
+"""Add search_vector columns for the Postgres search backend
+
+A nullable tsvector column and a GIN index on each searchable table. The
+columns are written by the application (infra/search_postgres.py), not
+generated: the text is segmented with jieba first, which Postgres cannot do.
+
+Nothing fills them here. Before setting SEARCH_BACKEND=postgres, run
+scripts/refresh_search_index.py with that setting to fill them.
+
+Adding a nullable column without a default is a catalog change. The indexes
+are built over all-NULL columns, so they are quick too.
+
+Revision ID: d2a6f0c4b7e1
+Revises: c8e21f7a9b34
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'd2a6f0c4b7e1'
+down_revision = 'c8e21f7a9b34'
+branch_labels = None
+depends_on = None
+
+_TABLES = ('question', 'answer', 'article', 'submission', 'site')
+
+
+def upgrade():
+    for table in _TABLES:
+        op.add_column(
+            table, sa.Column('search_vector', postgresql.TSVECTOR(), nullable=True)
+        )
+        op.create_index(
+            f'ix_{table}_search_vector',
+            table,
+            ['search_vector'],
+            postgresql_using='gin',
+        )
+
+
+def downgrade():
+    for table in _TABLES:
+        op.drop_index(f'ix_{table}_search_vector', table_name=table)
+        op.drop_column(table, 'search_vector')
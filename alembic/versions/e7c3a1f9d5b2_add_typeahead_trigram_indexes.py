@@ -0,0 +1,49 @@
+"""Add pg_trgm indexes for typeahead
+
+Trigram GIN indexes on the columns the search box completes: user handle and
+full name, site name and subdomain, topic name. They serve both
+``ILIKE '%fragment%'`` and the ``%`` similarity operator, which otherwise
+scan the table on every keystroke. See crud/crud_typeahead.py.
+
+pg_trgm ships with Postgres' contrib modules; creating the extension needs a
+role allowed to (a superuser, or the database owner on Postgres 13+).
+
+Revision ID: e7c3a1f9d5b2
+Revises: d2a6f0c4b7e1
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'e7c3a1f9d5b2'
+down_revision = 'd2a6f0c4b7e1'
+branch_labels = None
+depends_on = None
+
+_COLUMNS = (
+    ('user', 'handle'),
+    ('user', 'full_name'),
+    ('site', 'name'),
+    ('site', 'subdomain'),
+    ('topic', 'name'),
+)
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    for table, column in _COLUMNS:
+        op.create_index(
+            f'ix_{table}_{column}_trgm',
+            table,
+            [column],
+            postgresql_using='gin',
+            postgresql_ops={column: 'gin_trgm_ops'},
+        )
+
+
+def downgrade():
+    for table, column in _COLUMNS:
+        op.drop_index(f'ix_{table}_{column}_trgm', table_name=table)
+    # The extension stays: dropping it would fail on anything else using it.
@@ -0,0 +1,56 @@
+"""Add followers_count and followed_count to user
+
+Counted from the followers table and kept in step by crud.user.add_follower
+and remove_follower, so a user preview and the user ranking read them off
+the row instead of counting follows per user.
+
+The backfill counts distinct pairs: the followers table has no unique
+constraint, and a duplicated pair is one follow.
+
+Revision ID: f4b8d2e6a1c3
+Revises: e7c3a1f9d5b2
+Create Date: 2026-10-17
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4b8d2e6a1c3'
+down_revision = 'e7c3a1f9d5b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    for column in ('followers_count', 'followed_count'):
+        op.add_column(
+            'user',
+            sa.Column(column, sa.Integer(), server_default='0', nullable=False),
+        )
+    op.execute(
+        """
+        UPDATE "user" SET followers_count = counts.n
+        FROM (
+            SELECT followed_id, count(DISTINCT follower_id) AS n
+            FROM followers GROUP BY followed_id
+        ) AS counts
+        WHERE "user".id = counts.followed_id
+        """
+    )
+    op.execute(
+        """
+        UPDATE "user" SET followed_count = counts.n
+        FROM (
+            SELECT follower_id, count(DISTINCT followed_id) AS n
+            FROM followers GROUP BY follower_id
+        ) AS counts
+        WHERE "user".id = counts.follower_id
+        """
+    )
+
+
+def downgrade():
+    op.drop_column('user', 'followed_count')
+    op.drop_column('user', 'followers_count')
@@ -10,6 +10,7 @@ from chafan_core.app.schemas.answer_suggest_edit import (
     AnswerSuggestEditUpdate,
 )
 from chafan_core.app.services import answer_suggest_edits as answer_suggest_edits_service
+from chafan_core.app.services import tasks
 from chafan_core.app.services.postprocess import (
     postprocess_new_answer,
     postprocess_new_answer_suggest_edit,
@@ -28,7 +29,7 @@ def post_answer_suggest_edits(
     s, data = answer_suggest_edits_service.create_suggest_edit(
         ctx, create_in=create_in
     )
-    background_tasks.add_task(postprocess_new_answer_suggest_edit, s.id)
+    tasks.submit(background_tasks, postprocess_new_answer_suggest_edit, s.id)
     return data
 
 
@@ -51,7 +52,10 @@ def update_answer_suggest_edits(
         ctx, uuid=uuid, update_in=update_in
     )
     if answer_needs_postprocess and accepted_answer is not None:
-        background_tasks.add_task(
-            postprocess_new_answer, accepted_answer.id, answer_was_published
+        tasks.submit(
+            background_tasks,
+            postprocess_new_answer,
+            accepted_answer.id,
+            answer_was_published,
         )
     return data
@@ -10,6 +10,7 @@ from chafan_core.app.infra.request_context import RequestContext
 from chafan_core.app.limiter import limiter
 from chafan_core.app.schemas.answer import AnswerModUpdate
 from chafan_core.app.services import answers as answers_service
+from chafan_core.app.services import tasks
 from chafan_core.app.services.postprocess import postprocess_new_answer
 from chafan_core.utils.base import HTTPException_
 from chafan_core.utils.constants import MAX_ARCHIVE_PAGINATION_LIMIT
@@ -133,7 +134,7 @@ def create_answer(
     )
     if needs_postprocess:
         logger.info(f"create_answer add postprocess task id={answer.id}")
-        background_tasks.add_task(postprocess_new_answer, answer.id, False)
+        tasks.submit(background_tasks, postprocess_new_answer, answer.id, False)
     return data
 
 
@@ -153,7 +154,7 @@ def update_answer(
         ctx, uuid=uuid, answer_in=answer_in, ipaddr=client_ip(request)
     )
     if needs_postprocess:
-        background_tasks.add_task(postprocess_new_answer, answer.id, was_published)
+        tasks.submit(background_tasks, postprocess_new_answer, answer.id, was_published)
     return data
 
 
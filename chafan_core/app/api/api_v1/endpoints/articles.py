@@ -9,6 +9,7 @@ from chafan_core.app.api import deps
 from chafan_core.app.common import client_ip
 from chafan_core.app.infra.request_context import RequestContext
 from chafan_core.app.services import articles as articles_service
+from chafan_core.app.services import tasks
 from chafan_core.app.services.postprocess import (
     postprocess_new_article,
     postprocess_updated_article,
@@ -93,7 +94,7 @@ def create_article(
         ctx, article_in=article_in, ipaddr=client_ip(request)
     )
     if new_article.is_published:
-        background_tasks.add_task(postprocess_new_article, new_article.id)
+        tasks.submit(background_tasks, postprocess_new_article, new_article.id)
     return data
 
 
@@ -110,8 +111,8 @@ def update_article(
         ctx, uuid=uuid, article_in=article_in, ipaddr=client_ip(request)
     )
     if article.is_published:
-        background_tasks.add_task(
-            postprocess_updated_article, article.id, was_published
+        tasks.submit(
+            background_tasks, postprocess_updated_article, article.id, was_published
         )
     return data
 
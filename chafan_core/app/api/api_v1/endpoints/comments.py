@@ -7,6 +7,7 @@ from chafan_core.app import schemas
 from chafan_core.app.api import deps
 from chafan_core.app.infra.request_context import RequestContext
 from chafan_core.app.services import comments as comments_service
+from chafan_core.app.services import tasks
 from chafan_core.app.services.postprocess import postprocess_comment_update, postprocess_new_comment
 from chafan_core.utils.base import HTTPException_
 
@@ -71,7 +72,8 @@ def create_comment(
 ) -> Any:
     """Create new comment authored by the current active user."""
     comment, comment_data = comments_service.create_comment(ctx, comment_in=comment_in)
-    background_tasks.add_task(
+    tasks.submit(
+        background_tasks,
         postprocess_new_comment,
         comment.id,
         comment_in.shared_to_timeline,
@@ -92,7 +94,8 @@ def update_comment(
     comment, comment_data, was_shared = comments_service.update_comment(
         ctx, uuid=uuid, comment_in=comment_in
     )
-    background_tasks.add_task(
+    tasks.submit(
+        background_tasks,
         postprocess_comment_update,
         comment.id,
         was_shared,
@@ -1,6 +1,6 @@
 from typing import Any, List
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, BackgroundTasks, Depends, Query
 
 from chafan_core.app import schemas
 from chafan_core.app.api import deps
@@ -35,16 +35,18 @@ def get_pending_questions(
     response_model=List[schemas.QuestionPreview],
 )
 def get_interesting_questions(
+    background_tasks: BackgroundTasks,
     ctx: RequestContext = Depends(deps.get_request_context),
 ) -> Any:
-    return discovery_service.interesting_questions(ctx)
+    return discovery_service.interesting_questions(ctx, background_tasks)
 
 
 @router.get("/interesting-users/", response_model=List[schemas.UserPreview])
 def get_interesting_users(
+    background_tasks: BackgroundTasks,
     ctx: RequestContext = Depends(deps.get_request_context),
 ) -> Any:
-    return discovery_service.interesting_users(ctx)
+    return discovery_service.interesting_users(ctx, background_tasks)
 
 
 @router.get(
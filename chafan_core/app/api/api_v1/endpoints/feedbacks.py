@@ -11,6 +11,7 @@ from chafan_core.app.common import valid_content_length
 from chafan_core.app.infra.request_context import RequestContext
 from chafan_core.app.limiter import limiter
 from chafan_core.app.services import feedbacks as feedbacks_service
+from chafan_core.app.services import tasks
 from chafan_core.utils.validators import CaseInsensitiveEmailStr
 
 router = APIRouter()
@@ -68,5 +69,5 @@ def post_feedback(
     )
     from chafan_core.app.services.postprocess import postprocess_new_feedback
 
-    background_tasks.add_task(postprocess_new_feedback, feedback.id)
+    tasks.submit(background_tasks, postprocess_new_feedback, feedback.id)
     return schemas.GenericResponse()
@@ -1,6 +1,6 @@
 from typing import Any, List, Optional
 
-from fastapi import APIRouter, BackgroundTasks, Depends, Request, Response
+from fastapi import APIRouter, BackgroundTasks, Depends, Query, Request, Response
 
 from chafan_core.app import schemas
 from chafan_core.app.api import deps
@@ -8,10 +8,12 @@ from chafan_core.app.common import client_ip
 from chafan_core.app.infra.request_context import RequestContext
 from chafan_core.app.limiter import limiter
 from chafan_core.app.services import questions as questions_service
+from chafan_core.app.services import tasks
 from chafan_core.app.services.postprocess import (
     postprocess_new_question,
     postprocess_updated_question,
 )
+from chafan_core.utils.constants import MAX_QUESTION_PAGE_ANSWERS_LIMIT
 
 router = APIRouter()
 
@@ -76,7 +78,7 @@ def create_question(
     new_question, data = questions_service.create_question(
         ctx, question_in=question_in, ipaddr=client_ip(request)
     )
-    background_tasks.add_task(postprocess_new_question, new_question.id)
+    tasks.submit(background_tasks, postprocess_new_question, new_question.id)
     return data
 
 
@@ -100,7 +102,7 @@ def update_question(
         current_user_id=current_user_id,
         ipaddr=client_ip(request),
     )
-    background_tasks.add_task(postprocess_updated_question, new_question.id)
+    tasks.submit(background_tasks, postprocess_updated_question, new_question.id)
     return data
 
 
@@ -176,5 +178,45 @@ def get_question_page(
     *,
     ctx: RequestContext = Depends(deps.get_request_context),
     uuid: str,
+    limit: int = Query(
+        default=MAX_QUESTION_PAGE_ANSWERS_LIMIT,
+        le=MAX_QUESTION_PAGE_ANSWERS_LIMIT,
+        gt=0,
+    ),
+    fields: List[schemas.QuestionPageField] = Query(
+        default=["full_answers", "answer_previews"]
+    ),
 ) -> Any:
-    return questions_service.get_question_page(ctx, uuid=uuid, request=request)
+    """
+    Get the question with its first answers. Pass ``answers_cursor`` to
+    ``/{uuid}/page/answers`` for the next ones.
+    """
+    return questions_service.get_question_page(
+        ctx, uuid=uuid, request=request, limit=limit, fields=fields
+    )
+
+
+@router.get("/{uuid}/page/answers", response_model=schemas.QuestionPageAnswers)
+@limiter.limit("60/minute")
+def get_question_page_answers(
+    response: Response,
+    request: Request,
+    *,
+    ctx: RequestContext = Depends(deps.get_request_context),
+    uuid: str,
+    cursor: str,
+    limit: int = Query(
+        default=MAX_QUESTION_PAGE_ANSWERS_LIMIT,
+        le=MAX_QUESTION_PAGE_ANSWERS_LIMIT,
+        gt=0,
+    ),
+    fields: List[schemas.QuestionPageField] = Query(
+        default=["full_answers", "answer_previews"]
+    ),
+) -> Any:
+    """
+    Get the next answers of a question page, after ``cursor``.
+    """
+    return questions_service.get_question_page_answers(
+        ctx, uuid=uuid, cursor=cursor, limit=limit, fields=fields
+    )
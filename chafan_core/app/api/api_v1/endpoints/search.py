@@ -1,18 +1,35 @@
 from typing import Any, List
 
-from fastapi import APIRouter, Depends, Request, Response
+from fastapi import APIRouter, Depends, Query, Request, Response
 
 from chafan_core.app import schemas
 from chafan_core.app.api import deps
 from chafan_core.app.infra.request_context import RequestContext
 from chafan_core.app.limiter import limiter
 from chafan_core.app.services import search as search_service
+from chafan_core.utils.constants import (
+    MAX_SEARCH_PAGINATION_LIMIT,
+    MAX_TYPEAHEAD_LIMIT,
+)
 
 router = APIRouter()
 
 _SEARCH_RATE_LIMIT = "60/minute"
 
 
+@router.get("/typeahead/", response_model=List[schemas.TypeaheadSuggestion])
+@limiter.limit(_SEARCH_RATE_LIMIT)
+def typeahead(
+    response: Response,
+    request: Request,
+    *,
+    ctx: RequestContext = Depends(deps.get_request_context_logged_in),
+    q: str,
+    limit: int = Query(default=MAX_TYPEAHEAD_LIMIT, le=MAX_TYPEAHEAD_LIMIT, gt=0),
+) -> Any:
+    return search_service.typeahead(ctx, q, limit=limit)
+
+
 @router.get("/users/", response_model=List[schemas.UserPreview])
 @limiter.limit(_SEARCH_RATE_LIMIT)
 def search_users(
@@ -33,8 +50,12 @@ def search_sites(
     *,
     ctx: RequestContext = Depends(deps.get_request_context_logged_in),
     q: str,
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(
+        default=MAX_SEARCH_PAGINATION_LIMIT, le=MAX_SEARCH_PAGINATION_LIMIT, gt=0
+    ),
 ) -> Any:
-    return search_service.search_sites(ctx, q)
+    return search_service.search_sites(ctx, q, skip=skip, limit=limit)
 
 
 @router.get("/topics/", response_model=List[schemas.Topic])
@@ -58,8 +79,12 @@ def search_questions(
     ctx: RequestContext = Depends(deps.get_request_context_logged_in),
     # This API is very time consuming! Must check user logged in
     q: str,
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(
+        default=MAX_SEARCH_PAGINATION_LIMIT, le=MAX_SEARCH_PAGINATION_LIMIT, gt=0
+    ),
 ) -> Any:
-    return search_service.search_questions(ctx, q)
+    return search_service.search_questions(ctx, q, skip=skip, limit=limit)
 
 
 @router.get("/articles/", response_model=List[schemas.ArticlePreview])
@@ -70,8 +95,12 @@ def search_articles(
     *,
     ctx: RequestContext = Depends(deps.get_request_context_logged_in),
     q: str,
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(
+        default=MAX_SEARCH_PAGINATION_LIMIT, le=MAX_SEARCH_PAGINATION_LIMIT, gt=0
+    ),
 ) -> Any:
-    return search_service.search_articles(ctx, q)
+    return search_service.search_articles(ctx, q, skip=skip, limit=limit)
 
 
 @router.get("/submissions/", response_model=List[schemas.Submission])
@@ -82,8 +111,12 @@ def search_submissions(
     *,
     ctx: RequestContext = Depends(deps.get_request_context_logged_in),
     q: str,
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(
+        default=MAX_SEARCH_PAGINATION_LIMIT, le=MAX_SEARCH_PAGINATION_LIMIT, gt=0
+    ),
 ) -> Any:
-    return search_service.search_submissions(ctx, q)
+    return search_service.search_submissions(ctx, q, skip=skip, limit=limit)
 
 
 @router.get("/answers/", response_model=List[schemas.AnswerPreview])
@@ -94,5 +127,9 @@ def search_answers(
     *,
     ctx: RequestContext = Depends(deps.get_request_context_logged_in),
     q: str,
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(
+        default=MAX_SEARCH_PAGINATION_LIMIT, le=MAX_SEARCH_PAGINATION_LIMIT, gt=0
+    ),
 ) -> Any:
-    return search_service.search_answers(ctx, q)
+    return search_service.search_answers(ctx, q, skip=skip, limit=limit)
@@ -10,6 +10,7 @@ from chafan_core.app.schemas.submission_suggestion import (
     SubmissionSuggestionUpdate,
 )
 from chafan_core.app.services import submission_suggestions as submission_suggestions_service
+from chafan_core.app.services import tasks
 from chafan_core.app.services.postprocess import (
     postprocess_new_submission_suggestion,
     postprocess_updated_submission,
@@ -28,7 +29,7 @@ def post_submission_suggestions(
     s, data = submission_suggestions_service.create_suggestion(
         ctx, create_in=create_in
     )
-    background_tasks.add_task(postprocess_new_submission_suggestion, s.id)
+    tasks.submit(background_tasks, postprocess_new_submission_suggestion, s.id)
     return data
 
 
@@ -49,7 +50,7 @@ def update_submission_suggestions(
         ctx, uuid=uuid, update_in=update_in
     )
     if updated_submission is not None:
-        background_tasks.add_task(
-            postprocess_updated_submission, updated_submission.id
+        tasks.submit(
+            background_tasks, postprocess_updated_submission, updated_submission.id
         )
     return data
@@ -8,6 +8,7 @@ from chafan_core.app.api import deps
 from chafan_core.app.common import client_ip
 from chafan_core.app.infra.request_context import RequestContext
 from chafan_core.app.services import submissions as submissions_service
+from chafan_core.app.services import tasks
 from chafan_core.app.services.postprocess import (
     postprocess_new_submission,
     postprocess_updated_submission,
@@ -81,7 +82,7 @@ def create_submission(
         author=current_user,
         ipaddr=client_ip(request),
     )
-    background_tasks.add_task(postprocess_new_submission, new_submission.id)
+    tasks.submit(background_tasks, postprocess_new_submission, new_submission.id)
     return data
 
 
@@ -103,7 +104,7 @@ def update_submission(
         submission_in=submission_in,
         ipaddr=client_ip(request),
     )
-    background_tasks.add_task(postprocess_updated_submission, new_submission.id)
+    tasks.submit(background_tasks, postprocess_updated_submission, new_submission.id)
     return data
 
 
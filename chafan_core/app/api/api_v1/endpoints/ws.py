@@ -1,4 +1,3 @@
-import asyncio
 import secrets
 from datetime import timedelta
 from typing import Any
@@ -11,7 +10,6 @@ from websockets.exceptions import ConnectionClosedError, ConnectionClosedOK
 from chafan_core.app import schemas, ws_connections
 from chafan_core.app.api import deps
 from chafan_core.app.common import get_redis_cli
-from chafan_core.app.mq import get_ws_queue_for_user
 
 import logging
 logger = logging.getLogger(__name__)
@@ -33,11 +31,6 @@ def get_ws_token(
     return schemas.WsAuthResponse(token=token)
 
 
-def _read_message_queue(redis, queue_name:str):
-    item = redis.lpop(queue_name)
-    return item
-
-
 @router.websocket("")
 async def ws(websocket: WebSocket, token: str = Query(...)) -> Any:
     # TODO 1. should not depend on redis directly 2. should use dependency
@@ -50,16 +43,12 @@ async def ws(websocket: WebSocket, token: str = Query(...)) -> Any:
         return
     redis.delete(key)
     user_id = int(value)
-    await ws_connections.manager.connect(user_id, websocket)
-    queue_name = get_ws_queue_for_user(user_id)
+    # Messages are pushed by ws_connections.manager as they are published;
+    # this loop only notices the client leaving. Clients send nothing.
+    connection = await ws_connections.manager.connect(user_id, websocket)
     try:
         while True:
-            await asyncio.sleep(10)
-            msg = _read_message_queue(redis, queue_name)
-            if msg is None or msg == "":
-                continue
-            logger.info(f"read from redis: {msg}")
-            await ws_connections.manager.send_message(msg, user_id)
+            await websocket.receive_text()
     except (
         ConnectionClosedError,
         WebSocketDisconnect,
@@ -67,5 +56,6 @@ async def ws(websocket: WebSocket, token: str = Query(...)) -> Any:
         ConnectionClosedOK,
         RuntimeError,
     ) as e:
-        logger.error("websocket error: " + str(e))
-        ws_connections.manager.remove(user_id)
+        logger.info("websocket closed: " + str(e))
+    finally:
+        ws_connections.manager.remove(connection)
@@ -67,7 +67,28 @@ class Settings(BaseSettings):
 
     WELCOME_TEST_FORM_UUID: str = "4CGv4iReMxuWjs3T2PEY"
 
+    # "whoosh": an index directory per API host, at SEARCH_INDEX_FILESYSTEM_PATH.
+    # "postgres": search_vector columns shared by every host. Run
+    # scripts/refresh_search_index.py after switching.
+    SEARCH_BACKEND: Literal["whoosh", "postgres"] = "whoosh"
     SEARCH_INDEX_FILESYSTEM_PATH: str = "/tmp/chafan/search_index"
+    # Whoosh writer processes per index in a full rebuild, on top of the one
+    # process per index; see services/search_rebuild.py.
+    SEARCH_INDEX_REBUILD_WRITER_PROCS: int = 2
+    # When the app loads what its first requests would wait for: "background"
+    # while serving, "blocking" before binding the port, or "off". See
+    # app/warm_up.py.
+    STARTUP_WARM_UP: Literal["off", "background", "blocking"] = "background"
+    # Where jieba keeps its built dictionary between processes; default: the
+    # system temp directory. See infra/jieba_loader.py.
+    JIEBA_CACHE_DIR: Optional[str] = None
+    # Pages of search hits cached in Redis until the index changes, or for
+    # this long at most; 0 turns the cache off. See infra/search_cache.py.
+    SEARCH_RESULT_CACHE_TTL_SECONDS: int = 600
+    # Typeahead results kept per API process, by fragment; 0 turns the cache
+    # off. See services/search.py.
+    TYPEAHEAD_CACHE_SIZE: int = 1024
+    TYPEAHEAD_CACHE_TTL_SECONDS: int = 30
 
     EMAIL_RESET_TOKEN_EXPIRE_HOURS: int = 1
     EMAIL_SIGNUP_CODE_EXPIRE_HOURS: int = 1
@@ -120,10 +141,32 @@ class Settings(BaseSettings):
     ### Cache (Redis)
     CACHE_SITEMAP_VALID_HOURS: int = 1
 
+    ### Feed
+    # Above this many followers, an author's activity is no longer pushed to
+    # every follower as Feed rows; each follower's feed pulls it at read time.
+    # None pushes to everyone. See events.distribute and feed_impl.receiver_feed.
+    FEED_PULL_ABOVE_FOLLOWERS: Optional[int] = 5000
+
+    ### Task queue
+    # Where post-response jobs (services.postprocess) run. "inline": in the API
+    # process, as BackgroundTasks after the response -- best-effort, no retries
+    # (D4). "redis": the API only appends them to a Redis stream, and
+    # `python -m chafan_core.app.worker` runs them, with retries; that worker
+    # must then be running. See infra/task_queue.py.
+    TASK_QUEUE: Literal["inline", "redis"] = "inline"
+    TASK_WORKER_CONCURRENCY: int = 4
+    # Runs per job, the first included, before it is dead-lettered.
+    TASK_MAX_ATTEMPTS: int = 3
+
     ### Scheduled Tasks
     SCHEDULED_TASK_UPDATE_VIEW_COUNT_MINUTES: int = 5
-    SCHEDULED_TASK_REFRESH_SEARCH_INDEX_HOURS: int = 24
+    # How often content changed since the last run is re-indexed for search.
+    # The full rebuild is not scheduled; see scripts/refresh_search_index.py.
+    SCHEDULED_TASK_FLUSH_SEARCH_INDEX_SECONDS: int = 30
     SCHEDULED_TASK_FILL_MISSING_KEYWORDS_HOURS: int = 24
+    # How often the recommendation snapshots (related sites and users,
+    # follow-follow counts) are rebuilt; see infra/snapshot_store.py.
+    SCHEDULED_TASK_REFRESH_RECS_SNAPSHOTS_HOURS: int = 6
 
     # Karma and coin amounts are NOT settings -- they are product rules, and
     # they live in `chafan_core/app/rules.py` where they can be read and
@@ -0,0 +1,228 @@
+"""Contribution heatmaps: how much a user wrote on each day, by year.
+
+The profile page shows, for each year from the user's first post to their
+last, 364 daily levels from 0 to 3. They used to be computed by loading
+everything the user ever wrote through ORM relationships and binning it in
+Python, on every profile view. Now:
+
+- ``crud.user.get_daily_contribution_counts`` counts posts per kind per UTC
+  day in SQL, one ``GROUP BY`` per kind;
+- those counts are cached per user in a Redis hash,
+  ``chafan:contributions:<user id>``, with a field ``<kind>:<YYYY-MM-DD>``
+  per day;
+- :func:`bin_counts` turns them into the yearly arrays on each read, which
+  costs one pass over the user's active days.
+
+So a profile view costs one HGETALL, however much its user has written.
+
+Upkeep
+------
+Like ``karma.py``, this sits at the app root so crud can call it where
+content is created and deleted: :func:`record_new` after a create, and
+:func:`tracked` around a change that can move a post to another day (editing
+an answer) or stop it counting (deleting). Each adds and subtracts single
+days in the cached hash once the transaction commits. A hash that is not
+cached is left alone; the next read builds it. The TTL is the backstop for a
+change that lands between a read's query and its write to the cache.
+"""
+
+from __future__ import annotations
+
+import datetime
+import logging
+from contextlib import contextmanager
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from chafan_core.app import crud, models
+from chafan_core.app.common import get_redis_cli
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL = datetime.timedelta(days=1)
+
+# Days per yearly array. Days 365 and 366 count towards the last one.
+DAYS_PER_YEAR = 364
+
+# Present in every cached hash, so a user who has written nothing is cached
+# too (Redis has no empty hashes).
+_BUILT = "built"
+
+# Adds to a field of a cached hash, dropping it at zero; a hash that is not
+# cached stays that way.
+_ADD_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    local n = redis.call('HINCRBY', KEYS[1], ARGV[1], ARGV[2])
+    if n <= 0 then
+        redis.call('HDEL', KEYS[1], ARGV[1])
+    end
+end
+"""
+
+Contributor = Union[models.Answer, models.Article, models.Question, models.Submission]
+# (kind, day, n)
+DailyCounts = List[Tuple[str, datetime.date, int]]
+# List of (year, day_contribs[1..364]), latest year first
+UserContributions = List[Tuple[int, List[int]]]
+
+
+def _cache_key(user_id: int) -> str:
+    return f"chafan:contributions:{user_id}"
+
+
+def _utc_day(timestamp: datetime.datetime) -> datetime.date:
+    return timestamp.astimezone(datetime.timezone.utc).date()
+
+
+def counted_day(item: Contributor) -> Optional[Tuple[str, datetime.date]]:
+    """The (kind, day) ``item`` counts towards; None if it does not count.
+
+    Must agree with ``crud.user.get_daily_contribution_counts``.
+    """
+    if isinstance(item, models.Answer):
+        if item.is_deleted:
+            return None
+        return "answer", _utc_day(item.updated_at)
+    if isinstance(item, models.Article):
+        if item.is_deleted:
+            return None
+        return "article", _utc_day(item.created_at)
+    if isinstance(item, models.Question):
+        return "question", _utc_day(item.created_at)
+    if isinstance(item, models.Submission):
+        return "submission", _utc_day(item.created_at)
+    raise TypeError(f"{type(item).__name__} is not a contribution")
+
+
+def _day_level(kinds: Dict[str, int]) -> int:
+    level = 0
+    if "answer" in kinds:
+        level += max(kinds["answer"], 2)
+    if "question" in kinds:
+        level += max(kinds["question"], 1)
+    if "submission" in kinds:
+        level += max(int(kinds["submission"] / 2), 1)
+    if "article" in kinds:
+        level += max(kinds["article"], 2)
+    return min(level, 3)
+
+
+def bin_counts(
+    counts: Iterable[Tuple[str, datetime.date, int]]
+) -> UserContributions:
+    """The yearly arrays of daily levels, latest year first, every year from
+    the first post's to the last's included."""
+    days: Dict[Tuple[int, int], Dict[str, int]] = {}
+    for kind, day, n in counts:
+        if n <= 0:
+            continue
+        slot = (day.year, min(day.timetuple().tm_yday, DAYS_PER_YEAR))
+        kinds = days.setdefault(slot, {})
+        kinds[kind] = kinds.get(kind, 0) + n
+    if not days:
+        return []
+    first = min(year for year, _ in days)
+    last = max(year for year, _ in days)
+    years = {year: [0] * DAYS_PER_YEAR for year in range(first, last + 1)}
+    for (year, yday), kinds in days.items():
+        years[year][yday - 1] = _day_level(kinds)
+    return sorted(years.items(), reverse=True)
+
+
+def _parse(cached: Dict[str, str]) -> DailyCounts:
+    counts: DailyCounts = []
+    for field, n in cached.items():
+        if field == _BUILT:
+            continue
+        kind, _, day = field.partition(":")
+        counts.append((kind, datetime.date.fromisoformat(day), int(n)))
+    return counts
+
+
+def _daily_counts(db: Session, user_id: int) -> DailyCounts:
+    try:
+        redis_cli = get_redis_cli()
+        cached = redis_cli.hgetall(_cache_key(user_id))
+    except Exception:
+        logger.exception("contributions cache unavailable for user %s", user_id)
+        return crud.user.get_daily_contribution_counts(db, user_id=user_id)
+    if cached:
+        return _parse(cached)
+    counts = crud.user.get_daily_contribution_counts(db, user_id=user_id)
+    fields: Dict[str, int] = {_BUILT: 1}
+    for kind, day, n in counts:
+        fields[f"{kind}:{day.isoformat()}"] = n
+    try:
+        pipe = redis_cli.pipeline()
+        pipe.hset(_cache_key(user_id), mapping=fields)
+        pipe.expire(_cache_key(user_id), CACHE_TTL)
+        pipe.execute()
+    except Exception:
+        logger.exception("could not cache contributions for user %s", user_id)
+    return counts
+
+
+def get(db: Session, user_id: int) -> UserContributions:
+    return bin_counts(_daily_counts(db, user_id))
+
+
+def apply(user_id: int, deltas: DailyCounts) -> None:
+    """Add ``deltas`` to ``user_id``'s cached counts, if they are cached."""
+    redis_cli = get_redis_cli()
+    add = redis_cli.register_script(_ADD_SCRIPT)
+    pipe = redis_cli.pipeline()
+    for kind, day, n in deltas:
+        add(
+            keys=[_cache_key(user_id)],
+            args=[f"{kind}:{day.isoformat()}", n],
+            client=pipe,
+        )
+    pipe.execute()
+
+
+def _after_commit(db: Session, run: Callable[[], None]) -> None:
+    @event.listens_for(db, "after_commit", once=True)
+    def _run(session: Session) -> None:
+        try:
+            run()
+        except Exception:
+            logger.exception("could not update cached contributions")
+
+
+def _apply_on_commit(db: Session, user_id: int, deltas: DailyCounts) -> None:
+    if deltas:
+        _after_commit(db, lambda: apply(user_id, deltas))
+
+
+def record_new(db: Session, item: Contributor) -> None:
+    """Count a just-created ``item``."""
+    day = counted_day(item)
+    if day is not None:
+        _apply_on_commit(db, item.author_id, [(*day, 1)])
+
+
+@contextmanager
+def tracked(db: Session, item: Contributor) -> Iterator[None]:
+    """Move ``item`` to the day it counts on after a change to it, or drop it."""
+    before = counted_day(item)
+    yield
+    after = counted_day(item)
+    if before == after:
+        return
+    deltas: DailyCounts = []
+    if before is not None:
+        deltas.append((*before, -1))
+    if after is not None:
+        deltas.append((*after, 1))
+    _apply_on_commit(db, item.author_id, deltas)
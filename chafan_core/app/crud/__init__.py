@@ -12,6 +12,7 @@ from . import crud_channel as channel
 from . import crud_coin_deposit as coin_deposit
 from . import crud_coin_payment as coin_payment
 from . import crud_comment as comment
+from . import crud_feed as feed
 from . import crud_feedback as feedback
 from . import crud_form as form
 from . import crud_form_response as form_response
@@ -23,10 +24,12 @@ from . import crud_profile as profile
 from . import crud_question as question
 from . import crud_report as report
 from . import crud_reward as reward
+from . import crud_search_hit as search_hit
 from . import crud_site as site
 from . import crud_submission as submission
 from . import crud_submission_suggestion as submission_suggestion
 from . import crud_topic as topic
+from . import crud_typeahead as typeahead
 from . import crud_upload as upload
 from . import crud_user as user
 from . import crud_viewcount as viewcount
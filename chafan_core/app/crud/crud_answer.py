@@ -1,11 +1,23 @@
 import datetime
-from typing import Any, Dict, List, Optional, Union
+from contextlib import contextmanager
+from typing import (
+    Any,
+    Collection,
+    Dict,
+    FrozenSet,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+    Union,
+)
 
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 
-from chafan_core.app import crud, karma
-from chafan_core.app.infra.search_index import do_search
+from chafan_core.app import contributions, crud, karma
+from chafan_core.app.infra import search_index
+from chafan_core.app.model_utils import is_live_answer
 from chafan_core.app.models.answer import Answer, Answer_Upvotes
 from chafan_core.app.models.user import User
 from chafan_core.app.schemas.answer import AnswerCreate, AnswerUpdate
@@ -40,6 +52,19 @@ def get_one_as_search_result(db: Session, id: int) -> Optional[Answer]:
     return answer
 
 
+@contextmanager
+def _live_counted(db: Session, answer: Answer) -> Iterator[None]:
+    """Keep the question's ``live_answers_count`` in step with a change that
+    can publish, hide or delete ``answer``."""
+    was_live = bool(is_live_answer(answer))
+    yield
+    delta = int(bool(is_live_answer(answer))) - int(was_live)
+    if delta:
+        crud.question.add_to_counts(
+            db, question_id=answer.question_id, live_answers=delta
+        )
+
+
 def create_with_author(
     db: Session, *, obj_in: AnswerCreate, author_id: int, site_id: int
 ) -> Answer:
@@ -67,6 +92,9 @@ def create_with_author(
     db.flush()
     db.refresh(db_obj)
     karma.record_new(db, db_obj)
+    contributions.record_new(db, db_obj)
+    if is_live_answer(db_obj):
+        crud.question.add_to_counts(db, question_id=question.id, live_answers=1)
     db.flush()
     return db_obj
 
@@ -107,25 +135,54 @@ def cancel_upvote(db: Session, *, db_obj: Answer, voter: User) -> Answer:
     return db_obj
 
 
-def search(db: Session, *, q: str) -> List[Answer]:
-    ids = do_search("answer", query=q)
-    if ids is None:
-        # Search index unavailable (e.g. local dev): fall back to listing all.
-        return get_all_published(db)
-    ret = []
-    for id in ids:
-        answer = get_one_as_search_result(db, id=id)
-        if answer:
-            ret.append(answer)
-    return ret
+def get_upvoted_ids(
+    db: Session, *, voter_id: int, ids: Collection[int]
+) -> FrozenSet[int]:
+    """The answers among ``ids`` that ``voter_id`` has upvoted."""
+    if not ids:
+        return frozenset()
+    return frozenset(
+        answer_id
+        for (answer_id,) in db.query(Answer_Upvotes.answer_id).filter(
+            Answer_Upvotes.voter_id == voter_id,
+            Answer_Upvotes.answer_id.in_(ids),
+            Answer_Upvotes.cancelled.is_(False),
+        )
+    )
+
+
+def search(
+    db: Session, *, q: str, skip: int, limit: int
+) -> List[Tuple[Answer, Optional[search_index.SearchHit]]]:
+    searchable = (
+        Answer.is_published.is_(True),
+        Answer.is_deleted.is_(False),
+        Answer.is_hidden_by_moderator.is_(False),
+    )
+    hits = search_index.search(db, "answer", q, skip=skip, limit=limit)
+    if hits is None:
+        # Search index unavailable (e.g. local dev): fall back to a page of
+        # the newest answers, unscored.
+        answers = (
+            db.query(Answer)
+            .filter(*searchable)
+            .order_by(Answer.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        return [(answer, None) for answer in answers]
+    return crud.search_hit.hydrate(db, Answer, hits, *searchable)
 
 
 def update(
     db: Session, *, db_obj: Answer, obj_in: Union[AnswerUpdate, Dict[str, Any]]
 ) -> Answer:
     # Tracked because this is the path that publishes a draft and the path a
-    # moderator hides an answer through -- both change what it is worth.
-    with karma.tracked(db, db_obj):
+    # moderator hides an answer through -- both change what it is worth -- and
+    # the path that moves `updated_at`, the day the answer counts on.
+    with karma.tracked(db, db_obj), contributions.tracked(
+        db, db_obj
+    ), _live_counted(db, db_obj):
         if isinstance(obj_in, dict):
             update_data = obj_in
         else:
@@ -146,7 +203,9 @@ def update_checked(db: Session, *, db_obj: Answer, obj_in: Dict[str, Any]) -> An
 
 
 def delete_forever(db: Session, *, answer: Answer) -> None:
-    with karma.tracked(db, answer):
+    with karma.tracked(db, answer), contributions.tracked(
+        db, answer
+    ), _live_counted(db, answer):
         answer.is_deleted = True
         answer.body = "[DELETED]"
         answer.body_draft = "[DELETED]"
@@ -1,11 +1,11 @@
 import datetime
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Collection, Dict, FrozenSet, List, Optional, Tuple, Union
 
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 
-from chafan_core.app import crud, karma, models
-from chafan_core.app.infra.search_index import do_search
+from chafan_core.app import contributions, crud, karma, models
+from chafan_core.app.infra import search_index
 from chafan_core.app.models.article import Article, ArticleUpvotes
 from chafan_core.app.schemas.article import ArticleCreate, ArticleUpdate
 from chafan_core.utils.base import get_uuid
@@ -56,19 +56,23 @@ def create_with_author(
     db.flush()
     db.refresh(db_obj)
     karma.record_new(db, db_obj)
+    contributions.record_new(db, db_obj)
     return db_obj
 
 
-def search(db: Session, *, q: str) -> List[Article]:
-    ids = do_search("article", query=q)
-    if not ids:
+def search(
+    db: Session, *, q: str, skip: int, limit: int
+) -> List[Tuple[Article, search_index.SearchHit]]:
+    hits = search_index.search(db, "article", q, skip=skip, limit=limit)
+    if not hits:
         return []
-    ret = []
-    for id in ids:
-        article = get(db, id=id)
-        if article:
-            ret.append(article)
-    return ret
+    return crud.search_hit.hydrate(
+        db,
+        Article,
+        hits,
+        Article.is_published.is_(True),
+        Article.is_deleted.is_(False),
+    )
 
 
 def update_topics(
@@ -118,8 +122,24 @@ def cancel_upvote(db: Session, *, db_obj: Article, voter: models.User) -> Articl
     return db_obj
 
 
+def get_upvoted_ids(
+    db: Session, *, voter_id: int, ids: Collection[int]
+) -> FrozenSet[int]:
+    """The articles among ``ids`` that ``voter_id`` has upvoted."""
+    if not ids:
+        return frozenset()
+    return frozenset(
+        article_id
+        for (article_id,) in db.query(ArticleUpvotes.article_id).filter(
+            ArticleUpvotes.voter_id == voter_id,
+            ArticleUpvotes.article_id.in_(ids),
+            ArticleUpvotes.cancelled.is_(False),
+        )
+    )
+
+
 def delete_forever(db: Session, *, article: Article) -> None:
-    with karma.tracked(db, article):
+    with karma.tracked(db, article), contributions.tracked(db, article):
         article.is_deleted = True
         article.body = "[DELETED]"
         article.body_draft = "[DELETED]"
@@ -1,4 +1,4 @@
-from typing import Any, Callable, Dict, List, Optional, Union
+from typing import Any, Callable, Collection, Dict, FrozenSet, List, Optional, Union
 
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
@@ -92,6 +92,8 @@ def create_with_author(
     db.flush()
     db.refresh(db_obj)
     karma.record_new(db, db_obj)
+    if db_obj.question_id is not None:
+        crud.question.add_to_counts(db, question_id=db_obj.question_id, comments=1)
     return db_obj
 
 
@@ -138,6 +140,23 @@ def cancel_upvote(db: Session, *, db_obj: Comment, voter: models.User) -> Commen
     return db_obj
 
 
+def get_upvoted_ids(
+    db: Session, *, voter_id: int, ids: Collection[int]
+) -> FrozenSet[int]:
+    """The comments among ``ids`` that ``voter_id`` has upvoted."""
+    if not ids:
+        return frozenset()
+    upvotes = models.comment.CommentUpvotes
+    return frozenset(
+        comment_id
+        for (comment_id,) in db.query(upvotes.comment_id).filter(
+            upvotes.voter_id == voter_id,
+            upvotes.comment_id.in_(ids),
+            upvotes.cancelled.is_(False),
+        )
+    )
+
+
 def update(
     db: Session, *, db_obj: Comment, obj_in: Union[CommentUpdate, Dict[str, Any]]
 ) -> Comment:
@@ -0,0 +1,38 @@
+from typing import Iterable, Optional
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from chafan_core.app.models.feed import Feed
+
+# Rows per INSERT statement, so that delivering to a large audience is a few
+# statements rather than one per receiver or one unbounded one.
+_INSERT_BATCH = 1000
+
+
+def bulk_create(
+    db: Session,
+    *,
+    activity_id: int,
+    receiver_ids: Iterable[int],
+    subject_user_uuid: Optional[str],
+) -> None:
+    """Deliver one activity to every receiver, skipping existing deliveries.
+
+    Relies on ``UNIQUE (activity_id, receiver_id)``: a receiver who already has
+    the row is left alone rather than failing the statement.
+    """
+    rows = [
+        {
+            "receiver_id": receiver_id,
+            "activity_id": activity_id,
+            "subject_user_uuid": subject_user_uuid,
+        }
+        for receiver_id in sorted(receiver_ids)
+    ]
+    for i in range(0, len(rows), _INSERT_BATCH):
+        db.execute(
+            insert(Feed)
+            .values(rows[i : i + _INSERT_BATCH])
+            .on_conflict_do_nothing(index_elements=["activity_id", "receiver_id"])
+        )
@@ -1,8 +1,8 @@
-from typing import Any, Dict, Optional, Union
+from typing import Any, Collection, Dict, FrozenSet, Optional, Set, Union
 
 from sqlalchemy.orm import Session
 
-from chafan_core.app import crud
+from chafan_core.app import crud, memberships
 from chafan_core.app.models.profile import Profile
 from chafan_core.app.schemas.profile import ProfileCreate, ProfileUpdate
 
@@ -13,6 +13,27 @@ def get_by_user_and_site(
     return db.query(Profile).filter_by(owner_id=owner_id, site_id=site_id).first()
 
 
+def get_site_ids_of_owner(db: Session, *, owner_id: int) -> FrozenSet[int]:
+    return frozenset(
+        site_id
+        for (site_id,) in db.query(Profile.site_id).filter_by(owner_id=owner_id)
+    )
+
+
+def get_site_ids_of_owners(
+    db: Session, *, owner_ids: Collection[int]
+) -> Dict[int, FrozenSet[int]]:
+    """:func:`get_site_ids_of_owner` of several owners, in one query; an owner
+    without any profile is absent."""
+    site_ids: Dict[int, Set[int]] = {}
+    if owner_ids:
+        for owner_id, site_id in db.query(Profile.owner_id, Profile.site_id).filter(
+            Profile.owner_id.in_(owner_ids)
+        ):
+            site_ids.setdefault(owner_id, set()).add(site_id)
+    return {owner_id: frozenset(ids) for owner_id, ids in site_ids.items()}
+
+
 def remove_by_user_and_site(
     db: Session, *, owner_id: int, site_id: int
 ) -> Optional[Profile]:
@@ -20,6 +41,7 @@ def remove_by_user_and_site(
     if profile:
         db.delete(profile)
         db.flush()
+        memberships.record_change(db, owner_id)
         return profile
     return None
 
@@ -33,6 +55,7 @@ def create_with_owner(db: Session, *, obj_in: ProfileCreate) -> Profile:
     db.add(db_obj)
     db.flush()
     db.refresh(db_obj)
+    memberships.record_change(db, owner.id)
     return db_obj
 
 
@@ -1,11 +1,12 @@
 import datetime
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Collection, Dict, FrozenSet, List, Optional, Tuple, Union
 
 from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func, or_, select
 from sqlalchemy.orm import Session
 
-from chafan_core.app import crud, karma, models
-from chafan_core.app.infra.search_index import do_search
+from chafan_core.app import contributions, crud, karma, models
+from chafan_core.app.infra import search_index
 from chafan_core.app.models.question import Question, QuestionUpvotes
 from chafan_core.app.models.topic import Topic
 from chafan_core.app.schemas.question import QuestionCreate, QuestionUpdate
@@ -52,9 +53,25 @@ def create_with_author(
     db.flush()
     db.refresh(db_obj)
     karma.record_new(db, db_obj)
+    contributions.record_new(db, db_obj)
     return db_obj
 
 
+def add_to_counts(
+    db: Session, *, question_id: int, live_answers: int = 0, comments: int = 0
+) -> None:
+    """Move a question's ``live_answers_count`` and ``comments_count``."""
+    # In SQL rather than on the loaded row, so concurrent answers to one
+    # question add up instead of overwriting each other.
+    db.query(Question).filter(Question.id == question_id).update(
+        {
+            Question.live_answers_count: Question.live_answers_count + live_answers,
+            Question.comments_count: Question.comments_count + comments,
+        },
+        synchronize_session="fetch",
+    )
+
+
 def update_topics(
     db: Session, *, db_obj: Question, new_topics: List[Topic]
 ) -> Question:
@@ -66,17 +83,22 @@ def update_topics(
     return db_obj
 
 
-def search(db: Session, *, q: str) -> List[Question]:
-    ids = do_search("question", query=q)
-    if ids is None:
-        # Search index unavailable (e.g. local dev): fall back to listing all.
-        return get_all_valid(db)
-    ret = []
-    for id in ids:
-        question = get(db, id=id)
-        if question:
-            ret.append(question)
-    return ret
+def search(
+    db: Session, *, q: str, skip: int, limit: int
+) -> List[Tuple[Question, Optional[search_index.SearchHit]]]:
+    hits = search_index.search(db, "question", q, skip=skip, limit=limit)
+    if hits is None:
+        # Search index unavailable (e.g. local dev): fall back to a page of
+        # the newest questions, unscored.
+        questions = (
+            db.query(Question)
+            .filter_by(is_hidden=False)
+            .order_by(Question.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        return [(question, None) for question in questions]
+    return crud.search_hit.hydrate(db, Question, hits, Question.is_hidden.is_(False))
 
 
 def get_placed_at_home(db: Session) -> List[Question]:
@@ -119,6 +141,22 @@ def cancel_upvote(db: Session, *, db_obj: Question, voter: models.User) -> Quest
     return db_obj
 
 
+def get_upvoted_ids(
+    db: Session, *, voter_id: int, ids: Collection[int]
+) -> FrozenSet[int]:
+    """The questions among ``ids`` that ``voter_id`` has upvoted."""
+    if not ids:
+        return frozenset()
+    return frozenset(
+        question_id
+        for (question_id,) in db.query(QuestionUpvotes.question_id).filter(
+            QuestionUpvotes.voter_id == voter_id,
+            QuestionUpvotes.question_id.in_(ids),
+            QuestionUpvotes.cancelled.is_(False),
+        )
+    )
+
+
 def update(
     db: Session, *, db_obj: Question, obj_in: Union[QuestionUpdate, Dict[str, Any]]
 ) -> Question:
@@ -140,3 +178,37 @@ def update(
 
 def get_all_valid(db: Session) -> List[Question]:
     return db.query(Question).filter_by(is_hidden=False).all()
+
+
+def sample_readable_ids(
+    db: Session, *, user_id: Optional[int], per_site: int, limit: Optional[int]
+) -> List[int]:
+    """Up to ``per_site`` random visible questions from each site ``user_id``
+    can read -- the public ones, and those they have a profile in -- and up
+    to ``limit`` of those overall, in random order. Public sites only for
+    ``user_id`` None.
+
+    One query: the sampling is a window over the readable sites' questions,
+    so no site's whole question list is loaded.
+    """
+    readable = models.Site.public_readable.is_(True)
+    if user_id is not None:
+        member_site_ids = select(models.Profile.site_id).where(
+            models.Profile.owner_id == user_id
+        )
+        readable = or_(readable, models.Site.id.in_(member_site_ids))
+    readable_site_ids = select(models.Site.id).where(readable)
+    ranked = (
+        select(
+            Question.id,
+            func.row_number()
+            .over(partition_by=Question.site_id, order_by=func.random())
+            .label("rank"),
+        )
+        .where(Question.site_id.in_(readable_site_ids), Question.is_hidden.is_(False))
+        .subquery()
+    )
+    query = select(ranked.c.id).where(ranked.c.rank <= per_site).order_by(func.random())
+    if limit is not None:
+        query = query.limit(limit)
+    return list(db.execute(query).scalars())
@@ -0,0 +1,28 @@
+"""Loading the rows behind a page of search hits."""
+
+from typing import Any, List, Tuple
+
+from sqlalchemy.orm import Session
+
+from chafan_core.app.infra.search_index import SearchHit
+
+
+def hydrate(
+    db: Session, model: Any, hits: List[SearchHit], *criteria: Any
+) -> List[Tuple[Any, SearchHit]]:
+    """``(row, hit)`` for each hit whose row exists and meets ``criteria``, in
+    the hits' order, from one ``IN`` query.
+
+    The index can lag the database by a flush, so a hit may name a row that
+    has since been deleted or hidden; ``criteria`` repeats what makes a row
+    searchable, and such hits are dropped.
+    """
+    if not hits:
+        return []
+    rows = {
+        row.id: row
+        for row in db.query(model).filter(
+            model.id.in_([hit.id for hit in hits]), *criteria
+        )
+    }
+    return [(rows[hit.id], hit) for hit in hits if hit.id in rows]
@@ -1,11 +1,12 @@
 import datetime
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Collection, Dict, List, Optional, Tuple, Union
 
 from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
-from chafan_core.app import models
-from chafan_core.app.infra.search_index import do_search
+from chafan_core.app import crud, models
+from chafan_core.app.infra import search_index
 from chafan_core.app.models.site import Site
 from chafan_core.app.schemas.site import SiteCreate, SiteUpdate
 from chafan_core.utils.base import get_uuid
@@ -50,6 +51,30 @@ def get_multi_submissions(
     return db_obj.submissions[skip : (skip + limit)]
 
 
+def get_content_counts(
+    db: Session, *, site_ids: Collection[int]
+) -> Dict[int, Tuple[int, int, int]]:
+    """{site id: (visible questions, visible submissions, members)} for
+    ``site_ids``, one grouped query per figure; a site with none of any is
+    absent."""
+    if not site_ids:
+        return {}
+    counts: Dict[int, List[int]] = {}
+    for i, (column, condition) in enumerate(
+        [
+            (models.Question.site_id, models.Question.is_hidden.is_(False)),
+            (models.Submission.site_id, models.Submission.is_hidden.is_(False)),
+            (models.Profile.site_id, None),
+        ]
+    ):
+        query = db.query(column, func.count()).filter(column.in_(site_ids))
+        if condition is not None:
+            query = query.filter(condition)
+        for site_id, n in query.group_by(column):
+            counts.setdefault(site_id, [0, 0, 0])[i] = n
+    return {site_id: (q, s, m) for site_id, (q, s, m) in counts.items()}
+
+
 def get_all_public_readable(db: Session) -> List[models.Site]:
     return db.query(models.Site).filter_by(public_readable=True).all()
 
@@ -58,16 +83,20 @@ def get_all(db: Session) -> List[models.Site]:
     return db.query(models.Site).all()
 
 
-def search(db: Session, *, fragment: str) -> List[Site]:
-    ids = do_search("site", query=fragment)
-    if not ids:
+def get_all_keywords(db: Session) -> List[Tuple[int, List[str]]]:
+    """(id, keywords) of each site with keywords, without loading the
+    sites."""
+    rows = db.query(models.Site.id, models.Site.keywords)
+    return [(row.id, row.keywords) for row in rows if row.keywords]
+
+
+def search(
+    db: Session, *, fragment: str, skip: int, limit: int
+) -> List[Tuple[Site, search_index.SearchHit]]:
+    hits = search_index.search(db, "site", fragment, skip=skip, limit=limit)
+    if not hits:
         return []
-    ret = []
-    for id in ids:
-        site = get(db, id=id)
-        if site:
-            ret.append(site)
-    return ret
+    return crud.search_hit.hydrate(db, Site, hits)
 
 
 def create_with_permission_type(
@@ -1,11 +1,11 @@
 import datetime
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
 
-from chafan_core.app import crud, karma, models
-from chafan_core.app.infra.search_index import do_search
+from chafan_core.app import contributions, crud, karma, models
+from chafan_core.app.infra import search_index
 from chafan_core.app.models.submission import Submission, SubmissionUpvotes
 from chafan_core.app.models.topic import Topic
 from chafan_core.app.schemas.submission import SubmissionCreate, SubmissionUpdate
@@ -47,6 +47,7 @@ def create_with_author(
     db.flush()
     db.refresh(db_obj)
     karma.record_new(db, db_obj)
+    contributions.record_new(db, db_obj)
     return db_obj
 
 
@@ -61,16 +62,15 @@ def update_topics(
     return db_obj
 
 
-def search(db: Session, *, q: str) -> List[Submission]:
-    ids = do_search("submission", query=q)
-    if not ids:
+def search(
+    db: Session, *, q: str, skip: int, limit: int
+) -> List[Tuple[Submission, search_index.SearchHit]]:
+    hits = search_index.search(db, "submission", q, skip=skip, limit=limit)
+    if not hits:
         return []
-    ret = []
-    for id in ids:
-        submission = get(db, id=id)
-        if submission:
-            ret.append(submission)
-    return ret
+    return crud.search_hit.hydrate(
+        db, Submission, hits, Submission.is_hidden.is_(False)
+    )
 
 
 def upvote(db: Session, *, db_obj: Submission, voter: models.User) -> Submission:
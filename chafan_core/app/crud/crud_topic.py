@@ -1,9 +1,7 @@
 from typing import Any, Dict, List, Optional, Union
 
 from fastapi.encoders import jsonable_encoder
-from sqlalchemy import desc
 from sqlalchemy.orm import Session
-from sqlalchemy.sql.expression import func
 
 from chafan_core.app.models.topic import Topic
 from chafan_core.app.schemas.topic import TopicCreate, TopicUpdate
@@ -27,26 +25,6 @@ def get_by_name(db: Session, *, name: str) -> Optional[Topic]:
     return db.query(Topic).filter(Topic.name == name).first()
 
 
-def get_ilike(
-    db: Session, *, fragment: str, column: Any, limit: int = 5
-) -> List[Topic]:
-    same_ones = (
-        db.query(Topic)
-        .filter(column.ilike(f"{fragment}"))
-        .order_by(desc(func.length(column)))
-        .limit(limit)
-        .all()
-    )
-    similar_ones = (
-        db.query(Topic)
-        .filter(column.ilike(f"%{fragment}%"))
-        .order_by(desc(func.length(column)))
-        .limit(limit)
-        .all()
-    )
-    return same_ones + [s for s in similar_ones if s not in same_ones]
-
-
 def _get_unique_uuid(db: Session) -> str:
     while True:
         uuid = get_uuid()
@@ -0,0 +1,142 @@
+"""Typeahead: what the search box offers while a fragment is being typed.
+
+Users (by handle or full name), sites (by name or subdomain) and topics (by
+name) are matched in one ``UNION ALL`` query and ranked together:
+
+1. exact -- the whole column equals the fragment, ignoring case;
+2. prefix -- the column starts with it;
+3. substring -- the column contains it;
+4. fuzzy -- pg_trgm's ``%``: trigram similarity above
+   ``pg_trgm.similarity_threshold`` (0.3 by default), for typos.
+
+Within a rank, higher ``similarity()`` first, then the shorter label. Every
+condition is served by the ``gin_trgm_ops`` indexes on those columns (see the
+``e7c3a1f9d5b2`` migration) rather than a scan. A fragment shorter than three
+characters has no whole trigram, so the index narrows nothing for it; those
+are also the hottest fragments, which is what the service's cache is for.
+"""
+
+import dataclasses
+from typing import Any, Dict, List, Literal, Sequence, Tuple
+
+from sqlalchemy import case, func, literal, or_, select, union_all
+from sqlalchemy.orm import Session
+
+from chafan_core.app.models import Site, Topic, User
+
+typeahead_kind_T = Literal["user", "site", "topic"]
+match_T = Literal["exact", "prefix", "substring", "fuzzy"]
+
+KINDS: Tuple[typeahead_kind_T, ...] = ("user", "site", "topic")
+
+_MATCHES: Tuple[match_T, ...] = ("exact", "prefix", "substring", "fuzzy")
+
+# What each kind is matched on; the first column is its label.
+_COLUMNS: Dict[str, Tuple[Any, Sequence[Any]]] = {
+    "user": (User, (User.handle, User.full_name)),
+    "site": (Site, (Site.name, Site.subdomain)),
+    "topic": (Topic, (Topic.name,)),
+}
+
+
+@dataclasses.dataclass(frozen=True)
+class Suggestion:
+    kind: typeahead_kind_T
+    id: int
+    label: str
+    match: match_T
+    score: float
+
+
+def _escape_like(fragment: str) -> str:
+    return (
+        fragment.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    )
+
+
+def _ranked(kind: str, fragment: str, limit: int) -> Any:
+    model, columns = _COLUMNS[kind]
+    escaped = _escape_like(fragment)
+    ranks, scores, conditions = [], [], []
+    for column in columns:
+        contains = column.ilike(f"%{escaped}%", escape="\\")
+        ranks.append(
+            case(
+                (func.lower(column) == func.lower(fragment), 0),
+                (column.ilike(f"{escaped}%", escape="\\"), 1),
+                (contains, 2),
+                else_=3,
+            )
+        )
+        scores.append(func.coalesce(func.similarity(column, fragment), 0))
+        conditions.append(or_(contains, column.op("%")(fragment)))
+    rank = func.least(*ranks) if len(ranks) > 1 else ranks[0]
+    score = func.greatest(*scores) if len(scores) > 1 else scores[0]
+    label = columns[0]
+    return (
+        select(
+            literal(kind).label("kind"),
+            model.id.label("id"),
+            label.label("label"),
+            rank.label("rank"),
+            score.label("score"),
+        )
+        .where(or_(*conditions))
+        .order_by(rank, score.desc(), func.length(label), model.id)
+        .limit(limit)
+    )
+
+
+def suggest(
+    db: Session,
+    *,
+    fragment: str,
+    limit: int,
+    kinds: Sequence[typeahead_kind_T] = KINDS,
+) -> List[Suggestion]:
+    """At most ``limit`` suggestions for ``fragment``, best first."""
+    fragment = fragment.strip()
+    if not fragment or limit <= 0 or not kinds:
+        return []
+    # Each kind contributes at most ``limit`` rows, so the merge never ranks
+    # more than len(kinds) * limit.
+    parts = [_ranked(kind, fragment, limit).subquery() for kind in kinds]
+    merged = union_all(*[select(part) for part in parts]).subquery()
+    rows = db.execute(
+        select(merged)
+        .order_by(
+            merged.c.rank,
+            merged.c.score.desc(),
+            func.length(merged.c.label),
+            merged.c.kind,
+            merged.c.id,
+        )
+        .limit(limit)
+    )
+    return [
+        Suggestion(
+            kind=row.kind,
+            id=row.id,
+            label=row.label,
+            match=_MATCHES[row.rank],
+            score=float(row.score),
+        )
+        for row in rows
+    ]
+
+
+def load(
+    db: Session, suggestions: Sequence[Suggestion]
+) -> Dict[Tuple[str, int], Any]:
+    """The rows behind ``suggestions``, by ``(kind, id)``: one ``IN`` query
+    per kind present. A row deleted since its suggestion was made is absent.
+    """
+    ids: Dict[str, List[int]] = {}
+    for suggestion in suggestions:
+        ids.setdefault(suggestion.kind, []).append(suggestion.id)
+    rows: Dict[Tuple[str, int], Any] = {}
+    for kind, kind_ids in ids.items():
+        model = _COLUMNS[kind][0]
+        for row in db.query(model).filter(model.id.in_(kind_ids)):
+            rows[(kind, row.id)] = row
+    return rows
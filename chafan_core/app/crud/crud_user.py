@@ -1,10 +1,10 @@
 import datetime
 import logging
-from typing import Any, Dict, List, Optional, Union
+from typing import Any, Dict, List, Optional, Tuple, Union
 
 from pydantic.types import SecretStr
-from sqlalchemy import desc
-from sqlalchemy.orm import Session
+from sqlalchemy import Date, cast, desc, literal, select, union_all
+from sqlalchemy.orm import Session, aliased
 from sqlalchemy.sql.expression import func
 
 from chafan_core.app import karma, rules
@@ -15,7 +15,7 @@ from chafan_core.app.models.article_column import ArticleColumn
 from chafan_core.app.models.question import Question
 from chafan_core.app.models.submission import Submission
 from chafan_core.app.models.topic import Topic
-from chafan_core.app.models.user import User
+from chafan_core.app.models.user import User, followers
 from chafan_core.app.schemas.security import IntlPhoneNumber
 from chafan_core.app.schemas.user import UserCreate, UserUpdate
 from chafan_core.app.security import get_password_hash, verify_password
@@ -58,6 +58,20 @@ def get_all_active_users(db: Session) -> List[User]:
     return db.query(User).filter_by(is_active=True).all()
 
 
+def get_active_user_ids(db: Session) -> List[int]:
+    rows = db.query(User.id).filter_by(is_active=True).order_by(User.id)
+    return [r[0] for r in rows]
+
+
+def get_active_user_keywords(db: Session) -> List[Tuple[int, List[str]]]:
+    """(id, keywords) of each active user with keywords, without loading
+    the users."""
+    rows = db.query(User.id, User.keywords).filter(
+        User.is_active.is_(True), User.keywords.isnot(None)
+    )
+    return [(row.id, row.keywords) for row in rows if row.keywords]
+
+
 def _get_unique_uuid(db: Session) -> str:
     while True:
         uuid = get_uuid()
@@ -77,26 +91,6 @@ def _generate_handle(db: Session, prefix: str) -> str:
     raise Exception("Handle generation failed")
 
 
-def _get_ilike(
-    db: Session, *, fragment: str, column: Any, limit: int = 5
-) -> List[User]:
-    same_ones = (
-        db.query(User)
-        .filter(column.ilike(f"{fragment}"))
-        .order_by(desc(func.length(column)))
-        .limit(limit)
-        .all()
-    )
-    similar_ones = (
-        db.query(User)
-        .filter(column.ilike(f"%{fragment}%"))
-        .order_by(desc(func.length(column)))
-        .limit(limit)
-        .all()
-    )
-    return same_ones + [s for s in similar_ones if s not in same_ones]
-
-
 def create(db: Session, *, obj_in: UserCreate) -> User:
     if obj_in.handle is None:
         handle = StrippedNonEmptyBasicStr(
@@ -183,10 +177,25 @@ def try_get_visitor_user(db: Session) -> Optional[User]:
     return db.query(User).filter_by(id=settings.VISITOR_USER_ID).first()
 
 
+def _count_follow(db: Session, *, follower: User, followed: User, delta: int) -> None:
+    # In SQL rather than on the loaded rows, so concurrent follows of one
+    # user add up instead of overwriting each other.
+    db.query(User).filter(User.id == followed.id).update(
+        {User.followers_count: User.followers_count + delta},
+        synchronize_session=False,
+    )
+    db.query(User).filter(User.id == follower.id).update(
+        {User.followed_count: User.followed_count + delta},
+        synchronize_session=False,
+    )
+    db.refresh(follower)
+
+
 def add_follower(db: Session, *, db_obj: User, follower: User) -> User:
     if follower not in db_obj.followers:
         db_obj.followers.append(follower)
         db.flush()
+        _count_follow(db, follower=follower, followed=db_obj, delta=1)
         db.refresh(db_obj)
     return db_obj
 
@@ -195,11 +204,130 @@ def remove_follower(db: Session, *, db_obj: User, follower: User) -> User:
     if follower in db_obj.followers:
         db_obj.followers.remove(follower)
         db.flush()
+        _count_follow(db, follower=follower, followed=db_obj, delta=-1)
         db.refresh(db_obj)
         assert db_obj not in follower.followed
     return db_obj
 
 
+def get_follower_ids(db: Session, *, user_id: int) -> List[int]:
+    rows = db.query(followers.c.follower_id).filter(
+        followers.c.followed_id == user_id
+    )
+    return [r[0] for r in rows]
+
+
+def get_active_follower_ids(db: Session) -> List[int]:
+    """Ids of the active users who follow anybody."""
+    rows = (
+        db.query(followers.c.follower_id)
+        .join(User, User.id == followers.c.follower_id)
+        .filter(User.is_active.is_(True))
+        .distinct()
+        .order_by(followers.c.follower_id)
+    )
+    return [r[0] for r in rows]
+
+
+def get_followed_ids_with_followers_above(
+    db: Session, *, user_id: int, threshold: int
+) -> List[int]:
+    """The users ``user_id`` follows who have more than ``threshold`` followers."""
+    rows = (
+        db.query(User.id)
+        .join(followers, followers.c.followed_id == User.id)
+        .filter(
+            followers.c.follower_id == user_id,
+            User.followers_count > threshold,
+        )
+        .distinct()
+    )
+    return [r[0] for r in rows]
+
+
+def get_top_ranked_active_user_ids(
+    db: Session,
+    *,
+    follower_weight: int,
+    limit: int,
+    not_followed_by: Optional[int] = None,
+) -> List[int]:
+    """The ``limit`` active users with the most karma plus ``follower_weight``
+    per follower, best first.
+
+    ``not_followed_by`` leaves out that user and everyone they follow.
+    """
+    score = User.karma + User.followers_count * follower_weight
+    query = db.query(User.id).filter(User.is_active.is_(True))
+    if not_followed_by is not None:
+        followed_ids = select(followers.c.followed_id).where(
+            followers.c.follower_id == not_followed_by
+        )
+        query = query.filter(
+            User.id != not_followed_by, User.id.not_in(followed_ids)
+        )
+    return [r[0] for r in query.order_by(desc(score), User.id).limit(limit)]
+
+
+def get_follow_follow_counts(
+    db: Session, *, user_id: int, limit: int
+) -> Dict[str, int]:
+    """{uuid: n} for the users followed by n of the people ``user_id`` follows.
+
+    One aggregate over two hops of the ``followers`` table, so its cost is set
+    by how many people this one user follows rather than by the whole graph.
+    The user themself is left out. ``limit`` keeps the strongest ``limit``
+    entries; the tail it drops is the people reached through a single follow.
+    """
+    first_hop = aliased(followers)
+    second_hop = aliased(followers)
+    count = func.count().label("n")
+    rows = (
+        db.query(User.uuid, count)
+        .select_from(first_hop)
+        .join(second_hop, second_hop.c.follower_id == first_hop.c.followed_id)
+        .join(User, User.id == second_hop.c.followed_id)
+        .filter(first_hop.c.follower_id == user_id)
+        .filter(second_hop.c.followed_id != user_id)
+        .group_by(User.uuid)
+        .order_by(desc(count), User.uuid)
+        .limit(limit)
+    )
+    return {uuid: n for uuid, n in rows}
+
+
+def get_daily_contribution_counts(
+    db: Session, *, user_id: int
+) -> List[Tuple[str, datetime.date, int]]:
+    """(kind, UTC day, n) for each day ``user_id`` wrote n of a kind of content.
+
+    One ``GROUP BY`` day per kind -- answers on the day they were last
+    updated, the rest on the day they were created -- so the cost is set by
+    the number of active days, not the number of posts. Deleted answers and
+    articles do not count.
+    """
+
+    def daily(kind: str, model: Any, column: Any, *filters: Any) -> Any:
+        day = cast(func.date_trunc("day", func.timezone("UTC", column)), Date)
+        return (
+            select(literal(kind), day, func.count())
+            .where(model.author_id == user_id, *filters)
+            .group_by(day)
+        )
+
+    rows = db.execute(
+        union_all(
+            daily("answer", Answer, Answer.updated_at, Answer.is_deleted.is_(False)),
+            daily(
+                "article", Article, Article.created_at, Article.is_deleted.is_(False)
+            ),
+            daily("question", Question, Question.created_at),
+            daily("submission", Submission, Submission.created_at),
+        )
+    )
+    return [(kind, day, n) for kind, day, n in rows]
+
+
 def subscribe_question(db: Session, *, db_obj: User, question: Question) -> User:
     if question not in db_obj.subscribed_questions:
         db_obj.subscribed_questions.append(question)
@@ -339,9 +467,3 @@ def update_profession_topics(
     db.add(db_obj)
     db.flush()
     db.refresh(db_obj)
-
-
-def search_by_handle_or_full_name(db: Session, *, fragment: str) -> List[User]:
-    users_by_handle = _get_ilike(db, fragment=fragment, column=User.handle)
-    users_by_full_name = _get_ilike(db, fragment=fragment, column=User.full_name)
-    return users_by_handle + [u for u in users_by_full_name if u not in users_by_handle]
@@ -1,11 +1,23 @@
-"""Read side of the per-object view counters.
+"""The per-object view counters.
 
-The write side (Redis queue drain into these tables) lives in
-``services/viewcounts.py``; these are the plain reads used by responders.
+Views are bumped in Redis (``infra.cache.bump_view``) and drained into these
+tables by ``services/viewcounts.py`` through :func:`add_view_counts`; the
+``get_viewcount_*`` reads (and :func:`get_viewcounts`, for many at once) are
+used by responders.
+
+A read with ``live=True`` adds the views bumped since the last drain, so a
+count moves as soon as a page is viewed rather than every few minutes. For the
+moment between a drain committing and clearing its Redis copy, those views
+are counted twice; the next read is right again.
 """
 
+from typing import Any, Collection, Dict, Mapping, Tuple
+
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.orm import Session
 
+from chafan_core.app import models
+from chafan_core.app.infra.cache import pending_views
 from chafan_core.app.models.viewcount import (
     ViewCountAnswer,
     ViewCountArticle,
@@ -13,40 +25,86 @@ from chafan_core.app.models.viewcount import (
     ViewCountSubmission,
 )
 
+# Object type (as bumped) -> its counter table, the table's key column, and the
+# content the key refers to.
+_TABLES: Dict[str, Tuple[Any, Any, Any]] = {
+    "question": (ViewCountQuestion, ViewCountQuestion.question_id, models.Question),
+    "answer": (ViewCountAnswer, ViewCountAnswer.answer_id, models.Answer),
+    "article": (ViewCountArticle, ViewCountArticle.article_id, models.Article),
+    "submission": (
+        ViewCountSubmission,
+        ViewCountSubmission.submission_id,
+        models.Submission,
+    ),
+}
 
-def get_viewcount_question(db: Session, row_id: int) -> int:
-    row = (
-        db.query(ViewCountQuestion)
-        .filter(ViewCountQuestion.question_id == row_id)
-        .first()
-    )
-    if row is None:
-        return 0
-    return row.view_count
+# Rows per INSERT statement; see crud_feed.
+_INSERT_BATCH = 1000
 
 
-def get_viewcount_article(db: Session, row_id: int) -> int:
-    row = (
-        db.query(ViewCountArticle).filter(ViewCountArticle.article_id == row_id).first()
-    )
-    if row is None:
-        return 0
-    return row.view_count
+def add_view_counts(
+    db: Session, *, object_type: str, counts: Mapping[int, int]
+) -> None:
+    """Add ``counts`` ({object id: views}) to the counters of ``object_type``.
 
+    One ``INSERT ... ON CONFLICT DO UPDATE`` per batch: a missing row starts
+    at the views given, an existing one is incremented in the statement, so a
+    concurrent drain cannot lose an update. Ids whose content no longer exists
+    are skipped -- one deleted answer must not fail the whole batch on its
+    foreign key.
+    """
+    table, key, content = _TABLES[object_type]
+    existing = {
+        row_id
+        for (row_id,) in db.query(content.id).filter(content.id.in_(list(counts)))
+    }
+    rows = [
+        {key.name: row_id, "view_count": count}
+        for row_id, count in sorted(counts.items())
+        if row_id in existing and count > 0
+    ]
+    for i in range(0, len(rows), _INSERT_BATCH):
+        stmt = insert(table).values(rows[i : i + _INSERT_BATCH])
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[key.name],
+                set_={"view_count": table.view_count + stmt.excluded.view_count},
+            )
+        )
 
-def get_viewcount_submission(db: Session, row_id: int) -> int:
-    row = (
-        db.query(ViewCountSubmission)
-        .filter(ViewCountSubmission.submission_id == row_id)
-        .first()
+
+def get_viewcounts(
+    db: Session, object_type: str, ids: Collection[int], *, live: bool = False
+) -> Dict[int, int]:
+    """{id: views} for the ``object_type`` objects ``ids``, one query for all
+    of them; an object never viewed is absent."""
+    if not ids:
+        return {}
+    table, key, _ = _TABLES[object_type]
+    counts: Dict[int, int] = dict(
+        db.query(key, table.view_count).filter(key.in_(ids)).all()
     )
-    if row is None:
-        return 0
-    return row.view_count
+    if live:
+        for row_id, pending in pending_views(object_type, ids).items():
+            counts[row_id] = counts.get(row_id, 0) + pending
+    return counts
+
+
+def _get(db: Session, object_type: str, row_id: int, live: bool) -> int:
+    return get_viewcounts(db, object_type, [row_id], live=live).get(row_id, 0)
+
+
+def get_viewcount_question(db: Session, row_id: int, *, live: bool = False) -> int:
+    return _get(db, "question", row_id, live)
+
+
+def get_viewcount_article(db: Session, row_id: int, *, live: bool = False) -> int:
+    return _get(db, "article", row_id, live)
+
+
+def get_viewcount_submission(db: Session, row_id: int, *, live: bool = False) -> int:
+    return _get(db, "submission", row_id, live)
 
 
-def get_viewcount_answer(db: Session, row_id: int) -> int:
-    row = db.query(ViewCountAnswer).filter(ViewCountAnswer.answer_id == row_id).first()
-    if row is None:
-        return 0
-    return row.view_count
+def get_viewcount_answer(db: Session, row_id: int, *, live: bool = False) -> int:
+    return _get(db, "answer", row_id, live)
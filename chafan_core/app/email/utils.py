@@ -1,3 +1,5 @@
+import functools
+import glob
 from typing import Dict, Any
 
 from jinja2 import Template,StrictUndefined
@@ -13,18 +15,32 @@ logger = logging.getLogger(__name__)
 
 
 
+@functools.lru_cache(maxsize=None)
+def _compiled_template(html_template_path: str, allow_undefined: bool) -> Template:
+    with open(html_template_path) as f:
+        template_str = f.read()
+    if allow_undefined:
+        return Template(template_str)
+    return Template(template_str, undefined=StrictUndefined)
+
+
 def apply_email_template(template_name:str,
                          environment: Dict[str, Any] = {},
                          allow_undefined:bool = False) -> str:
     html_template_path = "{}/{}.html".format(settings.EMAIL_TEMPLATES_DIR, template_name)
-    with open(html_template_path) as f:
-        template_str = f.read()
-    if allow_undefined:
-        jinja = Template(template_str)
-    else:
-        jinja = Template(template_str,undefined=StrictUndefined)
+    # Compiled once per process; templates only change with a deploy.
+    jinja = _compiled_template(html_template_path, allow_undefined)
     return jinja.render(environment)
 
+
+def compile_email_templates() -> int:
+    """Compile every template now rather than on its first email; returns
+    how many."""
+    paths = glob.glob("{}/*.html".format(settings.EMAIL_TEMPLATES_DIR))
+    for path in paths:
+        _compiled_template(path, False)
+    return len(paths)
+
 def send_verification_code_email(email: str, code: str) -> None:
     project_name = settings.PROJECT_NAME
     subject = f"{project_name} - 验证码 {code}"
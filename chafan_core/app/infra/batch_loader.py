@@ -0,0 +1,90 @@
+"""Request-scoped batch loading for responders.
+
+Shaping a preview used to cost its own queries -- whether the principal
+upvoted it, the principal's membership of its site, its author, its site's
+counts -- so a list endpoint cost those queries times its length. Instead a
+responder asks the request's loader (``RequestContext.loader``) for a value
+by :class:`Kind` and key, and a list is prepared before it is shaped: the
+keys its previews will ask for are *wanted* all at once, and the first
+``get`` of a kind loads every wanted key of that kind with one ``IN (...)``
+query. Every later ``get`` of a loaded key is answered from the loader.
+
+Kinds that load ORM rows keep them referenced for the request, so the
+session's identity map answers a many-to-one relationship (``answer.author``)
+to a loaded row without a query.
+
+The kinds themselves read through crud and live with the responders
+(``responders/_batch.py``). What the loader holds is as of when it was
+loaded: RequestContext drops it whenever the unit of work commits, rolls
+back or closes.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+from typing import (
+    Callable,
+    Dict,
+    Generic,
+    Hashable,
+    Iterable,
+    List,
+    Mapping,
+    Set,
+    TypeVar,
+)
+
+from sqlalchemy.orm import Session
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+@dataclasses.dataclass(frozen=True, eq=False)
+class Kind(Generic[K, V]):
+    """One type of key: how to load a batch of them, and the value of a key
+    the load does not return."""
+
+    name: str
+    load: Callable[[Session, List[K]], Mapping[K, V]]
+    default: V
+
+
+class BatchLoader:
+    def __init__(self, get_db: Callable[[], Session]) -> None:
+        self._get_db = get_db
+        self._loaded: Dict[Kind, Dict] = {}
+        self._wanted: Dict[Kind, Set] = {}
+
+    def want(self, kind: Kind[K, V], keys: Iterable[K]) -> None:
+        """Load ``keys`` with the next load of ``kind``."""
+        loaded = self._loaded.get(kind, {})
+        wanted = self._wanted.setdefault(kind, set())
+        wanted.update(key for key in keys if key not in loaded)
+
+    def get(self, kind: Kind[K, V], key: K) -> V:
+        loaded = self._loaded.setdefault(kind, {})
+        if key not in loaded:
+            self.want(kind, [key])
+            self._load(kind)
+        return loaded[key]
+
+    def get_many(self, kind: Kind[K, V], keys: Iterable[K]) -> Dict[K, V]:
+        keys = list(keys)
+        self.want(kind, keys)
+        self._load(kind)
+        loaded = self._loaded[kind]
+        return {key: loaded[key] for key in keys}
+
+    def clear(self) -> None:
+        self._loaded.clear()
+        self._wanted.clear()
+
+    def _load(self, kind: Kind[K, V]) -> None:
+        keys = self._wanted.pop(kind, set())
+        loaded = self._loaded.setdefault(kind, {})
+        if not keys:
+            return
+        found = kind.load(self._get_db(), list(keys))
+        for key in keys:
+            loaded[key] = found.get(key, kind.default)
@@ -8,7 +8,8 @@ from __future__ import annotations
 
 import datetime
 import json
-from typing import Any, Callable, Optional, TypeVar
+import logging
+from typing import Any, Callable, Collection, Dict, Optional, TypeVar
 
 import redis
 from fastapi.encoders import jsonable_encoder
@@ -16,9 +17,16 @@ from pydantic import TypeAdapter
 
 from chafan_core.app.common import get_redis_cli
 
-BUMP_VIEW_COUNT_QUEUE_CACHE_KEY = "chafan:bump-view-count"
+# View bumps not yet in Postgres: a hash of "<type>:<id>" -> views. A drain
+# renames it to the DRAINING key -- atomically, so no bump lands in a hash
+# that is being emptied -- and deletes that once the counts are committed.
+# See services/viewcounts.py.
+BUMP_VIEW_COUNT_CACHE_KEY = "chafan:view-counts"
+DRAINING_VIEW_COUNT_CACHE_KEY = "chafan:view-counts:draining"
 DAILY_INVITATION_LINK_ID_CACHE_KEY = "chafan:daily-invitation-link-id"
 
+logger = logging.getLogger(__name__)
+
 T = TypeVar("T")
 
 
@@ -28,7 +36,34 @@ def get_redis() -> redis.Redis:
 
 def bump_view(object_type: str, obj_id: int, redis_cli: Optional[redis.Redis] = None) -> None:
     cli = redis_cli if redis_cli is not None else get_redis()
-    cli.rpush(BUMP_VIEW_COUNT_QUEUE_CACHE_KEY, f"{object_type}:{obj_id}")
+    cli.hincrby(BUMP_VIEW_COUNT_CACHE_KEY, f"{object_type}:{obj_id}", 1)
+
+
+def pending_views(object_type: str, obj_ids: Collection[int]) -> Dict[int, int]:
+    """{id: views} bumped but not yet drained into Postgres, for the
+    ``object_type`` objects ``obj_ids``; an object with none is absent.
+
+    Empty if Redis is unavailable: a live count is a nicety, the stored one is
+    still right.
+    """
+    if not obj_ids:
+        return {}
+    ids = list(obj_ids)
+    fields = [f"{object_type}:{obj_id}" for obj_id in ids]
+    try:
+        pipe = get_redis().pipeline()
+        pipe.hmget(BUMP_VIEW_COUNT_CACHE_KEY, fields)
+        pipe.hmget(DRAINING_VIEW_COUNT_CACHE_KEY, fields)
+        bumped, draining = pipe.execute()
+    except Exception:
+        logger.exception("could not read pending views of %s", object_type)
+        return {}
+    views: Dict[int, int] = {}
+    for obj_id, *values in zip(ids, bumped, draining):
+        count = sum(int(v) for v in values if v is not None)
+        if count:
+            views[obj_id] = count
+    return views
 
 
 def get_or_set(
@@ -0,0 +1,75 @@
+"""jieba, loaded on first use rather than on import.
+
+Importing ``jieba.analyse`` alone loads the keyword-extraction tables (most of
+a second), and the first segmentation builds the prefix dictionary (over a
+second more). Both used to happen while importing the app -- and every
+script, and every forked worker -- because the search schemas built a
+``ChineseAnalyzer`` at import time.
+
+Now the schemas hold a :class:`LazyChineseAnalyzer`, and the dictionary is
+loaded by whatever segments text first: a search, an index update,
+:func:`extract_tags`, or the startup warm-up (``app/warm_up.py``). jieba
+caches the built dictionary, marshalled, in ``JIEBA_CACHE_DIR``, so only the
+first process on a host builds it from the word list.
+"""
+
+import functools
+import logging
+import threading
+from typing import Any, List
+
+from whoosh.analysis.analyzers import Analyzer  # type: ignore
+
+from chafan_core.app.config import settings
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=None)
+def _jieba() -> Any:
+    import jieba  # type: ignore
+
+    if settings.JIEBA_CACHE_DIR:
+        jieba.dt.tmp_dir = settings.JIEBA_CACHE_DIR
+    return jieba
+
+
+def ensure_loaded() -> None:
+    """Load jieba's dictionary now, if nothing has yet."""
+    with _lock:
+        _jieba().initialize()
+
+
+@functools.lru_cache(maxsize=None)
+def chinese_analyzer() -> Any:
+    _jieba()
+    from jieba.analyse.analyzer import ChineseAnalyzer  # type: ignore
+
+    return ChineseAnalyzer()
+
+
+def extract_tags(text: str, topK: int) -> List[str]:
+    _jieba()
+    import jieba.analyse  # type: ignore
+
+    return jieba.analyse.extract_tags(text, topK=topK)
+
+
+class LazyChineseAnalyzer(Analyzer):
+    """jieba's ``ChineseAnalyzer``, built the first time it analyzes text.
+
+    Whoosh pickles a schema's analyzers into each index it writes; this one
+    pickles as nothing but its class, so opening an index does not load
+    jieba either.
+    """
+
+    def __call__(self, value: str, **kwargs: Any) -> Any:
+        return chinese_analyzer()(value, **kwargs)
+
+    def has_morph(self) -> bool:
+        return chinese_analyzer().has_morph()
+
+    def clean(self) -> None:
+        chinese_analyzer().clean()
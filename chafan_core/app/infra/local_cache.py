@@ -0,0 +1,51 @@
+"""A small in-process LRU cache whose entries expire.
+
+For hot, cheap-to-be-stale lookups where even a Redis round trip is too much:
+each API process keeps its own copy, so an entry can be up to ``ttl`` seconds
+behind the database, and behind what another process serves.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class LocalCache(Generic[T]):
+    """At most ``maxsize`` entries, each served for ``ttl`` seconds after it
+    was loaded. ``maxsize`` 0 disables caching: every lookup loads."""
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, Tuple[float, T]]" = OrderedDict()
+
+    def get_or_load(self, key: Hashable, load: Callable[[], T]) -> T:
+        if self.maxsize <= 0:
+            return load()
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+        # Loaded outside the lock: two threads missing the same key both
+        # load it, which is cheaper than serializing every miss.
+        value = load()
+        with self._lock:
+            self._entries[key] = (now + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
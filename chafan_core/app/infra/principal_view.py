@@ -6,12 +6,13 @@ Shares the parent context's db/redis; holds its own principal_id.
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, AbstractSet, List, Optional, Sequence
 
 from sqlalchemy.orm import Session
 
 if TYPE_CHECKING:
     from chafan_core.app import models, schemas
+    from chafan_core.app.infra.batch_loader import BatchLoader
     from chafan_core.app.infra.request_context import RequestContext
     from chafan_core.app.schemas.event import Event
     from chafan_core.app.schemas.notification import Notification
@@ -35,6 +36,10 @@ class PrincipalView:
 
             self._principal = crud.user.get(ctx.get_db(), id=principal_id)
         self.principal = self._principal
+        # Set only while a batch is shaping (responders.event.materialize_events):
+        # every site the principal is a member of, so the permission gates check
+        # membership in memory. None means ask the database per gate.
+        self.member_site_ids: Optional[AbstractSet[int]] = None
 
     def get_db(self) -> Session:
         return self._ctx.get_db()
@@ -42,6 +47,10 @@ class PrincipalView:
     def get_redis(self):
         return self._ctx.get_redis()
 
+    @property
+    def loader(self) -> "BatchLoader":
+        return self._ctx.loader
+
     def try_get_current_user(self) -> Optional["models.User"]:
         return self.principal
 
@@ -78,6 +87,13 @@ class PrincipalView:
 
         return responders.question.preview_of_question(self, question)
 
+    def previews_of_questions(
+        self, questions: Sequence["models.Question"]
+    ) -> List[Optional["schemas.QuestionPreview"]]:
+        import chafan_core.app.responders as responders
+
+        return responders.question.previews_of_questions(self, questions)
+
     def get_answer_preview_base(
         self, answer: "models.Answer"
     ) -> "schemas.answer.AnswerPreviewBase":
@@ -92,6 +108,13 @@ class PrincipalView:
 
         return answer_responder.preview_of_answer(self, answer)
 
+    def previews_of_answers(
+        self, answers: Sequence["models.Answer"]
+    ) -> List[Optional["schemas.AnswerPreview"]]:
+        from chafan_core.app.responders import answer as answer_responder
+
+        return answer_responder.previews_of_answers(self, answers)
+
     def preview_of_article(
         self, article: "models.Article"
     ) -> Optional["schemas.ArticlePreview"]:
@@ -99,6 +122,13 @@ class PrincipalView:
 
         return article_responder.preview_of_article(self, article)
 
+    def previews_of_articles(
+        self, articles: Sequence["models.Article"]
+    ) -> List[Optional["schemas.ArticlePreview"]]:
+        from chafan_core.app.responders import article as article_responder
+
+        return article_responder.previews_of_articles(self, articles)
+
     def message_schema_from_orm(self, message: "models.Message") -> "schemas.Message":
         from chafan_core.app.responders import misc as misc_responder
 
@@ -169,6 +199,13 @@ class PrincipalView:
 
         return event_responder.materialize_event(self, event_internal_json)
 
+    def materialize_events(
+        self, event_internal_jsons: Sequence[str]
+    ) -> List[Optional["Event"]]:
+        from chafan_core.app.responders import event as event_responder
+
+        return event_responder.materialize_events(self, event_internal_jsons)
+
     def submission_schema_from_orm(
         self, submission: "models.Submission"
     ) -> Optional["schemas.Submission"]:
@@ -208,6 +245,13 @@ class PrincipalView:
 
         return comment_responder.comment_schema_from_orm(self, comment)
 
+    def comment_schemas_from_orm(
+        self, comments: Sequence["models.Comment"]
+    ) -> List[Optional["schemas.Comment"]]:
+        from chafan_core.app.responders import comment as comment_responder
+
+        return comment_responder.comment_schemas_from_orm(self, comments)
+
     def get_question_upvotes(
         self, question: "models.Question"
     ) -> "schemas.QuestionUpvotes":
@@ -6,7 +6,7 @@ responders take a RequestContext.
 
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple
 
 from sqlalchemy.orm import Session
 
@@ -16,11 +16,10 @@ from chafan_core.db.session import SessionLocal
 if TYPE_CHECKING:
     import redis
     from chafan_core.app import models, schemas
+    from chafan_core.app.infra.batch_loader import BatchLoader
     from chafan_core.app.infra.principal_view import PrincipalView
     from chafan_core.app.schemas.answer import AnswerPreview
 
-# User.id -> { User.uuid -> count }
-WeightedMatrixType = Dict[int, Dict[str, int]]
 UserContributions = List[Tuple[int, List[int]]]
 
 
@@ -33,7 +32,8 @@ class RequestContext:
         self._db: Optional[Session] = None
         self._principal: Optional["models.User"] = None
         self._principal_view: Optional["PrincipalView"] = None
-        self._follow_follow_fanout: Optional[WeightedMatrixType] = None
+        self._loader: Optional["BatchLoader"] = None
+        self._follow_follows: Optional[Dict[str, int]] = None
         self._user_contributions_map: Dict[int, UserContributions] = {}
         # True once a service has explicitly committed the unit of work.
         self._committed: bool = False
@@ -69,6 +69,15 @@ class RequestContext:
             self._db = SessionLocal()
         return self._db
 
+    @property
+    def loader(self) -> "BatchLoader":
+        """Batch loader the responders shape this request's previews through."""
+        if self._loader is None:
+            from chafan_core.app.infra.batch_loader import BatchLoader
+
+            self._loader = BatchLoader(self.get_db)
+        return self._loader
+
     @property
     def principal_view(self) -> "PrincipalView":
         """PrincipalView for this request's principal (plain nested previews)."""
@@ -115,21 +124,28 @@ class RequestContext:
             raise RuntimeError("No principal_id on RequestContext")
         return self.principal_id
 
-    def get_follow_follow_fanout(self) -> WeightedMatrixType:
-        if self._follow_follow_fanout is None:
-            from chafan_core.app.recs import matrices as recs_matrices
+    def get_follow_follows(self) -> Dict[str, int]:
+        """{user uuid: follow-follow count} for this request's principal.
 
-            self._follow_follow_fanout = recs_matrices.compute_follow_follow_fanout(
-                self.get_db()
-            )
-        return self._follow_follow_fanout
+        Read at most once per request; empty for an anonymous principal.
+        """
+        if self._follow_follows is None:
+            if self.principal_id is None:
+                self._follow_follows = {}
+            else:
+                from chafan_core.app.recs import follow_follows
+
+                self._follow_follows = follow_follows.get(
+                    self.get_db(), self.principal_id
+                )
+        return self._follow_follows
 
     def get_user_contributions(self, user: "models.User") -> UserContributions:
         if user.id not in self._user_contributions_map:
-            from chafan_core.app.recs import matrices as recs_matrices
+            from chafan_core.app import contributions
 
-            self._user_contributions_map[user.id] = (
-                recs_matrices.compute_user_contributions(user)
+            self._user_contributions_map[user.id] = contributions.get(
+                self.get_db(), user.id
             )
         return self._user_contributions_map[user.id]
 
@@ -141,6 +157,11 @@ class RequestContext:
     def preview_of_answer(self, answer: "models.Answer") -> Optional["AnswerPreview"]:
         return self.principal_view.preview_of_answer(answer)
 
+    def previews_of_answers(
+        self, answers: Sequence["models.Answer"]
+    ) -> List[Optional["AnswerPreview"]]:
+        return self.principal_view.previews_of_answers(answers)
+
     def site_schema_from_orm(self, site: "models.Site") -> "schemas.Site":
         from chafan_core.app.services import sites as sites_service
 
@@ -178,11 +199,13 @@ class RequestContext:
         if self._db is not None:
             self._db.commit()
             self._committed = True
+        self._clear_loader()
 
     def rollback(self) -> None:
         if self._db is not None:
             self._db.rollback()
             self._committed = False
+        self._clear_loader()
 
     def close(self) -> None:
         """Close the session. Callers must commit or rollback first on success/error."""
@@ -191,3 +214,8 @@ class RequestContext:
                 self._db.rollback()
             self._db.close()
             self._db = None
+        self._clear_loader()
+
+    def _clear_loader(self) -> None:
+        if self._loader is not None:
+            self._loader.clear()
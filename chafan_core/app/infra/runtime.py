@@ -2,7 +2,9 @@
 
 from __future__ import annotations
 
-from typing import Callable, Optional, TypeVar
+import contextlib
+from contextvars import ContextVar
+from typing import Callable, Iterator, Optional, TypeVar
 
 from sqlalchemy.orm.session import Session
 
@@ -11,6 +13,20 @@ from chafan_core.app.infra.request_context import RequestContext
 
 T = TypeVar("T")
 
+# Off everywhere but the task worker. A failed runnable is otherwise logged and
+# swallowed (D4); the worker needs the failure itself, to retry the job.
+_reraise: ContextVar[bool] = ContextVar("runtime_reraise", default=False)
+
+
+@contextlib.contextmanager
+def reraising() -> Iterator[None]:
+    """Within this block, a failed runnable is rolled back and re-raised."""
+    token = _reraise.set(True)
+    try:
+        yield
+    finally:
+        _reraise.reset(token)
+
 
 def execute_with_db(
     db: Session, runnable: Callable[[Session], T], auto_commit: bool = True
@@ -21,6 +37,9 @@ def execute_with_db(
             db.commit()
         return ret
     except Exception as e:
+        if _reraise.get():
+            db.rollback()
+            raise
         handle_exception(e)
         try:
             db.rollback()
@@ -42,6 +61,9 @@ def execute_with_context(
             ctx.commit()
         return ret
     except Exception as e:
+        if _reraise.get():
+            ctx.rollback()
+            raise
         handle_exception(e)
         ctx.rollback()
     finally:
@@ -17,7 +17,8 @@ scheduler = BackgroundScheduler()
 def set_up_scheduled_tasks() -> None:
     if scheduler.running:
         return
-    from chafan_core.app.services.search import refresh_search_index
+    from chafan_core.app.recs.matrices import refresh_snapshots
+    from chafan_core.app.services.search_updates import flush_search_index_updates
     from chafan_core.app.services.viewcounts import write_view_count_to_db
     from chafan_core.app.text_analysis import fill_missing_keywords_task
 
@@ -29,11 +30,11 @@ def set_up_scheduled_tasks() -> None:
         name="write_view_count_to_db",
     )
     scheduler.add_job(
-        refresh_search_index,
+        flush_search_index_updates,
         trigger=IntervalTrigger(
-            hours=settings.SCHEDULED_TASK_REFRESH_SEARCH_INDEX_HOURS
+            seconds=settings.SCHEDULED_TASK_FLUSH_SEARCH_INDEX_SECONDS
         ),
-        name="refresh_search_index",
+        name="flush_search_index_updates",
     )
     scheduler.add_job(
         fill_missing_keywords_task,
@@ -42,6 +43,13 @@ def set_up_scheduled_tasks() -> None:
         ),
         name="fill_missing_keywords_task",
     )
+    scheduler.add_job(
+        refresh_snapshots,
+        trigger=IntervalTrigger(
+            hours=settings.SCHEDULED_TASK_REFRESH_RECS_SNAPSHOTS_HOURS
+        ),
+        name="refresh_snapshots",
+    )
     # No karma job. Karma is applied as it is earned (see app/karma.py), so
     # there is nothing for a periodic pass to catch up on. `scripts/refresh_karmas.py`
     # recomputes it from scratch on demand -- after a rule change, or to check
@@ -0,0 +1,102 @@
+"""Pages of search hits cached in Redis, keyed by index generation.
+
+An entry is the hits (ids and scores, and the query's terms for highlighting)
+of one page of one query, at ``chafan:search:results:<index>:<generation>:
+<skip>:<limit>:<query digest>``. It is never invalidated in place: each index
+has a *generation*, a counter in :data:`GENERATIONS_KEY` bumped after every
+commit to that index -- each incremental update, and a rebuild -- so the next
+query looks under a key no earlier result was stored at. Entries of past
+generations expire after ``SEARCH_RESULT_CACHE_TTL_SECONDS``.
+
+The counter lives in Redis rather than in the index so it means the same for
+either backend and on every host.
+
+Only hits are cached. Loading the rows, and deciding what the viewer may see
+of them, still runs for every request.
+"""
+
+import hashlib
+import json
+import logging
+from typing import Callable, List, Optional
+
+from chafan_core.app.common import get_redis_cli
+from chafan_core.app.config import settings
+from chafan_core.app.infra.search_index import SearchHit
+from chafan_core.app.metrics import search as search_metrics
+from chafan_core.utils.constants import indexed_object_T
+
+logger = logging.getLogger(__name__)
+
+GENERATIONS_KEY = "chafan:search:generations"
+RESULTS_KEY_PREFIX = "chafan:search:results"
+
+
+def normalize(query: str) -> str:
+    """Whitespace does not change what a query matches; case may (``AND``)."""
+    return " ".join(query.split())
+
+
+def _key(
+    index_type: str, generation: int, query: str, skip: int, limit: int
+) -> str:
+    digest = hashlib.sha1(query.encode("utf-8")).hexdigest()
+    return f"{RESULTS_KEY_PREFIX}:{index_type}:{generation}:{skip}:{limit}:{digest}"
+
+
+def bump(*index_types: str) -> None:
+    """Start a new generation of each of ``index_types``: call after their
+    index has committed a change."""
+    try:
+        pipe = get_redis_cli().pipeline()
+        for index_type in index_types:
+            pipe.hincrby(GENERATIONS_KEY, index_type, 1)
+        pipe.execute()
+    except Exception:
+        logger.exception("could not bump search generations of %s", index_types)
+
+
+def cached(
+    index_type: indexed_object_T,
+    query: str,
+    *,
+    skip: int,
+    limit: int,
+    search: Callable[[], Optional[List[SearchHit]]],
+) -> Optional[List[SearchHit]]:
+    """The page from the cache, or from ``search()`` (and then cached).
+
+    A result of None -- the index is unavailable -- is not cached. Neither
+    is anything while Redis is unreachable: then every query searches.
+    """
+    ttl = settings.SEARCH_RESULT_CACHE_TTL_SECONDS
+    if ttl <= 0:
+        return search()
+    try:
+        redis_cli = get_redis_cli()
+        generation = int(redis_cli.hget(GENERATIONS_KEY, index_type) or 0)
+        key = _key(index_type, generation, normalize(query), skip, limit)
+        value = redis_cli.get(key)
+    except Exception:
+        logger.exception("could not read cached search on %s", index_type)
+        return search()
+    if value is not None:
+        search_metrics.record_cache(index_type, hit=True)
+        entry = json.loads(value)
+        terms = frozenset((field, word) for field, word in entry["terms"])
+        return [
+            SearchHit(id=id, score=score, index_type=index_type, terms=terms)
+            for id, score in entry["hits"]
+        ]
+    search_metrics.record_cache(index_type, hit=False)
+    hits = search()
+    if hits is not None:
+        entry = {
+            "terms": sorted(hits[0].terms) if hits else [],
+            "hits": [[hit.id, hit.score] for hit in hits],
+        }
+        try:
+            redis_cli.set(key, json.dumps(entry), ex=ttl)
+        except Exception:
+            logger.exception("could not cache search on %s", index_type)
+    return hits
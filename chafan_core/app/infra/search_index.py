@@ -1,27 +1,39 @@
-"""Whoosh full-text index client (Level 5 infra).
+"""Full-text search: the index schemas, and the backend queries go to.
 
-Owns the index schemas and the read path against the on-disk index at
-``settings.SEARCH_INDEX_FILESYSTEM_PATH``. The write/refresh side lives in
-``services/search.py``, which reuses the schemas defined here.
+Two backends implement :class:`SearchBackend`, chosen by
+``settings.SEARCH_BACKEND``:
+
+* ``whoosh`` (``infra/search_whoosh.py``): an on-disk index per API host at
+  ``SEARCH_INDEX_FILESYSTEM_PATH``, each host keeping its own copy;
+* ``postgres`` (``infra/search_postgres.py``): a ``search_vector`` column on
+  each searchable table, with a GIN index, shared by every host.
+
+Both analyze text with the schemas below -- jieba for Chinese, stemming for
+subdomains -- so a query finds the same documents whichever is live. What is
+searchable at all is decided in ``services/search_updates.py``, which hands
+each backend the documents to write.
+
+:func:`search` returns one page of hits with their scores; neither backend
+stores text, so a hit highlights text the caller has loaded from the
+database.
 """
 
-import os
-from typing import List, Mapping, Optional
+import dataclasses
+from typing import Dict, FrozenSet, List, Mapping, Optional, Protocol, Tuple
 
-from jieba.analyse.analyzer import ChineseAnalyzer  # type: ignore
+from sqlalchemy.orm import Session
 from whoosh.analysis.analyzers import StemmingAnalyzer  # type: ignore
 from whoosh.fields import ID  # type: ignore
 from whoosh.fields import TEXT, Schema
-from whoosh.index import open_dir  # type: ignore
-from whoosh.qparser import MultifieldParser  # type: ignore
+from whoosh.highlight import ContextFragmenter, HtmlFormatter  # type: ignore
+from whoosh.highlight import highlight as whoosh_highlight
 
 from chafan_core.app.config import settings
+from chafan_core.app.infra.jieba_loader import LazyChineseAnalyzer
 from chafan_core.utils.constants import indexed_object_T
 
-import logging
-logger = logging.getLogger(__name__)
-
-_analyzer = ChineseAnalyzer()
+# jieba loads on the first text analyzed; see infra/jieba_loader.py.
+_analyzer = LazyChineseAnalyzer()
 _stemming_analyzer = StemmingAnalyzer()
 
 QUESTION_SCHEMA = Schema(
@@ -65,23 +77,112 @@ schemas: Mapping[indexed_object_T, Schema] = {
 }
 
 
-def do_search(
+_highlight_fragmenter = ContextFragmenter(maxchars=200, surround=40)
+
+
+@dataclasses.dataclass(frozen=True)
+class SearchHit:
+    id: int
+    score: float
+    index_type: indexed_object_T
+    # The query's terms, by field, for highlighting.
+    terms: FrozenSet[Tuple[str, str]]
+
+    def highlight(self, field: str, text: Optional[str]) -> Optional[str]:
+        """Fragments of ``text`` (the hit's ``field``) with the query's terms
+        wrapped in ``<em class="match">``; None if no term occurs in it.
+
+        The rest of the text is HTML-escaped.
+        """
+        if not text:
+            return None
+        words = frozenset(word for f, word in self.terms if f == field)
+        if not words:
+            return None
+        analyzer = schemas[self.index_type][field].analyzer
+        return (
+            whoosh_highlight(
+                text,
+                words,
+                analyzer,
+                _highlight_fragmenter,
+                # Not shared: a formatter numbers the terms it has seen
+                # (term0, term1, ...) across every call it formats.
+                HtmlFormatter(tagname="em", classname="match"),
+                top=2,
+            )
+            or None
+        )
+
+
+class SearchBackend(Protocol):
+    def search(
+        self,
+        db: Optional[Session],
+        index_type: indexed_object_T,
+        query: str,
+        *,
+        skip: int,
+        limit: int,
+    ) -> Optional[List[SearchHit]]:
+        """Hits ``skip`` to ``skip + limit``, best first, or None if the index
+        is unavailable."""
+        ...
+
+    def update(
+        self,
+        db: Session,
+        index_type: indexed_object_T,
+        docs: Mapping[int, Optional[Dict[str, str]]],
+    ) -> None:
+        """Write ``docs`` ({id: document}); a None document is removed."""
+        ...
+
+    def warm_up(self, index_type: indexed_object_T) -> None:
+        """Open what the first query on ``index_type`` would otherwise wait
+        for."""
+        ...
+
+
+def backend() -> SearchBackend:
+    if settings.SEARCH_BACKEND == "postgres":
+        from chafan_core.app.infra.search_postgres import postgres_backend
+
+        return postgres_backend
+    from chafan_core.app.infra.search_whoosh import whoosh_backend
+
+    return whoosh_backend
+
+
+def search(
+    db: Optional[Session],
     index_type: indexed_object_T,
     query: str,
-    index_dir_prefix: Optional[str] = None,
+    *,
+    skip: int = 0,
+    limit: int = 10,
+) -> Optional[List[SearchHit]]:
+    """Hits ``skip`` to ``skip + limit`` for ``query``, best first, or None if
+    the index is unavailable. Served from ``infra/search_cache.py`` when the
+    index has not changed since the same page was last searched."""
+    from chafan_core.app.infra import search_cache
+
+    return search_cache.cached(
+        index_type,
+        query,
+        skip=skip,
+        limit=limit,
+        search=lambda: backend().search(
+            db, index_type, query, skip=skip, limit=limit
+        ),
+    )
+
+
+def do_search(
+    db: Optional[Session], index_type: indexed_object_T, query: str
 ) -> Optional[List[int]]:
-    if index_dir_prefix is None:
-        index_dir_prefix = settings.SEARCH_INDEX_FILESYSTEM_PATH + "/"
-    index_dir = index_dir_prefix + index_type
-    if not os.path.exists(index_dir):
-        logger.error(f"index_dir not exist, search skipped {index_dir}")
+    """The ids of the first page of hits for ``query``."""
+    hits = search(db, index_type, query)
+    if hits is None:
         return None
-    ix = open_dir(index_dir)
-    with ix.searcher() as searcher:
-        parser = MultifieldParser(
-            [n for n in ix.schema.names() if n != "id"],
-            schema=ix.schema,
-        )
-        q = parser.parse(query)
-        results = searcher.search(q)
-        return [int(r["id"]) for r in results]
+    return [hit.id for hit in hits]
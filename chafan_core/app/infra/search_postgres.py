@@ -0,0 +1,193 @@
+"""The Postgres search backend: a ``search_vector`` column per searchable table.
+
+Every API host queries the same tables, so there is no per-host index to copy
+or rebuild; a GIN index on each column serves ``@@``.
+
+Postgres cannot segment Chinese, so the vectors are not generated columns.
+They are written here from the documents ``services/search_updates.py``
+hands over: each field is tokenized by its analyzer in
+``infra.search_index.schemas`` (jieba, or stemming for subdomains), the
+tokens are joined with spaces, and ``to_tsvector('simple', ...)`` then only
+has to split on the spaces. Boosted fields are weighted A, the rest B, which
+``ts_rank_cd`` scores 1.0 and 0.4. A query is tokenized by the same
+analyzers, so it matches exactly the tokens the Whoosh backend would.
+"""
+
+import logging
+import time
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import bindparam, cast, func, select, update
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.orm import Session
+
+from chafan_core.app import models
+from chafan_core.app.infra.search_index import SearchHit, schemas
+from chafan_core.app.metrics import search as search_metrics
+from chafan_core.utils.constants import indexed_object_T
+
+logger = logging.getLogger(__name__)
+
+_TABLES: Dict[str, Any] = {
+    "question": models.Question.__table__,
+    "site": models.Site.__table__,
+    "submission": models.Submission.__table__,
+    "answer": models.Answer.__table__,
+    "article": models.Article.__table__,
+}
+
+# Rows per UPDATE batch.
+_UPDATE_BATCH = 500
+
+
+def _tokens(analyzer: Any, text: Optional[str], mode: str = "index") -> str:
+    if not text:
+        return ""
+    return " ".join(token.text for token in analyzer(text, mode=mode))
+
+
+def _simple(value: Any) -> Any:
+    return cast("simple", REGCONFIG), value
+
+
+def _fields(index_type: indexed_object_T) -> List[Tuple[str, Any, str]]:
+    """(name, analyzer, weight) of each text field."""
+    schema = schemas[index_type]
+    return [
+        (name, field.analyzer, "A" if field.format.field_boost > 1 else "B")
+        for name, field in schema.items()
+        if name != "id"
+    ]
+
+
+def _param(field: str) -> str:
+    # Not the field's own name: that may be a column of the updated table.
+    return f"tokens_{field}"
+
+
+def _vector_params(
+    index_type: indexed_object_T, doc: Mapping[str, str]
+) -> Dict[str, str]:
+    return {
+        _param(name): _tokens(analyzer, doc.get(name))
+        for name, analyzer, _ in _fields(index_type)
+    }
+
+
+def _vector_expr(index_type: indexed_object_T) -> Any:
+    parts = [
+        func.setweight(func.to_tsvector(*_simple(bindparam(_param(name)))), weight)
+        for name, _, weight in _fields(index_type)
+    ]
+    expr = parts[0]
+    for part in parts[1:]:
+        expr = expr.op("||")(part)
+    return expr
+
+
+class PostgresBackend:
+    def search(
+        self,
+        db: Optional[Session],
+        index_type: indexed_object_T,
+        query: str,
+        *,
+        skip: int,
+        limit: int,
+    ) -> Optional[List[SearchHit]]:
+        if db is None:
+            logger.error("no database session, search skipped")
+            return None
+        started = time.perf_counter()
+        table = _TABLES[index_type]
+        terms = frozenset(
+            (name, token.text)
+            for name, analyzer, _ in _fields(index_type)
+            for token in analyzer(query, mode="query")
+        )
+        # A field analyzed differently (stemmed) may tokenize the query
+        # differently; a row matches all of the query's tokens under any one
+        # of the analyzers.
+        analyzed = {
+            _tokens(analyzer, query, "query") for _, analyzer, _ in _fields(index_type)
+        }
+        analyzed.discard("")
+        if not analyzed:
+            return []
+        tsqueries = [func.plainto_tsquery(*_simple(t)) for t in sorted(analyzed)]
+        tsquery = tsqueries[0]
+        for q in tsqueries[1:]:
+            tsquery = tsquery.op("||")(q)
+        score = func.ts_rank_cd(table.c.search_vector, tsquery).label("score")
+        rows = db.execute(
+            select(table.c.id, score)
+            .where(table.c.search_vector.op("@@")(tsquery))
+            .order_by(score.desc(), table.c.id.desc())
+            .offset(skip)
+            .limit(limit)
+        )
+        hits = [
+            SearchHit(id=row.id, score=row.score, index_type=index_type, terms=terms)
+            for row in rows
+        ]
+        search_metrics.record(
+            index_type, took=time.perf_counter() - started, reopened=False
+        )
+        return hits
+
+    def warm_up(self, index_type: indexed_object_T) -> None:
+        # Nothing is held open between queries; the analyzers are jieba,
+        # which the warm-up loads on its own.
+        pass
+
+    def update(
+        self,
+        db: Session,
+        index_type: indexed_object_T,
+        docs: Mapping[int, Optional[Dict[str, str]]],
+    ) -> None:
+        table = _TABLES[index_type]
+        removed = [obj_id for obj_id, doc in docs.items() if doc is None]
+        if removed:
+            db.execute(
+                update(table)
+                .where(table.c.id.in_(removed))
+                .values(search_vector=None)
+            )
+        written = [
+            {"row_id": obj_id, **_vector_params(index_type, doc)}
+            for obj_id, doc in sorted(docs.items())
+            if doc is not None
+        ]
+        stmt = (
+            update(table)
+            .where(table.c.id == bindparam("row_id"))
+            .values(search_vector=_vector_expr(index_type))
+        )
+        for i in range(0, len(written), _UPDATE_BATCH):
+            db.execute(stmt, written[i : i + _UPDATE_BATCH])
+
+    def rebuild(
+        self, db: Session, index_type: indexed_object_T, docs: Iterable[Dict[str, str]]
+    ) -> int:
+        """Replace every vector of ``index_type`` with ``docs``; returns how
+        many were written."""
+        table = _TABLES[index_type]
+        db.execute(
+            update(table)
+            .where(table.c.search_vector.isnot(None))
+            .values(search_vector=None)
+        )
+        count = 0
+        batch: Dict[int, Optional[Dict[str, str]]] = {}
+        for doc in docs:
+            batch[int(doc["id"])] = doc
+            if len(batch) == _UPDATE_BATCH:
+                self.update(db, index_type, batch)
+                count += len(batch)
+                batch = {}
+        self.update(db, index_type, batch)
+        return count + len(batch)
+
+
+postgres_backend = PostgresBackend()
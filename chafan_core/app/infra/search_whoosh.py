@@ -0,0 +1,240 @@
+"""The Whoosh search backend: an on-disk index per API host.
+
+Each index lives at ``<SEARCH_INDEX_FILESYSTEM_PATH>/<index type>``; the full
+rebuild in ``services/search_rebuild.py`` makes that path a symlink to a
+complete index written alongside by :func:`build_index`.
+
+Queries share one open index and one searcher per index directory, kept in a
+process-wide registry, instead of opening the index on every query. Before
+each query the searcher is checked against the index's latest generation and
+reopened only if a writer has committed since; see :class:`_SharedSearcher`.
+"""
+
+import functools
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from whoosh import writing  # type: ignore
+from whoosh.index import EmptyIndexError, create_in, open_dir  # type: ignore
+from whoosh.qparser import MultifieldParser  # type: ignore
+from whoosh.searching import Searcher  # type: ignore
+
+from chafan_core.app.config import settings
+from chafan_core.app.infra.search_index import SearchHit, schemas
+from chafan_core.app.metrics import search as search_metrics
+from chafan_core.utils.constants import indexed_object_T
+
+logger = logging.getLogger(__name__)
+
+# Seconds an update waits for an index's write lock -- held by a rebuild, say
+# -- before giving up.
+_LOCK_TIMEOUT = 30.0
+
+
+@functools.lru_cache(maxsize=None)
+def _parser(index_type: indexed_object_T) -> MultifieldParser:
+    schema = schemas[index_type]
+    return MultifieldParser([n for n in schema.names() if n != "id"], schema=schema)
+
+
+def _version(ix) -> Tuple[int, Tuple[str, ...]]:
+    """The index's latest generation, and the segments it is made of.
+
+    Segment ids are random, so they tell apart an index deleted and recreated
+    up to the same generation, which the generation alone cannot (nor the
+    TOC's mtime, when both were written within one clock tick).
+    """
+    try:
+        return ix.latest_generation(), tuple(
+            segment.segment_id() for segment in ix._segments()
+        )
+    except (OSError, EmptyIndexError):
+        return -1, ()
+
+
+class _SharedSearcher:
+    """One open index and its current searcher, shared by every query on it.
+
+    When the index has moved on, the searcher is replaced with
+    ``Searcher.refresh()``, which keeps the readers of unchanged segments.
+    ``refresh()`` closes the readers it does not keep, though, so it is only
+    used while no query holds the old searcher; otherwise a fresh searcher is
+    opened and the old one is closed by the last query using it.
+    """
+
+    def __init__(self, index_dir: str) -> None:
+        self._lock = threading.Lock()
+        self._ix = open_dir(index_dir)
+        self._searcher: Searcher = self._ix.searcher()
+        self._version = _version(self._ix)
+        # id(searcher) -> queries running on it
+        self._users: Dict[int, int] = {}
+
+    @contextmanager
+    def searcher(self) -> Iterator[Tuple[Searcher, bool]]:
+        """The current searcher, and whether getting it meant a reopen."""
+        with self._lock:
+            reopened = self._refresh()
+            searcher = self._searcher
+            self._users[id(searcher)] = self._users.get(id(searcher), 0) + 1
+        try:
+            yield searcher, reopened
+        finally:
+            with self._lock:
+                self._users[id(searcher)] -= 1
+                if not self._users[id(searcher)]:
+                    del self._users[id(searcher)]
+                    if searcher is not self._searcher:
+                        searcher.close()
+
+    def _refresh(self) -> bool:
+        version = _version(self._ix)
+        if version == self._version:
+            return False
+        old = self._searcher
+        idle = id(old) not in self._users
+        if idle and version[0] != self._version[0]:
+            self._searcher = old.refresh()
+        else:
+            self._searcher = self._ix.searcher()
+            if idle:
+                old.close()
+        self._version = version
+        return True
+
+
+_registry: Dict[str, _SharedSearcher] = {}
+_registry_lock = threading.Lock()
+
+
+def _shared(index_dir: str) -> Optional[_SharedSearcher]:
+    with _registry_lock:
+        if not os.path.exists(index_dir):
+            _registry.pop(index_dir, None)
+            return None
+        shared = _registry.get(index_dir)
+        if shared is None:
+            shared = _registry[index_dir] = _SharedSearcher(index_dir)
+        return shared
+
+
+class WhooshBackend:
+    """Indexes under ``root``, or ``SEARCH_INDEX_FILESYSTEM_PATH`` if None."""
+
+    def __init__(self, root: Optional[str] = None) -> None:
+        self._root = root
+
+    def index_dir(self, index_type: indexed_object_T) -> str:
+        root = self._root or settings.SEARCH_INDEX_FILESYSTEM_PATH
+        return os.path.join(root, index_type)
+
+    def search(
+        self,
+        db: Optional[Session],
+        index_type: indexed_object_T,
+        query: str,
+        *,
+        skip: int,
+        limit: int,
+    ) -> Optional[List[SearchHit]]:
+        index_dir = self.index_dir(index_type)
+        shared = _shared(index_dir)
+        if shared is None:
+            logger.error(f"index_dir not exist, search skipped {index_dir}")
+            return None
+        started = time.perf_counter()
+        with shared.searcher() as (searcher, reopened):
+            q = _parser(index_type).parse(query)
+            terms = frozenset(
+                (field, word.decode("utf-8") if isinstance(word, bytes) else word)
+                for field, word in q.iter_all_terms()
+            )
+            results = searcher.search(q, limit=skip + limit)
+            hits = [
+                SearchHit(
+                    id=int(r["id"]), score=r.score, index_type=index_type, terms=terms
+                )
+                for r in results[skip : skip + limit]
+            ]
+        search_metrics.record(
+            index_type, took=time.perf_counter() - started, reopened=reopened
+        )
+        return hits
+
+    def warm_up(self, index_type: indexed_object_T) -> None:
+        """Open the shared searcher, and build the query parser."""
+        _parser(index_type)
+        shared = _shared(self.index_dir(index_type))
+        if shared is not None:
+            with shared.searcher():
+                pass
+
+    def update(
+        self,
+        db: Session,
+        index_type: indexed_object_T,
+        docs: Mapping[int, Optional[Dict[str, str]]],
+    ) -> None:
+        """One writer, one commit; small segments are merged on commit."""
+        with self._updater(index_type) as writer:
+            for obj_id in sorted(docs):
+                doc = docs[obj_id]
+                if doc is None:
+                    writer.delete_by_term("id", str(obj_id))
+                else:
+                    writer.update_document(**doc)
+
+    @contextmanager
+    def _updater(self, index_type: indexed_object_T) -> Iterator[writing.IndexWriter]:
+        index_dir = self.index_dir(index_type)
+        if os.path.exists(index_dir):
+            ix = open_dir(index_dir)
+        else:
+            os.makedirs(index_dir)
+            ix = create_in(index_dir, schemas[index_type])
+        writer = ix.writer(timeout=_LOCK_TIMEOUT)
+        try:
+            yield writer
+        except BaseException:
+            writer.cancel()
+            raise
+        else:
+            writer.commit()
+
+
+def build_index(
+    index_type: indexed_object_T,
+    index_dir: str,
+    docs: Iterable[Dict[str, str]],
+    *,
+    writer_procs: int = 1,
+) -> int:
+    """Write ``docs`` as a complete index into the new ``index_dir``.
+
+    Returns the documents written. With ``writer_procs`` > 1 the documents
+    are spread over that many writer processes, each writing its own segment.
+    """
+    os.makedirs(index_dir)
+    ix = create_in(index_dir, schemas[index_type])
+    if writer_procs > 1:
+        writer = ix.writer(procs=writer_procs, multisegment=True)
+    else:
+        writer = ix.writer()
+    count = 0
+    try:
+        for doc in docs:
+            writer.add_document(**doc)
+            count += 1
+    except BaseException:
+        writer.cancel()
+        raise
+    writer.commit()
+    return count
+
+
+whoosh_backend = WhooshBackend()
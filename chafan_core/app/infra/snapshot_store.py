@@ -0,0 +1,107 @@
+"""Precomputed recommendation rows in Redis, read one key at a time.
+
+A *snapshot* is one Redis hash, ``chafan:recs:snapshot:<name>``, of string
+rows keyed by id: a user's related users, a user's follow-follow counts. A
+scheduled job builds each snapshot whole (``recs/matrices.py``) and request
+paths read a row with one HGET, instead of computing the matrix the row
+comes from.
+
+A build writes under ``<key>:building``, in batches as its rows are
+computed, and renames that over the live key at the end -- so a reader sees
+the previous snapshot or the new one, never part of the build. Each build
+records when it finished and how many rows it stored in
+``metrics/recs.py``; the age of the last build is the snapshot's staleness.
+
+Between builds, a snapshot whose rows are cheap to compute one at a time can
+also be kept current row by row: :func:`forget` drops the rows a write made
+stale (from the build in progress too), and a reader that misses computes
+the row and :func:`put` s it back.
+
+Redis failing is not the request failing: a read is then a miss, and a
+write is logged and dropped.
+"""
+
+import logging
+import time
+from typing import Iterable, List, Optional, Tuple
+
+from chafan_core.app.common import get_redis_cli
+from chafan_core.app.metrics import recs as recs_metrics
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = "chafan:recs:snapshot"
+
+# Rows per HSET while building.
+_BATCH = 1000
+
+
+def _key(name: str) -> str:
+    return f"{KEY_PREFIX}:{name}"
+
+
+def get(name: str, row: str) -> Optional[str]:
+    """The row ``row`` of snapshot ``name``, or None if it has none."""
+    try:
+        pipe = get_redis_cli().pipeline()
+        pipe.hget(_key(name), row)
+        recs_metrics.count_read(pipe, name)
+        value, _ = pipe.execute()
+    except Exception:
+        logger.exception("snapshot %s unavailable", name)
+        return None
+    if value is None:
+        recs_metrics.record_miss(name)
+    return value
+
+
+def put(name: str, row: str, value: str) -> None:
+    """Set one row of the live snapshot, until the next build replaces it."""
+    try:
+        get_redis_cli().hset(_key(name), row, value)
+    except Exception:
+        logger.exception("could not store row %s of snapshot %s", row, name)
+
+
+def forget(name: str, rows: List[str]) -> None:
+    """Drop ``rows`` from the live snapshot and from a build in progress."""
+    key = _key(name)
+    try:
+        pipe = get_redis_cli().pipeline()
+        for i in range(0, len(rows), _BATCH):
+            batch = rows[i : i + _BATCH]
+            pipe.hdel(key, *batch)
+            pipe.hdel(f"{key}:building", *batch)
+        pipe.execute()
+    except Exception:
+        logger.exception("could not drop rows of snapshot %s", name)
+
+
+def build(name: str, rows: Iterable[Tuple[str, str]]) -> int:
+    """Replace snapshot ``name`` with ``rows``; returns how many were stored.
+
+    ``rows`` is consumed as it is written, so it can compute them lazily.
+    """
+    started = time.monotonic()
+    key = _key(name)
+    building = f"{key}:building"
+    redis_cli = get_redis_cli()
+    redis_cli.delete(building)
+    stored = 0
+    batch = {}
+    for row, value in rows:
+        batch[row] = value
+        if len(batch) >= _BATCH:
+            redis_cli.hset(building, mapping=batch)
+            stored += len(batch)
+            batch = {}
+    if batch:
+        redis_cli.hset(building, mapping=batch)
+        stored += len(batch)
+    if stored:
+        redis_cli.rename(building, key)
+    else:
+        redis_cli.delete(key)
+    took = time.monotonic() - started
+    recs_metrics.record_build(name, rows=stored, took=took)
+    return stored
@@ -0,0 +1,251 @@
+"""A Redis Streams queue for post-response jobs (Level 5 infra).
+
+With ``TASK_QUEUE="redis"`` the API no longer runs ``services.postprocess``
+jobs itself: it appends one stream entry per job and returns, and a separate
+process -- ``chafan_core.app.worker`` -- reads them through a consumer group
+and runs them. This module is only the mechanics of that hand-off; which jobs
+exist and how one is run is ``services.tasks``.
+
+An entry's life
+---------------
+1. :func:`enqueue` appends ``{task, args, kwargs, enqueued_at, attempt}`` to
+   :data:`STREAM_KEY`.
+2. A worker receives it with :func:`next_jobs` (``XREADGROUP``). From then on
+   it is *pending*: delivered to that consumer, not yet acknowledged.
+3. On success :func:`ack` acknowledges it and deletes it from the stream, so
+   the stream holds exactly the jobs not yet done.
+4. On failure :func:`retry` re-appends it with ``attempt + 1`` and
+   acknowledges the failed delivery. After ``max_attempts`` it is moved to
+   :data:`DEAD_KEY` instead, where it stays for a human to look at.
+5. A job pending for longer than :data:`CLAIM_IDLE` -- its worker died mid-job
+   -- is claimed by the next worker to ask (``XAUTOCLAIM``) and run again.
+
+So delivery is at least once. A job can run twice if its worker dies between
+finishing and acknowledging; the postprocess jobs tolerate that the way they
+tolerate a retry: their database writes are one transaction, and the outside
+effects (webhooks, emails) are the only part that can repeat.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import datetime
+import json
+import logging
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import redis
+
+from chafan_core.app.common import get_redis_cli
+
+logger = logging.getLogger(__name__)
+
+STREAM_KEY = "chafan:tasks"
+DEAD_KEY = "chafan:tasks:dead"
+GROUP = "postprocess"
+
+# A backstop, not a working limit: entries are deleted as they are
+# acknowledged, so the stream only grows this long if no worker is running.
+# Trimming is approximate (``MAXLEN ~``) and drops the oldest first.
+MAX_LENGTH = 100_000
+DEAD_MAX_LENGTH = 10_000
+
+# Longer than any job should take. A delivery idle for this long is presumed to
+# belong to a worker that died, and is handed to another.
+CLAIM_IDLE = datetime.timedelta(minutes=10)
+
+
+@dataclasses.dataclass
+class Job:
+    message_id: str
+    name: str
+    args: List[Any]
+    kwargs: Dict[str, Any]
+    enqueued_at: float
+    attempt: int
+
+    @property
+    def waited(self) -> float:
+        """Seconds between the first enqueue and now."""
+        return max(0.0, time.time() - self.enqueued_at)
+
+
+@dataclasses.dataclass
+class Depth:
+    waiting: int
+    running: int
+    dead: int
+
+
+def _fields(
+    name: str,
+    args: Sequence[Any],
+    kwargs: Dict[str, Any],
+    *,
+    enqueued_at: float,
+    attempt: int,
+) -> Dict[str, str]:
+    return {
+        "task": name,
+        "args": json.dumps(list(args)),
+        "kwargs": json.dumps(kwargs),
+        "enqueued_at": repr(enqueued_at),
+        "attempt": str(attempt),
+    }
+
+
+def enqueue(
+    name: str, args: Sequence[Any] = (), kwargs: Optional[Dict[str, Any]] = None
+) -> str:
+    """Append a job; returns its stream id. Arguments must be JSON values."""
+    return get_redis_cli().xadd(
+        STREAM_KEY,
+        _fields(name, args, kwargs or {}, enqueued_at=time.time(), attempt=1),
+        maxlen=MAX_LENGTH,
+        approximate=True,
+    )
+
+
+def ensure_group() -> None:
+    """Create the consumer group, and the stream with it, if missing."""
+    try:
+        get_redis_cli().xgroup_create(STREAM_KEY, GROUP, id="0", mkstream=True)
+    except redis.ResponseError as e:
+        if "BUSYGROUP" not in str(e):
+            raise
+
+
+def _parse(message_id: str, fields: Dict[str, str]) -> Optional[Job]:
+    try:
+        return Job(
+            message_id=message_id,
+            name=fields["task"],
+            args=json.loads(fields["args"]),
+            kwargs=json.loads(fields["kwargs"]),
+            enqueued_at=float(fields["enqueued_at"]),
+            attempt=int(fields["attempt"]),
+        )
+    except (KeyError, ValueError, TypeError):
+        return None
+
+
+def _jobs(messages: List[Tuple[str, Dict[str, str]]]) -> List[Job]:
+    jobs = []
+    for message_id, fields in messages:
+        job = _parse(message_id, fields or {})
+        if job is None:
+            logger.error("burying malformed task entry %s: %r", message_id, fields)
+            _bury(message_id, fields or {})
+            continue
+        jobs.append(job)
+    return jobs
+
+
+def next_jobs(consumer: str, *, count: int = 1, block_ms: int = 5000) -> List[Job]:
+    """Up to ``count`` jobs for ``consumer``, blocking up to ``block_ms``.
+
+    A job abandoned by a dead worker is taken before any new one.
+    """
+    redis_cli = get_redis_cli()
+    _, claimed, *_ = redis_cli.xautoclaim(
+        STREAM_KEY,
+        GROUP,
+        consumer,
+        min_idle_time=int(CLAIM_IDLE.total_seconds() * 1000),
+        count=count,
+    )
+    # A claimed id whose entry was trimmed away comes back without fields.
+    claimed = [(i, f) for i, f in claimed if f]
+    if claimed:
+        return _jobs(claimed)
+    response = redis_cli.xreadgroup(
+        GROUP, consumer, {STREAM_KEY: ">"}, count=count, block=block_ms
+    )
+    if not response:
+        return []
+    ((_, messages),) = response
+    return _jobs(messages)
+
+
+def ack(job: Job) -> None:
+    _done(job.message_id)
+
+
+def _done(message_id: str) -> None:
+    pipe = get_redis_cli().pipeline()
+    pipe.xack(STREAM_KEY, GROUP, message_id)
+    pipe.xdel(STREAM_KEY, message_id)
+    pipe.execute()
+
+
+def _bury(message_id: str, fields: Dict[str, str]) -> None:
+    pipe = get_redis_cli().pipeline()
+    pipe.xadd(
+        DEAD_KEY,
+        {**fields, "message_id": message_id},
+        maxlen=DEAD_MAX_LENGTH,
+        approximate=True,
+    )
+    pipe.xack(STREAM_KEY, GROUP, message_id)
+    pipe.xdel(STREAM_KEY, message_id)
+    pipe.execute()
+
+
+def retry(job: Job, *, max_attempts: int) -> bool:
+    """Settle a failed delivery; True if the job will run again.
+
+    The retry is a new entry at the back of the stream, so a failing job waits
+    behind the ones queued meanwhile instead of spinning at the front. It
+    keeps the original ``enqueued_at``: job latency counts from the request.
+    """
+    if job.attempt >= max_attempts:
+        bury(job)
+        return False
+    fields = _fields(
+        job.name,
+        job.args,
+        job.kwargs,
+        enqueued_at=job.enqueued_at,
+        attempt=job.attempt + 1,
+    )
+    pipe = get_redis_cli().pipeline()
+    pipe.xadd(STREAM_KEY, fields, maxlen=MAX_LENGTH, approximate=True)
+    pipe.xack(STREAM_KEY, GROUP, job.message_id)
+    pipe.xdel(STREAM_KEY, job.message_id)
+    pipe.execute()
+    return True
+
+
+def bury(job: Job) -> None:
+    """Dead-letter ``job`` without retrying it -- it can never succeed."""
+    _bury(
+        job.message_id,
+        _fields(
+            job.name,
+            job.args,
+            job.kwargs,
+            enqueued_at=job.enqueued_at,
+            attempt=job.attempt,
+        ),
+    )
+
+
+def depth() -> Depth:
+    """Jobs waiting for a worker, running (delivered, unacknowledged), dead.
+
+    Because acknowledged entries are deleted, the stream's length is exactly
+    waiting plus running.
+    """
+    redis_cli = get_redis_cli()
+    try:
+        running = int(redis_cli.xpending(STREAM_KEY, GROUP)["pending"])
+    except redis.ResponseError:
+        # No group yet: no worker has ever started.
+        running = 0
+    total = redis_cli.xlen(STREAM_KEY)
+    return Depth(
+        waiting=max(0, total - running),
+        running=running,
+        dead=redis_cli.xlen(DEAD_KEY),
+    )
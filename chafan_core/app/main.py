@@ -39,6 +39,7 @@ from slowapi.errors import RateLimitExceeded
 from starlette.middleware.cors import CORSMiddleware
 from starlette.requests import Request
 
+from chafan_core.app import warm_up, ws_connections
 from chafan_core.app.api import health
 from chafan_core.app.api.api_v1.api import api_router
 from chafan_core.app.common import enable_rate_limit, is_dev, report_msg
@@ -131,6 +132,21 @@ def _startup_scheduled_tasks() -> None:
     set_up_scheduled_tasks()
 
 
+@app.on_event("startup")
+def _startup_warm_up() -> None:
+    warm_up.start()
+
+
+@app.on_event("startup")
+async def _startup_ws_subscriber() -> None:
+    await ws_connections.manager.start()
+
+
+@app.on_event("shutdown")
+async def _shutdown_ws_subscriber() -> None:
+    await ws_connections.manager.stop()
+
+
 @app.on_event("shutdown")
 def shutdown_event():
     logger.info("Stub: shutdown_event")
@@ -0,0 +1,124 @@
+"""Site memberships: the ids of the sites a user has a profile on.
+
+``user_permission.user_in_site`` admits a member of a private site, and a
+single feed, search or question page asks it about the same (user, site)
+pair for every preview, nested comment and answer it shapes. Each ask used
+to be a profile query. Now a user's memberships are read as one set:
+
+- per request, memoized in the session's ``info``, so every check after the
+  first is a set lookup;
+- across requests, cached in Redis under ``chafan:member-sites:<user id>``,
+  a JSON list of site ids, so the first check of a request is one GET.
+
+Upkeep
+------
+Like ``contributions.py``, this sits at the app root so crud can call it
+where profiles are created and removed: :func:`record_change` re-reads the
+user's set for the rest of the session's transaction and drops it from
+Redis once the transaction commits. The TTL is the backstop for a change
+that lands between a read's query and its write to the cache; it is short
+because the set decides who reads a private site.
+
+Redis failing is not the request failing: a read then queries the profiles,
+and a write is logged and dropped.
+"""
+
+from __future__ import annotations
+
+import datetime
+import json
+import logging
+from typing import Callable, Collection, Dict, FrozenSet
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from chafan_core.app import crud
+from chafan_core.app.common import get_redis_cli
+
+logger = logging.getLogger(__name__)
+
+CACHE_TTL = datetime.timedelta(minutes=10)
+
+# Key of the per-request memo in ``Session.info``.
+_MEMO = "chafan_member_site_ids"
+
+
+def _cache_key(user_id: int) -> str:
+    return f"chafan:member-sites:{user_id}"
+
+
+def _clear_memo(session: Session) -> None:
+    session.info.pop(_MEMO, None)
+
+
+def _memo(db: Session) -> Dict[int, FrozenSet[int]]:
+    # What the session read is as of its transaction; so is the memo.
+    if not event.contains(db, "after_commit", _clear_memo):
+        event.listen(db, "after_commit", _clear_memo)
+        event.listen(db, "after_rollback", _clear_memo)
+    return db.info.setdefault(_MEMO, {})
+
+
+def _cached(user_ids: Collection[int]) -> Dict[int, FrozenSet[int]]:
+    try:
+        values = get_redis_cli().mget([_cache_key(i) for i in user_ids])
+    except Exception:
+        logger.exception("member sites cache unavailable")
+        return {}
+    return {
+        user_id: frozenset(json.loads(value))
+        for user_id, value in zip(user_ids, values)
+        if value is not None
+    }
+
+
+def _cache(site_ids: Dict[int, FrozenSet[int]]) -> None:
+    try:
+        pipe = get_redis_cli().pipeline()
+        for user_id, ids in site_ids.items():
+            pipe.set(_cache_key(user_id), json.dumps(sorted(ids)), ex=CACHE_TTL)
+        pipe.execute()
+    except Exception:
+        logger.exception("could not cache member sites")
+
+
+def get_site_ids_of_users(
+    db: Session, user_ids: Collection[int]
+) -> Dict[int, FrozenSet[int]]:
+    """{user id: ids of the sites they have a profile on} for ``user_ids``."""
+    memo = _memo(db)
+    missing = [i for i in set(user_ids) if i not in memo]
+    if missing:
+        found = _cached(missing)
+        unknown = [i for i in missing if i not in found]
+        if unknown:
+            queried = crud.profile.get_site_ids_of_owners(db, owner_ids=unknown)
+            loaded = {i: queried.get(i, frozenset()) for i in unknown}
+            _cache(loaded)
+            found.update(loaded)
+        memo.update(found)
+    return {i: memo[i] for i in user_ids}
+
+
+def get_site_ids(db: Session, user_id: int) -> FrozenSet[int]:
+    return get_site_ids_of_users(db, [user_id])[user_id]
+
+
+def _drop_cached(user_id: int) -> None:
+    try:
+        get_redis_cli().delete(_cache_key(user_id))
+    except Exception:
+        logger.exception("could not drop member sites of user %s", user_id)
+
+
+def _after_commit(db: Session, run: Callable[[], None]) -> None:
+    event.listen(db, "after_commit", lambda session: run(), once=True)
+
+
+def record_change(db: Session, user_id: int) -> None:
+    """Take a just-flushed change to ``user_id``'s profiles into account."""
+    # Re-read for the rest of the transaction rather than only dropped: the
+    # Redis copy still holds the old set until the commit.
+    _memo(db)[user_id] = crud.profile.get_site_ids_of_owner(db, owner_id=user_id)
+    _after_commit(db, lambda: _drop_cached(user_id))
@@ -0,0 +1,85 @@
+"""Build and read figures for the recommendation snapshots.
+
+One Redis hash, :data:`METRICS_KEY`, with fields per snapshot:
+``<name>:built_at`` (Unix seconds at the end of the last build),
+``<name>:rows`` and ``<name>:build_ms`` of that build, and the running
+totals ``<name>:reads`` and ``<name>:misses``, kept the way
+``metrics/tasks.py`` keeps job totals.
+
+*Staleness* is the age of the last build: how far behind the database a row
+read from the snapshot may be. A scheduled job that stops running shows as
+staleness growing past its interval.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import logging
+import time
+from typing import Any, Dict, Optional
+
+from chafan_core.app.common import get_redis_cli
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY = "chafan:metrics:recs"
+
+_FIELDS = ("built_at", "rows", "build_ms", "reads", "misses")
+
+
+@dataclasses.dataclass
+class SnapshotStats:
+    built_at: float = 0.0
+    rows: int = 0
+    build_ms: int = 0
+    reads: int = 0
+    misses: int = 0
+
+    def staleness(self, now: Optional[float] = None) -> Optional[float]:
+        """Seconds since the last build finished; None if it never has."""
+        if not self.built_at:
+            return None
+        return (time.time() if now is None else now) - self.built_at
+
+    @property
+    def hit_rate(self) -> float:
+        return 1 - self.misses / self.reads if self.reads else 0.0
+
+
+def record_build(name: str, *, rows: int, took: float) -> None:
+    """Note a finished build of ``name``; ``took`` is in seconds."""
+    try:
+        get_redis_cli().hset(
+            METRICS_KEY,
+            mapping={
+                f"{name}:built_at": time.time(),
+                f"{name}:rows": rows,
+                f"{name}:build_ms": int(took * 1000),
+            },
+        )
+    except Exception:
+        logger.exception("could not record build of snapshot %s", name)
+
+
+def count_read(pipe: Any, name: str) -> None:
+    """Add one read of ``name`` to ``pipe``, the pipeline doing the read."""
+    pipe.hincrby(METRICS_KEY, f"{name}:reads", 1)
+
+
+def record_miss(name: str) -> None:
+    try:
+        get_redis_cli().hincrby(METRICS_KEY, f"{name}:misses", 1)
+    except Exception:
+        logger.exception("could not record metrics for snapshot %s", name)
+
+
+def snapshot() -> Dict[str, SnapshotStats]:
+    """The figures, by snapshot name."""
+    stats: Dict[str, SnapshotStats] = {}
+    for field, value in get_redis_cli().hgetall(METRICS_KEY).items():
+        name, _, figure = field.rpartition(":")
+        if figure not in _FIELDS:
+            continue
+        parse = float if figure == "built_at" else int
+        setattr(stats.setdefault(name, SnapshotStats()), figure, parse(value))
+    return stats
@@ -0,0 +1,84 @@
+"""Query counters for full-text search: how many, how long, how often reopened,
+and how often served from the result cache.
+
+One Redis hash, :data:`METRICS_KEY`, of running totals per index --
+``<index>:queries``, ``<index>:query_us``, ``<index>:reopens``,
+``<index>:cache_hits`` and ``<index>:cache_misses`` -- kept the
+way ``metrics/tasks.py`` keeps job totals: any number of processes add to the
+same figures, and a rate is the difference between two snapshots.
+
+*Query time* is what a search backend spends on one query. For Whoosh:
+getting the shared searcher (and reopening it, when the index has moved on),
+parsing, searching and reading the ids. Microseconds, since a query against a
+warm searcher takes well under one. A query answered from
+``infra/search_cache.py`` is a cache hit and not a query: it never reaches
+the backend.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import logging
+from typing import Dict
+
+from chafan_core.app.common import get_redis_cli
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY = "chafan:metrics:search"
+
+_COUNTERS = ("queries", "query_us", "reopens", "cache_hits", "cache_misses")
+
+
+@dataclasses.dataclass
+class SearchStats:
+    queries: int = 0
+    query_us: int = 0
+    reopens: int = 0
+    cache_hits: int = 0
+    cache_misses: int = 0
+
+    @property
+    def mean_query_ms(self) -> float:
+        return self.query_us / self.queries / 1000 if self.queries else 0.0
+
+    @property
+    def cache_hit_rate(self) -> float:
+        lookups = self.cache_hits + self.cache_misses
+        return self.cache_hits / lookups if lookups else 0.0
+
+
+def record(index_type: str, *, took: float, reopened: bool) -> None:
+    """Add one query against ``index_type``; ``took`` is in seconds.
+
+    A metrics failure never fails the search it measures.
+    """
+    try:
+        pipe = get_redis_cli().pipeline()
+        pipe.hincrby(METRICS_KEY, f"{index_type}:queries", 1)
+        pipe.hincrby(METRICS_KEY, f"{index_type}:query_us", int(took * 1_000_000))
+        if reopened:
+            pipe.hincrby(METRICS_KEY, f"{index_type}:reopens", 1)
+        pipe.execute()
+    except Exception:
+        logger.exception("could not record metrics for search on %s", index_type)
+
+
+def record_cache(index_type: str, *, hit: bool) -> None:
+    """Add one result-cache lookup for ``index_type``."""
+    counter = "cache_hits" if hit else "cache_misses"
+    try:
+        get_redis_cli().hincrby(METRICS_KEY, f"{index_type}:{counter}", 1)
+    except Exception:
+        logger.exception("could not record cache metrics for %s", index_type)
+
+
+def snapshot() -> Dict[str, SearchStats]:
+    """The running totals, by index."""
+    stats: Dict[str, SearchStats] = {}
+    for field, value in get_redis_cli().hgetall(METRICS_KEY).items():
+        index_type, _, counter = field.rpartition(":")
+        if counter not in _COUNTERS:
+            continue
+        setattr(stats.setdefault(index_type, SearchStats()), counter, int(value))
+    return stats
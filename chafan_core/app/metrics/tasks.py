@@ -0,0 +1,68 @@
+"""Job counters for the task worker: how long jobs wait, how long they run.
+
+One Redis hash, :data:`METRICS_KEY`, of running totals per task name --
+``<task>:runs``, ``<task>:failures``, ``<task>:wait_ms``, ``<task>:run_ms``.
+Totals rather than samples, so any number of worker processes add to the same
+figures and a reader takes the difference between two snapshots for a rate.
+Queue depth is not counted here; it is read off the stream itself
+(``infra.task_queue.depth``).
+
+*Wait* is from the first enqueue to the start of this run, retries included:
+the delay a user sees between posting and their followers' feeds filling.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import logging
+from typing import Dict
+
+from chafan_core.app.common import get_redis_cli
+
+logger = logging.getLogger(__name__)
+
+METRICS_KEY = "chafan:metrics:tasks"
+
+
+@dataclasses.dataclass
+class TaskStats:
+    runs: int = 0
+    failures: int = 0
+    wait_ms: int = 0
+    run_ms: int = 0
+
+    @property
+    def mean_wait_ms(self) -> float:
+        return self.wait_ms / self.runs if self.runs else 0.0
+
+    @property
+    def mean_run_ms(self) -> float:
+        return self.run_ms / self.runs if self.runs else 0.0
+
+
+def record(name: str, *, waited: float, ran: float, ok: bool) -> None:
+    """Add one run of ``name``; ``waited`` and ``ran`` are in seconds.
+
+    A metrics failure never fails the job it measures.
+    """
+    try:
+        pipe = get_redis_cli().pipeline()
+        pipe.hincrby(METRICS_KEY, f"{name}:runs", 1)
+        if not ok:
+            pipe.hincrby(METRICS_KEY, f"{name}:failures", 1)
+        pipe.hincrby(METRICS_KEY, f"{name}:wait_ms", int(waited * 1000))
+        pipe.hincrby(METRICS_KEY, f"{name}:run_ms", int(ran * 1000))
+        pipe.execute()
+    except Exception:
+        logger.exception("could not record metrics for task %s", name)
+
+
+def snapshot() -> Dict[str, TaskStats]:
+    """The running totals, by task name."""
+    stats: Dict[str, TaskStats] = {}
+    for field, value in get_redis_cli().hgetall(METRICS_KEY).items():
+        name, _, counter = field.rpartition(":")
+        if counter not in ("runs", "failures", "wait_ms", "run_ms"):
+            continue
+        setattr(stats.setdefault(name, TaskStats()), counter, int(value))
+    return stats
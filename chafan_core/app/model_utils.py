@@ -1,5 +1,3 @@
-from typing import List
-
 from chafan_core.app import models
 
 
@@ -11,9 +9,5 @@ def is_live_answer(answer: models.Answer) -> bool:
     )
 
 
-def get_live_answers_of_question(question: models.Question) -> List[models.Answer]:
-    return [a for a in question.answers if is_live_answer(a)]
-
-
 def is_live_article(article: models.Article) -> bool:
     return (not article.is_deleted) and article.is_published
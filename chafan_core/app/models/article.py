@@ -6,13 +6,15 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     PrimaryKeyConstraint,
     String,
     Table,
     UniqueConstraint,
 )
-from sqlalchemy.orm import backref, relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import backref, deferred, relationship
 from sqlalchemy.sql.sqltypes import JSON, Enum
 
 from chafan_core.db.base_class import Base
@@ -45,8 +47,14 @@ class ArticleUpvotes(Base):
 
 
 class Article(Base):
+    __table_args__ = (
+        Index("ix_article_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     uuid = Column(CHAR(length=UUID_LENGTH), index=True, unique=True, nullable=False)
+    # See Question.search_vector.
+    search_vector = deferred(Column(TSVECTOR))
     author_id = Column(Integer, ForeignKey("user.id"), nullable=False, index=True)
     author = relationship("User", back_populates="articles", foreign_keys=[author_id])
     article_column_id = Column(
@@ -6,13 +6,15 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     PrimaryKeyConstraint,
     String,
     Table,
     UniqueConstraint,
 )
-from sqlalchemy.orm import backref, relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import backref, deferred, relationship
 from sqlalchemy.sql.sqltypes import JSON
 
 from chafan_core.db.base_class import Base
@@ -44,8 +46,15 @@ class QuestionUpvotes(Base):
 
 
 class Question(Base):
+    __table_args__ = (
+        Index("ix_question_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     uuid = Column(CHAR(length=UUID_LENGTH), index=True, unique=True, nullable=False)
+    # Written by infra/search_postgres.py when SEARCH_BACKEND is "postgres";
+    # deferred, as nothing but search reads it.
+    search_vector = deferred(Column(TSVECTOR))
 
     site_id = Column(Integer, ForeignKey("site.id"), nullable=False, index=True)
     site: "Site" = relationship("Site", back_populates="questions")  # type: ignore
@@ -94,6 +103,14 @@ class Question(Base):
 
     upvotes_count = Column(Integer, default=0, server_default="0", nullable=False)
 
+    # Answers that are published, not deleted and not hidden (see
+    # model_utils.is_live_answer), and comments directly on the question.
+    # Kept in step by crud.answer and crud.comment.
+    live_answers_count = Column(
+        Integer, default=0, server_default="0", nullable=False
+    )
+    comments_count = Column(Integer, default=0, server_default="0", nullable=False)
+
     archives: List["QuestionArchive"] = relationship("QuestionArchive", back_populates="question", order_by="QuestionArchive.created_at.desc()")  # type: ignore
 
     reports: List["Report"] = relationship("Report", back_populates="question", order_by="Report.created_at.asc()")  # type: ignore
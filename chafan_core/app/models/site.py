@@ -6,11 +6,13 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Table,
 )
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import deferred, relationship
 from sqlalchemy.sql.sqltypes import JSON
 
 from chafan_core.db.base_class import Base
@@ -28,8 +30,27 @@ site_topics = Table(
 
 
 class Site(Base):
+    __table_args__ = (
+        Index("ix_site_search_vector", "search_vector", postgresql_using="gin"),
+        # Typeahead; see crud/crud_typeahead.py.
+        Index(
+            "ix_site_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_site_subdomain_trgm",
+            "subdomain",
+            postgresql_using="gin",
+            postgresql_ops={"subdomain": "gin_trgm_ops"},
+        ),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     uuid = Column(CHAR(length=UUID_LENGTH), index=True, unique=True, nullable=False)
+    # See Question.search_vector.
+    search_vector = deferred(Column(TSVECTOR))
     subdomain = Column(String, nullable=False, unique=True, index=True)
     name = Column(String, unique=True, nullable=False)
     created_at = Column(DateTime(timezone=True), nullable=False)
@@ -6,13 +6,15 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     PrimaryKeyConstraint,
     String,
     Table,
     UniqueConstraint,
 )
-from sqlalchemy.orm import backref, relationship
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.orm import backref, deferred, relationship
 from sqlalchemy.sql.sqltypes import JSON
 
 from chafan_core.db.base_class import Base
@@ -51,8 +53,14 @@ class SubmissionUpvotes(Base):
 
 
 class Submission(Base):
+    __table_args__ = (
+        Index("ix_submission_search_vector", "search_vector", postgresql_using="gin"),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     uuid = Column(CHAR(length=UUID_LENGTH), index=True, unique=True, nullable=False)
+    # See Question.search_vector.
+    search_vector = deferred(Column(TSVECTOR))
 
     site_id = Column(Integer, ForeignKey("site.id"), nullable=False, index=True)
     site: "Site" = relationship("Site", back_populates="submissions")  # type: ignore
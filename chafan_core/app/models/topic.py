@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING, List
 
-from sqlalchemy import CHAR, Column, ForeignKey, Integer, String
+from sqlalchemy import CHAR, Column, ForeignKey, Index, Integer, String
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql.sqltypes import Boolean
 
@@ -12,6 +12,16 @@ if TYPE_CHECKING:
 
 
 class Topic(Base):
+    __table_args__ = (
+        # Typeahead; see crud/crud_typeahead.py.
+        Index(
+            "ix_topic_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     uuid = Column(CHAR(length=UUID_LENGTH), index=True, unique=True, nullable=False)
     name = Column(String, nullable=False)
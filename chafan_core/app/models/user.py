@@ -7,6 +7,7 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Table,
@@ -99,6 +100,22 @@ profession_topics_table = Table(
 
 
 class User(Base):
+    __table_args__ = (
+        # Typeahead; see crud/crud_typeahead.py.
+        Index(
+            "ix_user_handle_trgm",
+            "handle",
+            postgresql_using="gin",
+            postgresql_ops={"handle": "gin_trgm_ops"},
+        ),
+        Index(
+            "ix_user_full_name_trgm",
+            "full_name",
+            postgresql_using="gin",
+            postgresql_ops={"full_name": "gin_trgm_ops"},
+        ),
+    )
+
     id = Column(Integer, primary_key=True, index=True)
     uuid = Column(CHAR(length=UUID_LENGTH), index=True, unique=True, nullable=False)
     full_name = Column(String)
@@ -336,6 +353,11 @@ class User(Base):
 
     karma = Column(Integer, nullable=False, server_default="0")
 
+    # Rows of `followers` naming this user, on either side. Kept in step by
+    # crud.user.add_follower and remove_follower.
+    followers_count = Column(Integer, nullable=False, server_default="0", default=0)
+    followed_count = Column(Integer, nullable=False, server_default="0", default=0)
+
     claimed_welcome_test_rewards_with_form_response_id = Column(
         Integer, ForeignKey("formresponse.id"), nullable=True
     )
@@ -1,16 +1,57 @@
+"""Realtime messages to users' open websockets: the publishing side.
+
+A message goes two places, in one pipeline:
+
+* the user's **mailbox**, a Redis list -- :func:`get_ws_queue_for_user`. It
+  holds every message not yet sent down a socket, so one sent while the user
+  was offline is there when they connect. Bounded: the newest
+  :data:`MAILBOX_SIZE`, kept for :data:`MAILBOX_TTL`.
+* :data:`WS_CHANNEL`, a pub/sub channel every API process listens on
+  (``ws_connections.manager``). Whichever process holds the user's sockets
+  sends it at once and takes it out of the mailbox.
+
+Published once the transaction that wrote the notification commits, for the
+reason ``services.tokens`` gives: a user must not be told about a row that a
+rollback then takes back.
+"""
+
+import datetime
+import json
 import logging
 
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
 from chafan_core.app import models
+from chafan_core.app.common import get_redis_cli
 from chafan_core.app.infra.request_context import RequestContext
 from chafan_core.app.schemas.mq import WsUserMsg
 
 logger = logging.getLogger(__name__)
 
+WS_CHANNEL = "chafan:ws"
+
+# Someone away for longer, or with more unseen than this, loads the
+# notifications page anyway; the mailbox only has to bridge short absences.
+MAILBOX_SIZE = 100
+MAILBOX_TTL = datetime.timedelta(days=7)
+
 
 def get_ws_queue_for_user(user_id: int) -> str:
     return f"chafan.ws.users.{user_id}"
 
 
+def publish(user_id: int, message: str) -> None:
+    """Mail ``message`` to ``user_id`` and announce it to every process."""
+    mailbox = get_ws_queue_for_user(user_id)
+    pipe = get_redis_cli().pipeline()
+    pipe.rpush(mailbox, message)
+    pipe.ltrim(mailbox, -MAILBOX_SIZE, -1)
+    pipe.expire(mailbox, MAILBOX_TTL)
+    pipe.publish(WS_CHANNEL, json.dumps({"user_id": user_id, "message": message}))
+    pipe.execute()
+
+
 def push_notification(data_broker: RequestContext, *, notif: models.Notification) -> None:
     n = data_broker.as_principal(notif.receiver_id).notification_schema_from_orm(
         notif,
@@ -18,11 +59,16 @@ def push_notification(data_broker: RequestContext, *, notif: models.Notification
     logger.info("push_notification " + str(n)[:100])
     if n is None:
         return
-    queue_name = get_ws_queue_for_user(notif.receiver_id)
     msg = WsUserMsg(
                 type="notification",
                 data=n,
     )
-    redis = data_broker.get_redis()
-    redis.rpush(queue_name, msg.json())
+    user_id, message = notif.receiver_id, msg.json()
+    db: Session = data_broker.get_db()
 
+    @event.listens_for(db, "after_commit", once=True)
+    def _publish(session: Session) -> None:
+        try:
+            publish(user_id, message)
+        except Exception:
+            logger.exception("could not push notification to user %s", user_id)
@@ -0,0 +1,117 @@
+"""Follow-follow counts for one principal: how many of my follows follow you.
+
+This is the number behind ``UserPreview.social_annotations.follow_follows``.
+It used to come from a matrix built for *every* active user by walking two
+hops of relationships in Python -- and every request that rendered a user
+preview paid for the whole matrix to read one row of it. Here only that row
+is computed, by one bounded aggregate in ``crud.user.get_follow_follow_counts``.
+
+Rows are read from the ``follow-follows`` snapshot
+(``infra/snapshot_store.py``), which the scheduled
+``matrices.refresh_snapshots`` builds for everyone who follows anybody. A
+principal missing from it -- new, or just invalidated -- has their row
+computed and put back.
+
+Invalidation
+------------
+A principal's row depends on two things: whom they follow, and whom *those*
+people follow. So when A follows or unfollows someone, both A's row and the
+row of everyone following A are stale. :func:`forget_on_commit` drops exactly
+those. It waits for the commit for the same reason ``services.tokens`` does:
+a delete inside the open transaction lets a concurrent reader put the row back
+as it still stands.
+
+The next build is only the backstop for the read-through race that a delete
+cannot close. A stale count here is a cosmetic number on a preview, not a
+permission.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import Dict, Iterable, List
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from chafan_core.app import crud, schemas
+from chafan_core.app.infra import snapshot_store
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT = "follow-follows"
+
+# Entries kept per principal, strongest first. Past this the counts are ones
+# and twos, which rank nobody differently from zero.
+MAX_FOLLOW_FOLLOWS = 1000
+
+FollowFollows = Dict[str, int]
+
+
+def compute(db: Session, user_id: int) -> FollowFollows:
+    return crud.user.get_follow_follow_counts(
+        db, user_id=user_id, limit=MAX_FOLLOW_FOLLOWS
+    )
+
+
+def get(db: Session, user_id: int) -> FollowFollows:
+    """{user uuid: follow-follow count} for ``user_id``, read through the
+    snapshot.
+
+    Users absent from the mapping count zero.
+    """
+    row = snapshot_store.get(SNAPSHOT, str(user_id))
+    if row is not None:
+        try:
+            return {str(k): int(v) for k, v in json.loads(row).items()}
+        except (ValueError, AttributeError):
+            # A malformed row reads as a miss and is overwritten below.
+            pass
+    counts = compute(db, user_id)
+    snapshot_store.put(SNAPSHOT, str(user_id), json.dumps(counts))
+    return counts
+
+
+def build_snapshot(db: Session) -> int:
+    """Rebuild the snapshot for every active user who follows anybody."""
+    return snapshot_store.build(
+        SNAPSHOT,
+        (
+            (str(user_id), json.dumps(compute(db, user_id)))
+            for user_id in crud.user.get_active_follower_ids(db)
+        ),
+    )
+
+
+def annotate(
+    previews: Iterable[schemas.UserPreview], counts: FollowFollows
+) -> None:
+    """Set ``social_annotations.follow_follows`` on each preview, in place."""
+    for preview in previews:
+        preview.social_annotations.follow_follows = counts.get(preview.uuid, 0)
+
+
+def stale_user_ids(db: Session, user_id: int) -> List[int]:
+    """Whose rows change when ``user_id`` follows or unfollows somebody."""
+    return [user_id] + crud.user.get_follower_ids(db, user_id=user_id)
+
+
+def forget(user_ids: List[int]) -> None:
+    snapshot_store.forget(SNAPSHOT, [str(uid) for uid in user_ids])
+
+
+def forget_on_commit(db: Session, user_id: int) -> None:
+    """Drop the rows made stale by ``user_id``'s follow change, after commit.
+
+    The ids are read now, inside the transaction that changed the graph, and
+    the keys dropped only once it is durable. Nothing happens on rollback.
+    """
+    user_ids = stale_user_ids(db, user_id)
+
+    @event.listens_for(db, "after_commit", once=True)
+    def _drop(session: Session) -> None:
+        try:
+            forget(user_ids)
+        except Exception:
+            logger.exception("could not drop follow-follows for user %s", user_id)
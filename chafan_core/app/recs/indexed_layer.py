@@ -1,92 +1,143 @@
+"""Interesting questions and users, served stale while they are revalidated.
+
+Each user row stores both lists and when they were computed. A request
+serves whatever is stored, at once. If a list is older than
+:data:`STALE_AFTER`, the request also queues a refresh of it through
+``services.tasks`` -- at most one per user and list at a time, as a Redis key
+claimed for :data:`REFRESH_CLAIM_TTL` -- and a later request sees the result.
+
+A user whose lists have never been computed is served the visitor user's
+meanwhile: those are drawn from public sites only, so fit anyone.
+``scripts/refresh_interesting.py`` computes everyone's in bulk.
+"""
+
 import datetime
-from typing import List, Optional, Union
+import logging
+from typing import Callable, List, Optional
+
+from fastapi import BackgroundTasks
+from sqlalchemy.orm import Session
 
 from chafan_core.app import crud, models, schemas
+from chafan_core.app.common import get_redis_cli
 from chafan_core.app.infra.request_context import RequestContext
 from chafan_core.app.schemas.preview import UserPreview
+from chafan_core.app.services import people as people_service
+from chafan_core.app.services import tasks
 from chafan_core.app.services.postprocess import (
     refresh_interesting_question_ids_for_user,
     refresh_interesting_user_ids_for_user,
 )
-from chafan_core.utils.base import filter_not_none, get_utc_now, unwrap
+from chafan_core.utils.base import filter_not_none, get_utc_now
 
+logger = logging.getLogger(__name__)
 
-def days_in_seconds(days: int) -> int:
-    return days * 24 * 60 * 60
+STALE_AFTER = datetime.timedelta(days=3)
 
+# Longer than a queued refresh should wait and run. Until it lapses, no other
+# refresh of the same list is queued.
+REFRESH_CLAIM_TTL = datetime.timedelta(minutes=15)
 
-def _is_expired(updated_at: Optional[datetime.datetime], ttl_seconds: int) -> bool:
-    if not updated_at:
-        return True
-    duration = get_utc_now() - updated_at
-    return duration.total_seconds() > ttl_seconds
 
+def _is_stale(updated_at: Optional[datetime.datetime]) -> bool:
+    return updated_at is None or get_utc_now() - updated_at > STALE_AFTER
 
-def _get_interesting_question_ids(user: models.User) -> List[int]:
-    # if way too old, refresh now
-    if _is_expired(user.interesting_question_ids_updated_at, days_in_seconds(7)):
-        refresh_interesting_question_ids_for_user(user.id)
-    # if a bit old, enqueue refresh task
-    elif _is_expired(user.interesting_question_ids_updated_at, days_in_seconds(3)):
-        refresh_interesting_question_ids_for_user(user.id)
 
-    # return latest version
+def _claim_refresh(kind: str, user_id: int) -> bool:
+    try:
+        return bool(
+            get_redis_cli().set(
+                f"chafan:interesting-refresh:{kind}:{user_id}",
+                1,
+                nx=True,
+                ex=REFRESH_CLAIM_TTL,
+            )
+        )
+    except Exception:
+        logger.exception("could not claim %s refresh for user %s", kind, user_id)
+        return False
+
+
+def _revalidate(
+    background_tasks: BackgroundTasks,
+    kind: str,
+    user: models.User,
+    updated_at: Optional[datetime.datetime],
+    refresh: Callable[[int], None],
+) -> None:
+    if _is_stale(updated_at) and _claim_refresh(kind, user.id):
+        tasks.submit(background_tasks, refresh, user.id)
+
+
+def _get_interesting_question_ids(
+    db: Session, background_tasks: BackgroundTasks, user: models.User
+) -> List[int]:
+    _revalidate(
+        background_tasks,
+        "questions",
+        user,
+        user.interesting_question_ids_updated_at,
+        refresh_interesting_question_ids_for_user,
+    )
     if user.interesting_question_ids is None:
-        return []
+        visitor = crud.user.try_get_visitor_user(db)
+        if visitor is None or visitor.id == user.id:
+            return []
+        return visitor.interesting_question_ids or []
     return user.interesting_question_ids
 
 
 def get_interesting_questions(
-    ctx: RequestContext,
+    ctx: RequestContext, background_tasks: BackgroundTasks
 ) -> List[schemas.QuestionPreview]:
+    db = ctx.get_db()
     current_user = ctx.try_get_current_user()
     if not current_user:
-        current_user = crud.user.try_get_visitor_user(ctx.get_db())
+        current_user = crud.user.try_get_visitor_user(db)
         if not current_user:
             return []
+    # A stored id can outlive its question.
+    questions = [
+        crud.question.get(db, id=q_id)
+        for q_id in _get_interesting_question_ids(db, background_tasks, current_user)
+    ]
     return filter_not_none(
-        [
-            ctx.principal_view.preview_of_question(
-                unwrap(crud.question.get(ctx.get_db(), id=q_id))
-            )
-            for q_id in _get_interesting_question_ids(current_user)
-        ]
+        ctx.principal_view.previews_of_questions(filter_not_none(questions))
     )
 
 
-def _get_interesting_user_ids(user: models.User) -> List[int]:
-    # if way too old, refresh now
-    if _is_expired(user.interesting_user_ids_updated_at, days_in_seconds(7)):
-        refresh_interesting_user_ids_for_user(user.id)
-    # if a bit old, enqueue refresh task
-    elif _is_expired(user.interesting_user_ids_updated_at, days_in_seconds(3)):
-        refresh_interesting_user_ids_for_user(user.id)
-
-    # return latest version
+def _get_interesting_user_ids(
+    db: Session, background_tasks: BackgroundTasks, user: models.User
+) -> List[int]:
+    _revalidate(
+        background_tasks,
+        "users",
+        user,
+        user.interesting_user_ids_updated_at,
+        refresh_interesting_user_ids_for_user,
+    )
     if user.interesting_user_ids is None:
-        return []
+        visitor = crud.user.try_get_visitor_user(db)
+        if visitor is None or visitor.id == user.id:
+            return []
+        return [u for u in visitor.interesting_user_ids or [] if u != user.id]
     return user.interesting_user_ids
 
 
-def get_interesting_users(ctx: RequestContext) -> List[UserPreview]:
+def get_interesting_users(
+    ctx: RequestContext, background_tasks: BackgroundTasks
+) -> List[UserPreview]:
+    db = ctx.get_db()
     current_user = ctx.try_get_current_user()
     if not current_user:
-        current_user = crud.user.try_get_visitor_user(ctx.get_db())
-    if current_user:
-        return [
-            ctx.preview_of_user(
-                unwrap(crud.user.get(ctx.get_db(), id=u))
-            )
-            for u in _get_interesting_user_ids(current_user)
-        ]
-    return []
-
-
-def force_refresh_all_interesting_users(broker: RequestContext) -> None:
-    for u in crud.user.get_all_active_users(broker.get_db()):
-        refresh_interesting_user_ids_for_user(u.id)
-
-
-def force_refresh_all_interesting_questions(broker: RequestContext) -> None:
-    for u in crud.user.get_all_active_users(broker.get_db()):
-        refresh_interesting_question_ids_for_user(u.id)
+        current_user = crud.user.try_get_visitor_user(db)
+    if not current_user:
+        return []
+    # A stored id can outlive its user's account.
+    users = [
+        crud.user.get(db, id=u)
+        for u in _get_interesting_user_ids(db, background_tasks, current_user)
+    ]
+    return people_service.preview_of_users(
+        ctx, [u for u in filter_not_none(users) if u.is_active]
+    )
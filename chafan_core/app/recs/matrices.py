@@ -1,118 +1,119 @@
-"""Similarity / fanout / contribution matrices (formerly CachedLayer recs)."""
+"""Similarity / fanout matrices (formerly CachedLayer recs)."""
 
 from __future__ import annotations
 
-import datetime
-from collections import Counter
-from typing import Dict, List, Optional, Set, Tuple
+import heapq
+import logging
+from collections import Counter, defaultdict
+from typing import Dict, List, Optional, Tuple
 
 from sqlalchemy.orm import Session
 
-from chafan_core.app import crud, models
+from chafan_core.app import crud
+from chafan_core.app.infra import snapshot_store
+from chafan_core.app.infra.runtime import execute_with_db
+from chafan_core.db.session import SessionLocal
 from chafan_core.utils.base import EntityType
 
+logger = logging.getLogger(__name__)
+
+# Neighbours kept per entity in a similarity snapshot; the most any reader
+# asks for.
+SIMILAR_TOP_K = 50
+
 # Entity.id -> ranked similar entity ids
 MatrixType = Dict[int, List[int]]
-# User.id -> { User.uuid -> count }
-WeightedMatrixType = Dict[int, Dict[str, int]]
-# List of (year, day_contribs[1..364])
-UserContributions = List[Tuple[int, List[int]]]
 
 
-def compute_entity_similarity_matrix(db: Session, entity_type: EntityType) -> MatrixType:
-    entities: List[Tuple[int, Set[str]]] = []
+def _entity_keywords(
+    db: Session, entity_type: EntityType
+) -> List[Tuple[int, List[str]]]:
     if entity_type == EntityType.sites:
-        for site in crud.site.get_all(db):
-            if site.keywords:
-                entities.append((site.id, set(site.keywords)))
-    elif entity_type == EntityType.users:
-        for user in crud.user.get_all_active_users(db):
-            if user.keywords:
-                entities.append((user.id, set(user.keywords)))
-    else:
-        raise Exception(f"Unknown entity type: {entity_type}")
+        return crud.site.get_all_keywords(db)
+    if entity_type == EntityType.users:
+        return crud.user.get_active_user_keywords(db)
+    raise Exception(f"Unknown entity type: {entity_type}")
+
+
+def compute_entity_similarity_matrix(
+    db: Session, entity_type: EntityType, top_k: int = SIMILAR_TOP_K
+) -> MatrixType:
+    """Each entity's ``top_k`` most similar others: the most keywords in
+    common first, then the lower id.
+
+    This is the sparse product of the entity-by-keyword incidence matrix
+    with its transpose, a row at a time: an inverted index maps each keyword
+    to the entities that have it, and an entity's row counts the entities
+    on its keywords' postings. Entities sharing no keyword are never
+    visited, so the cost is the sum of the postings' squared lengths rather
+    than the square of the number of entities -- and they are not listed as
+    "similar" either.
+    """
+    entities = [
+        (entity_id, set(keywords))
+        for entity_id, keywords in _entity_keywords(db, entity_type)
+    ]
+    postings: Dict[str, List[int]] = defaultdict(list)
+    for entity_id, keywords in entities:
+        for keyword in keywords:
+            postings[keyword].append(entity_id)
 
     matrix: MatrixType = {}
-    for query_id, query_keywords in entities:
-        candidates = []
-        for candidate_id, candidate_keywords in entities:
-            if candidate_id == query_id:
-                continue
-            candidates.append(
-                (candidate_id, len(candidate_keywords.intersection(query_keywords)))
-            )
-        candidates.sort(key=lambda p: p[1], reverse=True)
-        matrix[query_id] = [cid for cid, _ in candidates[:50]]
+    for entity_id, keywords in entities:
+        shared: Counter = Counter()
+        for keyword in keywords:
+            shared.update(postings[keyword])
+        del shared[entity_id]
+        top = heapq.nsmallest(top_k, shared.items(), key=lambda p: (-p[1], p[0]))
+        matrix[entity_id] = [other_id for other_id, _ in top]
     return matrix
 
 
-def compute_follow_follow_fanout(db: Session) -> WeightedMatrixType:
-    matrix: WeightedMatrixType = {}
-    for user in crud.user.get_all_active_users(db):
-        user_ids: Counter = Counter()
-        for followed in user.followed:
-            for followed_followed in followed.followed:
-                if followed_followed.id != user.id:
-                    user_ids[followed_followed.uuid] += 1
-        matrix[user.id] = dict(user_ids)
-    return matrix
+def similarity_snapshot(entity_type: EntityType) -> str:
+    """The name of ``entity_type``'s snapshot in ``infra/snapshot_store.py``."""
+    return f"similar:{entity_type.value}"
+
+
+def store_similarity_snapshot(entity_type: EntityType, matrix: MatrixType) -> int:
+    """Replace ``entity_type``'s snapshot with ``matrix``; returns its rows."""
+    return snapshot_store.build(
+        similarity_snapshot(entity_type),
+        (
+            (str(entity_id), ",".join(map(str, similar_ids)))
+            for entity_id, similar_ids in matrix.items()
+            if similar_ids
+        ),
+    )
+
+
+def refresh_snapshots() -> None:
+    """Rebuild every recommendation snapshot; the scheduled job."""
+    from chafan_core.app.recs import follow_follows
 
+    def runnable(db: Session) -> None:
+        for entity_type in EntityType:
+            matrix = compute_entity_similarity_matrix(db, entity_type)
+            rows = store_similarity_snapshot(entity_type, matrix)
+            logger.info("snapshot %s: %d rows", similarity_snapshot(entity_type), rows)
+        rows = follow_follows.build_snapshot(db)
+        logger.info("snapshot %s: %d rows", follow_follows.SNAPSHOT, rows)
 
-def compute_user_contributions(user: models.User) -> UserContributions:
-    d: Dict[int, Dict[int, Dict[str, int]]] = {}
-
-    def incr(timestamp: datetime.datetime, action: str) -> None:
-        year = timestamp.year
-        day = min(timestamp.timetuple().tm_yday, 364)
-        if year not in d:
-            d[year] = {}
-        if day not in d[year]:
-            d[year][day] = {}
-        if action not in d[year][day]:
-            d[year][day][action] = 0
-        d[year][day][action] += 1
-
-    for answer in user.answers:
-        incr(answer.updated_at, "answer")
-    for article in user.articles:
-        incr(article.created_at, "article")
-    for question in user.questions:
-        incr(question.created_at, "question")
-    for submission in user.submissions:
-        incr(submission.created_at, "submission")
-
-    ret: UserContributions = []
-    if not d:
-        return ret
-    for year in reversed(range(min(d.keys()), max(d.keys()) + 1)):
-        day_contribs = []
-        for day in range(1, 365):
-            if year not in d or day not in d[year]:
-                day_contribs.append(0)
-            else:
-                v = 0
-                if "answer" in d[year][day]:
-                    v += max(d[year][day]["answer"], 2)
-                if "question" in d[year][day]:
-                    v += max(d[year][day]["question"], 1)
-                if "submission" in d[year][day]:
-                    v += max(int(float(d[year][day]["submission"]) / 2.0), 1)
-                if "article" in d[year][day]:
-                    v += max(d[year][day]["article"], 2)
-                day_contribs.append(min(int(v), 3))
-        ret.append((year, day_contribs))
-    return ret
+    execute_with_db(SessionLocal(), runnable, auto_commit=False)
 
 
 def similar_entity_ids(
-    db: Session,
     *,
     entity_id: int,
     entity_type: EntityType,
     top_k: int = 10,
     matrix: Optional[MatrixType] = None,
 ) -> List[int]:
-    m = matrix if matrix is not None else compute_entity_similarity_matrix(db, entity_type)
-    if entity_id not in m:
+    """Up to ``top_k`` entities most similar to ``entity_id``, from ``matrix``
+    or else its snapshot -- never computed here. Nothing before the first
+    snapshot is built, or if Redis is unavailable."""
+    if matrix is not None:
+        return matrix.get(entity_id, [])[:top_k]
+    row = snapshot_store.get(similarity_snapshot(entity_type), str(entity_id))
+    if not row:
         return []
-    return m[entity_id][:top_k]
+    return [int(other_id) for other_id in row.split(",")[:top_k]]
@@ -1,6 +1,6 @@
 import datetime
 import math
-from typing import List, Optional, Union
+from typing import List, Optional, Tuple, Union
 
 from chafan_core.app import models, schemas
 
@@ -12,19 +12,15 @@ def get_user_score(u: schemas.UserPreview) -> float:
     return score
 
 
-def get_user_model_score(u: models.User) -> float:
-    score = u.karma + u.followers.count() * 5
-    return score
+# Karma a follower is worth when ranking users for recommendation; the
+# ranking itself runs in SQL (crud.user.get_top_ranked_active_user_ids).
+USER_FOLLOWER_SCORE = 5
 
 
 def rank_user_previews(users: List[schemas.UserPreview]) -> List[schemas.UserPreview]:
     return sorted(users, key=get_user_score, reverse=True)
 
 
-def rank_users(users: List[models.User]) -> List[models.User]:
-    return sorted(users, key=get_user_model_score, reverse=True)
-
-
 # Return a freshness score between 0 and 1
 def freshness(
     utc_now: datetime.datetime, updated_at: datetime.datetime, recency_boost: float
@@ -47,23 +43,33 @@ def rank_submissions(
     return sorted(submissions, key=hotness, reverse=True)
 
 
-def rank_answers(
-    answers: List[models.Answer], principal_id: Optional[int]
-) -> List[models.Answer]:
-    utc_now = datetime.datetime.now(tz=datetime.timezone.utc)
+def answer_rank_key(
+    answer: models.Answer, principal_id: Optional[int], utc_now: datetime.datetime
+) -> Tuple[float, int]:
+    """Where ``answer`` sorts in :func:`rank_answers` as of ``utc_now``: by
+    weight, heaviest first, then by id."""
+    author_weight = 1000 if answer.author_id == principal_id else 1
+    freshness_weight = freshness(utc_now, answer.updated_at, recency_boost=2)
+    featured_weight = 2.0 if answer.featured_at else 1.0
+    weight = (
+        float(answer.upvotes_count + 1)
+        * author_weight
+        * freshness_weight
+        * featured_weight
+    )
+    return -weight, answer.id
 
-    def compute_weight(answer: models.Answer) -> float:
-        author_weight = 1000 if answer.author_id == principal_id else 1
-        freshness_weight = freshness(utc_now, answer.updated_at, recency_boost=2)
-        featured_weight = 2.0 if answer.featured_at else 1.0
-        return (
-            float(answer.upvotes_count + 1)
-            * author_weight
-            * freshness_weight
-            * featured_weight
-        )
 
-    return sorted(answers, key=compute_weight, reverse=True)
+def rank_answers(
+    answers: List[models.Answer],
+    principal_id: Optional[int],
+    utc_now: Optional[datetime.datetime] = None,
+) -> List[models.Answer]:
+    if utc_now is None:
+        utc_now = datetime.datetime.now(tz=datetime.timezone.utc)
+    return sorted(
+        answers, key=lambda answer: answer_rank_key(answer, principal_id, utc_now)
+    )
 
 
 def rank_site_profiles(site_profiles: List[models.Profile]) -> List[models.Profile]:
@@ -0,0 +1,117 @@
+"""The kinds of key responders batch-load through ``RequestContext.loader``.
+
+See ``infra/batch_loader.py``. Upvote flags are keyed by (voter id, content
+id), so shapers for different principals (``RequestContext.as_principal``)
+share one loader.
+"""
+
+from collections import defaultdict
+from typing import (
+    Any,
+    Callable,
+    Collection,
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+
+from sqlalchemy.orm import Session
+
+from chafan_core.app import crud, memberships, models
+from chafan_core.app.infra.batch_loader import BatchLoader, Kind
+
+
+def _rows(model: Any) -> Callable[[Session, List[int]], Dict[int, Any]]:
+    def load(db: Session, ids: List[int]) -> Dict[int, Any]:
+        return {row.id: row for row in db.query(model).filter(model.id.in_(ids))}
+
+    return load
+
+
+def _upvoted(
+    get_upvoted_ids: Callable[..., FrozenSet[int]]
+) -> Callable[[Session, List[Tuple[int, int]]], Dict[Tuple[int, int], bool]]:
+    def load(
+        db: Session, keys: List[Tuple[int, int]]
+    ) -> Dict[Tuple[int, int], bool]:
+        by_voter: Dict[int, Set[int]] = defaultdict(set)
+        for voter_id, content_id in keys:
+            by_voter[voter_id].add(content_id)
+        return {
+            (voter_id, content_id): True
+            for voter_id, ids in by_voter.items()
+            for content_id in get_upvoted_ids(db, voter_id=voter_id, ids=ids)
+        }
+
+    return load
+
+
+def _views(object_type: str) -> Callable[[Session, Collection[int]], Dict[int, int]]:
+    def load(db: Session, ids: Collection[int]) -> Dict[int, int]:
+        return crud.viewcount.get_viewcounts(db, object_type, ids, live=True)
+
+    return load
+
+
+USERS: Kind[int, Any] = Kind("users", _rows(models.User), None)
+SITES: Kind[int, Any] = Kind("sites", _rows(models.Site), None)
+QUESTIONS: Kind[int, Any] = Kind("questions", _rows(models.Question), None)
+ARTICLE_COLUMNS: Kind[int, Any] = Kind(
+    "article columns", _rows(models.ArticleColumn), None
+)
+
+# Every site a user has a profile on.
+MEMBER_SITE_IDS: Kind[int, FrozenSet[int]] = Kind(
+    "member site ids",
+    memberships.get_site_ids_of_users,
+    frozenset(),
+)
+# (visible questions, visible submissions, members) of a site.
+SITE_COUNTS: Kind[int, Tuple[int, int, int]] = Kind(
+    "site counts",
+    lambda db, ids: crud.site.get_content_counts(db, site_ids=ids),
+    (0, 0, 0),
+)
+
+QUESTION_UPVOTED: Kind[Tuple[int, int], bool] = Kind(
+    "question upvoted", _upvoted(crud.question.get_upvoted_ids), False
+)
+ANSWER_UPVOTED: Kind[Tuple[int, int], bool] = Kind(
+    "answer upvoted", _upvoted(crud.answer.get_upvoted_ids), False
+)
+ARTICLE_UPVOTED: Kind[Tuple[int, int], bool] = Kind(
+    "article upvoted", _upvoted(crud.article.get_upvoted_ids), False
+)
+COMMENT_UPVOTED: Kind[Tuple[int, int], bool] = Kind(
+    "comment upvoted", _upvoted(crud.comment.get_upvoted_ids), False
+)
+
+QUESTION_VIEWS: Kind[int, int] = Kind("question views", _views("question"), 0)
+ANSWER_VIEWS: Kind[int, int] = Kind("answer views", _views("answer"), 0)
+ARTICLE_VIEWS: Kind[int, int] = Kind("article views", _views("article"), 0)
+
+
+def upvoted(
+    loader: BatchLoader,
+    kind: Kind[Tuple[int, int], bool],
+    voter_id: Optional[int],
+    content_id: int,
+) -> bool:
+    """Whether ``voter_id`` upvoted ``content_id``; False for no voter."""
+    if voter_id is None:
+        return False
+    return loader.get(kind, (voter_id, content_id))
+
+
+def want_upvoted(
+    loader: BatchLoader,
+    kind: Kind[Tuple[int, int], bool],
+    voter_id: Optional[int],
+    content_ids: Iterable[int],
+) -> None:
+    if voter_id is not None:
+        loader.want(kind, ((voter_id, i) for i in content_ids))
@@ -9,6 +9,23 @@ def shaper(ctx):
     return getattr(ctx, "principal_view", ctx)
 
 
+def member_site_ids(ctx):
+    """The principal's site ids, passed through to
+    ``user_permission.user_in_site``.
+
+    Those a batch has set (see ``PrincipalView.member_site_ids``), else read
+    once per request through the loader; None for an anonymous principal,
+    whom membership cannot admit anyway.
+    """
+    from chafan_core.app.responders import _batch
+
+    mat = shaper(ctx)
+    site_ids = getattr(mat, "member_site_ids", None)
+    if site_ids is not None or mat.principal_id is None:
+        return site_ids
+    return ctx.loader.get(_batch.MEMBER_SITE_IDS, mat.principal_id)
+
+
 def get_db(ctx):
     if hasattr(ctx, "get_db"):
         return ctx.get_db()
@@ -1,9 +1,10 @@
-from typing import Optional, Tuple
+from typing import List, Optional, Sequence, Tuple
 import logging
 
 from chafan_core.app import crud, models, schemas, user_permission
 from chafan_core.app.common import OperationType
-from chafan_core.app.responders._util import get_db, shaper
+from chafan_core.app.responders import _batch
+from chafan_core.app.responders._util import get_db, member_site_ids, shaper
 from chafan_core.app.schemas.answer import AnswerInDBBase
 from chafan_core.app.schemas.richtext import RichText
 from chafan_core.utils.base import filter_not_none
@@ -33,13 +34,66 @@ def answer_preview_base(mat, answer: models.Answer) -> schemas.answer.AnswerPrev
     )
 
 
+def want_previews(ctx, answers: Sequence[models.Answer]) -> None:
+    """Queue what previewing ``answers`` reads, their questions' previews
+    included, so the first preview loads it for all of them."""
+    from chafan_core.app.responders import question as question_responder
+
+    mat = shaper(ctx)
+    mat.loader.want(_batch.USERS, (answer.author_id for answer in answers))
+    mat.loader.want(_batch.SITES, (answer.site_id for answer in answers))
+    questions = mat.loader.get_many(
+        _batch.QUESTIONS, (answer.question_id for answer in answers)
+    )
+    question_responder.want_previews(mat, filter_not_none(list(questions.values())))
+
+
+def want_schemas(ctx, answers: Sequence[models.Answer], principal_id) -> None:
+    """Queue what shaping ``answers`` in full for ``principal_id`` reads, the
+    upvotes included, so the first of them loads it for all of them."""
+    from chafan_core.app.responders import comment as comment_responder
+
+    ids = [answer.id for answer in answers]
+    want_previews(ctx, answers)
+    ctx.loader.want(_batch.ANSWER_VIEWS, ids)
+    _batch.want_upvoted(ctx.loader, _batch.ANSWER_UPVOTED, principal_id, ids)
+    comment_responder.want_schemas(
+        shaper(ctx), [comment for answer in answers for comment in answer.comments]
+    )
+
+
+def get_answer_upvotes(
+    ctx, answer: models.Answer, principal_id
+) -> schemas.AnswerUpvotes:
+    return schemas.AnswerUpvotes(
+        answer_uuid=answer.uuid,
+        count=answer.upvotes_count,
+        upvoted=_batch.upvoted(
+            ctx.loader, _batch.ANSWER_UPVOTED, principal_id, answer.id
+        ),
+    )
+
+
+def previews_of_answers(
+    ctx, answers: Sequence[models.Answer]
+) -> List[Optional[schemas.AnswerPreview]]:
+    """``[preview_of_answer(ctx, a) for a in answers]``, batched."""
+    want_previews(ctx, answers)
+    return [preview_of_answer(ctx, answer) for answer in answers]
+
+
 def preview_of_answer(ctx, answer: models.Answer) -> Optional[schemas.AnswerPreview]:
     """One answer preview for any principal allowed to read the answer."""
     from chafan_core.app.responders import question as question_responder
 
     db = get_db(ctx)
     principal_id = ctx.principal_id
-    if not user_permission.answer_read_allowed(db, answer=answer, user_id=principal_id):
+    if not user_permission.answer_read_allowed(
+        db,
+        answer=answer,
+        user_id=principal_id,
+        member_site_ids=member_site_ids(ctx),
+    ):
         return None
     mat = shaper(ctx)
     question = question_responder.preview_of_question(mat, answer.question)
@@ -60,16 +114,9 @@ def answer_schema_from_orm(
     if not user_permission.answer_read_allowed(db, answer=answer, user_id=principal_id):
         return None
 
-    upvoted = False
     comment_writable = False
     bookmarked = False
     if principal_id is not None:
-        upvoted = (
-            db.query(models.Answer_Upvotes)
-            .filter_by(answer_id=answer.id, voter_id=principal_id, cancelled=False)
-            .first()
-            is not None
-        )
         comment_writable = user_permission.user_in_site(
             db,
             site=answer.site,
@@ -84,17 +131,17 @@ def answer_schema_from_orm(
     base = AnswerInDBBase.from_orm(answer)
     d = base.dict()
     d["site"] = ctx.site_schema_from_orm(answer.site)
-    d["comments"] = filter_not_none(
-        [mat.comment_schema_from_orm(c) for c in answer.comments]
-    )
+    d["comments"] = filter_not_none(mat.comment_schemas_from_orm(answer.comments))
     d["author"] = mat.preview_of_user(answer.author)
     d["question"] = mat.preview_of_question(answer.question)
-    d["upvoted"] = upvoted
+    d["upvoted"] = _batch.upvoted(
+        ctx.loader, _batch.ANSWER_UPVOTED, principal_id, answer.id
+    )
     d["comment_writable"] = comment_writable
     d["bookmark_count"] = answer.bookmarkers.count()
     d["archives_count"] = len(answer.archives)
     d["bookmarked"] = bookmarked
-    d["view_times"] = crud.viewcount.get_viewcount_answer(db, answer.id)
+    d["view_times"] = ctx.loader.get(_batch.ANSWER_VIEWS, answer.id)
 
     if answer.is_published:
         body = answer.body
@@ -1,7 +1,8 @@
-from typing import Optional
+from typing import List, Optional, Sequence
 import logging
 
 from chafan_core.app import crud, models, schemas, user_permission
+from chafan_core.app.responders import _batch
 from chafan_core.app.responders._util import get_db, shaper
 from chafan_core.app.schemas.article import ArticleInDB
 from chafan_core.app.schemas.richtext import RichText
@@ -10,6 +11,27 @@ from chafan_core.utils.base import filter_not_none
 logger = logging.getLogger(__name__)
 
 
+def want_previews(ctx, articles: Sequence[models.Article]) -> None:
+    """Queue what previewing ``articles`` reads, so the first preview loads it
+    for all of them."""
+    loader = ctx.loader
+    loader.want(_batch.USERS, (article.author_id for article in articles))
+    columns = loader.get_many(
+        _batch.ARTICLE_COLUMNS, (article.article_column_id for article in articles)
+    )
+    loader.want(
+        _batch.USERS, (column.owner_id for column in columns.values() if column)
+    )
+
+
+def previews_of_articles(
+    ctx, articles: Sequence[models.Article]
+) -> List[Optional[schemas.ArticlePreview]]:
+    """``[preview_of_article(ctx, a) for a in articles]``, batched."""
+    want_previews(ctx, articles)
+    return [preview_of_article(ctx, article) for article in articles]
+
+
 def preview_of_article(ctx, article: models.Article) -> Optional[schemas.ArticlePreview]:
     principal_id = ctx.principal_id
     if not user_permission.article_preview_read_allowed(article, principal_id):
@@ -33,15 +55,8 @@ def article_schema_from_orm(
     if not user_permission.article_read_allowed(db, article, principal_id):
         return None
 
-    upvoted = False
     bookmarked = False
     if principal_id is not None:
-        upvoted = (
-            db.query(models.ArticleUpvotes)
-            .filter_by(article_id=article.id, voter_id=principal_id, cancelled=False)
-            .first()
-            is not None
-        )
         principal = crud.user.get(db, id=principal_id)
         if principal is not None:
             bookmarked = article in principal.bookmarked_articles
@@ -50,14 +65,14 @@ def article_schema_from_orm(
     base = ArticleInDB.from_orm(article)
     d = base.dict()
     d["article_column"] = mat.article_column_schema_from_orm(article.article_column)
-    d["comments"] = filter_not_none(
-        [mat.comment_schema_from_orm(c) for c in article.comments]
-    )
+    d["comments"] = filter_not_none(mat.comment_schemas_from_orm(article.comments))
     d["bookmark_count"] = article.bookmarkers.count()
     d["bookmarked"] = bookmarked
     d["author"] = mat.preview_of_user(article.author)
-    d["upvoted"] = upvoted
-    d["view_times"] = crud.viewcount.get_viewcount_article(db, article.id)
+    d["upvoted"] = _batch.upvoted(
+        ctx.loader, _batch.ARTICLE_UPVOTED, principal_id, article.id
+    )
+    d["view_times"] = ctx.loader.get(_batch.ARTICLE_VIEWS, article.id)
     d["archives_count"] = len(article.archives)
 
     if article.is_published:
@@ -2,10 +2,11 @@
 
 from __future__ import annotations
 
-from typing import Optional
+from typing import Iterator, List, Optional, Sequence
 
 from chafan_core.app import models, schemas
 from chafan_core.app.common import OperationType
+from chafan_core.app.responders import _batch
 from chafan_core.app.schemas.richtext import RichText
 from chafan_core.utils.base import filter_not_none
 
@@ -26,8 +27,36 @@ def root_route(comment: models.Comment) -> Optional[str]:
     return None
 
 
+def _with_replies(comments: Sequence[models.Comment]) -> Iterator[models.Comment]:
+    for comment in comments:
+        yield comment
+        yield from _with_replies(comment.child_comments)
+
+
+def want_schemas(mat, comments: Sequence[models.Comment]) -> None:
+    """Queue what shaping ``comments`` and all their replies reads."""
+    everything = list(_with_replies(comments))
+    mat.loader.want(_batch.USERS, (c.author_id for c in everything))
+    _batch.want_upvoted(
+        mat.loader,
+        _batch.COMMENT_UPVOTED,
+        mat.principal_id,
+        (c.id for c in everything),
+    )
+
+
+def comment_schemas_from_orm(
+    mat, comments: Sequence[models.Comment]
+) -> List[Optional[schemas.Comment]]:
+    """``[comment_schema_from_orm(mat, c) for c in comments]``, batched over
+    the comments and all their replies."""
+    want_schemas(mat, comments)
+    return [comment_schema_from_orm(mat, comment) for comment in comments]
+
+
 def comment_schema_from_orm(mat, comment: models.Comment) -> Optional[schemas.Comment]:
     """Shape a comment for mat.principal_id. mat is PrincipalView (db + principal + previews)."""
+    from chafan_core.app.responders._util import member_site_ids
     from chafan_core.app.user_permission import user_in_site
 
     db = mat.broker.get_db()
@@ -36,24 +65,15 @@ def comment_schema_from_orm(mat, comment: models.Comment) -> Optional[schemas.Co
         site=comment.site,
         user_id=mat.principal_id,
         op_type=OperationType.ReadSite,
+        member_site_ids=member_site_ids(mat),
     ):
         return None
     base = schemas.CommentInDBBase.from_orm(comment)
-    upvoted = False
-    if mat.principal_id is not None:
-        upvoted = (
-            db.query(models.CommentUpvotes)
-            .filter_by(
-                comment_id=comment.id,
-                voter_id=mat.principal_id,
-                cancelled=False,
-            )
-            .first()
-            is not None
-        )
     d = base.dict()
     d["author"] = mat.preview_of_user(comment.author)
-    d["upvoted"] = upvoted
+    d["upvoted"] = _batch.upvoted(
+        mat.loader, _batch.COMMENT_UPVOTED, mat.principal_id, comment.id
+    )
     d["root_route"] = root_route(comment)
     d["content"] = RichText(
         source=comment.body,
@@ -61,6 +81,6 @@ def comment_schema_from_orm(mat, comment: models.Comment) -> Optional[schemas.Co
         editor=comment.editor,
     )
     d["child_comments"] = filter_not_none(
-        [comment_schema_from_orm(mat, c) for c in comment.child_comments]
+        comment_schemas_from_orm(mat, comment.child_comments)
     )
     return schemas.Comment(**d)
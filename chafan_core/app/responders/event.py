@@ -3,11 +3,13 @@
 from __future__ import annotations
 
 import time
-from typing import Optional
+from collections import defaultdict
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple
 
 import sentry_sdk
+from sqlalchemy.orm import selectinload
 
-from chafan_core.app import crud, models, schemas
+from chafan_core.app import crud, memberships, models, schemas
 from chafan_core.app.common import report_msg
 from chafan_core.app.schemas import event as event_module
 from chafan_core.app.schemas.event import (
@@ -20,34 +22,140 @@ from chafan_core.app.schemas.notification import Notification, NotificationInDBB
 from chafan_core.app.schemas.reward import AnsweredQuestionCondition, RewardCondition
 from chafan_core.utils.base import map_, unwrap
 
-_KEYS = [
-    "reward",
-    "submission",
-    "article",
-    "article_column",
-    "subject",
-    "question",
-    "answer",
-    "comment",
-    "reply",
-    "parent_comment",
-    "user",
-    "site",
-    "channel",
-    "submission_suggestion",
-    "answer_suggest_edit",
-]
+# The model each ``<key>_id`` field of an event names.
+_MODELS = {
+    "reward": models.Reward,
+    "submission": models.Submission,
+    "article": models.Article,
+    "article_column": models.ArticleColumn,
+    "subject": models.User,
+    "question": models.Question,
+    "answer": models.Answer,
+    "comment": models.Comment,
+    "reply": models.Comment,
+    "parent_comment": models.Comment,
+    "user": models.User,
+    "site": models.Site,
+    "channel": models.Channel,
+    "submission_suggestion": models.SubmissionSuggestion,
+    "answer_suggest_edit": models.AnswerSuggestEdit,
+}
 
+# What the shaping below reads off each loaded row, fetched alongside it by a
+# batch so that rendering a page does not go back for every author and site.
+_EAGER = {
+    models.Question: lambda: [
+        selectinload(models.Question.author),
+        selectinload(models.Question.site),
+    ],
+    models.Answer: lambda: [
+        selectinload(models.Answer.author),
+        selectinload(models.Answer.site),
+        selectinload(models.Answer.question).selectinload(models.Question.author),
+        selectinload(models.Answer.question).selectinload(models.Question.site),
+    ],
+    models.Article: lambda: [
+        selectinload(models.Article.author),
+        selectinload(models.Article.article_column),
+    ],
+    models.Comment: lambda: [
+        selectinload(models.Comment.author),
+        selectinload(models.Comment.site),
+    ],
+    models.Submission: lambda: [
+        selectinload(models.Submission.author),
+        selectinload(models.Submission.site),
+    ],
+}
 
-def materialize_event(mat, event_internal_json: str) -> Optional[Event]:
+# Loads the row a ``<key>_id`` field names, or None.
+Loader = Callable[[str, Any], Any]
+
+
+def _parse(event_internal_json: str) -> Optional[EventInternal]:
     try:
-        event = EventInternal.parse_raw(event_internal_json)
+        return EventInternal.parse_raw(event_internal_json)
     except Exception:
         if time.time() % 2 == 0:
             sentry_sdk.capture_message(
                 f"Failed to materialize event: {event_internal_json}",
             )
         return None
+
+
+def _id_fields(event: EventInternal) -> Iterator[Tuple[str, Any]]:
+    for k, v in event.content.dict().items():
+        if k.endswith("_id") and k[:-3] in _MODELS:
+            yield k[:-3], v
+
+
+def _crud_loader(db) -> Loader:
+    # One row at a time: what each ``crud.<domain>.get`` does.
+    def load(k: str, v: Any) -> Any:
+        model = _MODELS[k]
+        return db.query(model).filter(model.id == v).first()
+
+    return load
+
+
+def materialize_event(mat, event_internal_json: str) -> Optional[Event]:
+    event = _parse(event_internal_json)
+    if event is None:
+        return None
+    return _materialize(
+        mat, event, event_internal_json, _crud_loader(mat.broker.get_db())
+    )
+
+
+def materialize_events(
+    mat, event_internal_jsons: Sequence[str]
+) -> List[Optional[Event]]:
+    """``[materialize_event(mat, j) for j in event_internal_jsons]``, batched.
+
+    Same output item for item, including the ``None`` for anything the
+    principal may not see. The difference is the queries: every event is parsed
+    first, the rows they name are loaded with one ``IN (...)`` per model, and
+    site membership is read once for the principal and checked in memory,
+    instead of a ``get`` per field and a profile lookup per permission gate.
+    """
+    parsed = [_parse(j) for j in event_internal_jsons]
+    wanted: Dict[Any, Set[Any]] = defaultdict(set)
+    for event in parsed:
+        if event is None:
+            continue
+        for k, v in _id_fields(event):
+            if v is not None:
+                wanted[_MODELS[k]].add(v)
+
+    db = mat.broker.get_db()
+    rows: Dict[Tuple[Any, Any], Any] = {}
+    for model, ids in wanted.items():
+        query = db.query(model).filter(model.id.in_(ids))
+        if model in _EAGER:
+            query = query.options(*_EAGER[model]())
+        for row in query:
+            rows[(model, row.id)] = row
+
+    def load(k: str, v: Any) -> Any:
+        return rows.get((_MODELS[k], v))
+
+    outer_member_site_ids = mat.member_site_ids
+    if mat.principal_id is None:
+        mat.member_site_ids = frozenset()
+    else:
+        mat.member_site_ids = memberships.get_site_ids(db, mat.principal_id)
+    try:
+        return [
+            None if event is None else _materialize(mat, event, j, load)
+            for event, j in zip(parsed, event_internal_jsons)
+        ]
+    finally:
+        mat.member_site_ids = outer_member_site_ids
+
+
+def _materialize(
+    mat, event: EventInternal, event_internal_json: str, load: Loader
+) -> Optional[Event]:
     db = mat.broker.get_db()
     kwargs = {}
     for k, v in event.content.dict().items():
@@ -59,11 +167,11 @@ def materialize_event(mat, event_internal_json: str) -> Optional[Event]:
             else:
                 assert k.endswith("_id"), k
                 k = k[:-3]
-                assert k in _KEYS, k
+                assert k in _MODELS, k
                 if k == "subject" or k == "user":
-                    kwargs[k] = map_(crud.user.get(db, id=v), mat.preview_of_user)
+                    kwargs[k] = map_(load(k, v), mat.preview_of_user)
                 elif k == "question":
-                    question = crud.question.get(db, id=v)
+                    question = load(k, v)
                     if question is None:
                         return None
                     question_data = mat.preview_of_question(question)
@@ -71,7 +179,7 @@ def materialize_event(mat, event_internal_json: str) -> Optional[Event]:
                         return None
                     kwargs[k] = question_data
                 elif k == "submission":
-                    submission = crud.submission.get(db, id=v)
+                    submission = load(k, v)
                     if submission is None:
                         return None
                     submission_data = mat.submission_schema_from_orm(submission)
@@ -79,7 +187,7 @@ def materialize_event(mat, event_internal_json: str) -> Optional[Event]:
                         return None
                     kwargs[k] = submission_data
                 elif k == "submission_suggestion":
-                    submission_suggestion = crud.submission_suggestion.get(db, id=v)
+                    submission_suggestion = load(k, v)
                     if submission_suggestion is None:
                         return None
                     submission_suggestion_data = (
@@ -91,7 +199,7 @@ def materialize_event(mat, event_internal_json: str) -> Optional[Event]:
                         return None
                     kwargs[k] = submission_suggestion_data
                 elif k == "answer_suggest_edit":
-                    answer_suggest_edit = crud.answer_suggest_edit.get(db, id=v)
+                    answer_suggest_edit = load(k, v)
                     if answer_suggest_edit is None:
                         return None
                     answer_suggest_edit_data = (
@@ -103,7 +211,7 @@ def materialize_event(mat, event_internal_json: str) -> Optional[Event]:
                         return None
                     kwargs[k] = answer_suggest_edit_data
                 elif k == "reward":
-                    reward = crud.reward.get(db, id=v)
+                    reward = load(k, v)
                     if reward is None:
                         return None
                     kwargs["reward"] = mat.reward_schema_from_orm(reward)
@@ -125,7 +233,7 @@ def materialize_event(mat, event_internal_json: str) -> Optional[Event]:
                             return None
                         kwargs["question"] = question_data
                 elif k == "answer":
-                    answer = crud.answer.get(db, id=v)
+                    answer = load(k, v)
                     if answer is None:
                         return None
                     assert answer.body is not None
@@ -135,7 +243,7 @@ def materialize_event(mat, event_internal_json: str) -> Optional[Event]:
                     else:
                         return None
                 elif k == "article":
-                    article = crud.article.get(db, id=v)
+                    article = load(k, v)
                     if article is None:
                         return None
                     data = mat.preview_of_article(article)
@@ -144,12 +252,12 @@ def materialize_event(mat, event_internal_json: str) -> Optional[Event]:
                     else:
                         kwargs[k] = data
                 elif k == "article_column":
-                    article_column = crud.article_column.get(db, id=v)
+                    article_column = load(k, v)
                     if article_column is None:
                         return None
                     kwargs[k] = mat.article_column_schema_from_orm(article_column)
                 elif k in ["comment", "parent_comment", "reply"]:
-                    comment = crud.comment.get(db, id=v)
+                    comment = load(k, v)
                     if comment:
                         comment_data = mat.comment_schema_from_orm(comment)
                         if comment_data:
@@ -158,11 +266,11 @@ def materialize_event(mat, event_internal_json: str) -> Optional[Event]:
                             return None
                 elif k == "site":
                     kwargs[k] = map_(
-                        crud.site.get(db, id=v), mat.site_schema_from_orm
+                        load(k, v), mat.site_schema_from_orm
                     )
                 elif k == "channel":
                     kwargs[k] = map_(
-                        crud.channel.get(db, id=v), mat.channel_schema_from_orm
+                        load(k, v), mat.channel_schema_from_orm
                     )
                 else:
                     raise Exception(k)
@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import List, Optional, Sequence
 import logging
 
 logger = logging.getLogger(__name__)
@@ -6,29 +6,34 @@ logger = logging.getLogger(__name__)
 import chafan_core.app.responders as responders
 from chafan_core.app import models, schemas
 from chafan_core.app.common import OperationType
-from chafan_core.app.model_utils import get_live_answers_of_question
+from chafan_core.app.infra.search_index import SearchHit
+from chafan_core.app.responders import _batch
 from chafan_core.app.schemas.question import QuestionInDBBase, QuestionPreviewForSearch
 from chafan_core.app.schemas.richtext import RichText
-from chafan_core.app import crud, user_permission
+from chafan_core.app import user_permission
 from chafan_core.utils.base import filter_not_none, map_
 
 
 def preview_of_question_as_search_hit(
     question: models.Question,
+    hit: Optional[SearchHit] = None,
 ) -> Optional[QuestionPreviewForSearch]:
     if not question.site.public_readable:
         return None
-    return QuestionPreviewForSearch(uuid=question.uuid, title=question.title)
+    if hit is None:
+        return QuestionPreviewForSearch(uuid=question.uuid, title=question.title)
+    return QuestionPreviewForSearch(
+        uuid=question.uuid,
+        title=question.title,
+        score=hit.score,
+        highlight=hit.highlight("title", question.title)
+        or hit.highlight("description_text", question.description_text),
+    )
 
 
 def get_question_upvotes(
     db, question: models.Question, principal_id
 ) -> schemas.QuestionUpvotes:
-    valid_upvotes = (
-        db.query(models.QuestionUpvotes)
-        .filter_by(question_id=question.id, cancelled=False)
-        .count()
-    )
     upvoted = False
     if principal_id is not None:
         upvoted = (
@@ -42,10 +47,42 @@ def get_question_upvotes(
             is not None
         )
     return schemas.QuestionUpvotes(
-        question_uuid=question.uuid, count=valid_upvotes, upvoted=upvoted
+        question_uuid=question.uuid, count=question.upvotes_count, upvoted=upvoted
+    )
+
+
+def _batched_upvotes(
+    ctx, question: models.Question, principal_id
+) -> schemas.QuestionUpvotes:
+    """``get_question_upvotes``, read through the loader."""
+    return schemas.QuestionUpvotes(
+        question_uuid=question.uuid,
+        count=question.upvotes_count,
+        upvoted=_batch.upvoted(
+            ctx.loader, _batch.QUESTION_UPVOTED, principal_id, question.id
+        ),
+    )
+
+
+def want_previews(ctx, questions: Sequence[models.Question]) -> None:
+    """Queue what previewing ``questions`` reads, so the first preview loads
+    it for all of them."""
+    ids = [question.id for question in questions]
+    ctx.loader.want(_batch.USERS, (question.author_id for question in questions))
+    _batch.want_upvoted(ctx.loader, _batch.QUESTION_UPVOTED, ctx.principal_id, ids)
+    responders.site.want_site_schemas(
+        ctx, {question.site_id for question in questions}
     )
 
 
+def previews_of_questions(
+    ctx, questions: Sequence[models.Question]
+) -> List[Optional[schemas.QuestionPreview]]:
+    """``[preview_of_question(ctx, q) for q in questions]``, batched."""
+    want_previews(ctx, questions)
+    return [preview_of_question(ctx, question) for question in questions]
+
+
 def preview_of_question(
     ctx, question: models.Question
 ) -> Optional[schemas.QuestionPreview]:
@@ -54,7 +91,7 @@ def preview_of_question(
     ctx may be RequestContext or PrincipalView (both expose principal_id
     and preview_of_user; RequestContext has get_db, PrincipalView has broker).
     """
-    from chafan_core.app.responders._util import get_db
+    from chafan_core.app.responders._util import get_db, member_site_ids
 
     db = get_db(ctx)
     principal_id = ctx.principal_id
@@ -63,6 +100,7 @@ def preview_of_question(
         site=question.site,
         user_id=principal_id,
         op_type=OperationType.ReadSite,
+        member_site_ids=member_site_ids(ctx),
     ):
         return None
     if question.is_hidden and (
@@ -84,11 +122,11 @@ def preview_of_question(
         is_placed_at_home=question.is_placed_at_home,
         created_at=question.created_at,
         desc=desc,
-        answers_count=len(get_live_answers_of_question(question)),
-        upvotes=get_question_upvotes(db, question, principal_id),
+        answers_count=question.live_answers_count,
+        upvotes=_batched_upvotes(ctx, question, principal_id),
         site=responders.site.site_schema_from_orm(ctx, question.site),
         upvotes_count=question.upvotes_count,
-        comments_count=len(question.comments),
+        comments_count=question.comments_count,
     )
 
 
@@ -109,33 +147,22 @@ def question_schema_from_orm(
     ):
         return None
 
-    upvoted = False
-    if principal_id is not None:
-        upvoted = (
-            db.query(models.QuestionUpvotes)
-            .filter_by(
-                question_id=question.id, voter_id=principal_id, cancelled=False
-            )
-            .first()
-            is not None
-        )
     mat = shaper(ctx)
     base = QuestionInDBBase.from_orm(question)
     d = base.dict()
     d["site"] = responders.site.site_schema_from_orm(ctx, question.site)
-    d["comments"] = filter_not_none(
-        [mat.comment_schema_from_orm(c) for c in question.comments]
-    )
+    d["comments"] = filter_not_none(mat.comment_schemas_from_orm(question.comments))
     d["author"] = mat.preview_of_user(question.author)
     d["editor"] = map_(question.editor, mat.preview_of_user)
-    d["upvoted"] = upvoted
-    d["view_times"] = crud.viewcount.get_viewcount_question(db, question.id)
-    d["answers_count"] = len(get_live_answers_of_question(question))
+    upvotes = _batched_upvotes(ctx, question, principal_id)
+    d["upvoted"] = upvotes.upvoted
+    d["view_times"] = ctx.loader.get(_batch.QUESTION_VIEWS, question.id)
+    d["answers_count"] = question.live_answers_count
     if question.description is not None:
         d["desc"] = RichText(
             source=question.description,
             editor=question.description_editor,
             rendered_text=question.description_text,
         )
-    d["upvotes"] = get_question_upvotes(db, question, principal_id)
+    d["upvotes"] = upvotes
     return schemas.Question(**d)
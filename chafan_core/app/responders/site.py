@@ -1,30 +1,28 @@
-from typing import Any, Mapping
+from typing import Collection
 from chafan_core.app import models, schemas
+from chafan_core.app.responders import _batch
 
 import logging
 logger = logging.getLogger(__name__)
 
-_VISIBLE_QUESTION_CONDITIONS = {
-    "is_hidden": False,
-}
-_VISIBLE_SUBMISSION_CONDITIONS = {
-    "is_hidden": False,
-}
 
-def keep_items(questions: Any, conditions: Mapping[str, Any]) -> Any:
-    return questions.filter_by(**conditions)
+def want_site_schemas(ctx, site_ids: Collection[int]) -> None:
+    """Queue what shaping the sites ``site_ids`` reads; see ``_batch``."""
+    loader = ctx.loader
+    loader.want(_batch.SITE_COUNTS, site_ids)
+    sites = loader.get_many(_batch.SITES, site_ids).values()
+    loader.want(_batch.USERS, (site.moderator_id for site in sites if site))
+
 
 def site_schema_from_orm(ctx, site: models.Site) -> schemas.Site:
     base = schemas.SiteInDBBase.from_orm(site)
     site_dict = base.dict()
     site_dict["moderator"] = ctx.preview_of_user(site.moderator)
-    site_dict["questions_count"] = keep_items(
-        site.questions, _VISIBLE_QUESTION_CONDITIONS
-    ).count()
-    site_dict["submissions_count"] = keep_items(
-        site.submissions, _VISIBLE_SUBMISSION_CONDITIONS
-    ).count()
-    site_dict["members_count"] = len(site.profiles)
+    (
+        site_dict["questions_count"],
+        site_dict["submissions_count"],
+        site_dict["members_count"],
+    ) = ctx.loader.get(_batch.SITE_COUNTS, site.id)
     if site.category_topic:
         site_dict["category_topic"] = schemas.Topic.from_orm(site.category_topic)
     else:
@@ -29,14 +29,14 @@ def submission_schema_from_orm(
     base = schemas.SubmissionInDB.from_orm(submission)
     d = base.dict()
     d["site"] = responders.site.site_schema_from_orm(ctx, submission.site)
-    d["comments"] = filter_not_none(
-        [mat.comment_schema_from_orm(c) for c in submission.comments]
-    )
+    d["comments"] = filter_not_none(mat.comment_schemas_from_orm(submission.comments))
     d["author"] = ctx.preview_of_user(submission.author)
     d["contributors"] = [
         ctx.preview_of_user(u) for u in submission.contributors
     ]
-    d["view_times"] = crud.viewcount.get_viewcount_submission(db, submission.id)
+    d["view_times"] = crud.viewcount.get_viewcount_submission(
+        db, submission.id, live=True
+    )
     if submission.description is not None:
         d["desc"] = RichText(
             source=submission.description,
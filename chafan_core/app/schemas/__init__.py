@@ -93,7 +93,12 @@ from .question import (
     QuestionUpvotes,
 )
 from .question_archive import QuestionArchive, QuestionArchiveInDB
-from .question_page import QuestionPage, QuestionPageFlags
+from .question_page import (
+    QuestionPage,
+    QuestionPageAnswers,
+    QuestionPageField,
+    QuestionPageFlags,
+)
 from .reaction import Reaction, Reactions
 from .report import Report, ReportCreate, ReportInDBBase, ReportUpdate
 from .reward import Reward, RewardCreate, RewardInDBBase, RewardUpdate
@@ -121,6 +126,7 @@ from .task import (
 )
 from .token import Token, TokenPayload
 from .topic import Topic, TopicCreate, TopicInDB, TopicUpdate
+from .typeahead import TypeaheadSuggestion
 from .user import (
     User,
     UserAnswerBookmark,
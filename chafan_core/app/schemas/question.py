@@ -82,6 +82,11 @@ class QuestionInDB(QuestionInDBBase):
 class QuestionPreviewForSearch(BaseModel):
     uuid: str
     title: str
+    # None when the search index is unavailable and hits are unranked.
+    score: Optional[float] = None
+    # HTML: fragments of the title, or else the description, with matched
+    # terms in <em class="match">; everything else escaped.
+    highlight: Optional[str] = None
 
 
 class QuestionPreview(BaseModel):
@@ -1,4 +1,4 @@
-from typing import List, Optional
+from typing import List, Literal, Optional
 
 from pydantic import BaseModel
 
@@ -15,9 +15,24 @@ class QuestionPageFlags(BaseModel):
     is_mod: bool = False
 
 
-class QuestionPage(BaseModel):
+# What a question page can shape each of its answers as; a client asks for
+# the ones it renders, and the others come back empty.
+QuestionPageField = Literal["full_answers", "answer_previews"]
+
+
+class QuestionPageAnswers(BaseModel):
+    """One window of a question's ranked answers.
+
+    ``answers_cursor`` continues the ranking after the window, through
+    ``GET /questions/{uuid}/page/answers``; None once it is exhausted.
+    """
+
+    full_answers: List[Answer] = []
+    answer_previews: List[AnswerPreview] = []
+    answers_cursor: Optional[str] = None
+
+
+class QuestionPage(QuestionPageAnswers):
     question: Question
-    full_answers: List[Answer]
-    answer_previews: List[AnswerPreview]
     question_subscription: Optional[UserQuestionSubscription]
     flags: QuestionPageFlags
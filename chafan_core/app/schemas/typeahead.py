@@ -0,0 +1,19 @@
+from typing import Literal, Optional
+
+from pydantic import BaseModel
+
+from chafan_core.app.schemas.preview import UserPreview
+from chafan_core.app.schemas.site import Site
+from chafan_core.app.schemas.topic import Topic
+
+
+class TypeaheadSuggestion(BaseModel):
+    kind: Literal["user", "site", "topic"]
+    label: str
+    # How the fragment matched: "exact", "prefix", "substring" or "fuzzy".
+    match: Literal["exact", "prefix", "substring", "fuzzy"]
+    score: float
+    # Exactly one of these, as named by ``kind``.
+    user: Optional[UserPreview] = None
+    site: Optional[Site] = None
+    topic: Optional[Topic] = None
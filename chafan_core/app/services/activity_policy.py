@@ -35,7 +35,8 @@ fields that merely *describe* it.
 
 Authoritative — the code reads these and behaves accordingly:
 
-* :attr:`EventPolicy.feed_audience` — ``events.distribute``.
+* :attr:`EventPolicy.feed_audience` — ``events.distribute``, and
+  ``feed_impl.receiver_feed`` for the followers who pull.
 * :attr:`EventPolicy.always_public` — ``feed_impl._is_public_activity``.
 * :attr:`EventPolicy.writes_activity`, :attr:`EventPolicy.notifies` and
   :attr:`EventPolicy.notify_exclusions` — ``events.distribute``.
@@ -427,3 +428,10 @@ assert len(POLICY) == len(_POLICIES), "duplicate verb in _POLICIES"
 ALWAYS_PUBLIC_EVENT_VERBS: frozenset[str] = frozenset(
     p.verb for p in _POLICIES if p.always_public
 )
+
+#: Verbs delivered to the subject's followers. When the followers of a
+#: high-fanout subject pull instead (``feed_impl.receiver_feed``), these are the
+#: verbs they pull.
+FOLLOWER_FEED_VERBS: frozenset[str] = frozenset(
+    p.verb for p in _POLICIES if Audience.SUBJECT_FOLLOWERS in p.feed_audience
+)
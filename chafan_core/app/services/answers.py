@@ -19,7 +19,7 @@ from chafan_core.app.user_permission import answer_read_allowed, check_user_in_s
 from chafan_core.utils.base import HTTPException_, get_utc_now, unwrap
 from chafan_core.utils.constants import MAX_ARCHIVE_PAGINATION_LIMIT
 import chafan_core.app.responders as responders
-from chafan_core.app.services import events
+from chafan_core.app.services import events, feed_pool, search_updates
 
 logger = logging.getLogger(__name__)
 
@@ -58,6 +58,8 @@ def delete_answer(
     if answer.author_id != principal_id:
         return "Unauthorized."
     crud.answer.delete_forever(db, answer=answer)
+    feed_pool.evict_on_commit(db, "answer", answer.id)
+    search_updates.mark_on_commit(db, "answer", [answer.id])
     return None
 
 
@@ -75,11 +77,7 @@ def get_answer_upvotes(
             .first()
             is not None
         )
-    valid_upvotes = (
-        db.query(models.Answer_Upvotes)
-        .filter_by(answer_id=answer.id, cancelled=False)
-        .count()
-    )
+    valid_upvotes = answer.upvotes_count
     return schemas.AnswerUpvotes(
         answer_uuid=answer.uuid, count=valid_upvotes, upvoted=upvoted
     )
@@ -98,14 +96,20 @@ def answer_schema(ctx, answer: models.Answer) -> Optional[schemas.Answer]:
         ctx, answer, ctx.principal_id
     )
     if answer_data:
-        answer_data.upvotes = get_answer_upvotes(
-            ctx.get_db(),
-            uuid=answer.uuid,
-            principal_id=ctx.principal_id,
+        answer_data.upvotes = responders.answer.get_answer_upvotes(
+            ctx, answer, ctx.principal_id
         )
     return answer_data
 
 
+def answer_schemas(
+    ctx, answers: List[models.Answer]
+) -> List[Optional[schemas.Answer]]:
+    """``[answer_schema(ctx, a) for a in answers]``, batched."""
+    responders.answer.want_schemas(ctx, answers, ctx.principal_id)
+    return [answer_schema(ctx, answer) for answer in answers]
+
+
 def get_answer_schema(ctx, uuid: str) -> Optional[schemas.Answer]:
     """Shape a single answer for the layer principal (permission gated)."""
     db = ctx.get_db()
@@ -379,6 +383,8 @@ def update_answer_by_mod(
     answer = crud.answer.update_checked(
         db, db_obj=answer, obj_in=update_in.dict(exclude_none=True)
     )
+    if answer.is_hidden_by_moderator:
+        feed_pool.evict_on_commit(db, "answer", answer.id)
     answer_data = answer_schema(ctx, answer)
     return answer_data
 
@@ -460,11 +466,7 @@ def upvote_answer(ctx, *, uuid: str) -> schemas.AnswerUpvotes:
                 ),
             )
         db.refresh(answer)
-    valid_upvotes = (
-        db.query(models.Answer_Upvotes)
-        .filter_by(answer_id=answer.id, cancelled=False)
-        .count()
-    )
+    valid_upvotes = answer.upvotes_count
     return schemas.AnswerUpvotes(
         answer_uuid=answer.uuid, count=valid_upvotes, upvoted=True
     )
@@ -500,11 +502,7 @@ def cancel_upvote_answer(ctx, *, uuid: str) -> schemas.AnswerUpvotes:
         )
         answer = crud.answer.cancel_upvote(db, db_obj=answer, voter=current_user)
         db.refresh(answer)
-    valid_upvotes = (
-        db.query(models.Answer_Upvotes)
-        .filter_by(answer_id=answer.id, cancelled=False)
-        .count()
-    )
+    valid_upvotes = answer.upvotes_count
     return schemas.AnswerUpvotes(
         answer_uuid=answer.uuid, count=valid_upvotes, upvoted=False
     )
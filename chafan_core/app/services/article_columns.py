@@ -39,7 +39,7 @@ def list_column_articles(
     if not current_user_id:
         articles = articles[: settings.VISITORS_READ_ARTICLE_LIMIT]
     mat = ctx.principal_view
-    return filter_not_none([mat.preview_of_article(a) for a in articles])
+    return filter_not_none(mat.previews_of_articles(articles))
 
 
 def create_article_column(
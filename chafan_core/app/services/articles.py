@@ -28,7 +28,7 @@ from chafan_core.app.user_permission import (
 from chafan_core.utils.base import ContentVisibility, HTTPException_
 from chafan_core.utils.constants import MAX_ARCHIVE_PAGINATION_LIMIT
 import chafan_core.app.responders as responders
-from chafan_core.app.services import events
+from chafan_core.app.services import events, feed_pool, search_updates
 
 logger = logging.getLogger(__name__)
 
@@ -141,6 +141,8 @@ def delete_article(db: Session, *, uuid: str, principal_id: int) -> None:
             detail="Unauthorized.",
         )
     crud.article.delete_forever(db, article=article)
+    feed_pool.evict_on_commit(db, "article", article.id)
+    search_updates.mark_on_commit(db, "article", [article.id])
 
 
 def get_draft(
@@ -459,11 +461,7 @@ def upvote_article(ctx, *, uuid: str) -> schemas.ArticleUpvotes:
             ),
         )
     db.refresh(article)
-    valid_upvotes = (
-        db.query(models.ArticleUpvotes)
-        .filter_by(article_id=article.id, cancelled=False)
-        .count()
-    )
+    valid_upvotes = article.upvotes_count
     return schemas.ArticleUpvotes(
         article_uuid=article.uuid, count=valid_upvotes, upvoted=True
     )
@@ -491,11 +489,7 @@ def cancel_upvote_article(ctx, *, uuid: str) -> schemas.ArticleUpvotes:
         )
     article = crud.article.cancel_upvote(db, db_obj=article, voter=current_user)
     db.refresh(article)
-    valid_upvotes = (
-        db.query(models.ArticleUpvotes)
-        .filter_by(article_id=article.id, cancelled=False)
-        .count()
-    )
+    valid_upvotes = article.upvotes_count
     return schemas.ArticleUpvotes(
         article_uuid=article.uuid, count=valid_upvotes, upvoted=False
     )
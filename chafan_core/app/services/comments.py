@@ -10,6 +10,7 @@ from sqlalchemy.orm import Session
 from chafan_core.app import crud, models, schemas
 from chafan_core.app.common import OperationType
 from chafan_core.app.responders import comment as comment_responder
+from chafan_core.app.services import feed_pool
 from chafan_core.app.user_permission import check_user_in_site
 from chafan_core.utils.base import HTTPException_
 
@@ -31,11 +32,7 @@ def get_comment_upvotes(
     comment = crud.comment.get_by_uuid(db, uuid=uuid)
     if comment is None:
         return None
-    valid_upvotes = (
-        db.query(models.CommentUpvotes)
-        .filter_by(comment_id=comment.id, cancelled=False)
-        .count()
-    )
+    valid_upvotes = comment.upvotes_count
     upvoted = False
     if principal_id:
         upvoted = (
@@ -57,6 +54,7 @@ def delete_comment(db: Session, *, uuid: str, principal_id: int) -> Optional[str
     if comment.author_id != principal_id:
         return "Unauthorized."
     crud.comment.delete_forever(db, comment=comment)
+    feed_pool.evict_on_commit(db, "comment", comment.id)
     return None
 
 
@@ -166,11 +164,7 @@ def upvote_comment(ctx, *, uuid: str) -> schemas.CommentUpvotes:
             )
         comment = crud.comment.upvote(db, db_obj=comment, voter=current_user)
         db.refresh(comment)
-    valid_upvotes = (
-        db.query(models.CommentUpvotes)
-        .filter_by(comment_id=comment.id, cancelled=False)
-        .count()
-    )
+    valid_upvotes = comment.upvotes_count
     return schemas.CommentUpvotes(
         comment_uuid=comment.uuid, count=valid_upvotes, upvoted=True
     )
@@ -201,11 +195,7 @@ def cancel_upvote_comment(ctx, *, uuid: str) -> schemas.CommentUpvotes:
     if upvoted:
         comment = crud.comment.cancel_upvote(db, db_obj=comment, voter=current_user)
         db.refresh(comment)
-    valid_upvotes = (
-        db.query(models.CommentUpvotes)
-        .filter_by(comment_id=comment.id, cancelled=False)
-        .count()
-    )
+    valid_upvotes = comment.upvotes_count
     return schemas.CommentUpvotes(
         comment_uuid=comment.uuid, count=valid_upvotes, upvoted=False
     )
@@ -6,13 +6,13 @@ import datetime
 import json
 from typing import List
 
+from fastapi import BackgroundTasks
 from fastapi.encoders import jsonable_encoder
 from pydantic import TypeAdapter
 from sqlalchemy.orm.session import Session
 
 from chafan_core.app import crud, models, schemas
 from chafan_core.app.common import get_redis_cli
-from chafan_core.app.model_utils import get_live_answers_of_question
 from chafan_core.app.recs import indexed_layer
 from chafan_core.app.infra.runtime import execute_with_db
 from chafan_core.db.session import SessionLocal
@@ -31,7 +31,7 @@ def pinned_questions(ctx) -> List[schemas.QuestionPreview]:
 
     def runnable(db: Session) -> List[schemas.QuestionPreview]:
         questions = crud.question.get_placed_at_home(db)
-        data = filter_not_none([mat.preview_of_question(q) for q in questions])
+        data = filter_not_none(mat.previews_of_questions(questions))
         redis.set(
             key, json.dumps(jsonable_encoder(data)), ex=datetime.timedelta(hours=12)
         )
@@ -49,11 +49,13 @@ def _get_pending_questions(ctx) -> List[schemas.QuestionPreview]:
         for profile in current_user.profiles:
             questions.extend(
                 filter_not_none(
-                    [
-                        mat.preview_of_question(q)
-                        for q in profile.site.questions
-                        if len(get_live_answers_of_question(q)) == 0 and not q.is_hidden
-                    ]
+                    mat.previews_of_questions(
+                        [
+                            q
+                            for q in profile.site.questions
+                            if q.live_answers_count == 0 and not q.is_hidden
+                        ]
+                    )
                 )
             )
         return questions
@@ -61,11 +63,13 @@ def _get_pending_questions(ctx) -> List[schemas.QuestionPreview]:
     for site in crud.site.get_all_public_readable(ctx.get_db()):
         questions.extend(
             filter_not_none(
-                [
-                    mat.preview_of_question(q)
-                    for q in site.questions
-                    if len(get_live_answers_of_question(q)) == 0 and not q.is_hidden
-                ]
+                mat.previews_of_questions(
+                    [
+                        q
+                        for q in site.questions
+                        if q.live_answers_count == 0 and not q.is_hidden
+                    ]
+                )
             )[:10]
         )
     return questions
@@ -84,12 +88,16 @@ def pending_questions(ctx) -> List[schemas.QuestionPreview]:
     return data
 
 
-def interesting_questions(ctx) -> List[schemas.QuestionPreview]:
-    return indexed_layer.get_interesting_questions(ctx)
+def interesting_questions(
+    ctx, background_tasks: BackgroundTasks
+) -> List[schemas.QuestionPreview]:
+    return indexed_layer.get_interesting_questions(ctx, background_tasks)
 
 
-def interesting_users(ctx) -> List[schemas.UserPreview]:
-    return indexed_layer.get_interesting_users(ctx)
+def interesting_users(
+    ctx, background_tasks: BackgroundTasks
+) -> List[schemas.UserPreview]:
+    return indexed_layer.get_interesting_users(ctx, background_tasks)
 
 
 def featured_answers(
@@ -102,4 +110,4 @@ def featured_answers(
         .order_by(models.Answer.featured_at.desc())
     )
     stream = stream[skip : skip + limit]
-    return filter_not_none([ctx.preview_of_answer(a) for a in stream])
+    return filter_not_none(ctx.previews_of_answers(stream))
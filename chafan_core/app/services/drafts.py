@@ -12,11 +12,13 @@ def list_draft_answers(ctx) -> List[schemas.AnswerPreview]:
     current_user = ctx.get_current_active_user()
     mat = ctx.principal_view
     return filter_not_none(
-        [
-            mat.preview_of_answer(answer)
-            for answer in current_user.answers
-            if not answer.is_published and answer.body_draft
-        ]
+        mat.previews_of_answers(
+            [
+                answer
+                for answer in current_user.answers
+                if not answer.is_published and answer.body_draft
+            ]
+        )
     )
 
 
@@ -24,9 +26,11 @@ def list_draft_articles(ctx) -> List[schemas.ArticlePreview]:
     current_user = ctx.get_current_active_user()
     mat = ctx.principal_view
     return filter_not_none(
-        [
-            mat.preview_of_article(article)
-            for article in current_user.articles
-            if not article.is_published or article.body_draft
-        ]
+        mat.previews_of_articles(
+            [
+                article
+                for article in current_user.articles
+                if not article.is_published or article.body_draft
+            ]
+        )
     )
@@ -11,8 +11,11 @@ Duty
 Given an event that has already happened:
 
 1. Look up the policy for its verb.
-2. Write **exactly one** ``Activity``, if the verb is publishable.
-3. Resolve the feed audience and write ``Feed`` rows.
+2. Write **exactly one** ``Activity``, if the verb is publishable, and offer
+   it to the feed padding pool (``feed_pool``) for when it commits.
+3. Resolve the feed audience and write ``Feed`` rows -- except to the
+   followers of a subject above ``settings.FEED_PULL_ABOVE_FOLLOWERS``, who
+   pull that subject's activity at read time instead. See :func:`distribute`.
 4. Resolve the notification audiences, write ``Notification`` rows, push each.
 
 Everything is derived from the event: the verb selects the policy row, and the
@@ -45,11 +48,13 @@ import logging
 from typing import Callable, Dict, FrozenSet, Optional, Set
 
 from chafan_core.app import crud, models
+from chafan_core.app.config import settings
 from chafan_core.app.infra.request_context import RequestContext
 from chafan_core.app.mq import push_notification
 from chafan_core.app.schemas import event as ev
 from chafan_core.app.schemas.event import EventInternal
 from chafan_core.app.schemas.notification import NotificationCreate
+from chafan_core.app.services import feed_pool
 from chafan_core.app.services.activity_policy import POLICY, Audience, Exclusion
 
 logger = logging.getLogger(__name__)
@@ -186,7 +191,7 @@ def _subject_followers(ctx: RequestContext, c: object) -> Set[int]:
     subject = _subject_user_of(ctx, c)
     if subject is None:
         return set()
-    return {follower.id for follower in subject.followers}
+    return set(crud.user.get_follower_ids(ctx.get_db(), user_id=subject.id))
 
 
 def _question_author(ctx: RequestContext, c: object) -> Set[int]:
@@ -380,32 +385,36 @@ def deliver(
     *,
     subject: Optional[models.User],
 ) -> None:
-    """Write one Feed row per receiver.
+    """Write one Feed row per receiver, as a few bulk inserts.
 
-    The single place fan-out happens, so that swapping fan-out-on-write for a
-    read-time join stays a change to one function.
+    The single place fan-out-on-write happens. Its read-time counterpart, for
+    high-fanout subjects, is ``feed_impl.receiver_feed``.
 
     ``subject`` is passed in rather than re-derived from ``activity.event_json``
     because :func:`distribute` has already resolved it for the Activity column.
     It is required and may be None -- see :func:`_subject_user_of`.
     """
     assert activity.id is not None
-    db = ctx.get_db()
-    subject_user_uuid = subject.uuid if subject is not None else None
-    for receiver_id in receiver_ids:
-        existing = (
-            db.query(models.Feed)
-            .filter_by(receiver_id=receiver_id, activity_id=activity.id)
-            .first()
-        )
-        if existing is None:
-            db.add(
-                models.Feed(
-                    receiver_id=receiver_id,
-                    activity_id=activity.id,
-                    subject_user_uuid=subject_user_uuid,
-                )
-            )
+    crud.feed.bulk_create(
+        ctx.get_db(),
+        activity_id=activity.id,
+        receiver_ids=receiver_ids,
+        subject_user_uuid=subject.uuid if subject is not None else None,
+    )
+
+
+def _followers_pull(subject: Optional[models.User]) -> bool:
+    """Whether ``subject``'s followers read their activity rather than receive it.
+
+    Pushing means one Feed row per follower inside the caller's transaction,
+    which for an author with tens of thousands of followers turns one answer
+    into a huge synchronous insert. Past the threshold, ``receiver_feed``
+    pulls the author's recent activity into each follower's feed instead.
+    """
+    threshold = settings.FEED_PULL_ABOVE_FOLLOWERS
+    if threshold is None or subject is None:
+        return False
+    return subject.followers_count > threshold
 
 
 def notify_users(
@@ -484,10 +493,18 @@ def distribute(
         )
         db.add(activity)
         db.flush()
+        # Same containment as _resolve: padding is not worth the caller's
+        # transaction.
+        try:
+            feed_pool.admit_on_commit(db, activity, content)
+        except Exception:
+            logger.exception("could not offer activity %s to padding", activity.id)
 
     if Sink.FEED in sinks and activity is not None and policy.feed_audience:
         feed_receivers: Set[int] = set()
         for audience in policy.feed_audience:
+            if audience is Audience.SUBJECT_FOLLOWERS and _followers_pull(subject):
+                continue
             feed_receivers |= _resolve(ctx, audience, content)
         deliver(ctx, activity, feed_receivers, subject=subject)
 
@@ -24,6 +24,13 @@ It also dropped the ``activity.id % 10 != receiver_id % 10`` filter that
 version used. That was never randomizing anything -- it is deterministic, so a
 user saw identical padding on every request and any two users in the same
 bucket saw identical padding as each other. It only cost an unindexable scan.
+
+Where candidates come from
+--------------------------
+Even bounded, that scan ran on every under-filled request. Candidates now come
+from ``feed_pool``, the ids of recent public activity kept current at write
+time, so a request reads about a shortfall's worth of them. The scan remains
+for a pool that is cold or unreachable, and refills it.
 """
 
 from __future__ import annotations
@@ -31,10 +38,13 @@ from __future__ import annotations
 import logging
 from typing import List, Optional, Set
 
+from sqlalchemy.orm import selectinload
+
 from chafan_core.app import models, schemas
 from chafan_core.app.infra.request_context import RequestContext
+from chafan_core.app.services import feed_pool
 from chafan_core.app.services.activity_policy import ALWAYS_PUBLIC_EVENT_VERBS
-from chafan_core.app.services.feed_impl import materialize_activity
+from chafan_core.app.services.feed_impl import materialize_activities
 
 logger = logging.getLogger(__name__)
 
@@ -44,16 +54,16 @@ logger = logging.getLogger(__name__)
 # user one item short of a full page triggered the whole scan described above.
 FILL_BELOW = 5
 
-# How far back to look. Caps both the query and the number of materializations,
-# each of which costs several more queries. Padding that comes up short is
-# fine; padding that walks the table is not.
+# How far back the scan looks when the pool is cold. Caps both the query and
+# the number of materializations, which run a shortfall's worth at a time.
+# Padding that comes up short is fine; padding that walks the table is not.
 SCAN_LIMIT = 200
 
 
 def _is_public(activity: schemas.Activity) -> bool:
     """Whether this activity may be shown to someone with no connection to it.
 
-    The per-viewer permission gate in ``materialize_activity`` has already run
+    The per-viewer permission gate in ``materialize_activities`` has already run
     by the time this is called; this is the *additional* restriction that
     padding is public content only. A viewer's own private-site activity
     reaches them through the feed, never through padding.
@@ -63,7 +73,81 @@ def _is_public(activity: schemas.Activity) -> bool:
     return activity.event.content.verb in ALWAYS_PUBLIC_EVENT_VERBS
 
 
-def _recent_public(
+def _take_public(
+    ctx: RequestContext,
+    candidates: List[models.Activity],
+    *,
+    receiver_id: int,
+    count: int,
+    padding: List[schemas.Activity],
+) -> None:
+    """Append what of ``candidates`` renders publicly, until ``count`` is met.
+
+    Batches of ``count``: usually the first one fills the page, and the rest is
+    never materialized at all.
+    """
+    for start in range(0, len(candidates), count):
+        batch = candidates[start : start + count]
+        for materialized in materialize_activities(ctx, batch, receiver_id, None):
+            if not _is_public(materialized):
+                continue
+            padding.append(materialized)
+            if len(padding) >= count:
+                return
+
+
+def _from_pool(
+    ctx: RequestContext,
+    *,
+    receiver_id: int,
+    count: int,
+    exclude_activity_ids: Set[int],
+    before_activity_id: Optional[int],
+) -> Optional[List[schemas.Activity]]:
+    """Padding drawn from ``feed_pool``; None when the pool cannot answer.
+
+    Reads ids a page at a time, so the common case -- a few stale entries at
+    most -- costs one read of about ``count`` ids and one batch. Coming up
+    short is an answer only from a warm pool: a cold one may be missing what
+    the scan would find.
+    """
+    db = ctx.get_db()
+    page = count + len(exclude_activity_ids)
+    padding: List[schemas.Activity] = []
+    for offset in range(0, feed_pool.POOL_SIZE, page):
+        try:
+            ids = feed_pool.read(
+                offset=offset, count=page, before_activity_id=before_activity_id
+            )
+        except Exception:
+            logger.exception("padding pool unavailable; scanning instead")
+            return None if offset == 0 else padding
+        if not ids:
+            break
+        rows = {
+            activity.id: activity
+            for activity in db.query(models.Activity)
+            .options(selectinload(models.Activity.site))
+            .filter(models.Activity.id.in_(ids))
+        }
+        candidates = [
+            rows[i] for i in ids if i in rows and i not in exclude_activity_ids
+        ]
+        _take_public(
+            ctx, candidates, receiver_id=receiver_id, count=count, padding=padding
+        )
+        if len(padding) >= count:
+            return padding
+    try:
+        if feed_pool.is_cold():
+            return None
+    except Exception:
+        logger.exception("padding pool unavailable; scanning instead")
+        return None
+    return padding
+
+
+def _from_scan(
     ctx: RequestContext,
     *,
     receiver_id: int,
@@ -71,25 +155,52 @@ def _recent_public(
     exclude_activity_ids: Set[int],
     before_activity_id: Optional[int],
 ) -> List[schemas.Activity]:
+    """Padding from the newest ``SCAN_LIMIT`` activities; refills the pool."""
     db = ctx.get_db()
-    query = db.query(models.Activity)
+    query = db.query(models.Activity).options(selectinload(models.Activity.site))
     if before_activity_id is not None:
         query = query.filter(models.Activity.id < before_activity_id)
     recent = query.order_by(models.Activity.id.desc()).limit(SCAN_LIMIT).all()
+    if before_activity_id is None:
+        try:
+            feed_pool.seed(recent)
+        except Exception:
+            logger.exception("could not seed the padding pool")
+    candidates = [a for a in recent if a.id not in exclude_activity_ids]
 
     padding: List[schemas.Activity] = []
-    for activity in recent:
-        if activity.id in exclude_activity_ids:
-            continue
-        materialized = materialize_activity(ctx, activity, receiver_id, None)
-        if materialized is None or not _is_public(materialized):
-            continue
-        padding.append(materialized)
-        if len(padding) >= count:
-            break
+    _take_public(
+        ctx, candidates, receiver_id=receiver_id, count=count, padding=padding
+    )
     return padding
 
 
+def _recent_public(
+    ctx: RequestContext,
+    *,
+    receiver_id: int,
+    count: int,
+    exclude_activity_ids: Set[int],
+    before_activity_id: Optional[int],
+) -> List[schemas.Activity]:
+    padding = _from_pool(
+        ctx,
+        receiver_id=receiver_id,
+        count=count,
+        exclude_activity_ids=exclude_activity_ids,
+        before_activity_id=before_activity_id,
+    )
+    if padding is not None:
+        return padding
+    return _from_scan(
+        ctx,
+        receiver_id=receiver_id,
+        count=count,
+        exclude_activity_ids=exclude_activity_ids,
+        before_activity_id=before_activity_id,
+    )
+
+
 def top_up(
     ctx: RequestContext,
     activities: List[schemas.Activity],
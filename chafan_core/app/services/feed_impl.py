@@ -1,13 +1,20 @@
-from typing import List, Optional
+from typing import List, Optional, Sequence
+
+from sqlalchemy import cast
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import selectinload
 
 from chafan_core.db.base_class import Base as BaseCrudModel
 from chafan_core.app import crud, models, schemas
+from chafan_core.app.config import settings
 from chafan_core.app.infra.request_context import RequestContext
+from chafan_core.app.services.activity_policy import FOLLOWER_FEED_VERBS
 from chafan_core.app.schemas.activity import UserFeedSettings
 from chafan_core.app.schemas.event import (
     AnswerQuestionInternal,
     CreateArticleInternal,
     CreateQuestionInternal,
+    Event,
     EventInternal,
 )
 from chafan_core.utils.base import map_, unwrap
@@ -37,6 +44,40 @@ def materialize_activity(
 ) -> Optional[schemas.Activity]:
     materializer = data_broker.as_principal(receiver_id)
     output_event = materializer.materialize_event(unwrap(activity.event_json))
+    return _activity_schema(materializer, activity, output_event, feed_settings)
+
+
+def materialize_activities(
+    data_broker: RequestContext,
+    activities: Sequence[models.Activity],
+    receiver_id: int,
+    feed_settings: Optional[UserFeedSettings],
+) -> List[schemas.Activity]:
+    """``materialize_activity`` over a page, dropping what does not render.
+
+    The events go through ``materialize_events`` together, so a page costs a
+    query per entity type rather than several per item. Order is kept.
+    """
+    materializer = data_broker.as_principal(receiver_id)
+    output_events = materializer.materialize_events(
+        [unwrap(activity.event_json) for activity in activities]
+    )
+    materialized = []
+    for activity, output_event in zip(activities, output_events):
+        activity_data = _activity_schema(
+            materializer, activity, output_event, feed_settings
+        )
+        if activity_data is not None:
+            materialized.append(activity_data)
+    return materialized
+
+
+def _activity_schema(
+    materializer,
+    activity: models.Activity,
+    output_event: Optional[Event],
+    feed_settings: Optional[UserFeedSettings],
+) -> Optional[schemas.Activity]:
     if output_event:
         origins = []
         if activity.site:
@@ -158,26 +199,81 @@ def receiver_feed(
 ) -> List[schemas.Activity]:
     """What was delivered to this user, newest first.
 
-    No deduplication and no over-fetch. ``Feed`` carries
-    ``UNIQUE (activity_id, receiver_id)``, so filtering by a single receiver
-    returns at most one row per activity. The ``limit * 2`` and the seen-set
-    this replaces existed only because the subject timeline ran through here
-    too, querying across *all* receivers -- that is where one activity came
-    back once per follower.
+    Two sources, merged by activity id. Most activity was *pushed*: ``Feed``
+    rows written by ``events.deliver``. The followers of a high-fanout author
+    are not pushed to (see ``events._followers_pull``); their feed *pulls* that
+    author's recent activity from the event log here instead.
+
+    Both are keyset queries on the activity id -- newest ``limit`` below
+    ``before_activity_id`` -- so the top ``limit`` of their union is exactly
+    the page, and its last id is the cursor for the next one. The union is
+    taken over ids, which is the only deduplication: an activity both pulled
+    and pushed (say an article reaching a column subscriber who also follows
+    its author) appears once. ``Feed`` carries
+    ``UNIQUE (activity_id, receiver_id)``, so the pushed side alone never
+    repeats.
     """
     db = ctx.get_db()
-    feeds = db.query(models.Feed).filter_by(receiver_id=receiver_id)
+    pushed = db.query(models.Feed.activity_id).filter_by(receiver_id=receiver_id)
     if before_activity_id:
-        feeds = feeds.filter(models.Feed.activity_id < before_activity_id)
-    feeds = feeds.order_by(models.Feed.activity_id.desc()).limit(limit)
-    activities = []
-    for feed in feeds:
-        activity = materialize_activity(
-            ctx, feed.activity, receiver_id, NO_FEED_SETTINGS
-        )
-        if activity is not None:
-            activities.append(activity)
-    return activities
+        pushed = pushed.filter(models.Feed.activity_id < before_activity_id)
+    pushed = pushed.order_by(models.Feed.activity_id.desc()).limit(limit)
+    page = sorted(
+        {activity_id for (activity_id,) in pushed}
+        | set(
+            _pulled_activity_ids(
+                ctx,
+                receiver_id=receiver_id,
+                before_activity_id=before_activity_id,
+                limit=limit,
+            )
+        ),
+        reverse=True,
+    )[:limit]
+    rows = {
+        activity.id: activity
+        for activity in db.query(models.Activity)
+        .options(selectinload(models.Activity.site))
+        .filter(models.Activity.id.in_(page))
+    }
+    return materialize_activities(
+        ctx, [rows[i] for i in page if i in rows], receiver_id, NO_FEED_SETTINGS
+    )
+
+
+def _pulled_activity_ids(
+    ctx: "RequestContext",
+    *,
+    receiver_id: int,
+    before_activity_id: Optional[int],
+    limit: int,
+) -> List[int]:
+    """The newest ``limit`` follower-feed activities of high-fanout followees.
+
+    Which followees pull is decided now, by their follower count now. An
+    author who crosses the threshold upward keeps their pushed rows and has
+    later ones pulled; one who drops back below it has only the pushed rows --
+    activity written while above it leaves those followers' feeds. Accepted:
+    the threshold is meant to sit far from anybody's actual count.
+    """
+    threshold = settings.FEED_PULL_ABOVE_FOLLOWERS
+    if threshold is None:
+        return []
+    db = ctx.get_db()
+    authors = crud.user.get_followed_ids_with_followers_above(
+        db, user_id=receiver_id, threshold=threshold
+    )
+    if not authors:
+        return []
+    verb = cast(models.Activity.event_json, JSONB)["content"]["verb"].astext
+    query = db.query(models.Activity.id).filter(
+        models.Activity.subject_user_id.in_(authors),
+        verb.in_(FOLLOWER_FEED_VERBS),
+    )
+    if before_activity_id:
+        query = query.filter(models.Activity.id < before_activity_id)
+    query = query.order_by(models.Activity.id.desc()).limit(limit)
+    return [activity_id for (activity_id,) in query]
 
 
 def subject_timeline(
@@ -214,10 +310,9 @@ def subject_timeline(
     )
     if before_activity_id:
         query = query.filter(models.Activity.id < before_activity_id)
-    query = query.order_by(models.Activity.id.desc()).limit(limit)
-    activities = []
-    for activity in query:
-        materialized = materialize_activity(ctx, activity, viewer_id, NO_FEED_SETTINGS)
-        if materialized is not None:
-            activities.append(materialized)
-    return activities
+    query = (
+        query.options(selectinload(models.Activity.site))
+        .order_by(models.Activity.id.desc())
+        .limit(limit)
+    )
+    return materialize_activities(ctx, query.all(), viewer_id, NO_FEED_SETTINGS)
@@ -0,0 +1,200 @@
+"""The pool that feed padding draws from: recent activity anyone may see.
+
+``feed_fill`` pads a nearly-empty home feed with recent public activity.
+Finding that activity used to mean scanning the newest ``SCAN_LIMIT`` rows of
+``activity`` and materializing them until enough passed -- on every
+under-filled request, so new users, the common case, paid the most. The answer
+to "which recent activities are public" barely changes between two requests,
+so it is kept here instead: a Redis sorted set of activity ids, scored by id,
+maintained as activities are written. Padding reads a shortfall's worth of ids
+from it and materializes only those.
+
+What an entry promises
+----------------------
+Less than it looks. An id was public *when it was admitted*; it is a
+candidate, not a verdict. Padding still puts every candidate through the
+per-viewer gate and ``feed_fill._is_public`` at read time, so an entry gone
+stale -- its site turned private, its content hidden -- costs a wasted slot,
+never a leak. Eviction exists to keep those slots few, not for safety.
+
+Only ids are pooled, not rendered payloads. An ``Activity`` schema is not
+viewer-independent: the nested previews carry ``upvoted`` and
+``subscribed_by_me``, and whether it renders at all is the per-viewer gate.
+
+Maintenance
+-----------
+* ``events.distribute`` admits a publishable activity once its transaction
+  commits -- :func:`admit_on_commit`. Not before, for the reason
+  ``services.tokens`` gives: a reader must not find an id whose row it cannot
+  see yet.
+* Hiding or deleting content evicts every entry naming it --
+  :func:`evict_on_commit`. Each entry carries the content keys of its event
+  (``question:12``) for exactly this.
+* Only the newest :data:`POOL_SIZE` entries are kept.
+* A cold pool -- Redis flushed, fresh deploy -- holds only what was admitted
+  since, which can be far less than the scan it replaces offered. So a pool
+  short of :data:`POOL_SIZE` entries is cold (:func:`is_cold`): when it cannot
+  fill a shortfall, ``feed_fill`` falls back to the bounded scan, which refills
+  it (:func:`seed`).
+
+Best effort throughout (D4): a Redis failure here is logged and skipped, and
+padding falls back to the scan.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from chafan_core.app import models
+from chafan_core.app.common import get_redis_cli
+from chafan_core.app.services.activity_policy import ALWAYS_PUBLIC_EVENT_VERBS
+
+logger = logging.getLogger(__name__)
+
+POOL_KEY = "chafan:feed-padding"
+
+# The same window the scan looked at, so the pool offers no less than it did.
+POOL_SIZE = 200
+
+# The event fields whose content can be hidden or deleted, and the key kind
+# each is filed under. A reply is a comment.
+_CONTENT_FIELDS = {
+    "question_id": "question",
+    "answer_id": "answer",
+    "article_id": "article",
+    "submission_id": "submission",
+    "comment_id": "comment",
+    "reply_id": "comment",
+}
+
+# An entry: the activity id and the content keys of its event.
+Entry = Tuple[int, List[str]]
+
+
+def content_key(kind: str, content_id: int) -> str:
+    return f"{kind}:{content_id}"
+
+
+def _content_keys(content: object) -> List[str]:
+    keys = []
+    for field, kind in _CONTENT_FIELDS.items():
+        value = getattr(content, field, None)
+        if isinstance(value, int):
+            keys.append(content_key(kind, value))
+    return keys
+
+
+def _member(entry: Entry) -> str:
+    activity_id, keys = entry
+    return " ".join([str(activity_id)] + keys)
+
+
+def _activity_id(member: str) -> int:
+    return int(member.split(" ", 1)[0])
+
+
+def _publishable(site: Optional[models.Site], verb: str) -> bool:
+    """``feed_fill._is_public``, decided on the ORM row before rendering."""
+    if site is not None and site.public_readable:
+        return True
+    return verb in ALWAYS_PUBLIC_EVENT_VERBS
+
+
+def admit(entries: Sequence[Entry]) -> None:
+    if not entries:
+        return
+    pipe = get_redis_cli().pipeline()
+    pipe.zadd(POOL_KEY, {_member(entry): entry[0] for entry in entries})
+    pipe.zremrangebyrank(POOL_KEY, 0, -(POOL_SIZE + 1))
+    pipe.execute()
+
+
+def admit_on_commit(db: Session, activity: models.Activity, content: object) -> None:
+    """Pool ``activity`` once the transaction that wrote it commits.
+
+    Decided now, against the site as this transaction sees it. Nothing happens
+    on rollback, nor for an activity that is not public to begin with.
+    """
+    assert activity.id is not None
+    if not _publishable(activity.site, getattr(content, "verb", "")):
+        return
+    entry: Entry = (activity.id, _content_keys(content))
+
+    @event.listens_for(db, "after_commit", once=True)
+    def _admit(session: Session) -> None:
+        try:
+            admit([entry])
+        except Exception:
+            logger.exception("could not pool activity %s for padding", entry[0])
+
+
+def seed(activities: Iterable[models.Activity]) -> None:
+    """Refill a cold pool from activity rows the caller already loaded.
+
+    A cold pool need not be empty, and an id already in it is left alone: a
+    second member for it, with other content keys, would be read twice.
+    """
+    pooled = {_activity_id(m) for m in get_redis_cli().zrange(POOL_KEY, 0, -1)}
+    entries: List[Entry] = []
+    for activity in activities:
+        if activity.id in pooled:
+            continue
+        try:
+            content = json.loads(activity.event_json)["content"]
+        except (ValueError, KeyError, TypeError):
+            continue
+        if not _publishable(activity.site, content.get("verb", "")):
+            continue
+        keys = [
+            content_key(kind, content[field])
+            for field, kind in _CONTENT_FIELDS.items()
+            if isinstance(content.get(field), int)
+        ]
+        entries.append((activity.id, keys))
+    admit(entries)
+
+
+def evict(key: str) -> None:
+    """Drop every entry whose event names the content ``key``.
+
+    Walks the whole pool, which is :data:`POOL_SIZE` short strings.
+    """
+    redis_cli = get_redis_cli()
+    stale = [m for m in redis_cli.zrange(POOL_KEY, 0, -1) if key in m.split(" ")[1:]]
+    if stale:
+        redis_cli.zrem(POOL_KEY, *stale)
+
+
+def evict_on_commit(db: Session, kind: str, content_id: int) -> None:
+    """Evict ``kind:content_id`` once the hide or delete is durable."""
+    key = content_key(kind, content_id)
+
+    @event.listens_for(db, "after_commit", once=True)
+    def _evict(session: Session) -> None:
+        try:
+            evict(key)
+        except Exception:
+            logger.exception("could not evict %s from the padding pool", key)
+
+
+def is_cold() -> bool:
+    """Whether the pool holds less than the window the scan looks at.
+
+    Not only when it is empty: one activity admitted after a flush would
+    otherwise pass for a pool, and keep it from ever being seeded.
+    """
+    return get_redis_cli().zcard(POOL_KEY) < POOL_SIZE
+
+
+def read(*, offset: int, count: int, before_activity_id: Optional[int]) -> List[int]:
+    """Up to ``count`` pooled activity ids, newest first, from ``offset``."""
+    ceiling = "+inf" if before_activity_id is None else f"({before_activity_id}"
+    members = get_redis_cli().zrevrangebyscore(
+        POOL_KEY, ceiling, "-inf", start=offset, num=count
+    )
+    return [_activity_id(m) for m in members]
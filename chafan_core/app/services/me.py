@@ -11,6 +11,7 @@ from pydantic.tools import parse_obj_as
 
 from chafan_core.app import crud, karma, schemas
 from chafan_core.app.common import get_redis_cli
+from chafan_core.app.recs import follow_follows
 from chafan_core.app.responders import misc as misc_responder
 from chafan_core.app.responders.user import user_schema_from_orm
 from chafan_core.app.schemas.event import EventInternal, FollowUserInternal
@@ -286,6 +287,8 @@ def follow_user(ctx, *, uuid: str) -> schemas.UserFollows:
     followed_user = crud.user.add_follower(
         db, db_obj=followed_user, follower=current_user
     )
+    if not already_following:
+        follow_follows.forget_on_commit(db, current_user.id)
     utc_now = datetime.datetime.now(tz=datetime.timezone.utc)
     follow_event = EventInternal(
         created_at=utc_now,
@@ -308,8 +311,8 @@ def follow_user(ctx, *, uuid: str) -> schemas.UserFollows:
         )
     return schemas.UserFollows(
         user_uuid=uuid,
-        followers_count=followed_user.followers.count(),
-        followed_count=followed_user.followed.count(),  # type: ignore
+        followers_count=followed_user.followers_count,
+        followed_count=followed_user.followed_count,
         followed_by_me=True,
     )
 
@@ -323,13 +326,16 @@ def cancel_follow_user(ctx, *, uuid: str) -> schemas.UserFollows:
             status_code=400,
             detail="The followed_user doesn't exist in the system.",
         )
+    was_following = current_user in followed_user.followers
     followed_user = crud.user.remove_follower(
         db, db_obj=followed_user, follower=current_user
     )
+    if was_following:
+        follow_follows.forget_on_commit(db, current_user.id)
     return schemas.UserFollows(
         user_uuid=uuid,
-        followers_count=followed_user.followers.count(),
-        followed_count=followed_user.followed.count(),  # type: ignore
+        followers_count=followed_user.followers_count,
+        followed_count=followed_user.followed_count,
         followed_by_me=False,
     )
 
@@ -362,10 +368,9 @@ def list_subscribed_questions(
 ) -> List[Optional[schemas.QuestionPreview]]:
     current_user = ctx.get_current_active_user()
     mat = ctx.principal_view
-    return [
-        mat.preview_of_question(q)
-        for q in current_user.subscribed_questions[skip : skip + limit]
-    ]
+    return mat.previews_of_questions(
+        current_user.subscribed_questions[skip : skip + limit]
+    )
 
 
 def subscribe_question(ctx, *, uuid: str) -> schemas.UserQuestionSubscription:
@@ -451,10 +456,7 @@ def list_bookmarked_answers(
 ) -> List[Optional[schemas.AnswerPreview]]:
     current_user = ctx.get_current_active_user()
     mat = ctx.principal_view
-    return [
-        mat.preview_of_answer(answer)
-        for answer in current_user.bookmarked_answers[skip : skip + limit]
-    ]
+    return mat.previews_of_answers(current_user.bookmarked_answers[skip : skip + limit])
 
 
 def bookmark_answer(ctx, *, uuid: str) -> schemas.UserAnswerBookmark:
@@ -486,10 +488,9 @@ def list_bookmarked_articles(
 ) -> List[Optional[schemas.ArticlePreview]]:
     current_user = ctx.get_current_active_user()
     mat = ctx.principal_view
-    return [
-        mat.preview_of_article(article)
-        for article in current_user.bookmarked_articles[skip : skip + limit]
-    ]
+    return mat.previews_of_articles(
+        current_user.bookmarked_articles[skip : skip + limit]
+    )
 
 
 def bookmark_article(ctx, *, uuid: str) -> schemas.UserArticleBookmark:
@@ -11,6 +11,7 @@ from sqlalchemy.orm import Session
 from chafan_core.app import crud, models, schemas
 from chafan_core.app.common import OperationType
 from chafan_core.app.model_utils import is_live_answer, is_live_article
+from chafan_core.app.recs import follow_follows
 from chafan_core.app.recs import matrices as recs_matrices
 from chafan_core.app.responders import misc as misc_responder
 from chafan_core.app.schemas.preview import UserPreview
@@ -37,53 +38,50 @@ def get_user_follows(
         followed_by_me = False
     return schemas.UserFollows(
         user_uuid=followed.uuid,
-        followers_count=followed.followers.count(),
-        followed_count=followed.followed.count(),  # type: ignore
+        followers_count=followed.followers_count,
+        followed_count=followed.followed_count,
         followed_by_me=followed_by_me,
     )
 
 
 def preview_of_user(ctx, user: models.User) -> schemas.UserPreview:
     """User preview with social annotations for the current principal."""
+    return preview_of_users(ctx, [user])[0]
+
+
+def preview_of_users(ctx, users: List[models.User]) -> List[schemas.UserPreview]:
+    """:func:`preview_of_user` for a list, annotated in one pass.
+
+    The principal's follow-follow counts are looked up once for the whole
+    batch rather than once per preview.
+    """
     from chafan_core.app.responders import user as user_responder
 
-    user_preview = user_responder.plain_preview_of_user(user)
-    principal_id = ctx.principal_id
-    if principal_id:
-        m = ctx.get_follow_follow_fanout()
-        if principal_id in m and user_preview.uuid in m[principal_id]:
-            user_preview.social_annotations.follow_follows = m[principal_id][
-                user_preview.uuid
-            ]
-        else:
-            user_preview.social_annotations.follow_follows = 0
-    user_preview.follows = get_user_follows(ctx, user)
-    return user_preview
+    previews = [user_responder.plain_preview_of_user(u) for u in users]
+    if ctx.principal_id:
+        follow_follows.annotate(previews, ctx.get_follow_follows())
+    for user_preview, user in zip(previews, users):
+        user_preview.follows = get_user_follows(ctx, user)
+    return previews
 
 
 def get_followers(
     ctx, user: models.User, skip: int, limit: int
 ) -> List[UserPreview]:
-    return [
-        preview_of_user(ctx, u) for u in user.followers[skip : skip + limit]
-    ]
+    return preview_of_users(ctx, list(user.followers[skip : skip + limit]))
 
 
 def get_followed(
     ctx, user: models.User, skip: int, limit: int
 ) -> List[UserPreview]:
-    return [
-        preview_of_user(ctx, u) for u in user.followed[skip : skip + limit]
-    ]
+    return preview_of_users(ctx, list(user.followed[skip : skip + limit]))
 
 
 def get_authored_answers_for_principal(
     ctx, author: models.User
 ) -> List[schemas.AnswerPreview]:
     mat = ctx.principal_view
-    return filter_not_none(
-        [mat.preview_of_answer(answer) for answer in author.answers]
-    )
+    return filter_not_none(mat.previews_of_answers(author.answers))
 
 
 def _require_user(ctx, uuid: str) -> models.User:
@@ -234,11 +232,9 @@ def list_user_questions(
     mat = ctx.principal_view
     # FIXME: think about more efficient paging mechanism
     return filter_not_none(
-        [
-            mat.preview_of_question(question)
-            for question in user.questions
-            if not question.is_hidden
-        ]
+        mat.previews_of_questions(
+            [question for question in user.questions if not question.is_hidden]
+        )
     )[skip : skip + limit]
 
 
@@ -248,9 +244,9 @@ def list_user_articles(
     user = _require_user(ctx, uuid)
     mat = ctx.principal_view
     # TODO we have limit, but we still generate all articles. Need generator 2025-Mar-23
-    return filter_not_none(
-        [mat.preview_of_article(article) for article in user.articles]
-    )[skip : skip + limit]
+    return filter_not_none(mat.previews_of_articles(user.articles))[
+        skip : skip + limit
+    ]
 
 
 def list_user_submissions(
@@ -300,12 +296,14 @@ def get_related_users(ctx, target_user: models.User) -> List[UserPreview]:
             related_users[u.id] = u
 
     for user_id in recs_matrices.similar_entity_ids(
-        db,
         entity_id=target_user.id,
         entity_type=EntityType.users,
         top_k=20,
     ):
         if user_id not in related_users:
-            related_users[user_id] = unwrap(crud.user.get(db, user_id))
+            # The snapshot may predate the user's deactivation.
+            user = crud.user.get(db, user_id)
+            if user is not None and user.is_active:
+                related_users[user_id] = user
 
-    return [preview_of_user(ctx, u) for u in related_users.values()]
+    return preview_of_users(ctx, list(related_users.values()))
@@ -1,6 +1,7 @@
 """Post-response side effects (notifications, feed fanout, webhooks)."""
 
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Optional
 
 from sqlalchemy.orm.session import Session
@@ -9,7 +10,7 @@ from sqlalchemy.orm.session import Session
 
 from chafan_core.app import crud, models, schemas
 from chafan_core.app.config import settings
-from chafan_core.app.services import events
+from chafan_core.app.services import events, search_updates
 from chafan_core.app.infra.request_context import RequestContext
 from chafan_core.app.recs.indexing import (
     compute_interesting_questions_ids_for_normal_user,
@@ -175,8 +176,11 @@ def postprocess_comment_update(
     execute_with_broker(runnable)
 
 
-def postprocess_question_common(question: models.Question) -> None:
+def postprocess_question_common(db: Session, question: models.Question) -> None:
     update_question_keywords(question)
+    search_updates.mark_on_commit(db, "question", [question.id])
+    # Its answers' documents carry its title and description.
+    search_updates.mark_on_commit(db, "answer", [a.id for a in question.answers])
 
 
 def postprocess_new_question(question_id: int) -> None:
@@ -195,7 +199,7 @@ def postprocess_new_question(question_id: int) -> None:
             ),
         )
         events.distribute(broker, event)
-        postprocess_question_common(question)
+        postprocess_question_common(broker.get_db(), question)
         for webhook in question.site.webhooks:
             call_webhook(
                 broker,
@@ -225,13 +229,14 @@ def postprocess_updated_question(question_id: int) -> None:
                 ),
             ),
         )
-        postprocess_question_common(question)
+        postprocess_question_common(broker.get_db(), question)
 
     execute_with_broker(runnable)
 
 
-def postprocess_submission_common(submission: models.Submission) -> None:
+def postprocess_submission_common(db: Session, submission: models.Submission) -> None:
     update_submission_keywords(submission)
+    search_updates.mark_on_commit(db, "submission", [submission.id])
 
 
 def postprocess_new_submission(submission_id: int) -> None:
@@ -241,7 +246,7 @@ def postprocess_new_submission(submission_id: int) -> None:
         # NOTE: crud.submission.create_with_author already wrote the Activity for
         # this submission, but nothing fans it out. See activity_policy.POLICY
         # ["create_submission"]. TODO event to feed? 2025-Sep-14
-        postprocess_submission_common(submission)
+        postprocess_submission_common(broker.get_db(), submission)
         for webhook in submission.site.webhooks:
             call_webhook(
                 broker,
@@ -294,7 +299,7 @@ def postprocess_updated_submission(submission_id: int) -> None:
     def runnable(db: Session) -> None:
         submission = crud.submission.get(db, id=submission_id)
         assert submission is not None
-        postprocess_submission_common(submission)
+        postprocess_submission_common(db, submission)
 
     execute_with_db(SessionLocal(), runnable)
 
@@ -325,6 +330,7 @@ def postprocess_new_answer(answer_id: int, was_published: bool) -> None:
             ),
         )
         update_answer_keywords(answer)
+        search_updates.mark_on_commit(broker.get_db(), "answer", [answer.id])
         for webhook in answer.site.webhooks:
             call_webhook(
                 broker,
@@ -350,6 +356,7 @@ def postprocess_new_article(article_id: int) -> None:
             content=event,
         )
         events.distribute(broker, event_internal)
+        search_updates.mark_on_commit(broker.get_db(), "article", [article.id])
 
     execute_with_broker(runnable)
 
@@ -374,6 +381,7 @@ def postprocess_updated_article(article_id: int, was_published: bool) -> None:
                     ),
                 ),
             )
+        search_updates.mark_on_commit(broker.get_db(), "article", [article.id])
 
     execute_with_broker(runnable)
 
@@ -390,20 +398,34 @@ def postprocess_new_feedback(feedback_id: int) -> None:
     execute_with_db(SessionLocal(), runnable)
 
 
+def _refresh_interesting_question_ids(db: Session, user: models.User) -> None:
+    if user.id == settings.VISITOR_USER_ID:
+        user.interesting_question_ids = (
+            compute_interesting_questions_ids_for_visitor_user(db)
+        )
+    else:
+        user.interesting_question_ids = (
+            compute_interesting_questions_ids_for_normal_user(db, user)
+        )
+    user.interesting_question_ids_updated_at = get_utc_now()
+
+
+def _refresh_interesting_user_ids(db: Session, user: models.User) -> None:
+    if user.id == settings.VISITOR_USER_ID:
+        user.interesting_user_ids = compute_interesting_users_ids_for_visitor_user(db)
+    else:
+        user.interesting_user_ids = compute_interesting_users_ids_for_normal_user(
+            db, user
+        )
+    user.interesting_user_ids_updated_at = get_utc_now()
+
+
 def refresh_interesting_question_ids_for_user(user_id: int) -> None:
     def runnable(db: Session) -> None:
         user = crud.user.get(db, user_id)
         if user is None:
             return
-        if user_id == settings.VISITOR_USER_ID:
-            user.interesting_question_ids = (
-                compute_interesting_questions_ids_for_visitor_user(db)
-            )
-        else:
-            user.interesting_question_ids = (
-                compute_interesting_questions_ids_for_normal_user(db, user)
-            )
-        user.interesting_question_ids_updated_at = get_utc_now()
+        _refresh_interesting_question_ids(db, user)
 
     execute_with_db(SessionLocal(), runnable)
 
@@ -413,16 +435,45 @@ def refresh_interesting_user_ids_for_user(user_id: int) -> None:
         user = crud.user.get(db, user_id)
         if user is None:
             return
-        if user_id == settings.VISITOR_USER_ID:
-            user.interesting_user_ids = compute_interesting_users_ids_for_visitor_user(
-                db
-            )
-        else:
-            user.interesting_user_ids = compute_interesting_users_ids_for_normal_user(
-                db, user
-            )
-        user.interesting_user_ids_updated_at = get_utc_now()
+        _refresh_interesting_user_ids(db, user)
+
+    execute_with_db(SessionLocal(), runnable)
+
+
+def refresh_interesting_ids_for_users(user_ids: List[int]) -> None:
+    """Both interesting lists of each of ``user_ids``, in one transaction.
+
+    Each user's lists are still their own queries -- the questions come from
+    one window query per user, with nothing shared between users -- so
+    batching saves only the per-user session and commit.
+    """
+
+    def runnable(db: Session) -> None:
+        for user_id in user_ids:
+            user = crud.user.get(db, user_id)
+            if user is None:
+                continue
+            _refresh_interesting_question_ids(db, user)
+            _refresh_interesting_user_ids(db, user)
 
     execute_with_db(SessionLocal(), runnable)
 
 
+def refresh_all_interesting_ids(*, batch_size: int, workers: int) -> int:
+    """Refresh both interesting lists of every active user, and the visitor's.
+
+    Batches of ``batch_size`` users run on ``workers`` threads, each batch in
+    its own transaction; a batch that fails is logged and the rest go on.
+    Returns how many users were in a batch.
+    """
+    user_ids = execute_with_db(SessionLocal(), crud.user.get_active_user_ids) or []
+    if settings.VISITOR_USER_ID and settings.VISITOR_USER_ID not in user_ids:
+        user_ids.append(settings.VISITOR_USER_ID)
+    batches = [
+        user_ids[i : i + batch_size] for i in range(0, len(user_ids), batch_size)
+    ]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        list(pool.map(refresh_interesting_ids_for_users, batches))
+    return len(user_ids)
+
+
@@ -2,8 +2,10 @@
 
 from __future__ import annotations
 
+import base64
 import datetime
-from typing import List, Optional, Tuple
+import json
+from typing import List, Optional, Sequence, Tuple
 
 from fastapi.encoders import jsonable_encoder
 from sqlalchemy.orm import Session
@@ -11,7 +13,7 @@ from sqlalchemy.orm import Session
 from chafan_core.app import crud, models, schemas, user_permission
 from chafan_core.app.common import OperationType
 from chafan_core.app.endpoint_utils import get_site
-from chafan_core.app.recs.ranking import rank_answers
+from chafan_core.app.recs.ranking import answer_rank_key
 from chafan_core.app.schemas.event import (
     EventInternal,
     InviteAnswerInternal,
@@ -20,8 +22,9 @@ from chafan_core.app.schemas.event import (
 from chafan_core.app.services import viewcounts as viewcounts_service
 from chafan_core.app.user_permission import check_user_in_site, user_in_site
 from chafan_core.utils.base import HTTPException_, filter_not_none
+from chafan_core.utils.constants import MAX_QUESTION_PAGE_ANSWERS_LIMIT
 import chafan_core.app.responders as responders
-from chafan_core.app.services import events
+from chafan_core.app.services import events, feed_pool, search_updates
 
 
 def get_question_model(db: Session, uuid: str) -> Optional[models.Question]:
@@ -143,9 +146,7 @@ def get_question_subscription(
 def list_answer_previews(ctx, question: models.Question) -> list[schemas.AnswerPreview]:
     mat = ctx.principal_view
     return sorted(
-        filter_not_none(
-            [mat.preview_of_answer(answer) for answer in question.answers]
-        ),
+        filter_not_none(mat.previews_of_answers(question.answers)),
         key=lambda a: a.upvotes_count,
     )
 
@@ -317,6 +318,8 @@ def hide_question(ctx, *, uuid: str) -> Optional[schemas.Question]:
     question = crud.question.update(
         ctx.get_db(), db_obj=question, obj_in={"is_hidden": True}
     )
+    feed_pool.evict_on_commit(ctx.get_db(), "question", question.id)
+    search_updates.mark_on_commit(ctx.get_db(), "question", [question.id])
     return question_schema(ctx, question)
 
 
@@ -423,11 +426,7 @@ def upvote_question(ctx, *, uuid: str) -> schemas.QuestionUpvotes:
                 ),
             )
         db.refresh(question)
-    valid_upvotes = (
-        db.query(models.QuestionUpvotes)
-        .filter_by(question_id=question.id, cancelled=False)
-        .count()
-    )
+    valid_upvotes = question.upvotes_count
     return schemas.QuestionUpvotes(
         question_uuid=question.uuid, count=valid_upvotes, upvoted=True
     )
@@ -457,18 +456,90 @@ def cancel_upvote_question(ctx, *, uuid: str) -> schemas.QuestionUpvotes:
     if upvoted:
         question = crud.question.cancel_upvote(db, db_obj=question, voter=current_user)
         db.refresh(question)
-    valid_upvotes = (
-        db.query(models.QuestionUpvotes)
-        .filter_by(question_id=question.id, cancelled=False)
-        .count()
-    )
+    valid_upvotes = question.upvotes_count
     return schemas.QuestionUpvotes(
         question_uuid=question.uuid, count=valid_upvotes, upvoted=False
     )
 
 
-def get_question_page(ctx, *, uuid: str, request=None) -> schemas.QuestionPage:
+_ALL_PAGE_FIELDS: Tuple[schemas.QuestionPageField, ...] = (
+    "full_answers",
+    "answer_previews",
+)
+
+
+def _encode_answers_cursor(
+    ranked_at: datetime.datetime, after: Tuple[float, int]
+) -> str:
+    raw = json.dumps([ranked_at.isoformat(), *after])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_answers_cursor(
+    cursor: str,
+) -> Tuple[datetime.datetime, Tuple[float, int]]:
+    try:
+        ranked_at, weight, answer_id = json.loads(base64.urlsafe_b64decode(cursor))
+        ranked_at = datetime.datetime.fromisoformat(ranked_at)
+        if ranked_at.tzinfo is None:
+            raise ValueError("naive ranking time")
+        return ranked_at, (float(weight), int(answer_id))
+    except (ValueError, TypeError):
+        raise HTTPException_(
+            status_code=400,
+            detail="Invalid answers cursor.",
+        )
+
+
+def _answers_window(
+    ctx,
+    question: models.Question,
+    *,
+    cursor: Optional[str],
+    limit: int,
+    fields: Sequence[schemas.QuestionPageField],
+) -> schemas.QuestionPageAnswers:
+    """The ``limit`` answers ranked after ``cursor`` (from the top without
+    one), shaped only as ``fields`` asks.
+
+    The answers are ranked as of the first window: the cursor carries that
+    time along with the last answer's place in the ranking, so paging does
+    not reshuffle as answers age. Votes cast meanwhile still move answers.
+    """
     from chafan_core.app.services import answers as answers_service
+
+    if cursor is None:
+        ranked_at = datetime.datetime.now(tz=datetime.timezone.utc)
+        after = None
+    else:
+        ranked_at, after = _decode_answers_cursor(cursor)
+    ranked = sorted(
+        (answer_rank_key(answer, ctx.principal_id, ranked_at), answer)
+        for answer in question.answers
+    )
+    if after is not None:
+        ranked = [(key, answer) for key, answer in ranked if key > after]
+    window = [answer for _, answer in ranked[:limit]]
+    page = schemas.QuestionPageAnswers()
+    if "full_answers" in fields:
+        page.full_answers = filter_not_none(answers_service.answer_schemas(ctx, window))
+    if "answer_previews" in fields:
+        page.answer_previews = filter_not_none(ctx.previews_of_answers(window))
+    if len(ranked) > limit:
+        page.answers_cursor = _encode_answers_cursor(ranked_at, ranked[limit - 1][0])
+    return page
+
+
+def get_question_page(
+    ctx,
+    *,
+    uuid: str,
+    request=None,
+    limit: int = MAX_QUESTION_PAGE_ANSWERS_LIMIT,
+    fields: Sequence[schemas.QuestionPageField] = _ALL_PAGE_FIELDS,
+) -> schemas.QuestionPage:
+    """The question with the first ``limit`` of its ranked answers; see
+    :func:`get_question_page_answers` for the rest."""
     from chafan_core.app.services import audit as audit_service
 
     current_user_id = ctx.principal_id
@@ -523,26 +594,45 @@ def get_question_page(ctx, *, uuid: str, request=None) -> schemas.QuestionPage:
     # TODO 2025-07-08 This is hacky. The whole logic of question flags needs to be reviewed and simplified.
     if question.site.public_writable_answer:
         flags.answer_writable = True
+    answers = _answers_window(ctx, question, cursor=None, limit=limit, fields=fields)
     return schemas.QuestionPage(
         question=question_data,
-        # TODO: continuation
-        # TODO: rethink the internal caching
-        full_answers=filter_not_none(
-            [
-                answers_service.answer_schema(ctx, answer)
-                for answer in rank_answers(
-                    question.answers, principal_id=ctx.principal_id
-                )
-            ]
-        ),
-        answer_previews=filter_not_none(
-            [
-                ctx.preview_of_answer(answer)
-                for answer in rank_answers(
-                    question.answers, principal_id=ctx.principal_id
-                )
-            ]
-        ),
+        full_answers=answers.full_answers,
+        answer_previews=answers.answer_previews,
+        answers_cursor=answers.answers_cursor,
         question_subscription=get_question_subscription(ctx, question),
         flags=flags,
     )
+
+
+def get_question_page_answers(
+    ctx,
+    *,
+    uuid: str,
+    cursor: str,
+    limit: int = MAX_QUESTION_PAGE_ANSWERS_LIMIT,
+    fields: Sequence[schemas.QuestionPageField] = _ALL_PAGE_FIELDS,
+) -> schemas.QuestionPageAnswers:
+    """The next window of a question page's answers, after ``cursor``."""
+    question = get_readable_question(
+        ctx.get_db(),
+        uuid=uuid,
+        principal_id=ctx.principal_id,
+        ctx=ctx,
+    )
+    if question is None:
+        raise HTTPException_(
+            status_code=404,
+            detail="No such question",
+        )
+    if not user_in_site(
+        ctx.get_db(),
+        site=question.site,
+        user_id=ctx.principal_id,
+        op_type=OperationType.ReadSite,
+    ):
+        raise HTTPException_(
+            status_code=400,
+            detail="Unauthorized.",
+        )
+    return _answers_window(ctx, question, cursor=cursor, limit=limit, fields=fields)
@@ -0,0 +1,164 @@
+"""Full rebuild of the search indexes, for repair.
+
+Not scheduled: the indexes are kept current by ``services/search_updates.py``.
+Run ``scripts/refresh_search_index.py`` after an index schema change, when an
+index directory is lost or suspect, or after switching ``SEARCH_BACKEND``.
+
+Rows are streamed with only the indexed columns. With the Postgres backend,
+the vectors are rewritten table by table in one transaction. With Whoosh,
+each index is built from scratch in its own process, into a new directory
+next to the live one. The live path ``<SEARCH_INDEX_FILESYSTEM_PATH>/<type>``
+is a symlink; once every build has succeeded it is repointed with one rename,
+so a search sees the old index or the new one, never a part-built one.
+Incremental flushes are held off the old indexes meanwhile, and catch up on
+the new ones after.
+"""
+
+import logging
+import multiprocessing
+import os
+import shutil
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
+from typing import Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+from whoosh.index import LockError, open_dir  # type: ignore
+from whoosh.util.filelock import try_for  # type: ignore
+
+from chafan_core.app.config import settings
+from chafan_core.app.infra import search_cache, search_whoosh
+from chafan_core.app.infra.runtime import execute_with_db, reraising
+from chafan_core.app.infra.search_postgres import postgres_backend
+from chafan_core.app.services.search_updates import document_rows
+from chafan_core.db.session import SessionLocal
+from chafan_core.utils.constants import indexed_object_T
+
+logger = logging.getLogger(__name__)
+
+_INDEX_TYPES: Tuple[indexed_object_T, ...] = (
+    "question",
+    "site",
+    "submission",
+    "answer",
+    "article",
+)
+
+# Seconds the rebuild waits for an incremental flush to finish with an index.
+_LOCK_TIMEOUT = 60.0
+
+
+def build_whoosh_index(
+    index_type: indexed_object_T, index_dir: str, writer_procs: int
+) -> int:
+    """Write a complete index of ``index_type`` into the new ``index_dir``.
+
+    Runs in a pool process, with its own database connection.
+    """
+    db = SessionLocal()
+    try:
+        return search_whoosh.build_index(
+            index_type,
+            index_dir,
+            document_rows(db, index_type),
+            writer_procs=writer_procs,
+        )
+    finally:
+        db.close()
+
+
+def _swap_in(live: str, built_dir: str) -> Optional[str]:
+    """Point ``live`` at ``built_dir``; returns what it pointed at before."""
+    root = os.path.dirname(live)
+    link = f"{built_dir}.link"
+    os.symlink(os.path.relpath(built_dir, root), link)
+    previous = None
+    if os.path.islink(live):
+        previous = os.path.join(root, os.readlink(live))
+    elif os.path.isdir(live):
+        # An index written in place, before rebuilds were swapped in. Moving
+        # it aside is not atomic: searches in between fall back as if there
+        # were no index.
+        previous = f"{built_dir}.replaced"
+        os.rename(live, previous)
+    os.replace(link, live)
+    return previous
+
+
+def refresh_search_index(
+    *, writer_procs: Optional[int] = None, processes: Optional[int] = None
+) -> Dict[str, int]:
+    """Rebuild every search index; returns the documents written per index.
+
+    For Whoosh, ``processes`` builds run at once (default: one per index),
+    each with ``writer_procs`` writer processes (default:
+    ``SEARCH_INDEX_REBUILD_WRITER_PROCS``). If any build fails, nothing is
+    swapped in.
+    """
+    logger.info("refresh_search_index executed")
+    if settings.SEARCH_BACKEND == "postgres":
+        return _refresh_postgres()
+    if writer_procs is None:
+        writer_procs = settings.SEARCH_INDEX_REBUILD_WRITER_PROCS
+    root = settings.SEARCH_INDEX_FILESYSTEM_PATH
+    os.makedirs(root, exist_ok=True)
+    build = uuid.uuid4().hex[:8]
+    built = {t: os.path.join(root, f".{t}.{build}") for t in _INDEX_TYPES}
+    previous = []
+    with ExitStack() as held:
+        # Changes committed after this are still queued when the new indexes
+        # go live: a flush cannot take these locks, so it leaves its batch
+        # to be retried.
+        for index_type in _INDEX_TYPES:
+            live = os.path.join(root, index_type)
+            if os.path.exists(live):
+                # The lock a writer takes, without a writer: its temporary
+                # files would follow the link to the new index.
+                lock = open_dir(live).lock("WRITELOCK")
+                if not try_for(lock.acquire, timeout=_LOCK_TIMEOUT):
+                    raise LockError(f"{live} is being written")
+                held.callback(lock.release)
+        try:
+            with ProcessPoolExecutor(
+                max_workers=processes or len(_INDEX_TYPES),
+                # Not fork: the children must not share the parent's
+                # database connections.
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as pool:
+                futures = {
+                    t: pool.submit(build_whoosh_index, t, built[t], writer_procs)
+                    for t in _INDEX_TYPES
+                }
+                counts = {t: f.result() for t, f in futures.items()}
+        except BaseException:
+            for index_dir in built.values():
+                shutil.rmtree(index_dir, ignore_errors=True)
+            raise
+        for index_type in _INDEX_TYPES:
+            old = _swap_in(os.path.join(root, index_type), built[index_type])
+            if old is not None:
+                previous.append(old)
+    search_cache.bump(*_INDEX_TYPES)
+    # Searchers still open on an old index keep its files open; removing the
+    # directory does not disturb them.
+    for old in previous:
+        shutil.rmtree(old, ignore_errors=True)
+    logger.info("refresh_search_index wrote %s", counts)
+    return counts
+
+
+def _refresh_postgres() -> Dict[str, int]:
+    counts: Dict[str, int] = {}
+
+    def runnable(db: Session) -> None:
+        for index_type in _INDEX_TYPES:
+            counts[index_type] = postgres_backend.rebuild(
+                db, index_type, document_rows(db, index_type)
+            )
+
+    with reraising():
+        execute_with_db(SessionLocal(), runnable)
+    search_cache.bump(*_INDEX_TYPES)
+    logger.info("refresh_search_index wrote %s", counts)
+    return counts
@@ -0,0 +1,222 @@
+"""Keeping the search indexes current as content changes.
+
+The search indexes used to be rebuilt from scratch once a day, so new content
+could not be found for hours and each rebuild cost more than the last. Now
+each write that can change what search should return *marks* the object, and
+:func:`flush_search_index_updates`, an interval job, re-indexes what was
+marked: per index, one batch of documents handed to the search backend
+(``infra.search_index.backend()``), which writes or removes them together.
+
+A mark says "look at this row again", not what changed. The flush reads the
+row as it is then and decides: :func:`document` is the whole rule of what is
+searchable. So creating, editing, publishing, hiding and deleting all make
+the same call, and marking twice costs nothing. The full rebuild in
+``services/search_rebuild.py`` streams :func:`document_rows`, the same rule
+stated as SQL; the two are kept side by side here so they change together.
+
+The queue
+---------
+A Redis set of ``"<index type>:<id>"``, deduplicated by construction. A flush
+renames it aside first (RENAMENX, as ``services/viewcounts.py`` does), so
+marks made during a flush wait for the next one, and deletes it only once the
+index writes are committed; a failed flush is retried whole, which
+``update_document`` makes harmless.
+
+Marks are added when the marking transaction commits: the flush must not read
+the row before the change that prompted it is visible.
+
+``search_rebuild.refresh_search_index`` remains for repair, e.g. after a
+schema change, a lost index directory, or a switch of backend.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+import redis
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from chafan_core.app import models
+from chafan_core.app.common import get_redis_cli
+from chafan_core.app.infra import search_cache, search_index
+from chafan_core.app.infra.runtime import execute_with_db
+from chafan_core.db.session import SessionLocal
+from chafan_core.utils.constants import indexed_object_T
+
+logger = logging.getLogger(__name__)
+
+PENDING_KEY = "chafan:search-index-pending"
+DRAINING_KEY = "chafan:search-index-pending:draining"
+
+_MODELS: Dict[str, Any] = {
+    "question": models.Question,
+    "site": models.Site,
+    "submission": models.Submission,
+    "answer": models.Answer,
+    "article": models.Article,
+}
+
+
+def document(index_type: indexed_object_T, obj: Any) -> Optional[Dict[str, str]]:
+    """The index document for ``obj``, or None if it must not be searchable."""
+    if obj is None:
+        return None
+    if index_type == "question":
+        if obj.is_hidden:
+            return None
+        return dict(
+            id=str(obj.id), title=obj.title, description_text=obj.description_text
+        )
+    if index_type == "site":
+        return dict(
+            id=str(obj.id),
+            name=obj.name,
+            description=obj.description,
+            subdomain=obj.subdomain,
+        )
+    if index_type == "submission":
+        if obj.is_hidden:
+            return None
+        return dict(
+            id=str(obj.id), title=obj.title, description_text=obj.description_text
+        )
+    if index_type == "answer":
+        if obj.is_deleted or not obj.is_published:
+            return None
+        return dict(
+            id=str(obj.id),
+            body_prerendered_text=obj.body_prerendered_text,
+            question_title=obj.question.title,
+            question_description_text=obj.question.description_text,
+        )
+    if index_type == "article":
+        if obj.is_deleted or not obj.is_published:
+            return None
+        return dict(id=str(obj.id), title=obj.title, body_text=obj.body_text)
+    raise ValueError(index_type)
+
+
+def _document_select(index_type: indexed_object_T) -> Any:
+    Question, Answer, Article = models.Question, models.Answer, models.Article
+    Site, Submission = models.Site, models.Submission
+    if index_type == "question":
+        return select(
+            Question.id, Question.title, Question.description_text
+        ).where(Question.is_hidden.is_(False))
+    if index_type == "site":
+        return select(Site.id, Site.name, Site.description, Site.subdomain)
+    if index_type == "submission":
+        return select(
+            Submission.id, Submission.title, Submission.description_text
+        ).where(Submission.is_hidden.is_(False))
+    if index_type == "answer":
+        return (
+            select(
+                Answer.id,
+                Answer.body_prerendered_text,
+                Question.title.label("question_title"),
+                Question.description_text.label("question_description_text"),
+            )
+            .join(Question, Answer.question_id == Question.id)
+            .where(Answer.is_deleted.is_(False), Answer.is_published.is_(True))
+        )
+    if index_type == "article":
+        return select(Article.id, Article.title, Article.body_text).where(
+            Article.is_deleted.is_(False), Article.is_published.is_(True)
+        )
+    raise ValueError(index_type)
+
+
+def document_rows(
+    db: Session, index_type: indexed_object_T, batch_size: int = 1000
+) -> Iterator[Dict[str, Any]]:
+    """Every searchable row's index document, streamed from a server-side
+    cursor ``batch_size`` rows at a time and loading only the indexed columns.
+    """
+    stmt = _document_select(index_type).execution_options(yield_per=batch_size)
+    for row in db.execute(stmt):
+        doc = row._asdict()
+        doc["id"] = str(doc["id"])
+        yield doc
+
+
+def mark(index_type: indexed_object_T, ids: Iterable[int]) -> None:
+    members = [f"{index_type}:{i}" for i in ids]
+    if members:
+        get_redis_cli().sadd(PENDING_KEY, *members)
+
+
+def mark_on_commit(
+    db: Session, index_type: indexed_object_T, ids: Iterable[int]
+) -> None:
+    """Re-index these objects once the current transaction commits."""
+    ids = list(ids)
+
+    @event.listens_for(db, "after_commit", once=True)
+    def _mark(session: Session) -> None:
+        try:
+            mark(index_type, ids)
+        except Exception:
+            logger.exception("could not queue %s %s for indexing", index_type, ids)
+
+
+def _rotate(redis_cli: redis.Redis) -> None:
+    try:
+        redis_cli.renamenx(PENDING_KEY, DRAINING_KEY)
+    except redis.ResponseError:
+        # No such key: nothing marked since the last flush.
+        pass
+
+
+def _group(members: Iterable[str]) -> Dict[str, List[int]]:
+    grouped: Dict[str, List[int]] = {}
+    for member in members:
+        index_type, _, obj_id = member.partition(":")
+        if index_type not in _MODELS or not obj_id.isdigit():
+            logger.error("unknown search index entry %r", member)
+            continue
+        grouped.setdefault(index_type, []).append(int(obj_id))
+    return grouped
+
+
+def apply_updates(db: Session, index_type: indexed_object_T, ids: List[int]) -> None:
+    """Bring ``ids`` in one index up to date with the database, in one batch."""
+    model = _MODELS[index_type]
+    rows = {row.id: row for row in db.query(model).filter(model.id.in_(ids))}
+    docs = {obj_id: document(index_type, rows.get(obj_id)) for obj_id in ids}
+    search_index.backend().update(db, index_type, docs)
+    search_cache.bump(index_type)
+
+
+def flush_search_index_updates() -> None:
+    def runnable(db: Session) -> List[str]:
+        redis_cli = get_redis_cli()
+        _rotate(redis_cli)
+        pending = redis_cli.smembers(DRAINING_KEY)
+        if not pending:
+            return []
+        groups = _group(pending)
+        for index_type, ids in groups.items():
+            apply_updates(db, index_type, ids)  # type: ignore[arg-type]
+        logger.info("re-indexed %d search document(s)", len(pending))
+
+        # Dropped only once the Postgres vectors are committed too. On
+        # rollback the key stays, and the next flush re-indexes it whole.
+        @event.listens_for(db, "after_commit", once=True)
+        def _drained(session: Session) -> None:
+            try:
+                redis_cli.delete(DRAINING_KEY)
+            except Exception:
+                # Harmless but for the work: the next flush repeats it.
+                logger.exception("could not clear drained search updates")
+
+        return list(groups)
+
+    # Committed for the Postgres backend, which writes the rows' vectors.
+    updated = execute_with_db(SessionLocal(), runnable)
+    if updated:
+        # Again, now that the vectors are committed: a Postgres search
+        # between the update and the commit cached the old ones.
+        search_cache.bump(*updated)
@@ -22,9 +22,9 @@ from chafan_core.app.schemas.event import (
 )
 from chafan_core.app.schemas.site import SiteCreate
 from chafan_core.app.user_permission import check_user_in_site, user_in_site
-from chafan_core.utils.base import EntityType, HTTPException_, unwrap
+from chafan_core.utils.base import EntityType, HTTPException_
 import chafan_core.app.responders as responders
-from chafan_core.app.services import events
+from chafan_core.app.services import events, search_updates
 
 logger = logging.getLogger(__name__)
 
@@ -36,12 +36,14 @@ def create_site(
     moderator: models.User,
     category_topic_id: Optional[int],
 ) -> models.Site:
-    return crud.site.create_with_permission_type(
+    site = crud.site.create_with_permission_type(
         db,
         obj_in=site_in,
         moderator=moderator,
         category_topic_id=category_topic_id,
     )
+    search_updates.mark_on_commit(db, "site", [site.id])
+    return site
 
 
 def create_site_profile(
@@ -70,9 +72,9 @@ def remove_site_profile(db: Session, *, owner_id: int, site_id: int) -> None:
     crud.profile.remove_by_user_and_site(db, owner_id=owner_id, site_id=site_id)
 
 
-def related_site_ids(db: Session, site_id: int, top_k: int = 10) -> List[int]:
+def related_site_ids(site_id: int, top_k: int = 10) -> List[int]:
     return similar_entity_ids(
-        db, entity_id=site_id, entity_type=EntityType.sites, top_k=top_k
+        entity_id=site_id, entity_type=EntityType.sites, top_k=top_k
     )
 
 
@@ -126,7 +128,9 @@ def get_site_info(ctx, *, subdomain: str) -> Optional[schemas.Site]:
 def update_site(
     db: Session, *, old_site: models.Site, update_dict: dict
 ) -> models.Site:
-    return crud.site.update(db, db_obj=old_site, obj_in=update_dict)
+    site = crud.site.update(db, db_obj=old_site, obj_in=update_dict)
+    search_updates.mark_on_commit(db, "site", [site.id])
+    return site
 
 
 def list_site_question_previews(
@@ -138,7 +142,7 @@ def list_site_question_previews(
         ctx.get_db(), db_obj=site, skip=skip, limit=limit
     )
     mat = ctx.principal_view
-    return filter_not_none([mat.preview_of_question(q) for q in questions])
+    return filter_not_none(mat.previews_of_questions(questions))
 
 
 def list_site_webhooks(ctx, *, site: models.Site) -> List[schemas.Webhook]:
@@ -445,8 +449,11 @@ def get_related_sites(ctx, *, uuid: str) -> List[schemas.Site]:
         ):
             related_sites[s.id] = s
 
-    for site_id in related_site_ids(ctx.get_db(), site.id, top_k=5):
+    for site_id in related_site_ids(site.id, top_k=5):
         if site_id not in related_sites:
-            related_sites[site_id] = unwrap(crud.site.get(ctx.get_db(), site_id))
+            # The snapshot may predate the site's removal.
+            related_site = crud.site.get(ctx.get_db(), site_id)
+            if related_site is not None:
+                related_sites[site_id] = related_site
 
     return [site_schema(ctx, s) for s in related_sites.values()]
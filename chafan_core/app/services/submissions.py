@@ -20,7 +20,7 @@ from chafan_core.app.user_permission import check_user_in_site
 from chafan_core.utils.base import HTTPException_, filter_not_none
 import chafan_core.app.responders as responders
 from chafan_core.app.schemas.event import CreateSubmissionInternal
-from chafan_core.app.services import events
+from chafan_core.app.services import events, feed_pool, search_updates
 
 logger = logging.getLogger(__name__)
 
@@ -156,7 +156,7 @@ def get_upvotes(
             status_code=400,
             detail="The submission doesn't exist in the system.",
         )
-    valid_upvotes = crud.submission.count_upvotes(db, submission)
+    valid_upvotes = submission.upvotes_count
     if principal_id:
         upvoted = (
             db.query(models.SubmissionUpvotes)
@@ -352,6 +352,8 @@ def hide_submission(ctx, *, uuid: str) -> Optional[schemas.Submission]:
     submission = crud.submission.update(
         db, db_obj=submission, obj_in={"is_hidden": True}
     )
+    feed_pool.evict_on_commit(db, "submission", submission.id)
+    search_updates.mark_on_commit(db, "submission", [submission.id])
     return submission_schema(ctx, submission)
 
 
@@ -429,11 +431,7 @@ def upvote_submission(ctx, *, uuid: str) -> schemas.SubmissionUpvotes:
                 ),
             )
         db.refresh(submission)
-    valid_upvotes = (
-        db.query(models.SubmissionUpvotes)
-        .filter_by(submission_id=submission.id, cancelled=False)
-        .count()
-    )
+    valid_upvotes = submission.upvotes_count
     return schemas.SubmissionUpvotes(
         submission_uuid=submission.uuid, count=valid_upvotes, upvoted=True
     )
@@ -467,11 +465,7 @@ def cancel_upvote_submission(ctx, *, uuid: str) -> schemas.SubmissionUpvotes:
             db, db_obj=submission, voter=current_user
         )
         db.refresh(submission)
-    valid_upvotes = (
-        db.query(models.SubmissionUpvotes)
-        .filter_by(submission_id=submission.id, cancelled=False)
-        .count()
-    )
+    valid_upvotes = submission.upvotes_count
     return schemas.SubmissionUpvotes(
         submission_uuid=submission.uuid, count=valid_upvotes, upvoted=False
     )
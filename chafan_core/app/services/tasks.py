@@ -0,0 +1,90 @@
+"""Post-response jobs: hand one off from an endpoint, run one in the worker.
+
+Endpoints hand ``services.postprocess`` jobs off with :func:`submit` instead of
+calling ``background_tasks.add_task`` themselves. Where the job then runs is
+``settings.TASK_QUEUE``:
+
+* ``"inline"`` -- in this process, as a FastAPI background task, exactly as
+  before: best-effort, lost on restart, never retried (D4).
+* ``"redis"`` -- the background task only appends the job to the stream in
+  ``infra.task_queue``, and ``chafan_core.app.worker`` runs it with
+  :func:`run`, retrying a failure.
+
+Either way the hand-off happens in a background task, after the response:
+that is after the request's transaction has committed, so a worker can never
+pick up a job for a row it cannot see yet.
+
+A job is named by its function's ``__name__`` and must be listed in
+:data:`JOBS`; its arguments must be JSON values (ids, flags, handles).
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Callable, Dict
+
+from fastapi import BackgroundTasks
+
+from chafan_core.app.config import settings
+from chafan_core.app.infra import task_queue
+from chafan_core.app.infra.runtime import reraising
+from chafan_core.app.services import postprocess
+
+logger = logging.getLogger(__name__)
+
+JOBS: Dict[str, Callable[..., None]] = {
+    job.__name__: job
+    for job in (
+        postprocess.postprocess_new_question,
+        postprocess.postprocess_updated_question,
+        postprocess.postprocess_new_answer,
+        postprocess.postprocess_new_answer_suggest_edit,
+        postprocess.postprocess_new_article,
+        postprocess.postprocess_updated_article,
+        postprocess.postprocess_new_comment,
+        postprocess.postprocess_comment_update,
+        postprocess.postprocess_new_submission,
+        postprocess.postprocess_updated_submission,
+        postprocess.postprocess_new_submission_suggestion,
+        postprocess.postprocess_new_feedback,
+        postprocess.refresh_interesting_question_ids_for_user,
+        postprocess.refresh_interesting_user_ids_for_user,
+    )
+}
+
+
+class UnknownJob(Exception):
+    pass
+
+
+def _enqueue(job: Callable[..., None], args: Any, kwargs: Dict[str, Any]) -> None:
+    try:
+        task_queue.enqueue(job.__name__, args, kwargs)
+    except Exception:
+        # Redis down is no reason to drop the job: run it here, as inline mode
+        # would have.
+        logger.exception("could not enqueue %s; running it in-process", job.__name__)
+        job(*args, **kwargs)
+
+
+def submit(
+    background_tasks: BackgroundTasks,
+    job: Callable[..., None],
+    *args: Any,
+    **kwargs: Any,
+) -> None:
+    """Run ``job(*args, **kwargs)`` after the response, here or in the worker."""
+    assert JOBS.get(job.__name__) is job, f"{job.__name__} is not in tasks.JOBS"
+    if settings.TASK_QUEUE == "redis":
+        background_tasks.add_task(_enqueue, job, args, kwargs)
+    else:
+        background_tasks.add_task(job, *args, **kwargs)
+
+
+def run(job: task_queue.Job) -> None:
+    """Run a dequeued job; a failure propagates, for the worker to retry."""
+    fn = JOBS.get(job.name)
+    if fn is None:
+        raise UnknownJob(job.name)
+    with reraising():
+        fn(*job.args, **job.kwargs)
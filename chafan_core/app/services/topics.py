@@ -40,11 +40,9 @@ def list_topic_questions(
     questions: List[models.Question] = topic.questions[skip : (skip + limit)]
     mat = ctx.principal_view
     return filter_not_none(
-        [
-            mat.preview_of_question(question)
-            for question in questions
-            if not question.is_hidden
-        ]
+        mat.previews_of_questions(
+            [question for question in questions if not question.is_hidden]
+        )
     )
 
 
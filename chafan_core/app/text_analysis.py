@@ -1,6 +1,5 @@
 from typing import List
 
-import jieba.analyse  # type: ignore
 from pydantic.tools import parse_obj_as
 from sqlalchemy.orm.session import Session
 
@@ -9,13 +8,14 @@ from chafan_core.app.schemas.user import (
     UserEducationExperienceInternal,
     UserWorkExperienceInternal,
 )
+from chafan_core.app.infra.jieba_loader import extract_tags
 from chafan_core.app.infra.runtime import execute_with_db
 from chafan_core.db.session import SessionLocal
 from chafan_core.utils.base import dedup, unwrap
 
 
 def get_keywords(text: str, topK: int = 10) -> List[str]:
-    return jieba.analyse.extract_tags(text, topK=topK)
+    return extract_tags(text, topK=topK)
 
 
 def update_question_keywords(question: models.Question) -> None:
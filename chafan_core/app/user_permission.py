@@ -1,8 +1,8 @@
-from typing import Optional
+from typing import AbstractSet, Optional
 
 from sqlalchemy.orm import Session
 
-from chafan_core.app import crud, models
+from chafan_core.app import crud, memberships, models
 from chafan_core.app.common import OperationType
 from chafan_core.app.model_utils import is_live_answer, is_live_article
 from chafan_core.utils.base import ContentVisibility, HTTPException_
@@ -25,11 +25,17 @@ def user_in_site(
     site: models.Site,
     user_id: Optional[int],
     op_type: OperationType,
+    *,
+    member_site_ids: Optional[AbstractSet[int]] = None,
 ) -> bool:
     """Site membership / public-flag check for a principal.
 
     Anonymous principals (user_id is None) only succeed when the site's public
     flag for the given op_type allows the operation without membership.
+
+    Membership is checked against ``member_site_ids`` when given -- every
+    site ``user_id`` has a profile on, already read by the caller -- and else
+    against the set ``memberships`` keeps per request.
     """
     if op_type == OperationType.ReadSite and site.public_readable:
         return True
@@ -43,7 +49,9 @@ def user_in_site(
         return True
     if user_id is None:
         return False
-    if get_active_site_profile(db, site=site, user_id=user_id) is None:
+    if member_site_ids is None:
+        member_site_ids = memberships.get_site_ids(db, user_id)
+    if site.id not in member_site_ids:
         return False
     if op_type == OperationType.AddSiteMember and not site.addable_member:
         return False
@@ -97,7 +105,11 @@ def question_read_allowed(
 
 
 def answer_read_allowed(
-    db: Session, answer: models.Answer, user_id: Optional[int]
+    db: Session,
+    answer: models.Answer,
+    user_id: Optional[int],
+    *,
+    member_site_ids: Optional[AbstractSet[int]] = None,
 ) -> bool:
     """Binary read gate for answers: allowed → full schema; denied → no payload.
 
@@ -115,7 +127,11 @@ def answer_read_allowed(
             return False
         return bool(answer.site.public_readable)
     return user_in_site(
-        db, site=answer.site, user_id=user_id, op_type=OperationType.ReadSite
+        db,
+        site=answer.site,
+        user_id=user_id,
+        op_type=OperationType.ReadSite,
+        member_site_ids=member_site_ids,
     )
 
 
@@ -0,0 +1,92 @@
+"""Startup warm-up: doing before the first requests what they would wait for.
+
+Each phase loads something lazily loaded on first use -- jieba's dictionary,
+the search indexes, compiled email templates, connection pools -- and is
+timed and logged on its own, so a slow start can be pinned on a phase. A
+phase that fails is logged and skipped: whatever it was warming loads on
+first use as before.
+
+``STARTUP_WARM_UP`` decides when it runs: ``background`` (the default) in a
+thread started by the app's startup event, so the server binds its port and
+serves while it runs; ``blocking`` in the startup event itself, so the port
+is bound only once everything is warm; ``off`` not at all.
+"""
+
+import logging
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+
+from chafan_core.app.common import get_redis_cli
+from chafan_core.app.config import settings
+from chafan_core.app.email.utils import compile_email_templates
+from chafan_core.app.infra import jieba_loader, search_index
+from chafan_core.db.session import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+
+def _jieba() -> None:
+    jieba_loader.ensure_loaded()
+    # The keyword extractor's tables, for the first post's keywords.
+    jieba_loader.extract_tags("预热", topK=1)
+
+
+def _search_indexes() -> None:
+    backend = search_index.backend()
+    for index_type in search_index.schemas:
+        backend.warm_up(index_type)
+
+
+def _email_templates() -> None:
+    compile_email_templates()
+
+
+def _connections() -> None:
+    """One connection each in the database and Redis pools."""
+    db = SessionLocal()
+    try:
+        db.execute(text("SELECT 1"))
+    finally:
+        db.close()
+    get_redis_cli().ping()
+
+
+PHASES: List[Tuple[str, Callable[[], None]]] = [
+    ("connections", _connections),
+    ("jieba", _jieba),
+    ("search indexes", _search_indexes),
+    ("email templates", _email_templates),
+]
+
+
+def run() -> Dict[str, float]:
+    """Run every phase; returns the seconds each took."""
+    took: Dict[str, float] = {}
+    started = time.perf_counter()
+    for name, phase in PHASES:
+        phase_started = time.perf_counter()
+        try:
+            phase()
+        except Exception:
+            logger.exception("warm-up: %s failed, skipped", name)
+            continue
+        took[name] = time.perf_counter() - phase_started
+        logger.info("warm-up: %s took %.3fs", name, took[name])
+    logger.info("warm-up: done in %.3fs", time.perf_counter() - started)
+    return took
+
+
+def start() -> Optional[threading.Thread]:
+    """Warm up as ``STARTUP_WARM_UP`` says; returns the thread, if one was
+    started."""
+    if settings.STARTUP_WARM_UP == "off":
+        return None
+    if settings.STARTUP_WARM_UP == "blocking":
+        run()
+        return None
+    thread = threading.Thread(target=run, name="warm-up", daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,161 @@
+"""The task worker: runs the post-response jobs the API queued.
+
+    python -m chafan_core.app.worker                  # TASK_WORKER_CONCURRENCY threads
+    python -m chafan_core.app.worker --concurrency 8
+
+Only needed with ``TASK_QUEUE=redis``; with the default ``inline`` the API
+runs these jobs itself and nothing is ever queued. Reads ``infra.task_queue``
+through its consumer group, so any number of these processes can run side by
+side, on any host, each taking a share. Run more of them when
+``waiting`` in the periodic queue line keeps growing.
+
+Each thread takes one job at a time. A job that raises is retried up to
+``TASK_MAX_ATTEMPTS`` runs and then dead-lettered; a job whose worker dies is
+picked up again after ``task_queue.CLAIM_IDLE``. SIGTERM or SIGINT lets the
+running jobs finish, then exits.
+"""
+
+import argparse
+import logging
+import os
+import signal
+import socket
+import sys
+import threading
+import time
+from typing import Any, List
+
+from chafan_core.app.common import handle_exception
+from chafan_core.app.config import settings
+from chafan_core.app.infra import task_queue
+from chafan_core.app.metrics import tasks as task_metrics
+from chafan_core.app.services import tasks
+
+logger = logging.getLogger(__name__)
+
+# How often the queue depth and job totals are logged.
+REPORT_EVERY = 60.0
+
+
+def handle(job: task_queue.Job) -> None:
+    """Run ``job`` and settle it: ack, retry, or dead-letter."""
+    waited = job.waited
+    started = time.monotonic()
+    ok = False
+    try:
+        tasks.run(job)
+        ok = True
+    except tasks.UnknownJob:
+        logger.error("no such task %r; dead-lettering %s", job.name, job.message_id)
+        task_queue.bury(job)
+    except Exception as e:
+        handle_exception(e)
+        if task_queue.retry(job, max_attempts=settings.TASK_MAX_ATTEMPTS):
+            logger.warning(
+                "task %s failed on attempt %d; requeued", job.name, job.attempt
+            )
+        else:
+            logger.error(
+                "task %s failed %d times; dead-lettered", job.name, job.attempt
+            )
+    else:
+        task_queue.ack(job)
+    finally:
+        ran = time.monotonic() - started
+        task_metrics.record(job.name, waited=waited, ran=ran, ok=ok)
+        logger.info(
+            "task %s %s: waited %.0fms, ran %.0fms",
+            job.name,
+            "done" if ok else "failed",
+            waited * 1000,
+            ran * 1000,
+        )
+
+
+def _consume(consumer: str, stop: threading.Event) -> None:
+    while not stop.is_set():
+        try:
+            jobs = task_queue.next_jobs(consumer)
+        except Exception as e:
+            # Redis gone: wait for it rather than spin.
+            handle_exception(e)
+            stop.wait(5)
+            continue
+        for job in jobs:
+            try:
+                handle(job)
+            except Exception as e:
+                # Settling it failed. The job stays pending, and is claimed
+                # again after CLAIM_IDLE.
+                handle_exception(e)
+
+
+def _report() -> None:
+    depth = task_queue.depth()
+    logger.info(
+        "task queue: %d waiting, %d running, %d dead",
+        depth.waiting,
+        depth.running,
+        depth.dead,
+    )
+    for name, stats in sorted(task_metrics.snapshot().items()):
+        logger.info(
+            "task %s: %d runs, %d failed, mean wait %.0fms, mean run %.0fms",
+            name,
+            stats.runs,
+            stats.failures,
+            stats.mean_wait_ms,
+            stats.mean_run_ms,
+        )
+
+
+def main(argv: List[str]) -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=settings.TASK_WORKER_CONCURRENCY,
+        help="jobs run at once (default: TASK_WORKER_CONCURRENCY)",
+    )
+    args = parser.parse_args(argv)
+    if settings.TASK_QUEUE != "redis":
+        logger.warning(
+            "TASK_QUEUE is %r: the API will not queue anything", settings.TASK_QUEUE
+        )
+
+    task_queue.ensure_group()
+    stop = threading.Event()
+
+    def _stop(signum: int, frame: Any) -> None:
+        logger.info("stopping once the running jobs finish")
+        stop.set()
+
+    signal.signal(signal.SIGTERM, _stop)
+    signal.signal(signal.SIGINT, _stop)
+
+    prefix = f"{socket.gethostname()}-{os.getpid()}"
+    threads = [
+        threading.Thread(
+            target=_consume, args=(f"{prefix}-{i}", stop), name=f"task-worker-{i}"
+        )
+        for i in range(args.concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    logger.info("task worker %s running %d consumer(s)", prefix, len(threads))
+    while not stop.wait(REPORT_EVERY):
+        try:
+            _report()
+        except Exception as e:
+            handle_exception(e)
+    for thread in threads:
+        thread.join()
+    return 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s: %(message)s",
+    )
+    sys.exit(main(sys.argv[1:]))
@@ -1,29 +1,164 @@
-from typing import MutableMapping
+"""This process's open websockets, and the subscriber that feeds them.
 
-from fastapi.websockets import WebSocket
+One :class:`ConnectionManager` per process holds every socket connected to it
+-- any number per user, one for each tab or device. It runs a single
+``redis.asyncio`` subscription to ``mq.WS_CHANNEL`` and hands each published
+message to the sockets of its user here, if there are any; a process without
+them ignores it.
+
+Delivery
+--------
+Each socket has its own bounded send queue and sender task, so one slow
+client never holds up the dispatcher or anyone else. A client whose queue
+fills up -- it stopped reading -- is disconnected with 1013 "try again later"
+rather than buffered without limit.
+
+A message leaves the user's mailbox (``mq.get_ws_queue_for_user``) only once
+it has been sent down a socket. On connect, whatever is still in the mailbox
+is sent first. So a message is never lost to a disconnect, a slow client or a
+gap in the subscription -- it is sent on the next connect instead -- but it
+can arrive twice, e.g. on two tabs opened a moment apart. ``Notification``
+carries its ``id`` for the client to tell.
+"""
 
+import asyncio
+import json
 import logging
+from typing import Dict, Optional, Set
+
+import redis.asyncio as aioredis
+from fastapi import status
+from fastapi.websockets import WebSocket
+
+from chafan_core.app import mq
+
 logger = logging.getLogger(__name__)
 
+# Messages waiting to be sent down one socket before its client is dropped:
+# room for a full mailbox replayed on connect, and as many again arriving live.
+SEND_QUEUE_SIZE = 2 * mq.MAILBOX_SIZE
+
+
+class Connection:
+    def __init__(self, user_id: int, websocket: WebSocket) -> None:
+        self.user_id = user_id
+        self.websocket = websocket
+        self.queue: "asyncio.Queue[str]" = asyncio.Queue(maxsize=SEND_QUEUE_SIZE)
+        self.sender: Optional["asyncio.Task[None]"] = None
+
+
 class ConnectionManager:
     def __init__(self) -> None:
-        # User ID -> WebSocket
-        self.active_connections: MutableMapping[int, WebSocket] = {}
+        # User ID -> that user's sockets on this process
+        self.active_connections: Dict[int, Set[Connection]] = {}
+        self._redis: Optional[aioredis.Redis] = None
+        self._listener: Optional["asyncio.Task[None]"] = None
+
+    def _redis_cli(self) -> aioredis.Redis:
+        if self._redis is None:
+            from chafan_core.app.config import settings
+
+            self._redis = aioredis.from_url(settings.REDIS_URL, decode_responses=True)
+        return self._redis
+
+    async def start(self) -> None:
+        """Subscribe to ``mq.WS_CHANNEL``; call once, on startup."""
+        if self._listener is None:
+            self._listener = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        if self._listener is not None:
+            self._listener.cancel()
+            self._listener = None
+        if self._redis is not None:
+            await self._redis.aclose()
+            self._redis = None
 
-    async def connect(self, user_id: int, websocket: WebSocket) -> None:
+    async def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = self._redis_cli().pubsub(ignore_subscribe_messages=True)
+                await pubsub.subscribe(mq.WS_CHANNEL)
+                logger.info("Subscribed to %s", mq.WS_CHANNEL)
+                async for published in pubsub.listen():
+                    self._on_published(published["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Messages published meanwhile stay in their mailboxes and go
+                # out on the user's next connect.
+                logger.exception("ws subscription lost; resubscribing")
+                await asyncio.sleep(1)
+
+    def _on_published(self, data: str) -> None:
+        try:
+            published = json.loads(data)
+            user_id, message = int(published["user_id"]), published["message"]
+        except (ValueError, KeyError, TypeError):
+            logger.error("malformed message on %s: %r", mq.WS_CHANNEL, data)
+            return
+        self.dispatch(message, user_id)
+
+    async def connect(self, user_id: int, websocket: WebSocket) -> Connection:
         await websocket.accept()
-        self.active_connections[user_id] = websocket
+        connection = Connection(user_id, websocket)
+        self.active_connections.setdefault(user_id, set()).add(connection)
+        mailbox = mq.get_ws_queue_for_user(user_id)
+        try:
+            waiting = await self._redis_cli().lrange(mailbox, 0, -1)
+        except Exception:
+            logger.exception("could not read the ws mailbox of user %s", user_id)
+            waiting = []
+        for message in waiting:
+            connection.queue.put_nowait(message)
+        connection.sender = asyncio.create_task(self._send(connection))
+        return connection
+
+    def remove(self, connection: Connection) -> None:
+        if connection.sender is not None:
+            connection.sender.cancel()
+        connections = self.active_connections.get(connection.user_id)
+        if connections is None:
+            return
+        connections.discard(connection)
+        if not connections:
+            del self.active_connections[connection.user_id]
 
-    def remove(self, user_id: int) -> None:
-        del self.active_connections[user_id]
+    def dispatch(self, message: str, user_id: int) -> int:
+        """Queue ``message`` for every socket of ``user_id``; how many there were."""
+        connections = list(self.active_connections.get(user_id, ()))
+        for connection in connections:
+            try:
+                connection.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                logger.warning(
+                    "ws client of user %s is not reading; dropping it", user_id
+                )
+                self.remove(connection)
+                asyncio.create_task(
+                    connection.websocket.close(code=status.WS_1013_TRY_AGAIN_LATER)
+                )
+        return len(connections)
+
+    async def _send(self, connection: Connection) -> None:
+        mailbox = mq.get_ws_queue_for_user(connection.user_id)
+        while True:
+            message = await connection.queue.get()
+            try:
+                await connection.websocket.send_text(message)
+            except Exception as e:
+                # The receive loop in the endpoint notices the disconnect and
+                # removes the connection; the message stays in the mailbox.
+                logger.info("ws send to user %s failed: %s", connection.user_id, e)
+                return
+            try:
+                await self._redis_cli().lrem(mailbox, 1, message)
+            except Exception:
+                logger.exception("could not clear a sent ws message")
 
     async def send_message(self, message: str, user_id: int) -> None:
-        ws = self.active_connections.get(user_id)
-        if ws:
-            await ws.send_text(message)
-        else:
+        if not self.dispatch(message, user_id):
             logger.error(f"Failed to send_message. No active ws for user={user_id}")
 
 
 manager = ConnectionManager()
-
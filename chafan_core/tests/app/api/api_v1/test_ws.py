@@ -0,0 +1,106 @@
+"""The /ws endpoint: pushed delivery, several sockets per user, the mailbox.
+
+Runs against the app's real subscriber (started with the test client) and
+Redis; what a message is does not matter here, so plain strings stand in for
+serialized notifications.
+"""
+
+import asyncio
+import time
+
+from fastapi.testclient import TestClient
+
+from chafan_core.app import mq, ws_connections
+from chafan_core.app.common import get_redis_cli
+from chafan_core.app.config import settings
+
+
+def _ws_url(client: TestClient, headers: dict) -> str:
+    r = client.post(f"{settings.API_V1_STR}/ws/token", headers=headers)
+    assert r.status_code == 200, r.json()
+    return f"{settings.API_V1_STR}/ws?token={r.json()['token']}"
+
+
+def _wait_for(predicate, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.02)
+
+
+def _subscribed() -> bool:
+    ((_, count),) = get_redis_cli().pubsub_numsub(mq.WS_CHANNEL)
+    return count > 0
+
+
+def test_message_sent_while_offline_arrives_on_connect(
+    client: TestClient, normal_user_token_headers: dict, normal_user_id: int
+) -> None:
+    mailbox = mq.get_ws_queue_for_user(normal_user_id)
+    get_redis_cli().delete(mailbox)
+    mq.publish(normal_user_id, "while-you-were-away")
+
+    with client.websocket_connect(_ws_url(client, normal_user_token_headers)) as ws:
+        assert ws.receive_text() == "while-you-were-away"
+        _wait_for(lambda: get_redis_cli().llen(mailbox) == 0)
+
+
+def test_live_message_reaches_every_socket_of_the_user(
+    client: TestClient, normal_user_token_headers: dict, normal_user_id: int
+) -> None:
+    get_redis_cli().delete(mq.get_ws_queue_for_user(normal_user_id))
+    _wait_for(_subscribed)
+
+    with client.websocket_connect(
+        _ws_url(client, normal_user_token_headers)
+    ) as first, client.websocket_connect(
+        _ws_url(client, normal_user_token_headers)
+    ) as second:
+        _wait_for(
+            lambda: len(
+                ws_connections.manager.active_connections.get(normal_user_id, ())
+            )
+            == 2
+        )
+        mq.publish(normal_user_id, "live")
+
+        assert first.receive_text() == "live"
+        assert second.receive_text() == "live"
+
+    _wait_for(lambda: normal_user_id not in ws_connections.manager.active_connections)
+
+
+class _StalledSocket:
+    """A client that never reads: sends hang, so its queue only grows."""
+
+    def __init__(self) -> None:
+        self.closed_with = None
+
+    async def accept(self) -> None:
+        pass
+
+    async def send_text(self, message: str) -> None:
+        await asyncio.Event().wait()
+
+    async def close(self, code: int) -> None:
+        self.closed_with = code
+
+
+def test_a_client_that_stops_reading_is_dropped() -> None:
+    async def scenario() -> None:
+        manager = ws_connections.ConnectionManager()
+        socket = _StalledSocket()
+        get_redis_cli().delete(mq.get_ws_queue_for_user(-1))
+        connection = await manager.connect(-1, socket)  # type: ignore[arg-type]
+        try:
+            for i in range(ws_connections.SEND_QUEUE_SIZE + 2):
+                manager.dispatch(f"m{i}", -1)
+            await asyncio.sleep(0)
+
+            assert -1 not in manager.active_connections
+            assert socket.closed_with == 1013
+        finally:
+            manager.remove(connection)
+            await manager.stop()
+
+    asyncio.run(scenario())
@@ -337,6 +337,40 @@ def test_delete_forever(db: Session) -> None:
     assert answer.body_prerendered_text == "[DELETED]"
 
 
+def test_live_answers_count(db: Session) -> None:
+    """Test that question.live_answers_count follows its answers' lifecycle."""
+    user = _create_test_user(db)
+    site = _create_test_site(db, moderator=user)
+    question = _create_test_question(db, author_id=user.id, site_id=site.id)
+
+    def _answer(is_published: bool):
+        return crud.answer.create_with_author(
+            db,
+            obj_in=AnswerCreate(
+                content=RichText(source="a", rendered_text="a", editor="tiptap"),
+                question_uuid=question.uuid,
+                is_published=is_published,
+                visibility=ContentVisibility.ANYONE,
+                writing_session_uuid=get_uuid(),
+            ),
+            author_id=user.id,
+            site_id=site.id,
+        )
+
+    published, draft = _answer(True), _answer(False)
+    db.refresh(question)
+    assert question.live_answers_count == 1
+
+    crud.answer.update(db, db_obj=draft, obj_in={"is_published": True})
+    db.refresh(question)
+    assert question.live_answers_count == 2
+
+    crud.answer.update(db, db_obj=draft, obj_in={"is_hidden_by_moderator": True})
+    crud.answer.delete_forever(db, answer=published)
+    db.refresh(question)
+    assert question.live_answers_count == 0
+
+
 def test_update_checked_cannot_unpublish(db: Session) -> None:
     """Test that update_checked prevents unpublishing a published answer."""
     user = _create_test_user(db)
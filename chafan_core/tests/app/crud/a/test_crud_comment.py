@@ -368,6 +368,10 @@ def test_create_reply_comment(db: Session) -> None:
     assert reply_comment.parent_comment_id == parent_comment.id
     assert reply_comment.body == "Reply comment"
 
+    # Only the comment on the question itself counts towards it.
+    db.refresh(question)
+    assert question.comments_count == 1
+
 
 def test_get_comment_by_uuid_returns_none_for_nonexistent(db: Session) -> None:
     """Test that get_by_uuid returns None for non-existent comment."""
@@ -1,6 +1,9 @@
 from sqlalchemy.orm import Session
+from whoosh.index import create_in  # type: ignore
 
 from chafan_core.app import crud
+from chafan_core.app.config import settings
+from chafan_core.app.infra.search_index import schemas as index_schemas
 from chafan_core.app.schemas.question import QuestionCreate, QuestionUpdate
 from chafan_core.app.schemas.user import UserCreate
 from chafan_core.tests.utils.utils import (
@@ -330,3 +333,138 @@ def test_get_question_by_uuid_returns_none_for_nonexistent(db: Session) -> None:
     """Test that get_by_uuid returns None for non-existent question."""
     result = crud.question.get_by_uuid(db, uuid="nonexistent-uuid")
     assert result is None
+
+
+def test_search_returns_a_page_of_hits_in_rank_order(
+    db: Session, tmp_path, monkeypatch
+) -> None:
+    """Test search hydrates one page of hits, best first, dropping hidden ones."""
+    monkeypatch.setattr(settings, "SEARCH_INDEX_FILESYSTEM_PATH", str(tmp_path))
+    # The index is written directly, so no generation is bumped for it.
+    monkeypatch.setattr(settings, "SEARCH_RESULT_CACHE_TTL_SECONDS", 0)
+    user = _create_test_user(db)
+    site = _create_test_site(db, moderator=user)
+    word = "wombatrix"
+    titles = [f"{word} {word} {word}", f"{word} {word}", f"{word} x", "hidden"]
+    questions = [
+        crud.question.create_with_author(
+            db,
+            obj_in=QuestionCreate(site_uuid=site.uuid, title=title),
+            author_id=user.id,
+        )
+        for title in titles
+    ]
+    questions[3].title = f"{word} {word} {word} {word}"
+    db.flush()
+    (tmp_path / "question").mkdir()
+    writer = create_in(tmp_path / "question", index_schemas["question"]).writer()
+    for q in questions:
+        writer.add_document(id=str(q.id), title=q.title, description_text="")
+    writer.commit()
+    # Hidden after indexing, as if the flush had not run yet.
+    questions[3].is_hidden = True
+    db.flush()
+
+    hits = crud.question.search(db, q=word, skip=0, limit=2)
+    assert [q.id for q, _ in hits] == [questions[0].id]
+    hits = crud.question.search(db, q=word, skip=1, limit=3)
+    assert [q.id for q, _ in hits] == [q.id for q in questions[:3]]
+    scores = [hit.score for _, hit in hits]
+    assert scores == sorted(scores, reverse=True)
+    assert hits[0][1].highlight("title", hits[0][0].title).count("<em") == 3
+
+
+def test_search_without_an_index_returns_a_bounded_page(
+    db: Session, tmp_path, monkeypatch
+) -> None:
+    """Test search falls back to a page of the newest questions, unscored."""
+    monkeypatch.setattr(
+        settings, "SEARCH_INDEX_FILESYSTEM_PATH", str(tmp_path / "missing")
+    )
+    user = _create_test_user(db)
+    site = _create_test_site(db, moderator=user)
+    for _ in range(3):
+        crud.question.create_with_author(
+            db,
+            obj_in=QuestionCreate(
+                site_uuid=site.uuid, title=f"Q {random_short_lower_string()}"
+            ),
+            author_id=user.id,
+        )
+
+    hits = crud.question.search(db, q="anything", skip=0, limit=2)
+
+    assert len(hits) == 2
+    assert hits[0][0].id > hits[1][0].id
+    assert all(hit is None for _, hit in hits)
+
+
+def test_sample_readable_ids(db: Session) -> None:
+    """Test sampling draws at most per_site visible questions per readable site."""
+    from chafan_core.app.schemas.profile import ProfileCreate
+    from chafan_core.app.schemas.site import SiteCreate
+
+    user = _create_test_user(db)
+    member_site = _create_test_site(db, moderator=user)
+    crud.profile.create_with_owner(
+        db, obj_in=ProfileCreate(site_uuid=member_site.uuid, owner_uuid=user.uuid)
+    )
+    other_site = _create_test_site(db, moderator=_create_test_user(db))
+    public_site = crud.site.create_with_permission_type(
+        db,
+        obj_in=SiteCreate(
+            name=f"Test Site {random_short_lower_string()}",
+            subdomain=random_short_lower_string(),
+            description="Test site",
+            permission_type="public",
+        ),
+        moderator=user,
+        category_topic_id=None,
+    )
+    site_question_ids = {}
+    hidden_ids = set()
+    for site in (member_site, other_site, public_site):
+        questions = [
+            crud.question.create_with_author(
+                db,
+                obj_in=QuestionCreate(
+                    site_uuid=site.uuid, title=f"Q {random_short_lower_string()}"
+                ),
+                author_id=user.id,
+            )
+            for _ in range(4)
+        ]
+        questions[0].is_hidden = True
+        hidden_ids.add(questions[0].id)
+        site_question_ids[site.id] = {q.id for q in questions}
+    db.flush()
+
+    def _per_site(ids):
+        return {
+            site_id: len(question_ids & set(ids))
+            for site_id, question_ids in site_question_ids.items()
+        }
+
+    sampled = crud.question.sample_readable_ids(
+        db, user_id=user.id, per_site=2, limit=None
+    )
+    assert not hidden_ids & set(sampled)
+    assert _per_site(sampled) == {
+        member_site.id: 2,
+        other_site.id: 0,
+        public_site.id: 2,
+    }
+
+    sampled = crud.question.sample_readable_ids(
+        db, user_id=None, per_site=5, limit=None
+    )
+    assert _per_site(sampled) == {
+        member_site.id: 0,
+        other_site.id: 0,
+        public_site.id: 3,
+    }
+
+    sampled = crud.question.sample_readable_ids(
+        db, user_id=user.id, per_site=2, limit=3
+    )
+    assert len(sampled) == 3
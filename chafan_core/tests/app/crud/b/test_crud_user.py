@@ -1,7 +1,9 @@
 from fastapi.encoders import jsonable_encoder
+from sqlalchemy import func
 from sqlalchemy.orm import Session
 
 from chafan_core.app import crud
+from chafan_core.app.models.user import User
 from chafan_core.app.schemas.user import UserCreate, UserUpdate
 from chafan_core.app.security import verify_password
 from chafan_core.tests.utils.utils import (
@@ -123,3 +125,53 @@ def test_update_user(db: Session) -> None:
     assert user_2
     assert user.email == user_2.email
     assert verify_password(new_password, user_2.hashed_password)
+
+
+def _user(db: Session):
+    return crud.user.create(
+        db,
+        obj_in=UserCreate(
+            email=random_email(),
+            password=random_password(),
+            handle=random_short_lower_string(),
+        ),
+    )
+
+
+def test_follow_counts_follow_follows_and_unfollows(db: Session) -> None:
+    a, b, c = _user(db), _user(db), _user(db)
+    crud.user.add_follower(db, db_obj=a, follower=b)
+    crud.user.add_follower(db, db_obj=a, follower=c)
+    crud.user.add_follower(db, db_obj=a, follower=c)  # already following
+    crud.user.add_follower(db, db_obj=c, follower=b)
+    crud.user.remove_follower(db, db_obj=a, follower=b)
+    crud.user.remove_follower(db, db_obj=a, follower=b)  # not following
+
+    for user in (a, b, c):
+        db.refresh(user)
+        assert (user.followers_count, user.followed_count) == (
+            user.followers.count(),
+            user.followed.count(),
+        )
+    assert (a.followers_count, b.followed_count, c.followed_count) == (1, 1, 1)
+
+
+def test_top_ranked_users_weigh_followers_against_karma(db: Session) -> None:
+    # Above everyone already in the database, including earlier runs' users.
+    base = (db.query(func.max(User.karma)).scalar() or 0) + 1000
+    top, popular, me = _user(db), _user(db), _user(db)
+    top.karma = base + 20
+    popular.karma = base
+    me.karma = base + 100
+    fans = [_user(db) for _ in range(5)]
+    for fan in fans:
+        crud.user.add_follower(db, db_obj=popular, follower=fan)
+    db.flush()
+
+    assert crud.user.get_top_ranked_active_user_ids(
+        db, follower_weight=5, limit=3
+    ) == [me.id, popular.id, top.id]
+    crud.user.add_follower(db, db_obj=popular, follower=me)
+    assert crud.user.get_top_ranked_active_user_ids(
+        db, follower_weight=5, limit=1, not_followed_by=me.id
+    ) == [top.id]
@@ -0,0 +1,122 @@
+"""infra.batch_loader and the preview paths shaped through it.
+
+The loader has to load every wanted key of a kind in one go and answer from
+memory after that; the batched previews have to be the per-item ones, with
+the per-item queries gone.
+"""
+
+from typing import List
+
+import pytest
+from sqlalchemy import event as sa_event
+
+from chafan_core.app import crud
+from chafan_core.app.infra.batch_loader import BatchLoader, Kind
+from chafan_core.app.infra.request_context import RequestContext
+from chafan_core.app.schemas.profile import ProfileCreate
+from chafan_core.tests.utils.content import new_comment, new_question, new_site
+from chafan_core.tests.utils.user import new_user
+
+
+def test_loader_loads_wanted_keys_together() -> None:
+    loads: List[List[int]] = []
+
+    def load(db, keys):
+        loads.append(sorted(keys))
+        return {key: key * 10 for key in keys if key != 3}
+
+    tens = Kind("tens", load, -1)
+    loader = BatchLoader(lambda: None)  # type: ignore
+
+    loader.want(tens, [1, 2, 3])
+    assert loader.get(tens, 2) == 20
+    assert loader.get(tens, 3) == -1
+    assert loader.get_many(tens, [1, 4]) == {1: 10, 4: 40}
+    assert loads == [[1, 2, 3], [4]]
+
+    loader.clear()
+    assert loader.get(tens, 1) == 10
+    assert loads[-1] == [1]
+
+
+@pytest.fixture
+def questions(ctx: RequestContext):
+    """Questions on a private site, some upvoted by a member."""
+    db = ctx.get_db()
+    author, member = new_user(db), new_user(db)
+    site = new_site(db, author, "private")
+    crud.profile.create_with_owner(
+        db, obj_in=ProfileCreate(site_uuid=site.uuid, owner_uuid=member.uuid)
+    )
+    questions = [new_question(db, author, site) for _ in range(4)]
+    for question in questions[:2]:
+        crud.question.upvote(db, db_obj=question, voter=member)
+    db.flush()
+    return {"member": member, "questions": questions}
+
+
+@pytest.mark.parametrize("who", ["member", "outsider", "anonymous"])
+def test_question_previews(ctx: RequestContext, questions, who) -> None:
+    db = ctx.get_db()
+    principal_id = {
+        "member": questions["member"].id,
+        "outsider": new_user(db).id,
+        "anonymous": None,
+    }[who]
+    mat = ctx.as_principal(principal_id)
+
+    previews = mat.previews_of_questions(questions["questions"])
+
+    if who != "member":
+        assert previews == [None] * 4
+        return
+    assert [p.upvotes.upvoted for p in previews] == [True, True, False, False]
+    assert [p.upvotes.count for p in previews] == [1, 1, 0, 0]
+    assert [p.site.members_count for p in previews] == [1] * 4
+    fresh = RequestContext()
+    fresh.db = db
+    assert previews == [
+        fresh.as_principal(principal_id).preview_of_question(q)
+        for q in questions["questions"]
+    ]
+
+
+def test_question_previews_query_once_per_kind(
+    ctx: RequestContext, questions
+) -> None:
+    db = ctx.get_db()
+    statements: List[str] = []
+
+    def _count(conn, cursor, statement, *args) -> None:
+        statements.append(statement)
+
+    engine = db.get_bind()
+    sa_event.listen(engine, "before_cursor_execute", _count)
+    try:
+        ctx.as_principal(questions["member"].id).previews_of_questions(
+            questions["questions"]
+        )
+    finally:
+        sa_event.remove(engine, "before_cursor_execute", _count)
+
+    assert sum("FROM questionupvotes" in s for s in statements) == 1
+    # The sites' member counts; the member's own sites were read when they
+    # joined, and memberships keeps them for the transaction.
+    assert sum("FROM profile" in s for s in statements) == 1
+
+
+def test_comment_schemas_cover_replies(ctx: RequestContext) -> None:
+    db = ctx.get_db()
+    author, voter = new_user(db), new_user(db)
+    question = new_question(db, author, new_site(db, author, "public"))
+    top = new_comment(db, author, question)
+    reply = new_comment(db, author, question, parent=top)
+    crud.comment.upvote(db, db_obj=reply, voter=voter)
+    db.flush()
+    db.refresh(top)
+
+    (shaped,) = ctx.as_principal(voter.id).comment_schemas_from_orm([top])
+
+    assert shaped is not None
+    assert shaped.upvoted is False
+    assert [c.upvoted for c in shaped.child_comments] == [True]
@@ -0,0 +1,145 @@
+"""Contribution heatmaps: the per-day SQL counts, their binning into yearly
+levels, and the per-user cache kept up to date as content comes and goes."""
+
+import datetime
+import random
+from typing import Dict, List, Tuple
+
+from sqlalchemy.orm import Session
+
+from chafan_core.app import contributions, crud
+from chafan_core.app.common import get_redis_cli
+from chafan_core.app.schemas.answer import AnswerCreate
+from chafan_core.app.schemas.question import QuestionCreate
+from chafan_core.app.schemas.richtext import RichText
+from chafan_core.app.schemas.site import SiteCreate
+from chafan_core.app.schemas.user import UserCreate
+from chafan_core.tests.utils.utils import (
+    random_email,
+    random_password,
+    random_short_lower_string,
+)
+from chafan_core.utils.base import ContentVisibility, get_uuid
+
+
+def _per_post_levels(
+    posts: List[Tuple[str, datetime.date]]
+) -> contributions.UserContributions:
+    """The binning the SQL counts replaced, one post at a time."""
+    d: Dict[int, Dict[int, Dict[str, int]]] = {}
+    for kind, day in posts:
+        yday = min(day.timetuple().tm_yday, 364)
+        by_kind = d.setdefault(day.year, {}).setdefault(yday, {})
+        by_kind[kind] = by_kind.get(kind, 0) + 1
+    ret = []
+    for year in reversed(range(min(d), max(d) + 1)) if d else []:
+        data = []
+        for yday in range(1, 365):
+            kinds = d.get(year, {}).get(yday, {})
+            v = 0
+            if "answer" in kinds:
+                v += max(kinds["answer"], 2)
+            if "question" in kinds:
+                v += max(kinds["question"], 1)
+            if "submission" in kinds:
+                v += max(int(float(kinds["submission"]) / 2.0), 1)
+            if "article" in kinds:
+                v += max(kinds["article"], 2)
+            data.append(min(int(v), 3))
+        ret.append((year, data))
+    return ret
+
+
+def test_binned_counts_match_the_per_post_binning() -> None:
+    rng = random.Random(18)
+    kinds = ["answer", "article", "question", "submission"]
+    start = datetime.date(2019, 12, 25)
+    posts = [
+        (rng.choice(kinds), start + datetime.timedelta(days=rng.randint(0, 800)))
+        for _ in range(600)
+    ]
+    counts: Dict[Tuple[str, datetime.date], int] = {}
+    for post in posts:
+        counts[post] = counts.get(post, 0) + 1
+
+    binned = contributions.bin_counts(
+        (kind, day, n) for (kind, day), n in counts.items()
+    )
+
+    assert binned == _per_post_levels(posts)
+    assert [year for year, _ in binned] == [2022, 2021, 2020, 2019]
+    assert contributions.bin_counts([]) == []
+
+
+def _only_day(yday: int, level: int) -> List[int]:
+    data = [0] * contributions.DAYS_PER_YEAR
+    data[yday - 1] = level
+    return data
+
+
+def test_cached_counts_follow_creates_edits_and_deletes(
+    db: Session, monkeypatch
+) -> None:
+    monkeypatch.setattr(contributions, "_after_commit", lambda db, run: run())
+    user = crud.user.create(
+        db,
+        obj_in=UserCreate(
+            email=random_email(),
+            password=random_password(),
+            handle=random_short_lower_string(),
+        ),
+    )
+    site = crud.site.create_with_permission_type(
+        db,
+        obj_in=SiteCreate(
+            name=random_short_lower_string(),
+            subdomain=random_short_lower_string(),
+            description="",
+            permission_type="private",
+        ),
+        moderator=user,
+        category_topic_id=None,
+    )
+    key = contributions._cache_key(user.id)
+    get_redis_cli().delete(key)
+    try:
+        assert contributions.get(db, user.id) == []
+        assert get_redis_cli().exists(key), "an empty heatmap is cached too"
+
+        question = crud.question.create_with_author(
+            db,
+            obj_in=QuestionCreate(site_uuid=site.uuid, title="A question"),
+            author_id=user.id,
+        )
+        answer = crud.answer.create_with_author(
+            db,
+            obj_in=AnswerCreate(
+                content=RichText(source="a", rendered_text="a", editor="tiptap"),
+                question_uuid=question.uuid,
+                is_published=True,
+                visibility=ContentVisibility.ANYONE,
+                writing_session_uuid=get_uuid(),
+            ),
+            author_id=user.id,
+            site_id=site.id,
+        )
+        today = datetime.datetime.now(tz=datetime.timezone.utc)
+        yday = min(today.timetuple().tm_yday, contributions.DAYS_PER_YEAR)
+        ((year, data),) = contributions.get(db, user.id)
+        assert (year, data[yday - 1]) == (today.year, 3)
+
+        # An edit moves the answer to the day it was edited.
+        last_year = today - datetime.timedelta(days=366)
+        crud.answer.update(db, db_obj=answer, obj_in={"updated_at": last_year})
+        levels = dict(contributions.get(db, user.id))
+        assert levels[today.year][yday - 1] == 1
+        assert sum(levels[last_year.year]) == 2
+
+        crud.answer.delete_forever(db, answer=answer)
+        assert contributions.get(db, user.id) == [(today.year, _only_day(yday, 1))]
+
+        # The cache agrees with counting afresh.
+        get_redis_cli().delete(key)
+        assert contributions.get(db, user.id) == [(today.year, _only_day(yday, 1))]
+    finally:
+        get_redis_cli().delete(key)
@@ -0,0 +1,156 @@
+"""responders.event.materialize_events: the batched path behind the feeds.
+
+It has one contract -- item for item, exactly what ``materialize_event``
+returns, ``None`` included -- and these pin it across the cases where the two
+could drift: private sites, membership, hidden content, rows that are gone and
+JSON that does not parse.
+"""
+
+import datetime
+from typing import List
+
+import pytest
+from sqlalchemy import event as sa_event
+
+from chafan_core.app import crud
+from chafan_core.app.infra.request_context import RequestContext
+from chafan_core.app.schemas.event import (
+    AnswerQuestionInternal,
+    CommentQuestionInternal,
+    CreateQuestionInternal,
+    EventInternal,
+    FollowUserInternal,
+)
+from chafan_core.app.schemas.profile import ProfileCreate
+from chafan_core.tests.utils.content import (
+    new_answer,
+    new_comment,
+    new_question,
+    new_site,
+)
+from chafan_core.tests.utils.user import new_user
+
+
+def _json(content) -> str:
+    return EventInternal(
+        created_at=datetime.datetime.now(tz=datetime.timezone.utc),
+        content=content,
+    ).json()
+
+
+@pytest.fixture
+def page(ctx: RequestContext):
+    """A page of events mixing everything the gates treat differently."""
+    db = ctx.get_db()
+    author, member = new_user(db), new_user(db)
+    public = new_site(db, author, "public")
+    private = new_site(db, author, "private")
+    crud.profile.create_with_owner(
+        db, obj_in=ProfileCreate(site_uuid=private.uuid, owner_uuid=member.uuid)
+    )
+    open_q, closed_q, hidden_q = (
+        new_question(db, author, public),
+        new_question(db, author, private),
+        new_question(db, author, public),
+    )
+    hidden_q.is_hidden = True
+    open_a, closed_a = new_answer(db, author, open_q), new_answer(db, author, closed_q)
+    open_c = new_comment(db, author, open_q)
+    closed_c = new_comment(db, author, closed_q)
+    db.flush()
+
+    jsons = [
+        _json(CreateQuestionInternal(subject_id=author.id, question_id=open_q.id)),
+        _json(CreateQuestionInternal(subject_id=author.id, question_id=closed_q.id)),
+        _json(CreateQuestionInternal(subject_id=author.id, question_id=hidden_q.id)),
+        _json(AnswerQuestionInternal(subject_id=author.id, answer_id=open_a.id)),
+        _json(AnswerQuestionInternal(subject_id=author.id, answer_id=closed_a.id)),
+        _json(
+            CommentQuestionInternal(
+                subject_id=author.id, comment_id=open_c.id, question_id=open_q.id
+            )
+        ),
+        _json(
+            CommentQuestionInternal(
+                subject_id=author.id, comment_id=closed_c.id, question_id=closed_q.id
+            )
+        ),
+        _json(FollowUserInternal(subject_id=member.id, user_id=author.id)),
+        _json(CreateQuestionInternal(subject_id=author.id, question_id=2**30)),
+        "{not json",
+    ]
+    return {"author": author, "member": member, "jsons": jsons}
+
+
+def _one_by_one(ctx: RequestContext, principal_id, jsons: List[str]):
+    mat = ctx.as_principal(principal_id)
+    return [mat.materialize_event(j) for j in jsons]
+
+
+def _batched(ctx: RequestContext, principal_id, jsons: List[str]):
+    return ctx.as_principal(principal_id).materialize_events(jsons)
+
+
+@pytest.mark.parametrize("who", ["anonymous", "outsider", "member", "author"])
+def test_batch_matches_the_per_item_path(ctx: RequestContext, page, who) -> None:
+    db = ctx.get_db()
+    principal_id = {
+        "anonymous": None,
+        "outsider": new_user(db).id,
+        "member": page["member"].id,
+        "author": page["author"].id,
+    }[who]
+
+    expected = _one_by_one(ctx, principal_id, page["jsons"])
+    actual = _batched(ctx, principal_id, page["jsons"])
+
+    assert [e is None for e in actual] == [e is None for e in expected]
+    assert actual == expected
+
+
+def test_private_items_render_only_for_members(ctx: RequestContext, page) -> None:
+    """Not just equal to the old path: the gates actually ran."""
+    db = ctx.get_db()
+    outsider = new_user(db)
+
+    seen_by_member = _batched(ctx, page["member"].id, page["jsons"])
+    seen_by_outsider = _batched(ctx, outsider.id, page["jsons"])
+
+    assert seen_by_member[1] is not None
+    assert seen_by_outsider[1] is None
+    assert seen_by_outsider[4] is None
+    assert seen_by_outsider[6] is None
+    assert seen_by_outsider[2] is None, "a hidden question is nobody's but its author's"
+    assert seen_by_outsider[-2:] == [None, None], "gone rows and bad JSON"
+
+
+def test_batch_issues_fewer_statements(ctx: RequestContext, page) -> None:
+    db = ctx.get_db()
+    principal_id = page["member"].id
+    statements: List[str] = []
+
+    def _count(conn, cursor, statement, *args) -> None:
+        statements.append(statement)
+
+    engine = db.get_bind()
+    sa_event.listen(engine, "before_cursor_execute", _count)
+    try:
+        _one_by_one(ctx, principal_id, page["jsons"])
+        per_item = len(statements)
+        statements.clear()
+        _batched(ctx, principal_id, page["jsons"])
+        batched = len(statements)
+    finally:
+        sa_event.remove(engine, "before_cursor_execute", _count)
+
+    assert batched < per_item
+
+
+def test_membership_set_does_not_outlive_the_batch(
+    ctx: RequestContext, page
+) -> None:
+    mat = ctx.as_principal(page["member"].id)
+
+    mat.materialize_events(page["jsons"])
+
+    assert mat.member_site_ids is None
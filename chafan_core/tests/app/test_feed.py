@@ -13,12 +13,22 @@ import pytest
 from sqlalchemy.orm import Session
 
 from chafan_core.app import crud, models, schemas
+from chafan_core.app.config import settings
 from chafan_core.app.infra.request_context import RequestContext
-from chafan_core.app.schemas.event import CreateQuestionInternal, EventInternal
+from chafan_core.app.schemas.event import (
+    CreateQuestionInternal,
+    EventInternal,
+    FollowUserInternal,
+)
 from chafan_core.app.schemas.question import QuestionCreate
 from chafan_core.app.schemas.site import SiteCreate
 from chafan_core.app.schemas.user import UserCreate
-from chafan_core.app.services import events, feed as feed_service, feed_fill
+from chafan_core.app.services import (
+    events,
+    feed as feed_service,
+    feed_fill,
+    feed_impl,
+)
 from chafan_core.tests.utils.utils import (
     random_email,
     random_password,
@@ -359,3 +369,113 @@ def test_subject_timeline_paginates(ctx: RequestContext) -> None:
     )
     assert len(rest) == 1
     assert rest[0].id < first[-1].id
+
+
+# ---------------------------------------------------------------------------
+# Hybrid fan-out: a high-fanout author's followers pull instead of receiving.
+# ---------------------------------------------------------------------------
+
+
+@pytest.fixture
+def pull_above_one(monkeypatch):
+    """Authors with two or more followers are pulled."""
+    monkeypatch.setattr(settings, "FEED_PULL_ABOVE_FOLLOWERS", 1)
+
+
+def _popular(db: Session, *fans):
+    author = _user(db)
+    for fan in fans:
+        crud.user.add_follower(db, db_obj=author, follower=fan)
+    return author
+
+
+def _received(ctx: RequestContext, user, **kwargs) -> List[int]:
+    """The receiver feed alone, before any padding."""
+    kwargs.setdefault("before_activity_id", None)
+    kwargs.setdefault("limit", 20)
+    return [
+        a.id for a in feed_impl.receiver_feed(ctx, receiver_id=user.id, **kwargs)
+    ]
+
+
+def test_high_fanout_author_writes_no_feed_rows(
+    ctx: RequestContext, pull_above_one
+) -> None:
+    db = ctx.get_db()
+    fan, other = _user(db), _user(db)
+    author = _popular(db, fan, other)
+    _ask(ctx, author, _public_site(db, moderator=author))
+
+    assert db.query(models.Feed).filter_by(receiver_id=fan.id).count() == 0
+    mine = db.query(models.Activity).filter_by(subject_user_id=author.id).one()
+    assert _received(ctx, fan) == [mine.id], "pulled at read time instead"
+
+
+def test_low_fanout_author_is_still_pushed(
+    ctx: RequestContext, pull_above_one
+) -> None:
+    db = ctx.get_db()
+    fan = _user(db)
+    author = _popular(db, fan)
+    _ask(ctx, author, _public_site(db, moderator=author))
+
+    assert db.query(models.Feed).filter_by(receiver_id=fan.id).count() == 1
+    assert len(_received(ctx, fan)) == 1
+
+
+def test_pushed_and_pulled_merge_and_paginate(
+    ctx: RequestContext, pull_above_one
+) -> None:
+    db = ctx.get_db()
+    fan, other = _user(db), _user(db)
+    popular = _popular(db, fan, other)
+    modest = _popular(db, fan)
+    site = _public_site(db, moderator=modest)
+    for author in (modest, popular, modest, popular, modest):
+        _ask(ctx, author, site)
+    expected = [
+        a.id
+        for a in db.query(models.Activity)
+        .filter(models.Activity.subject_user_id.in_([popular.id, modest.id]))
+        .order_by(models.Activity.id.desc())
+    ]
+
+    first = _received(ctx, fan, limit=3)
+    rest = _received(ctx, fan, limit=3, before_activity_id=first[-1])
+
+    assert first + rest == expected
+
+
+def test_an_activity_both_pushed_and_pulled_appears_once(
+    ctx: RequestContext, pull_above_one
+) -> None:
+    db = ctx.get_db()
+    fan, other = _user(db), _user(db)
+    author = _popular(db, fan, other)
+    _ask(ctx, author, _public_site(db, moderator=author))
+    activity = db.query(models.Activity).filter_by(subject_user_id=author.id).one()
+    # As if it had also reached `fan` through another audience.
+    events.deliver(ctx, activity, {fan.id}, subject=author)
+    db.flush()
+
+    assert _received(ctx, fan) == [activity.id]
+
+
+def test_only_follower_feed_verbs_are_pulled(
+    ctx: RequestContext, pull_above_one
+) -> None:
+    """A follow writes an Activity, but was never delivered to followers."""
+    db = ctx.get_db()
+    fan, other, followee = _user(db), _user(db), _user(db)
+    popular = _popular(db, fan, other)
+    events.distribute(
+        ctx,
+        EventInternal(
+            created_at=datetime.datetime.now(tz=datetime.timezone.utc),
+            content=FollowUserInternal(subject_id=popular.id, user_id=followee.id),
+        ),
+    )
+    db.flush()
+
+    assert db.query(models.Activity).filter_by(subject_user_id=popular.id).count() == 1
+    assert _received(ctx, fan) == []
@@ -0,0 +1,168 @@
+"""services.feed_pool: the candidates feed padding draws from.
+
+The pool is only a list of candidates -- padding still gates every one at read
+time -- so these pin the three things it must get right: what goes in and
+when, what comes out again, and that padding reads it instead of the table.
+"""
+
+import datetime
+
+from chafan_core.app import crud, models
+from chafan_core.app.common import get_redis_cli
+from chafan_core.app.infra.request_context import RequestContext
+from chafan_core.app.schemas.event import CreateQuestionInternal, EventInternal
+from chafan_core.app.schemas.question import QuestionCreate
+from chafan_core.app.services import events, feed_fill, feed_pool
+from chafan_core.tests.utils.content import new_site
+from chafan_core.tests.utils.user import new_user
+from chafan_core.tests.utils.utils import random_short_lower_string
+
+
+def _ask(ctx: RequestContext, author, site) -> models.Activity:
+    db = ctx.get_db()
+    question = crud.question.create_with_author(
+        db,
+        obj_in=QuestionCreate(
+            site_uuid=site.uuid, title=f"Q {random_short_lower_string()}"
+        ),
+        author_id=author.id,
+    )
+    db.flush()
+    activity = events.distribute(
+        ctx,
+        EventInternal(
+            created_at=datetime.datetime.now(tz=datetime.timezone.utc),
+            content=CreateQuestionInternal(
+                subject_id=author.id, question_id=question.id
+            ),
+        ),
+    )
+    assert activity is not None
+    db.flush()
+    return activity
+
+
+def _pooled_ids():
+    members = get_redis_cli().zrange(feed_pool.POOL_KEY, 0, -1)
+    return {int(m.split(" ")[0]) for m in members}
+
+
+def _warm() -> None:
+    """Fill the pool to POOL_SIZE with entries older than any test's, and
+    naming no row, so that it answers a shortfall by itself."""
+    get_redis_cli().delete(feed_pool.POOL_KEY)
+    feed_pool.admit([(-i, []) for i in range(1, feed_pool.POOL_SIZE + 1)])
+
+
+def _pad(ctx: RequestContext, receiver, limit: int = 3):
+    return feed_fill.top_up(
+        ctx,
+        [],
+        receiver_id=receiver.id,
+        limit=limit,
+        before_activity_id=None,
+        random=False,
+    )
+
+
+def test_public_activity_is_pooled_once_committed() -> None:
+    """Not before the commit: a reader must not find an id it cannot load."""
+    ctx = RequestContext()
+    try:
+        db = ctx.get_db()
+        author = new_user(db)
+        public = new_site(db, author, "public")
+        private = new_site(db, author, "private")
+        shown = _ask(ctx, author, public)
+        unshown = _ask(ctx, author, private)
+        assert shown.id not in _pooled_ids()
+
+        db.commit()
+
+        assert shown.id in _pooled_ids()
+        assert unshown.id not in _pooled_ids()
+    finally:
+        ctx.close()
+
+
+def test_evicting_content_drops_every_entry_naming_it() -> None:
+    feed_pool.admit(
+        [
+            (10**9 + 1, ["question:77"]),
+            (10**9 + 2, ["comment:5", "question:77"]),
+            (10**9 + 3, ["question:78"]),
+        ]
+    )
+
+    feed_pool.evict("question:77")
+
+    pooled = _pooled_ids()
+    assert 10**9 + 1 not in pooled
+    assert 10**9 + 2 not in pooled
+    assert 10**9 + 3 in pooled
+    feed_pool.evict("question:78")
+
+
+def test_padding_reads_the_pool_not_the_table(ctx: RequestContext) -> None:
+    db = ctx.get_db()
+    author = new_user(db)
+    site = new_site(db, author, "public")
+    pooled = _ask(ctx, author, site)
+    _warm()
+    feed_pool.admit([(pooled.id, [])])
+    # Newer and public, but never committed, so never admitted.
+    unpooled = _ask(ctx, author, site)
+    newcomer = new_user(db)
+    db.flush()
+
+    ids = [a.id for a in _pad(ctx, newcomer)]
+
+    assert pooled.id in ids
+    assert unpooled.id not in ids
+
+
+def test_stale_entries_are_gated_at_read_time(ctx: RequestContext) -> None:
+    """An entry is a candidate, not a verdict."""
+    db = ctx.get_db()
+    author = new_user(db)
+    secret = _ask(ctx, author, new_site(db, author, "private"))
+    _warm()
+    feed_pool.admit([(secret.id, [])])
+    outsider = new_user(db)
+    db.flush()
+
+    ids = [a.id for a in _pad(ctx, outsider)]
+
+    assert secret.id not in ids
+
+
+def test_a_cold_pool_falls_back_to_the_scan_and_refills(ctx: RequestContext) -> None:
+    db = ctx.get_db()
+    author = new_user(db)
+    activity = _ask(ctx, author, new_site(db, author, "public"))
+    newcomer = new_user(db)
+    db.flush()
+    get_redis_cli().delete(feed_pool.POOL_KEY)
+
+    ids = [a.id for a in _pad(ctx, newcomer)]
+
+    assert activity.id in ids
+    assert activity.id in _pooled_ids()
+
+
+def test_a_short_pool_is_still_cold(ctx: RequestContext) -> None:
+    """One admission after a flush must not stand in for the seeding."""
+    db = ctx.get_db()
+    author = new_user(db)
+    site = new_site(db, author, "public")
+    older = [_ask(ctx, author, site) for _ in range(2)]
+    admitted = _ask(ctx, author, site)
+    newcomer = new_user(db)
+    db.flush()
+    get_redis_cli().delete(feed_pool.POOL_KEY)
+    feed_pool.admit([(admitted.id, [])])
+
+    ids = [a.id for a in _pad(ctx, newcomer)]
+
+    assert ids == [admitted.id] + [a.id for a in reversed(older)]
+    assert {a.id for a in older} <= _pooled_ids()
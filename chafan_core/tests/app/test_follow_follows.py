@@ -0,0 +1,94 @@
+"""Per-principal follow-follow counts behind UserPreview.social_annotations.
+
+These pin the bounded two-hop query's counts on small hand-built graphs, and
+that the cache in front of it is dropped for everyone whose row a follow
+changes.
+"""
+
+from sqlalchemy.orm import Session
+
+from chafan_core.app import crud
+from chafan_core.app.infra.request_context import RequestContext
+from chafan_core.app.recs import follow_follows
+from chafan_core.app.services import people
+from chafan_core.tests.utils.user import new_user
+
+
+def _follow(db: Session, follower, followed) -> None:
+    crud.user.add_follower(db, db_obj=followed, follower=follower)
+
+
+def test_counts_each_path_through_a_followed_user(db: Session) -> None:
+    me, b, c, target = new_user(db), new_user(db), new_user(db), new_user(db)
+    _follow(db, me, b)
+    _follow(db, me, c)
+    _follow(db, b, target)
+    _follow(db, c, target)
+    _follow(db, b, c)
+
+    counts = follow_follows.compute(db, me.id)
+
+    assert counts == {target.uuid: 2, c.uuid: 1}
+
+
+def test_principal_is_never_their_own_follow_follow(db: Session) -> None:
+    me, b = new_user(db), new_user(db)
+    _follow(db, me, b)
+    _follow(db, b, me)
+
+    assert follow_follows.compute(db, me.id) == {}
+
+
+def test_each_principal_reads_their_own_row(db: Session) -> None:
+    me, b, c, d = new_user(db), new_user(db), new_user(db), new_user(db)
+    _follow(db, me, b)
+    _follow(db, me, c)
+    _follow(db, b, d)
+    _follow(db, c, d)
+    _follow(db, c, b)
+    _follow(db, d, me)
+
+    assert follow_follows.compute(db, me.id) == {d.uuid: 2, b.uuid: 1}
+    assert follow_follows.compute(db, b.id) == {me.uuid: 1}
+    assert follow_follows.compute(db, c.id) == {d.uuid: 1, me.uuid: 1}
+    assert follow_follows.compute(db, d.id) == {b.uuid: 1, c.uuid: 1}
+
+
+def test_cache_is_dropped_for_the_follower_and_their_followers(db: Session) -> None:
+    fan, me, b, c = new_user(db), new_user(db), new_user(db), new_user(db)
+    _follow(db, fan, me)
+    _follow(db, me, b)
+    _follow(db, b, c)
+    assert follow_follows.get(db, fan.id) == {b.uuid: 1}
+    assert follow_follows.get(db, me.id) == {c.uuid: 1}
+
+    # `me` now follows c as well: c becomes a follow-follow of `fan`.
+    _follow(db, me, c)
+    assert follow_follows.get(db, fan.id) == {b.uuid: 1}, "served from cache"
+    follow_follows.forget(follow_follows.stale_user_ids(db, me.id))
+
+    assert follow_follows.get(db, fan.id) == {b.uuid: 1, c.uuid: 1}
+    assert follow_follows.get(db, me.id) == {c.uuid: 1}
+
+
+def test_batch_previews_are_annotated_for_the_principal(
+    ctx: RequestContext,
+) -> None:
+    db = ctx.get_db()
+    me, b, target, stranger = new_user(db), new_user(db), new_user(db), new_user(db)
+    _follow(db, me, b)
+    _follow(db, b, target)
+    ctx.principal_id = me.id
+
+    previews = people.preview_of_users(ctx, [target, stranger])
+
+    assert [p.social_annotations.follow_follows for p in previews] == [1, 0]
+
+
+def test_anonymous_previews_carry_no_annotation(ctx: RequestContext) -> None:
+    db = ctx.get_db()
+    user = new_user(db)
+
+    (preview,) = people.preview_of_users(ctx, [user])
+
+    assert preview.social_annotations.follow_follows is None
@@ -0,0 +1,79 @@
+"""Interesting questions and users: stored lists served as they are, with one
+background refresh queued per stale list, and the bulk refresher's batches."""
+
+import datetime
+
+import pytest
+from fastapi import BackgroundTasks
+from sqlalchemy.orm import Session
+
+from chafan_core.app import crud
+from chafan_core.app.common import get_redis_cli
+from chafan_core.app.config import settings
+from chafan_core.app.recs import indexed_layer
+from chafan_core.app.services import postprocess
+from chafan_core.tests.utils.user import new_user
+from chafan_core.utils.base import get_utc_now
+
+
+@pytest.fixture
+def user(db: Session):
+    user = new_user(db)
+    yield user
+    for kind in ("questions", "users"):
+        get_redis_cli().delete(f"chafan:interesting-refresh:{kind}:{user.id}")
+
+
+def test_a_stale_list_is_served_and_refreshed_once(db: Session, user) -> None:
+    user.interesting_question_ids = [3, 1, 2]
+    user.interesting_question_ids_updated_at = get_utc_now() - datetime.timedelta(
+        days=4
+    )
+    first, second = BackgroundTasks(), BackgroundTasks()
+
+    assert indexed_layer._get_interesting_question_ids(db, first, user) == [3, 1, 2]
+    assert indexed_layer._get_interesting_question_ids(db, second, user) == [3, 1, 2]
+
+    assert [(t.func, t.args) for t in first.tasks] == [
+        (postprocess.refresh_interesting_question_ids_for_user, (user.id,))
+    ]
+    assert second.tasks == []
+
+
+def test_a_fresh_list_is_not_refreshed(db: Session, user) -> None:
+    user.interesting_user_ids = [5]
+    user.interesting_user_ids_updated_at = get_utc_now()
+    background_tasks = BackgroundTasks()
+
+    assert indexed_layer._get_interesting_user_ids(db, background_tasks, user) == [5]
+    assert background_tasks.tasks == []
+
+
+def test_a_user_without_lists_is_served_the_visitors(
+    db: Session, user, monkeypatch
+) -> None:
+    visitor = new_user(db)
+    visitor.interesting_user_ids = [user.id, 7]
+    visitor.interesting_question_ids = [8]
+    monkeypatch.setattr(settings, "VISITOR_USER_ID", visitor.id)
+    background_tasks = BackgroundTasks()
+
+    assert indexed_layer._get_interesting_user_ids(db, background_tasks, user) == [7]
+    assert indexed_layer._get_interesting_question_ids(
+        db, background_tasks, user
+    ) == [8]
+    assert len(background_tasks.tasks) == 2
+
+
+def test_bulk_refresh_covers_every_active_user_in_batches(monkeypatch) -> None:
+    batches = []
+    monkeypatch.setattr(crud.user, "get_active_user_ids", lambda db: [1, 2, 3, 4, 5])
+    monkeypatch.setattr(settings, "VISITOR_USER_ID", 9)
+    monkeypatch.setattr(
+        postprocess, "refresh_interesting_ids_for_users", batches.append
+    )
+
+    count = postprocess.refresh_all_interesting_ids(batch_size=2, workers=2)
+
+    assert count == 6
+    assert sorted(batches) == [[1, 2], [3, 4], [5, 9]]
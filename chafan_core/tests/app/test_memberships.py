@@ -0,0 +1,92 @@
+"""memberships: a user's site ids, read once per request and cached in Redis.
+
+Permission checks of one user against many sites have to cost one profile
+query at most, and none while Redis holds the set; joining or leaving a site
+has to show in the same transaction and drop the Redis copy on commit.
+"""
+
+from typing import List
+
+import pytest
+from sqlalchemy import event as sa_event
+from sqlalchemy.orm import Session
+
+from chafan_core.app import crud, memberships
+from chafan_core.app.common import OperationType, get_redis_cli
+from chafan_core.app.schemas.profile import ProfileCreate
+from chafan_core.app.user_permission import user_in_site
+from chafan_core.tests.utils.content import new_site
+from chafan_core.tests.utils.user import new_user
+
+
+def _profile_queries(db: Session, run) -> int:
+    statements: List[str] = []
+
+    def _count(conn, cursor, statement, *args) -> None:
+        statements.append(statement)
+
+    engine = db.get_bind()
+    sa_event.listen(engine, "before_cursor_execute", _count)
+    try:
+        run()
+    finally:
+        sa_event.remove(engine, "before_cursor_execute", _count)
+    return sum("FROM profile" in s for s in statements)
+
+
+def _read(db: Session, sites, user_id: int) -> List[bool]:
+    return [
+        user_in_site(db, site=site, user_id=user_id, op_type=OperationType.ReadSite)
+        for site in sites
+    ]
+
+
+@pytest.fixture
+def on_commit(monkeypatch) -> List:
+    """Runs queued for commit, so a test can run them without committing."""
+    queued: List = []
+    monkeypatch.setattr(
+        memberships, "_after_commit", lambda db, run: queued.append(run)
+    )
+    return queued
+
+
+def test_checks_read_the_set_once(db: Session) -> None:
+    moderator, member = new_user(db), new_user(db)
+    sites = [new_site(db, moderator, "private") for _ in range(3)]
+    crud.profile.create_with_owner(
+        db, obj_in=ProfileCreate(site_uuid=sites[0].uuid, owner_uuid=member.uuid)
+    )
+    get_redis_cli().delete(memberships._cache_key(member.id))
+    memberships._clear_memo(db)
+
+    results: List[List[bool]] = []
+
+    def read() -> None:
+        results.append(_read(db, sites, member.id))
+
+    assert _profile_queries(db, read) == 1
+    assert _profile_queries(db, read) == 0
+    # A new request: the set comes from Redis.
+    memberships._clear_memo(db)
+    assert _profile_queries(db, read) == 0
+    assert results == [[True, False, False]] * 3
+
+
+def test_joining_and_leaving_show_at_once(db: Session, on_commit) -> None:
+    moderator, user = new_user(db), new_user(db)
+    site = new_site(db, moderator, "private")
+    assert _read(db, [site], user.id) == [False]
+    key = memberships._cache_key(user.id)
+    assert get_redis_cli().exists(key)
+
+    crud.profile.create_with_owner(
+        db, obj_in=ProfileCreate(site_uuid=site.uuid, owner_uuid=user.uuid)
+    )
+    assert _read(db, [site], user.id) == [True]
+    for run in on_commit:
+        run()
+    assert not get_redis_cli().exists(key)
+
+    crud.profile.remove_by_user_and_site(db, owner_id=user.id, site_id=site.id)
+    assert _read(db, [site], user.id) == [False]
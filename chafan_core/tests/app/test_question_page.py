@@ -0,0 +1,66 @@
+"""services.questions' question page and its answer continuation.
+
+Paging with the cursor has to walk the same ranking as one unpaged page,
+without repeating or skipping an answer, and only shape the fields asked for.
+"""
+
+from typing import List
+
+import pytest
+from fastapi import HTTPException
+
+from chafan_core.app import crud
+from chafan_core.app.infra.request_context import RequestContext
+from chafan_core.app.recs.ranking import rank_answers
+from chafan_core.app.services import questions as questions_service
+from chafan_core.tests.utils.content import new_answer, new_question, new_site
+from chafan_core.tests.utils.user import new_user
+
+
+@pytest.fixture
+def question(ctx: RequestContext):
+    """A question on a public site with five answers, two of them upvoted."""
+    db = ctx.get_db()
+    moderator = new_user(db)
+    site = new_site(db, moderator)
+    question = new_question(db, moderator, site)
+    answers = [new_answer(db, new_user(db), question) for _ in range(5)]
+    crud.answer.upvote(db, db_obj=answers[3], voter=moderator)
+    crud.answer.upvote(db, db_obj=answers[1], voter=moderator)
+    crud.answer.upvote(db, db_obj=answers[1], voter=new_user(db))
+    db.refresh(question)
+    return question
+
+
+def test_cursor_pages_through_the_ranking(ctx: RequestContext, question) -> None:
+    page = questions_service.get_question_page(ctx, uuid=question.uuid, limit=2)
+    uuids: List[str] = [a.uuid for a in page.full_answers]
+    assert [a.uuid for a in page.answer_previews] == uuids
+    cursor = page.answers_cursor
+    while cursor is not None:
+        more = questions_service.get_question_page_answers(
+            ctx, uuid=question.uuid, cursor=cursor, limit=2
+        )
+        assert 0 < len(more.full_answers) <= 2
+        uuids += [a.uuid for a in more.full_answers]
+        cursor = more.answers_cursor
+
+    assert uuids == [a.uuid for a in rank_answers(question.answers, None)]
+
+
+def test_only_requested_fields_are_shaped(ctx: RequestContext, question) -> None:
+    page = questions_service.get_question_page(
+        ctx, uuid=question.uuid, limit=5, fields=["answer_previews"]
+    )
+
+    assert page.full_answers == []
+    assert len(page.answer_previews) == 5
+    assert page.answers_cursor is None
+
+
+def test_bad_cursor_is_rejected(ctx: RequestContext, question) -> None:
+    with pytest.raises(HTTPException) as e:
+        questions_service.get_question_page_answers(
+            ctx, uuid=question.uuid, cursor="not a cursor", limit=2
+        )
+    assert e.value.status_code == 400
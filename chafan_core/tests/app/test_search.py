@@ -1,17 +1,27 @@
 import os
 import shutil
 from contextlib import contextmanager
-from typing import Iterator
+from typing import Iterator, List
 
 from whoosh import writing  # type: ignore
 from whoosh.analysis.analyzers import FancyAnalyzer  # type: ignore
 from whoosh.analysis.analyzers import LanguageAnalyzer, StemmingAnalyzer
 from whoosh.index import create_in  # type: ignore
 
-from chafan_core.app.infra.search_index import do_search, schemas
+from chafan_core.app.common import get_redis_cli
+from chafan_core.app.infra import search_whoosh
+from chafan_core.app.infra.search_index import schemas
+from chafan_core.app.metrics import search as search_metrics
 from chafan_core.utils.constants import indexed_object_T
 
 _TEST_SEARCH_INDEX_PREFIX = "/tmp/test_chafan_search/"
+_backend = search_whoosh.WhooshBackend(_TEST_SEARCH_INDEX_PREFIX)
+
+
+def do_search(index_type: indexed_object_T, query: str) -> List[int]:
+    hits = _backend.search(None, index_type, query, skip=0, limit=10)
+    assert hits is not None
+    return [hit.id for hit in hits]
 
 
 @contextmanager
@@ -38,16 +48,85 @@ def test_search_sites() -> None:
             id="1", name="投资", description="test", subdomain="investment"
         )
 
-    ids = do_search("site", "投资", _TEST_SEARCH_INDEX_PREFIX)
+    ids = do_search("site", "投资")
     assert ids == [1], ids
 
-    ids = do_search("site", "invest", _TEST_SEARCH_INDEX_PREFIX)
+    ids = do_search("site", "invest")
     assert ids == [1], ids
 
-    ids = do_search("site", "investment", _TEST_SEARCH_INDEX_PREFIX)
+    ids = do_search("site", "investment")
     assert ids == [1], ids
 
 
+def test_search_pages_hits_with_scores_and_highlights() -> None:
+    with _index_writer("site") as writer:
+        for i in range(5):
+            writer.add_document(
+                id=str(i), name="投资" * (5 - i), description="d", subdomain="s"
+            )
+
+    hits = _backend.search(None, "site", "投资", skip=1, limit=2)
+
+    assert [hit.id for hit in hits] == [1, 2]
+    assert hits[0].score >= hits[1].score
+    highlight = hits[0].highlight("name", "投资 <i>基金</i>")
+    assert highlight.startswith('<em class="match term0">投资</em>')
+    assert "&lt;i&gt;" in highlight and "<i>" not in highlight
+    assert hits[0].highlight("description", "nothing to see") is None
+
+
+def test_searcher_is_shared_until_the_index_changes() -> None:
+    with _index_writer("site") as writer:
+        writer.add_document(id="1", name="投资", description="d", subdomain="a")
+    assert do_search("site", "投资") == [1]
+    shared = search_whoosh._registry[_TEST_SEARCH_INDEX_PREFIX + "site"]
+    with shared.searcher() as (first, _):
+        pass
+
+    assert do_search("site", "投资") == [1]
+    with shared.searcher() as (again, reopened):
+        assert again is first and not reopened
+
+    writer = shared._ix.writer()
+    writer.add_document(id="2", name="投资基金", description="d", subdomain="b")
+    writer.commit()
+    assert sorted(do_search("site", "投资")) == [1, 2]
+
+    # Deleted and rebuilt, back at the same generation.
+    with _index_writer("site") as writer:
+        writer.add_document(id="3", name="投资", description="d", subdomain="c")
+    assert do_search("site", "投资") == [3]
+
+
+def test_a_query_in_flight_keeps_its_searcher_open() -> None:
+    with _index_writer("site") as writer:
+        writer.add_document(id="1", name="投资", description="d", subdomain="a")
+    do_search("site", "投资")
+    shared = search_whoosh._registry[_TEST_SEARCH_INDEX_PREFIX + "site"]
+
+    with shared.searcher() as (held, _):
+        writer = shared._ix.writer()
+        writer.add_document(id="2", name="投资", description="d", subdomain="b")
+        writer.commit()
+        assert sorted(do_search("site", "投资")) == [1, 2]
+        assert not held.is_closed
+        assert [r["id"] for r in held.documents()] == ["1"]
+    assert held.is_closed
+
+
+def test_queries_are_counted_per_index() -> None:
+    get_redis_cli().delete(search_metrics.METRICS_KEY)
+    with _index_writer("site") as writer:
+        writer.add_document(id="1", name="投资", description="d", subdomain="a")
+
+    do_search("site", "投资")
+    do_search("site", "invest")
+
+    stats = search_metrics.snapshot()["site"]
+    assert stats.queries == 2
+    assert stats.query_us > 0
+
+
 def test_stemming_anlayzer() -> None:
     ana = StemmingAnalyzer()
     parsed = [token.text for token in ana("investment")]
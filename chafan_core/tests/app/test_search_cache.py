@@ -0,0 +1,97 @@
+"""infra.search_cache: pages of hits cached in Redis until their index's
+generation moves on.
+
+Each test searches for a query of its own, so entries other tests (or earlier
+runs) cached are never in the way.
+"""
+
+from typing import List
+
+import pytest
+
+from chafan_core.app.common import get_redis_cli
+from chafan_core.app.config import settings
+from chafan_core.app.infra import search_cache
+from chafan_core.app.infra.search_index import SearchHit
+from chafan_core.app.metrics import search as search_metrics
+from chafan_core.tests.utils.utils import random_short_lower_string
+
+
+@pytest.fixture(autouse=True)
+def cache_on(monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_RESULT_CACHE_TTL_SECONDS", 60)
+
+
+class _Backend:
+    def __init__(self, ids: List[int]) -> None:
+        self.ids = ids
+        self.calls = 0
+
+    def __call__(self) -> List[SearchHit]:
+        self.calls += 1
+        terms = frozenset({("name", "word")})
+        return [
+            SearchHit(id=i, score=1.0 / (n + 1), index_type="site", terms=terms)
+            for n, i in enumerate(self.ids)
+        ]
+
+
+def _search(query: str, backend, skip: int = 0, limit: int = 10):
+    return search_cache.cached("site", query, skip=skip, limit=limit, search=backend)
+
+
+def test_a_page_is_served_from_the_cache_until_the_index_changes() -> None:
+    query = random_short_lower_string()
+    backend = _Backend([3, 1, 2])
+
+    first = _search(query, backend)
+    again = _search(f"  {query} ", backend)
+
+    assert backend.calls == 1
+    assert again == first
+    assert again[0].highlight("name", "word") == '<em class="match term0">word</em>'
+
+    _search(query, backend, skip=1)
+    assert backend.calls == 2
+
+    backend.ids = [2]
+    search_cache.bump("site")
+    assert [hit.id for hit in _search(query, backend)] == [2]
+    assert backend.calls == 3
+
+
+def test_an_unavailable_index_is_not_cached() -> None:
+    query = random_short_lower_string()
+    calls = []
+
+    def unavailable():
+        calls.append(1)
+        return None
+
+    assert _search(query, unavailable) is None
+    assert _search(query, unavailable) is None
+    assert len(calls) == 2
+
+
+def test_cache_lookups_are_counted() -> None:
+    get_redis_cli().delete(search_metrics.METRICS_KEY)
+    query = random_short_lower_string()
+    backend = _Backend([1])
+
+    for _ in range(3):
+        _search(query, backend)
+
+    stats = search_metrics.snapshot()["site"]
+    assert (stats.cache_hits, stats.cache_misses) == (2, 1)
+    assert stats.cache_hit_rate == pytest.approx(2 / 3)
+
+
+def test_a_zero_ttl_turns_the_cache_off(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "SEARCH_RESULT_CACHE_TTL_SECONDS", 0)
+    query = random_short_lower_string()
+    backend = _Backend([1])
+
+    _search(query, backend)
+    _search(query, backend)
+
+    assert backend.calls == 2
@@ -0,0 +1,136 @@
+"""The Postgres search backend: jieba-segmented tsvectors behind the same
+interface as Whoosh.
+
+Rows are written and searched in the suite's session, so nothing here is
+committed.
+"""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from chafan_core.app import crud
+from chafan_core.app.config import settings
+from chafan_core.app.infra.search_postgres import postgres_backend
+from chafan_core.app.schemas.question import QuestionCreate
+from chafan_core.app.schemas.site import SiteCreate
+from chafan_core.app.schemas.user import UserCreate
+from chafan_core.app.services import search_updates
+from chafan_core.tests.utils.utils import (
+    random_email,
+    random_password,
+    random_short_lower_string,
+)
+
+
+@pytest.fixture(autouse=True)
+def postgres_search(monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_BACKEND", "postgres")
+
+
+def _site(db: Session, subdomain: str = ""):
+    author = crud.user.create(
+        db,
+        obj_in=UserCreate(
+            email=random_email(),
+            password=random_password(),
+            handle=random_short_lower_string(),
+        ),
+    )
+    return crud.site.create_with_permission_type(
+        db,
+        obj_in=SiteCreate(
+            name=f"S {random_short_lower_string()}",
+            subdomain=subdomain or random_short_lower_string(),
+            description="d",
+            permission_type="public",
+        ),
+        moderator=author,
+        category_topic_id=None,
+    )
+
+
+def _questions(db: Session, *texts):
+    site = _site(db)
+    questions = []
+    for title, description in texts:
+        question = crud.question.create_with_author(
+            db,
+            obj_in=QuestionCreate(site_uuid=site.uuid, title=title),
+            author_id=site.moderator_id,
+        )
+        question.description_text = description
+        questions.append(question)
+    db.flush()
+    search_updates.apply_updates(db, "question", [q.id for q in questions])
+    return questions
+
+
+def test_chinese_text_is_segmented_before_indexing(db: Session) -> None:
+    if db.execute(text("SHOW client_encoding")).scalar() == "SQL_ASCII":
+        pytest.skip("the test database connection cannot carry Chinese text")
+    word = random_short_lower_string()
+    (question,) = _questions(db, (f"我们讨论投资理财 {word}", ""))
+
+    hits = crud.question.search(db, q=f"投资 {word}", skip=0, limit=10)
+
+    assert [(q.id, hit.score > 0) for q, hit in hits] == [(question.id, True)]
+    assert hits[0][1].highlight("title", question.title).startswith(
+        '我们讨论<em class="match term0">投资</em>'
+    )
+
+
+def test_title_matches_outrank_description_matches(db: Session) -> None:
+    word = random_short_lower_string()
+    in_description, in_title = _questions(
+        db, ("first", f"about {word}"), (f"about {word}", "second")
+    )
+
+    hits = crud.question.search(db, q=word, skip=0, limit=10)
+    assert [q.id for q, _ in hits] == [in_title.id, in_description.id]
+    hits = crud.question.search(db, q=word, skip=1, limit=10)
+    assert [q.id for q, _ in hits] == [in_description.id]
+
+
+def test_unsearchable_rows_lose_their_vector(db: Session) -> None:
+    word = random_short_lower_string()
+    (question,) = _questions(db, (word, ""))
+    question.is_hidden = True
+    db.flush()
+
+    search_updates.apply_updates(db, "question", [question.id])
+
+    assert crud.question.search(db, q=word, skip=0, limit=10) == []
+
+
+def test_subdomains_are_stemmed(db: Session) -> None:
+    site = _site(db, subdomain=f"investment{random_short_lower_string()}")
+    # Subdomains are unique and the suite's database outlives a run, so the
+    # one that stems to "invest" is only held until the savepoint rolls back.
+    savepoint = db.begin_nested()
+    try:
+        site.subdomain = "investments"
+        db.flush()
+        search_updates.apply_updates(db, "site", [site.id])
+
+        hits = postgres_backend.search(db, "site", "invest", skip=0, limit=50)
+
+        assert site.id in [hit.id for hit in hits]
+    finally:
+        savepoint.rollback()
+
+
+def test_rebuild_rewrites_every_vector(db: Session) -> None:
+    word = random_short_lower_string()
+    (question,) = _questions(db, (word, ""))
+    question.title = "renamed"
+    db.flush()
+
+    postgres_backend.rebuild(
+        db, "question", search_updates.document_rows(db, "question")
+    )
+
+    assert crud.question.search(db, q=word, skip=0, limit=10) == []
+    assert question.id in [
+        q.id for q, _ in crud.question.search(db, q="renamed", skip=0, limit=20)
+    ]
@@ -0,0 +1,163 @@
+"""services.search_updates: re-indexing what changed, one document at a time.
+
+Each test writes to its own index directory. ``apply_updates`` is driven with
+the suite's session so uncommitted rows are visible to it; the flush, which
+opens its own session, is exercised on ids no row has. The full rebuild reads
+in other processes, so its test commits what it indexes.
+"""
+
+import os
+
+import pytest
+from sqlalchemy.orm import Session
+
+from chafan_core.app import crud
+from chafan_core.app.common import get_redis_cli
+from chafan_core.app.config import settings
+from chafan_core.app.infra.request_context import RequestContext
+from chafan_core.app.infra.search_index import do_search
+from chafan_core.app.schemas.question import QuestionCreate
+from chafan_core.app.schemas.site import SiteCreate
+from chafan_core.app.schemas.user import UserCreate
+from chafan_core.app.services import search_updates
+from chafan_core.app.services.search_rebuild import refresh_search_index
+from chafan_core.tests.utils.utils import (
+    random_email,
+    random_password,
+    random_short_lower_string,
+)
+
+
+@pytest.fixture(autouse=True)
+def index_path(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_INDEX_FILESYSTEM_PATH", str(tmp_path))
+    keys = (search_updates.PENDING_KEY, search_updates.DRAINING_KEY)
+    get_redis_cli().delete(*keys)
+    yield str(tmp_path) + "/"
+    get_redis_cli().delete(*keys)
+
+
+def _question(db: Session, title: str):
+    author = crud.user.create(
+        db,
+        obj_in=UserCreate(
+            email=random_email(),
+            password=random_password(),
+            handle=random_short_lower_string(),
+        ),
+    )
+    site = crud.site.create_with_permission_type(
+        db,
+        obj_in=SiteCreate(
+            name=f"S {random_short_lower_string()}",
+            subdomain=random_short_lower_string(),
+            description="d",
+            permission_type="public",
+        ),
+        moderator=author,
+        category_topic_id=None,
+    )
+    question = crud.question.create_with_author(
+        db,
+        obj_in=QuestionCreate(site_uuid=site.uuid, title=title),
+        author_id=author.id,
+    )
+    db.flush()
+    return question
+
+
+def test_new_content_is_searchable_after_one_update(db: Session, index_path) -> None:
+    question = _question(db, "zebracorn migration")
+
+    search_updates.apply_updates(db, "question", [question.id])
+
+    assert do_search(db, "question", "zebracorn") == [question.id]
+
+
+def test_an_edit_replaces_the_document(db: Session, index_path) -> None:
+    question = _question(db, "quokkafish habitat")
+    search_updates.apply_updates(db, "question", [question.id])
+
+    question.title = "narwhalope habitat"
+    db.flush()
+    search_updates.apply_updates(db, "question", [question.id])
+
+    assert do_search(db, "question", "quokkafish") == []
+    assert do_search(db, "question", "habitat") == [question.id]
+
+
+def test_hidden_content_is_removed(db: Session, index_path) -> None:
+    question = _question(db, "axolotter sightings")
+    search_updates.apply_updates(db, "question", [question.id])
+
+    question.is_hidden = True
+    db.flush()
+    search_updates.apply_updates(db, "question", [question.id])
+
+    assert do_search(db, "question", "axolotter") == []
+
+
+def test_flush_drains_the_queue_and_drops_rows_that_are_gone(
+    db: Session, index_path
+) -> None:
+    question = _question(db, "pangolynx census")
+    search_updates.apply_updates(db, "question", [question.id])
+    # As if the row had since been deleted: the flush's own session cannot
+    # see it, uncommitted.
+    search_updates.mark("question", [question.id])
+
+    search_updates.flush_search_index_updates()
+
+    assert do_search(db, "question", "pangolynx") == []
+    redis_cli = get_redis_cli()
+    assert not redis_cli.exists(search_updates.PENDING_KEY)
+    assert not redis_cli.exists(search_updates.DRAINING_KEY)
+
+
+def test_failed_flush_keeps_the_batch(db: Session, index_path, monkeypatch) -> None:
+    search_updates.mark("question", [0])
+
+    def _fail(db, index_type, ids) -> None:
+        raise RuntimeError("index unavailable")
+
+    monkeypatch.setattr(search_updates, "apply_updates", _fail)
+    search_updates.flush_search_index_updates()
+
+    assert get_redis_cli().smembers(search_updates.DRAINING_KEY) == {"question:0"}
+
+
+def test_rebuild_rows_follow_the_same_rule_as_updates(db: Session) -> None:
+    shown = _question(db, "shown")
+    hidden = _question(db, "hidden")
+    hidden.is_hidden = True
+    db.flush()
+
+    rows = {
+        doc["id"]: doc
+        for doc in search_updates.document_rows(db, "question", batch_size=10)
+        if doc["id"] in (str(shown.id), str(hidden.id))
+    }
+
+    assert rows == {str(shown.id): search_updates.document("question", shown)}
+    assert search_updates.document("question", hidden) is None
+
+
+def test_rebuild_swaps_complete_indexes_in(db: Session, index_path) -> None:
+    word = random_short_lower_string()
+    ctx = RequestContext()
+    try:
+        question_id = _question(ctx.get_db(), word).id
+        ctx.get_db().commit()
+    finally:
+        ctx.close()
+    # An index written in place, as before rebuilds were swapped in.
+    search_updates.apply_updates(db, "question", [])
+    live = index_path + "question"
+    assert not os.path.islink(live)
+
+    counts = refresh_search_index(writer_procs=1, processes=1)
+
+    assert set(counts) == {"question", "site", "submission", "answer", "article"}
+    assert os.path.islink(live)
+    assert len(os.listdir(index_path)) == 10  # five links, five directories
+    assert do_search(db, "question", word) == [question_id]
@@ -0,0 +1,108 @@
+"""Keyword similarity of sites and users: the inverted-index computation, and
+the snapshot that related-site and related-user lookups read."""
+
+import random
+from typing import Dict, List, Set
+
+from sqlalchemy.orm import Session
+
+from chafan_core.app import crud
+from chafan_core.app.common import get_redis_cli
+from chafan_core.app.infra import snapshot_store
+from chafan_core.app.recs import matrices
+from chafan_core.app.schemas.user import UserCreate
+from chafan_core.tests.utils.utils import (
+    random_email,
+    random_password,
+    random_short_lower_string,
+)
+from chafan_core.utils.base import EntityType
+
+
+def _brute_force(keywords: Dict[int, Set[str]], top_k: int) -> Dict[int, List[int]]:
+    """The O(n²) computation the inverted index replaced."""
+    matrix = {}
+    for entity_id, mine in keywords.items():
+        shared = [
+            (len(mine & theirs), other_id)
+            for other_id, theirs in keywords.items()
+            if other_id != entity_id and mine & theirs
+        ]
+        shared.sort(key=lambda p: (-p[0], p[1]))
+        matrix[entity_id] = [other_id for _, other_id in shared[:top_k]]
+    return matrix
+
+
+def test_sparse_top_k_matches_brute_force(monkeypatch) -> None:
+    rng = random.Random(16)
+    vocabulary = [f"k{i}" for i in range(30)]
+    keywords = {
+        entity_id: set(rng.sample(vocabulary, rng.randint(0, 6)))
+        for entity_id in range(1, 201)
+    }
+    monkeypatch.setattr(
+        matrices,
+        "_entity_keywords",
+        lambda db, entity_type: [(k, sorted(v)) for k, v in keywords.items()],
+    )
+
+    for top_k in (1, 5, 50):
+        assert matrices.compute_entity_similarity_matrix(
+            None, EntityType.sites, top_k=top_k  # type: ignore
+        ) == _brute_force(keywords, top_k)
+
+
+def test_users_share_keywords_only_when_active(db: Session) -> None:
+    word = random_short_lower_string()
+    users = []
+    for keywords in ([word, "a"], [word, "a"], [word], ["unrelated"]):
+        user = crud.user.create(
+            db,
+            obj_in=UserCreate(
+                email=random_email(),
+                password=random_password(),
+                handle=random_short_lower_string(),
+            ),
+        )
+        user.keywords = [f"{word}-{k}" if k != word else k for k in keywords]
+        users.append(user)
+    users[2].is_active = False
+    db.flush()
+
+    matrix = matrices.compute_entity_similarity_matrix(db, EntityType.users)
+
+    assert matrix[users[0].id][0] == users[1].id
+    assert users[2].id not in matrix
+    assert users[3].id not in matrix[users[0].id]
+
+
+def test_lookups_read_the_stored_snapshot(monkeypatch) -> None:
+    suffix = random_short_lower_string()
+    monkeypatch.setattr(
+        matrices, "similarity_snapshot", lambda entity_type: f"test:{suffix}"
+    )
+    try:
+        assert matrices.similar_entity_ids(
+            entity_id=1, entity_type=EntityType.sites
+        ) == []
+
+        matrices.store_similarity_snapshot(
+            EntityType.sites, {1: [3, 2, 4], 2: [1], 3: []}
+        )
+        assert matrices.similar_entity_ids(
+            entity_id=1, entity_type=EntityType.sites, top_k=2
+        ) == [3, 2]
+        assert matrices.similar_entity_ids(
+            entity_id=3, entity_type=EntityType.sites
+        ) == []
+
+        # A rebuild replaces the whole snapshot.
+        matrices.store_similarity_snapshot(EntityType.sites, {2: [4]})
+        assert matrices.similar_entity_ids(
+            entity_id=1, entity_type=EntityType.sites
+        ) == []
+        assert matrices.similar_entity_ids(
+            entity_id=2, entity_type=EntityType.sites
+        ) == [4]
+    finally:
+        get_redis_cli().delete(f"{snapshot_store.KEY_PREFIX}:test:{suffix}")
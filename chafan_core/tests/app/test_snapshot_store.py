@@ -0,0 +1,72 @@
+"""The Redis snapshot store behind related users and sites and follow-follow
+counts: whole-snapshot builds, row-level upkeep, and the build figures."""
+
+import time
+
+import pytest
+
+from chafan_core.app.common import get_redis_cli
+from chafan_core.app.infra import snapshot_store
+from chafan_core.app.metrics import recs as recs_metrics
+from chafan_core.tests.utils.utils import random_short_lower_string
+
+
+@pytest.fixture
+def name():
+    name = f"test:{random_short_lower_string()}"
+    yield name
+    get_redis_cli().delete(
+        f"{snapshot_store.KEY_PREFIX}:{name}",
+        f"{snapshot_store.KEY_PREFIX}:{name}:building",
+    )
+
+
+def test_a_build_replaces_the_whole_snapshot(name: str, monkeypatch) -> None:
+    monkeypatch.setattr(snapshot_store, "_BATCH", 2)
+    assert snapshot_store.build(name, ((str(i), f"v{i}") for i in range(5))) == 5
+    assert [snapshot_store.get(name, str(i)) for i in range(6)] == [
+        "v0",
+        "v1",
+        "v2",
+        "v3",
+        "v4",
+        None,
+    ]
+
+    snapshot_store.build(name, [("9", "v9")])
+    assert snapshot_store.get(name, "0") is None
+    assert snapshot_store.get(name, "9") == "v9"
+
+    snapshot_store.build(name, [])
+    assert snapshot_store.get(name, "9") is None
+
+
+def test_rows_are_put_and_forgotten_between_builds(name: str) -> None:
+    snapshot_store.build(name, [("1", "a"), ("2", "b")])
+
+    snapshot_store.put(name, "3", "c")
+    snapshot_store.forget(name, ["1", "4"])
+
+    assert snapshot_store.get(name, "1") is None
+    assert snapshot_store.get(name, "2") == "b"
+    assert snapshot_store.get(name, "3") == "c"
+
+
+def test_builds_and_reads_are_recorded(name: str) -> None:
+    before = time.time()
+    snapshot_store.build(name, [("1", "a"), ("2", "b")])
+    snapshot_store.get(name, "1")
+    snapshot_store.get(name, "3")
+
+    stats = recs_metrics.snapshot()[name]
+
+    assert stats.rows == 2
+    assert (stats.reads, stats.misses, stats.hit_rate) == (2, 1, 0.5)
+    assert stats.built_at >= before
+    assert 0 <= stats.staleness() < 60
+    assert stats.staleness(now=stats.built_at + 3600) == 3600
+    assert recs_metrics.SnapshotStats().staleness() is None
+    get_redis_cli().hdel(
+        recs_metrics.METRICS_KEY,
+        *[f"{name}:{field}" for field in recs_metrics._FIELDS],
+    )
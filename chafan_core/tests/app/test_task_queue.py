@@ -0,0 +1,128 @@
+"""The Redis task queue: hand-off from an endpoint, and the worker's side.
+
+The jobs here are stand-ins registered for the test; what is under test is the
+queue around them -- that a job crosses over with its arguments, runs once on
+success, comes back on failure, and is dead-lettered when it keeps failing.
+"""
+
+from typing import List
+
+import pytest
+from fastapi import BackgroundTasks
+
+from chafan_core.app import worker
+from chafan_core.app.common import get_redis_cli
+from chafan_core.app.config import settings
+from chafan_core.app.infra import task_queue
+from chafan_core.app.infra.runtime import execute_with_context, reraising
+from chafan_core.app.metrics import tasks as task_metrics
+from chafan_core.app.services import tasks
+
+calls: List[tuple] = []
+
+
+def record_call(*args, **kwargs) -> None:
+    calls.append((args, kwargs))
+
+
+def always_fails(*args, **kwargs) -> None:
+    def runnable(ctx) -> None:
+        raise RuntimeError("boom")
+
+    execute_with_context(runnable)
+
+
+@pytest.fixture(autouse=True)
+def queue(monkeypatch):
+    redis_cli = get_redis_cli()
+    keys = (task_queue.STREAM_KEY, task_queue.DEAD_KEY, task_metrics.METRICS_KEY)
+    redis_cli.delete(*keys)
+    task_queue.ensure_group()
+    monkeypatch.setitem(tasks.JOBS, "record_call", record_call)
+    monkeypatch.setitem(tasks.JOBS, "always_fails", always_fails)
+    calls.clear()
+    yield
+    redis_cli.delete(*keys)
+
+
+def _run_background(background_tasks: BackgroundTasks) -> None:
+    for task in background_tasks.tasks:
+        task.func(*task.args, **task.kwargs)
+
+
+def _drain() -> int:
+    handled = 0
+    while True:
+        jobs = task_queue.next_jobs("test-consumer", block_ms=10)
+        if not jobs:
+            return handled
+        for job in jobs:
+            worker.handle(job)
+            handled += 1
+
+
+def test_inline_mode_runs_the_job_in_process(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "TASK_QUEUE", "inline")
+    background_tasks = BackgroundTasks()
+
+    tasks.submit(background_tasks, record_call, 7, flag=True)
+    _run_background(background_tasks)
+
+    assert calls == [((7,), {"flag": True})]
+    assert task_queue.depth().waiting == 0
+
+
+def test_redis_mode_only_enqueues_and_the_worker_runs_it(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "TASK_QUEUE", "redis")
+    background_tasks = BackgroundTasks()
+
+    tasks.submit(background_tasks, record_call, 7, ["a", "b"], flag=True)
+    _run_background(background_tasks)
+
+    assert calls == []
+    assert task_queue.depth().waiting == 1
+
+    assert _drain() == 1
+    assert calls == [((7, ["a", "b"]), {"flag": True})]
+    depth = task_queue.depth()
+    assert (depth.waiting, depth.running, depth.dead) == (0, 0, 0)
+    assert task_metrics.snapshot()["record_call"].runs == 1
+
+
+def test_a_failing_job_is_retried_then_dead_lettered(monkeypatch) -> None:
+    monkeypatch.setattr(settings, "TASK_MAX_ATTEMPTS", 3)
+    task_queue.enqueue("always_fails", [1])
+
+    assert _drain() == 3
+
+    depth = task_queue.depth()
+    assert (depth.waiting, depth.running, depth.dead) == (0, 0, 1)
+    stats = task_metrics.snapshot()["always_fails"]
+    assert (stats.runs, stats.failures) == (3, 3)
+
+
+def test_an_unknown_job_is_dead_lettered_without_retrying() -> None:
+    task_queue.enqueue("no_such_job", [1])
+
+    assert _drain() == 1
+
+    assert task_queue.depth().dead == 1
+
+
+def test_failures_are_swallowed_outside_the_worker_only() -> None:
+    def runnable(ctx) -> None:
+        raise RuntimeError("boom")
+
+    assert execute_with_context(runnable) is None
+    with reraising():
+        with pytest.raises(RuntimeError):
+            execute_with_context(runnable)
+
+
+def test_every_registered_job_is_a_postprocess_function() -> None:
+    from chafan_core.app.services import postprocess
+
+    for name, job in tasks.JOBS.items():
+        if name in ("record_call", "always_fails"):
+            continue
+        assert getattr(postprocess, name) is job
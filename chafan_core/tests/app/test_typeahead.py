@@ -0,0 +1,134 @@
+"""Typeahead: trigram-ranked users, sites and topics, and the in-process cache
+in front of them.
+
+The ranking tests need the pg_trgm extension (the e7c3a1f9d5b2 migration) and
+are skipped on a database without it.
+"""
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from chafan_core.app import crud
+from chafan_core.app.infra.local_cache import LocalCache
+from chafan_core.app.infra.request_context import RequestContext
+from chafan_core.app.schemas.topic import TopicCreate
+from chafan_core.app.schemas.user import UserCreate
+from chafan_core.app.services import search as search_service
+from chafan_core.tests.utils.utils import (
+    random_email,
+    random_password,
+    random_short_lower_string,
+)
+
+
+@pytest.fixture
+def trigram(db: Session):
+    installed = db.execute(
+        text("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+    ).first()
+    if installed is None:
+        pytest.skip("pg_trgm is not installed in the test database")
+
+
+def _topic(db: Session, name: str):
+    return crud.topic.create(db, obj_in=TopicCreate(name=name))
+
+
+def _user(db: Session, handle: str):
+    return crud.user.create(
+        db,
+        obj_in=UserCreate(
+            email=random_email(), password=random_password(), handle=handle
+        ),
+    )
+
+
+def test_local_cache_serves_until_expiry_and_evicts_least_recent() -> None:
+    cache: LocalCache[int] = LocalCache(maxsize=2, ttl=60)
+    loads = []
+
+    def load(value: int):
+        return lambda: loads.append(value) or value
+
+    assert cache.get_or_load("a", load(1)) == 1
+    assert cache.get_or_load("a", load(2)) == 1
+    cache.get_or_load("b", load(3))
+    cache.get_or_load("a", load(4))
+    cache.get_or_load("c", load(5))  # evicts "b", the least recent
+    assert cache.get_or_load("b", load(6)) == 6
+    assert loads == [1, 3, 5, 6]
+    assert (cache.hits, cache.misses) == (2, 4)
+
+    expired: LocalCache[int] = LocalCache(maxsize=2, ttl=0)
+    expired.get_or_load("a", load(7))
+    assert expired.get_or_load("a", load(8)) == 8
+
+    disabled: LocalCache[int] = LocalCache(maxsize=0, ttl=60)
+    disabled.get_or_load("a", load(9))
+    assert disabled.get_or_load("a", load(10)) == 10
+
+
+def test_matches_rank_exact_prefix_substring_then_fuzzy(
+    db: Session, trigram
+) -> None:
+    word = random_short_lower_string()
+    typo = word[:-1] + ("x" if word[-1] != "x" else "y")
+    fuzzy = _topic(db, typo)
+    substring = _topic(db, f"all about {word}")
+    prefix = _user(db, f"{word}fan")
+    exact = _topic(db, word.upper())
+    db.flush()
+
+    suggestions = crud.typeahead.suggest(db, fragment=word, limit=10)
+
+    assert [(s.kind, s.id, s.match) for s in suggestions] == [
+        ("topic", exact.id, "exact"),
+        ("user", prefix.id, "prefix"),
+        ("topic", substring.id, "substring"),
+        ("topic", fuzzy.id, "fuzzy"),
+    ]
+    assert suggestions[0].score >= suggestions[-1].score > 0
+    limited = crud.typeahead.suggest(db, fragment=word, limit=2, kinds=("topic",))
+    assert [s.id for s in limited] == [exact.id, substring.id]
+
+
+def test_like_wildcards_in_a_fragment_are_literal(db: Session, trigram) -> None:
+    word = random_short_lower_string()
+    underscored = _topic(db, f"{word}_x")
+    other = _topic(db, f"{word}ax")
+    db.flush()
+
+    suggestions = crud.typeahead.suggest(db, fragment=f"{word}_x", limit=10)
+
+    matches = {s.id: s.match for s in suggestions}
+    assert matches[underscored.id] == "exact"
+    assert matches.get(other.id) in (None, "fuzzy")
+
+
+def test_typeahead_previews_each_kind_and_caches_suggestions(
+    ctx: RequestContext, db: Session, trigram, monkeypatch
+) -> None:
+    cache: LocalCache = LocalCache(maxsize=16, ttl=60)
+    monkeypatch.setattr(search_service, "_typeahead_cache", cache)
+    word = random_short_lower_string()
+    user = _user(db, word)
+    topic = _topic(db, f"{word} topic")
+    db.flush()
+
+    results = search_service.typeahead(ctx, f" {word.upper()} ")
+
+    assert [(r.kind, r.match) for r in results] == [
+        ("user", "exact"),
+        ("topic", "prefix"),
+    ]
+    assert results[0].user is not None and results[0].user.uuid == user.uuid
+    assert results[1].topic is not None and results[1].topic.uuid == topic.uuid
+
+    # Served from the cache, so a topic added since is not suggested yet.
+    _topic(db, f"{word} another")
+    db.flush()
+    assert len(search_service.typeahead(ctx, word)) == 2
+    assert cache.hits == 1
+    cache.clear()
+    assert len(search_service.typeahead(ctx, word)) == 3
@@ -0,0 +1,49 @@
+"""Lazy jieba and the startup warm-up that loads it, among other things."""
+
+import pickle
+import subprocess
+import sys
+
+import pytest
+
+from chafan_core.app import warm_up
+from chafan_core.app.config import settings
+from chafan_core.app.infra.search_index import schemas
+
+
+def test_importing_the_app_does_not_load_jieba() -> None:
+    code = (
+        "import sys\n"
+        "import chafan_core.app.main, chafan_core.app.text_analysis\n"
+        "assert not [m for m in sys.modules if m.startswith('jieba')]\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_lazy_analyzer_segments_and_pickles_as_its_class() -> None:
+    analyzer = schemas["question"]["title"].analyzer
+
+    assert [t.text for t in analyzer("Investing 投资")] == ["invest", "投资"]
+    assert pickle.loads(pickle.dumps(analyzer)) == type(analyzer)()
+
+
+def test_each_phase_is_timed_and_a_failure_skips_only_that_phase(
+    monkeypatch,
+) -> None:
+    def broken() -> None:
+        raise RuntimeError("no")
+
+    monkeypatch.setattr(warm_up, "PHASES", [("broken", broken)] + warm_up.PHASES)
+
+    took = warm_up.run()
+
+    assert set(took) == {"connections", "jieba", "search indexes", "email templates"}
+    assert all(seconds >= 0 for seconds in took.values())
+
+
+@pytest.mark.parametrize("mode", ["off", "blocking"])
+def test_only_background_mode_starts_a_thread(mode, monkeypatch) -> None:
+    monkeypatch.setattr(settings, "STARTUP_WARM_UP", mode)
+    monkeypatch.setattr(warm_up, "PHASES", [])
+
+    assert warm_up.start() is None
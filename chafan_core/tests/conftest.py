@@ -7,6 +7,7 @@ from sqlalchemy.orm import Session
 
 from chafan_core.app.main import app
 from chafan_core.app import crud
+from chafan_core.app.infra.request_context import RequestContext
 from chafan_core.db.session import SessionLocal
 from chafan_core.tests.utils.user import authentication_token_from_email
 from chafan_core.tests.utils.utils import (
@@ -46,6 +47,18 @@ def client() -> Generator[TestClient, None, None]:
         yield test_client
 
 
+@pytest.fixture
+def ctx(db: Session) -> Generator[RequestContext, None, None]:
+    """
+    A RequestContext sharing the suite's session, for calling services directly.
+    Not a fresh RequestContext: its own SessionLocal would open a second
+    transaction and block on rows this one holds.
+    """
+    context = RequestContext()
+    context.db = db
+    yield context
+
+
 # =============================================================================
 # User Authentication Fixtures
 # =============================================================================
@@ -0,0 +1,82 @@
+"""Sites, questions, answers and comments for tests, flushed but not committed.
+
+Each is created through crud with random names, the way a test written
+against the shared ``db`` session needs them; see ``new_user`` in user.py.
+"""
+
+from typing import Optional
+
+from sqlalchemy.orm import Session
+
+from chafan_core.app import crud, models
+from chafan_core.app.schemas.answer import AnswerCreate
+from chafan_core.app.schemas.comment import CommentCreate
+from chafan_core.app.schemas.question import QuestionCreate
+from chafan_core.app.schemas.richtext import RichText
+from chafan_core.app.schemas.site import SiteCreate
+from chafan_core.tests.utils.utils import random_short_lower_string
+from chafan_core.utils.base import ContentVisibility, get_uuid
+
+
+def new_site(
+    db: Session, moderator: models.User, permission_type: str = "public"
+) -> models.Site:
+    return crud.site.create_with_permission_type(
+        db,
+        obj_in=SiteCreate(
+            name=f"S {random_short_lower_string()}",
+            subdomain=random_short_lower_string(),
+            description="d",
+            permission_type=permission_type,
+        ),
+        moderator=moderator,
+        category_topic_id=None,
+    )
+
+
+def new_question(
+    db: Session, author: models.User, site: models.Site
+) -> models.Question:
+    return crud.question.create_with_author(
+        db,
+        obj_in=QuestionCreate(
+            site_uuid=site.uuid, title=f"Q {random_short_lower_string()}"
+        ),
+        author_id=author.id,
+    )
+
+
+def new_answer(
+    db: Session, author: models.User, question: models.Question
+) -> models.Answer:
+    return crud.answer.create_with_author(
+        db,
+        obj_in=AnswerCreate(
+            content=RichText(source="a", rendered_text="a", editor="tiptap"),
+            question_uuid=question.uuid,
+            is_published=True,
+            visibility=ContentVisibility.ANYONE,
+            writing_session_uuid=get_uuid(),
+        ),
+        author_id=author.id,
+        site_id=question.site_id,
+    )
+
+
+def new_comment(
+    db: Session,
+    author: models.User,
+    question: models.Question,
+    parent: Optional[models.Comment] = None,
+) -> models.Comment:
+    """A comment on ``question``, or a reply to ``parent`` if given."""
+    return crud.comment.create_with_author(
+        db,
+        obj_in=CommentCreate(
+            content=RichText(source="c", rendered_text="c", editor="tiptap"),
+            question_uuid=None if parent else question.uuid,
+            parent_comment_uuid=parent.uuid if parent else None,
+        ),
+        author_id=author.id,
+        check_site=lambda site: None,
+    )
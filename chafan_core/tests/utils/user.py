@@ -43,6 +43,18 @@ def create_random_user(db: Session) -> User:
     return user
 
 
+def new_user(db: Session) -> User:
+    """A user with random credentials, flushed but not committed."""
+    return crud.user.create(
+        db,
+        obj_in=UserCreate(
+            email=random_email(),
+            password=random_password(),
+            handle=random_short_lower_string(),
+        ),
+    )
+
+
 def authentication_token_from_email(
     *, client: TestClient, email: CaseInsensitiveEmailStr, db: Session
 ) -> Dict[str, str]:
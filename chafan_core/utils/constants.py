@@ -11,6 +11,9 @@ MAX_MY_SUBSCRIBED_ITEMS_PAGINATION_LIMIT = 20
 MAX_USER_FOLLOWERS_PAGINATION_LIMIT = 20
 MAX_USER_FOLLOWED_PAGINATION_LIMIT = 20
 MAX_FEATURED_ANSWERS_LIMIT = 20
+MAX_QUESTION_PAGE_ANSWERS_LIMIT = 10
+MAX_SEARCH_PAGINATION_LIMIT = 20
+MAX_TYPEAHEAD_LIMIT = 10
 
 # Why storing editor choice? Pre-rendering for email etc.
 
@@ -0,0 +1,135 @@
+"""Compare the Whoosh and Postgres search backends on this database's content.
+
+    python scripts/benchmark_search.py                    # 200 queries per index
+    python scripts/benchmark_search.py --queries 50 --index question --index answer
+
+Both backends are built from the same rows (`search_updates.document_rows`):
+Whoosh into a temporary directory, Postgres inside a transaction that is
+rolled back at the end, so neither the live index directory nor the live
+`search_vector` columns are touched. Queries are one or two words drawn from
+the indexed text itself, so every query has hits.
+
+For each index it reports build time, query latency (mean, p50, p95) and how
+much the two backends' first pages agree (mean overlap of the top 10 ids).
+"""
+
+import os.path
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+import logging
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy.orm import Session
+
+from chafan_core.app.infra.search_index import schemas
+from chafan_core.app.infra.search_postgres import postgres_backend
+from chafan_core.app.infra.search_whoosh import WhooshBackend
+from chafan_core.app.services.search_rebuild import build_whoosh_index
+from chafan_core.app.services.search_updates import document_rows
+from chafan_core.db.session import SessionLocal
+
+logging.basicConfig(level=logging.WARNING)
+
+_INDEX_TYPES = ("question", "site", "submission", "answer", "article")
+
+
+def _sample_queries(
+    index_type: str, docs: List[Dict[str, str]], n: int, rng: random.Random
+) -> List[str]:
+    schema = schemas[index_type]
+    queries = []
+    for doc in rng.sample(docs, min(n, len(docs))):
+        fields = [f for f in doc if f != "id" and doc[f]]
+        if not fields:
+            continue
+        field = rng.choice(fields)
+        words = [t.text for t in schema[field].analyzer(doc[field])]
+        if words:
+            start = rng.randrange(len(words))
+            queries.append(" ".join(words[start : start + rng.choice((1, 2))]))
+    return queries
+
+
+def _run(
+    backend: Any, db: Session, index_type: str, queries: List[str]
+) -> Tuple[List[float], List[List[int]]]:
+    """Each query's latency in ms, and its first page of ids."""
+    timings, pages = [], []
+    for q in queries:
+        started = time.perf_counter()
+        hits = backend.search(db, index_type, q, skip=0, limit=10) or []
+        timings.append((time.perf_counter() - started) * 1000)
+        pages.append([hit.id for hit in hits])
+    return timings, pages
+
+
+def _summary(ms: List[float]) -> str:
+    if not ms:
+        return "-"
+    p95 = statistics.quantiles(ms, n=20)[-1] if len(ms) >= 20 else max(ms)
+    return (
+        f"mean {statistics.mean(ms):7.2f} ms  "
+        f"p50 {statistics.median(ms):7.2f} ms  p95 {p95:7.2f} ms"
+    )
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--queries", type=int, default=200, help="per index")
+    parser.add_argument(
+        "--index", action="append", choices=_INDEX_TYPES, help="(repeatable)"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    root = tempfile.mkdtemp(prefix="chafan-search-benchmark-")
+    whoosh = WhooshBackend(root)
+    db = SessionLocal()
+    try:
+        for index_type in args.index or _INDEX_TYPES:
+            docs = list(document_rows(db, index_type))
+            queries = _sample_queries(index_type, docs, args.queries, rng)
+
+            started = time.perf_counter()
+            build_whoosh_index(index_type, whoosh.index_dir(index_type), 1)
+            whoosh_build = time.perf_counter() - started
+            started = time.perf_counter()
+            postgres_backend.rebuild(db, index_type, iter(docs))
+            db.flush()
+            postgres_build = time.perf_counter() - started
+
+            runs = {}
+            for name, backend in (("whoosh", whoosh), ("postgres", postgres_backend)):
+                runs[name] = _run(backend, db, index_type, queries)
+            overlaps = []
+            for w, p in zip(runs["whoosh"][1], runs["postgres"][1]):
+                if w or p:
+                    overlaps.append(len(set(w) & set(p)) / len(set(w) | set(p)))
+
+            print(f"{index_type}: {len(docs)} documents, {len(queries)} queries")
+            print(
+                f"  build    whoosh {whoosh_build:7.2f} s"
+                f"   postgres {postgres_build:7.2f} s"
+            )
+            print(f"  whoosh   {_summary(runs['whoosh'][0])}")
+            print(f"  postgres {_summary(runs['postgres'][0])}")
+            if overlaps:
+                print(f"  top-10 overlap {statistics.mean(overlaps):.0%}")
+    finally:
+        db.rollback()
+        db.close()
+        shutil.rmtree(root, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""Recompute every active user's interesting questions and users.
+
+    python scripts/refresh_interesting.py
+    python scripts/refresh_interesting.py --batch-size 50 --workers 2   # gentler
+
+Requests keep these lists current on their own: a stale list is served and a
+refresh queued (see `chafan_core/app/recs/indexed_layer.py`). Run this to fill
+them ahead of the requests -- after a deploy that changes how they are
+computed, or to give users who have never had lists their own.
+"""
+
+import os.path
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+import logging
+
+from chafan_core.app.config import settings
+from chafan_core.app.services.postprocess import refresh_all_interesting_ids
+
+logging.basicConfig(level=logging.INFO)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=100,
+        help="users refreshed per transaction (default: 100)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=settings.TASK_WORKER_CONCURRENCY,
+        help="batches refreshed at once (default: TASK_WORKER_CONCURRENCY)",
+    )
+    args = parser.parse_args()
+    count = refresh_all_interesting_ids(
+        batch_size=args.batch_size, workers=args.workers
+    )
+    print(f"{count} user(s) refreshed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
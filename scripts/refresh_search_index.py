@@ -0,0 +1,57 @@
+"""Rebuild every search index from scratch.
+
+    python scripts/refresh_search_index.py
+    python scripts/refresh_search_index.py --processes 2 --writer-procs 1   # gentler
+
+The indexes are kept current as content changes (see
+`chafan_core/app/services/search_updates.py`), so this is a repair command,
+not maintenance. Run it:
+
+  * after changing an index schema in `chafan_core/app/infra/search_index.py`
+    or the documents built in `search_updates.document`;
+  * on a host whose index directory (`SEARCH_INDEX_FILESYSTEM_PATH`) is new,
+    lost, or suspect.
+
+The indexes are built side by side in separate processes and swapped in
+together when all are done; searches keep using the old ones until then.
+"""
+
+import os.path
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import argparse
+import logging
+
+from chafan_core.app.services.search_rebuild import refresh_search_index
+
+logging.basicConfig(level=logging.INFO)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--processes",
+        type=int,
+        default=None,
+        help="indexes built at once (default: all five)",
+    )
+    parser.add_argument(
+        "--writer-procs",
+        type=int,
+        default=None,
+        help="Whoosh writer processes per index "
+        "(default: SEARCH_INDEX_REBUILD_WRITER_PROCS)",
+    )
+    args = parser.parse_args()
+    counts = refresh_search_index(
+        writer_procs=args.writer_procs, processes=args.processes
+    )
+    for index_type, count in counts.items():
+        print(f"{index_type}: {count} document(s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
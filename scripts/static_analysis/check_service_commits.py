@@ -78,8 +78,7 @@ def is_db_receiver(name: str) -> bool:
     so `ctx.commit()` is the form a regression would most likely take.
 
     Deliberately excludes non-SQLAlchemy commits that share the method name --
-    `writer.commit()` on a Whoosh IndexWriter in services/search.py is not a
-    transaction boundary.
+    `writer.commit()` on a Whoosh IndexWriter is not a transaction boundary.
     """
     lowered = name.lower()
     return any(tok in lowered for tok in ("db", "session", "ctx", "context"))